@@ -0,0 +1,41 @@
+"""Add archived_records for the cold archive tier
+
+Revision ID: add_cold_archive
+Revises: partition_time_series
+Create Date: 2026-10-16 23:00:00.000000
+
+Rows are moved here by core.archiver; nothing is archived by the migration.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_cold_archive'
+down_revision = 'partition_time_series'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create archived_records"""
+    op.create_table(
+        'archived_records',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('record_type', sa.String(length=20), nullable=False),
+        sa.Column('record_key', sa.String(length=64), nullable=False),
+        sa.Column('session_id', sa.String(length=64), nullable=True),
+        sa.Column('user_pubkey', sa.String(length=66), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=True),
+        sa.Column('payload', sa.LargeBinary(length=16777215), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('record_type', 'record_key', name='uq_archived_records_type_key')
+    )
+    op.create_index('ix_archived_records_session_id', 'archived_records', ['session_id'], unique=False)
+
+
+def downgrade():
+    """Drop archived_records; archived rows are lost"""
+    op.drop_index('ix_archived_records_session_id', table_name='archived_records')
+    op.drop_table('archived_records')
@@ -0,0 +1,56 @@
+"""Add composite secondary indexes for hot query paths
+
+Revision ID: add_hot_path_indexes
+Revises: add_rgb_support
+Create Date: 2026-10-16 09:00:00.000000
+
+Existing duplicate (user_pubkey, asset_id) rows in asset_balances must be
+merged before upgrading, otherwise the unique constraint cannot be created.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_hot_path_indexes'
+down_revision = 'add_rgb_support'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create composite indexes used by assignment, balance, session and job queries"""
+
+    # VTXO assignment / inventory: asset_id + status equality, amount range, expiry filter
+    op.create_index('ix_vtxos_asset_status_amount_expires', 'vtxos',
+                    ['asset_id', 'status', 'amount_sats', 'expires_at'], unique=False)
+    op.create_index('ix_vtxos_user_status', 'vtxos', ['user_pubkey', 'status'], unique=False)
+    op.create_index('ix_vtxos_status_expires', 'vtxos', ['status', 'expires_at'], unique=False)
+
+    # One balance row per (user, asset)
+    op.create_unique_constraint('uq_asset_balances_user_asset', 'asset_balances', ['user_pubkey', 'asset_id'])
+
+    # Signing sessions by user/status and expiry sweeps
+    op.create_index('ix_signing_sessions_user_status', 'signing_sessions', ['user_pubkey', 'status'], unique=False)
+    op.create_index('ix_signing_sessions_status_expires', 'signing_sessions', ['status', 'expires_at'], unique=False)
+
+    # Transactions looked up by session
+    op.create_index('ix_transactions_session_id', 'transactions', ['session_id'], unique=False)
+
+    # Lightning monitor polls pending invoices
+    op.create_index('ix_lightning_invoices_status_expires', 'lightning_invoices', ['status', 'expires_at'], unique=False)
+
+    # Admin job statistics scan by time window
+    op.create_index('ix_job_logs_created_at_status', 'job_logs', ['created_at', 'status'], unique=False)
+
+
+def downgrade():
+    """Drop hot-path indexes"""
+    op.drop_index('ix_job_logs_created_at_status', table_name='job_logs')
+    op.drop_index('ix_lightning_invoices_status_expires', table_name='lightning_invoices')
+    op.drop_index('ix_transactions_session_id', table_name='transactions')
+    op.drop_index('ix_signing_sessions_status_expires', table_name='signing_sessions')
+    op.drop_index('ix_signing_sessions_user_status', table_name='signing_sessions')
+    op.drop_constraint('uq_asset_balances_user_asset', 'asset_balances', type_='unique')
+    op.drop_index('ix_vtxos_status_expires', table_name='vtxos')
+    op.drop_index('ix_vtxos_user_status', table_name='vtxos')
+    op.drop_index('ix_vtxos_asset_status_amount_expires', table_name='vtxos')
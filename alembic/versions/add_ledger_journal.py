@@ -0,0 +1,77 @@
+"""Add append-only ledger journal, supply counters and snapshots
+
+Revision ID: add_ledger_journal
+Revises: add_vtxo_settlement_proof
+Create Date: 2026-10-16 14:00:00.000000
+
+Existing balances are carried over as one 'opening' journal entry per
+asset_balances row, and supply counters start from SUM(balance) per asset.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_ledger_journal'
+down_revision = 'add_vtxo_settlement_proof'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create ledger_entries, asset_supply and ledger_snapshots and seed them from asset_balances"""
+    op.create_table(
+        'ledger_entries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('asset_id', sa.String(length=64), nullable=False),
+        sa.Column('user_pubkey', sa.String(length=66), nullable=False),
+        sa.Column('balance_delta', sa.BigInteger(), nullable=True),
+        sa.Column('reserved_delta', sa.BigInteger(), nullable=True),
+        sa.Column('entry_type', sa.String(length=32), nullable=False),
+        sa.Column('reference', sa.String(length=128), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ledger_entries_asset_user_id', 'ledger_entries', ['asset_id', 'user_pubkey', 'id'], unique=False)
+    op.create_index('ix_ledger_entries_created_at', 'ledger_entries', ['created_at'], unique=False)
+
+    op.create_table(
+        'asset_supply',
+        sa.Column('asset_id', sa.String(length=64), nullable=False),
+        sa.Column('circulating', sa.BigInteger(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('asset_id')
+    )
+
+    op.create_table(
+        'ledger_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('asset_id', sa.String(length=64), nullable=False),
+        sa.Column('user_pubkey', sa.String(length=66), nullable=False),
+        sa.Column('balance', sa.BigInteger(), nullable=True),
+        sa.Column('reserved_balance', sa.BigInteger(), nullable=True),
+        sa.Column('last_entry_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ledger_snapshots_asset_user_entry', 'ledger_snapshots',
+                    ['asset_id', 'user_pubkey', 'last_entry_id'], unique=False)
+
+    op.execute(
+        "INSERT INTO ledger_entries (asset_id, user_pubkey, balance_delta, reserved_delta, entry_type, created_at) "
+        "SELECT asset_id, user_pubkey, COALESCE(balance, 0), COALESCE(reserved_balance, 0), 'opening', CURRENT_TIMESTAMP "
+        "FROM asset_balances"
+    )
+    op.execute(
+        "INSERT INTO asset_supply (asset_id, circulating, updated_at) "
+        "SELECT asset_id, COALESCE(SUM(balance), 0), CURRENT_TIMESTAMP FROM asset_balances GROUP BY asset_id"
+    )
+
+
+def downgrade():
+    """Drop the ledger journal tables"""
+    op.drop_index('ix_ledger_snapshots_asset_user_entry', table_name='ledger_snapshots')
+    op.drop_table('ledger_snapshots')
+    op.drop_table('asset_supply')
+    op.drop_index('ix_ledger_entries_created_at', table_name='ledger_entries')
+    op.drop_index('ix_ledger_entries_asset_user_id', table_name='ledger_entries')
+    op.drop_table('ledger_entries')
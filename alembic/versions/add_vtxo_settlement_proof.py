@@ -0,0 +1,25 @@
+"""Store Merkle inclusion proofs for settled VTXOs
+
+Revision ID: add_vtxo_settlement_proof
+Revises: add_hot_path_indexes
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_vtxo_settlement_proof'
+down_revision = 'add_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add vtxos.settlement_proof"""
+    op.add_column('vtxos', sa.Column('settlement_proof', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    """Drop vtxos.settlement_proof"""
+    op.drop_column('vtxos', 'settlement_proof')
@@ -0,0 +1,80 @@
+"""Range-partition system_metrics, heartbeats and job_logs by day
+
+Revision ID: partition_time_series
+Revises: add_ledger_journal
+Create Date: 2026-10-16 22:00:00.000000
+
+MySQL/MariaDB only; on other databases this revision is a no-op and
+retention keeps deleting rows.
+
+MySQL requires the partitioning column in every unique key, so the primary
+keys become (id, <time column>) and job_logs' unique job_id becomes unique
+(job_id, created_at). Rows with a NULL time column are stamped with the
+migration time. Existing rows land in ``p_history``, which retention drops
+once it is entirely past the cutoff; day partitions start today and
+``core.partitioning`` keeps creating them ahead of time.
+
+Partitioning rebuilds each table once; run it in a maintenance window on
+large tables.
+"""
+from datetime import date, timedelta
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'partition_time_series'
+down_revision = 'add_ledger_journal'
+branch_labels = None
+depends_on = None
+
+DAYS_AHEAD = 7
+
+TABLES = (
+    ('system_metrics', 'timestamp'),
+    ('heartbeats', 'timestamp'),
+    ('job_logs', 'created_at'),
+)
+
+
+def _partitions(today):
+    days = [today + timedelta(days=offset) for offset in range(DAYS_AHEAD + 1)]
+    return ", ".join(
+        [f"PARTITION p_history VALUES LESS THAN (TO_DAYS('{today:%Y-%m-%d}'))"]
+        + [f"PARTITION p{day:%Y%m%d} VALUES LESS THAN (TO_DAYS('{day + timedelta(days=1):%Y-%m-%d}'))"
+           for day in days]
+        + ["PARTITION pmax VALUES LESS THAN MAXVALUE"]
+    )
+
+
+def upgrade():
+    """Partition the time-series tables by day on MySQL/MariaDB"""
+    if op.get_bind().dialect.name not in ('mysql', 'mariadb'):
+        return
+
+    today = date.today()
+    for table, column in TABLES:
+        op.execute(f"UPDATE {table} SET `{column}` = CURRENT_TIMESTAMP WHERE `{column}` IS NULL")
+        op.execute(f"ALTER TABLE {table} MODIFY `{column}` DATETIME NOT NULL")
+        op.execute(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id, `{column}`)")
+
+    # The unnamed UniqueConstraint('job_id') from the initial migration is the index `job_id`
+    op.execute("ALTER TABLE job_logs DROP INDEX job_id, "
+               "ADD UNIQUE INDEX uq_job_logs_job_id_created_at (job_id, created_at)")
+
+    for table, column in TABLES:
+        op.execute(f"ALTER TABLE {table} PARTITION BY RANGE (TO_DAYS(`{column}`)) ({_partitions(today)})")
+
+
+def downgrade():
+    """Merge the partitions back into plain tables"""
+    if op.get_bind().dialect.name not in ('mysql', 'mariadb'):
+        return
+
+    for table, column in TABLES:
+        op.execute(f"ALTER TABLE {table} REMOVE PARTITIONING")
+
+    op.execute("ALTER TABLE job_logs DROP INDEX uq_job_logs_job_id_created_at, ADD UNIQUE INDEX job_id (job_id)")
+
+    for table, column in TABLES:
+        op.execute(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id)")
+        op.execute(f"ALTER TABLE {table} MODIFY `{column}` DATETIME NULL")
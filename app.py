@@ -1,4 +1,4 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from redis import Redis
 from rq import Queue
 from rq_scheduler import Scheduler
@@ -14,7 +14,7 @@ from nostr_clients.nostr_redis import get_redis_manager, initialize_redis_manage
 from nostr_clients.nostr_workers import get_action_intent_worker, get_signing_response_worker
 from core.session_manager import get_session_manager
 from core.challenge_manager import get_challenge_manager
-from core.transaction_processor import get_transaction_processor
+from core.transaction_processor import get_transaction_processor, TransactionError
 from core.signing_orchestrator import get_signing_orchestrator
 from core.asset_manager import get_asset_manager
 from core.lightning_manager import LightningManager, LightningLiftRequest, LightningLandRequest
@@ -27,6 +27,12 @@ from core.vtxo_manager import get_vtxo_manager, get_settlement_manager, initiali
 from core.monitoring import get_monitoring_system, initialize_monitoring, shutdown_monitoring
 from core.admin_api import admin_bp
 from core.cache_manager import initialize_performance_systems, shutdown_performance_systems, get_cache_manager
+from core.balance_cache import get_balance_cache
+from core.ceremony_events import get_ceremony_events
+from core.ceremony_executor import get_ceremony_executor
+from core.config import Config
+from core.replica_routing import replica_read
+from core.session_state import get_session_state_store
 from core.rgb_api import rgb_bp
 
 app = Flask(__name__)
@@ -383,8 +389,12 @@ def get_cache_stats():
             return jsonify({'error': 'Cache manager not initialized'}), 503
 
         stats = cache_manager.get_stats()
+        balance_cache = get_balance_cache()
+        session_state = get_session_state_store()
         return jsonify({
             'cache_stats': stats,
+            'balance_cache': balance_cache.get_stats() if balance_cache else {'enabled': False},
+            'session_state': session_state.get_stats() if session_state else {'enabled': False},
             'timestamp': datetime.now().isoformat()
         })
 
@@ -502,6 +512,7 @@ def reconnect_grpc_service(service):
         return jsonify({'error': str(e)}), 500
 
 @app.route('/stats')
+@replica_read()
 def get_stats():
     session = get_session()
     try:
@@ -962,6 +973,7 @@ def fail_session():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/sessions')
+@replica_read(lambda: request.args.get('user_pubkey'))
 def get_sessions():
     """Get sessions, optionally filtered by user pubkey"""
     try:
@@ -1061,6 +1073,7 @@ def get_challenge_info(challenge_id):
         return jsonify({'error': str(e)}), 500
 
 @app.route('/sessions/stats')
+@replica_read()
 def get_session_stats():
     """Get session statistics"""
     try:
@@ -1204,15 +1217,25 @@ def get_user_transactions(user_pubkey):
     try:
         limit = request.args.get('limit', 50, type=int)
         transaction_processor = get_transaction_processor()
-        transactions = transaction_processor.get_user_transactions(user_pubkey, limit)
+        page = transaction_processor.get_user_transactions_page(
+            user_pubkey, limit,
+            cursor=request.args.get('cursor'),
+            asset_id=request.args.get('asset_id'),
+            status=request.args.get('status'),
+            tx_type=request.args.get('tx_type')
+        )
+        transactions = page['transactions']
 
         return jsonify({
             'transactions': transactions,
+            'next_cursor': page['next_cursor'],
             'user_pubkey': user_pubkey[:8] + '...',
             'total_count': len(transactions),
             'timestamp': datetime.now().isoformat()
         })
 
+    except TransactionError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1226,6 +1249,18 @@ def start_signing_ceremony():
         if not session_id:
             return jsonify({'error': 'session_id is required'}), 400
 
+        executor = get_ceremony_executor()
+        if executor is not None:
+            # Run on a worker; clients follow /signing/ceremony/<id>/status or /events
+            signature_data = data.get('signature_data')
+            if signature_data is not None and not (isinstance(signature_data, dict) and signature_data.get('user_signature')):
+                return jsonify({'error': 'signature_data must contain user_signature'}), 400
+            return jsonify({
+                'message': 'Signing ceremony queued',
+                'ceremony': executor.enqueue(session_id, signature_data),
+                'timestamp': datetime.now().isoformat()
+            }), 202
+
         orchestrator = get_signing_orchestrator()
         result = orchestrator.start_signing_ceremony(session_id)
 
@@ -1240,19 +1275,55 @@ def start_signing_ceremony():
 
 @app.route('/signing/ceremony/<session_id>/status')
 def get_signing_ceremony_status(session_id):
-    """Get the status of a signing ceremony"""
+    """Get the status of a signing ceremony
+
+    With ``?wait=<seconds>`` the request is held until the status differs from
+    ``?since=<last_updated>`` (or changes, without ``since``), the ceremony ends,
+    or the wait elapses.
+    """
     try:
         orchestrator = get_signing_orchestrator()
-        status = orchestrator.get_ceremony_status(session_id)
+        wait = request.args.get('wait', type=float)
+        if wait:
+            wait = min(max(wait, 0), Config().CEREMONY_LONG_POLL_MAX_SECONDS)
+            status = orchestrator.wait_for_ceremony_status(session_id, wait, since=request.args.get('since'))
+        else:
+            status = orchestrator.get_ceremony_status(session_id)
 
         return jsonify(status)
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/signing/ceremony/<session_id>/events')
+def stream_signing_ceremony_events(session_id):
+    """Server-Sent Events stream of a signing ceremony's status, ending when the ceremony does"""
+    if get_ceremony_events() is None:
+        return jsonify({'error': 'Ceremony events are disabled'}), 503
+
+    orchestrator = get_signing_orchestrator()
+    heartbeat = Config().CEREMONY_SSE_HEARTBEAT_SECONDS
+
+    def generate():
+        try:
+            for status in orchestrator.stream_ceremony_status(session_id, heartbeat=heartbeat):
+                if status is None:
+                    yield ': keepalive\n\n'
+                else:
+                    yield f"event: status\ndata: {json.dumps(status)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/signing/ceremony/<session_id>/step/<int:step>', methods=['POST'])
 def execute_signing_step(session_id, step):
     """Execute a specific signing ceremony step"""
+    if get_ceremony_executor() is not None:
+        # The worker owns the ceremony state; stepping it here would race it
+        return jsonify({'error': 'Ceremony steps run on the ceremony executor; pass signature_data to '
+                                 '/signing/ceremony/start and follow /status or /events'}), 409
     try:
         data = request.get_json() or {}
         signature_data = data.get('signature_data')
@@ -1325,6 +1396,7 @@ def create_asset():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/assets/<asset_id>')
+@replica_read()
 def get_asset_info(asset_id):
     """Get information about an asset"""
     try:
@@ -1412,6 +1484,7 @@ def transfer_assets():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/balances/<user_pubkey>')
+@replica_read('user_pubkey')
 def get_user_balances(user_pubkey):
     """Get all balances for a user"""
     try:
@@ -1429,6 +1502,7 @@ def get_user_balances(user_pubkey):
         return jsonify({'error': str(e)}), 500
 
 @app.route('/balances/<user_pubkey>/<asset_id>')
+@replica_read('user_pubkey')
 def get_user_balance(user_pubkey, asset_id):
     """Get user's balance for a specific asset"""
     try:
@@ -1905,19 +1979,25 @@ def assign_vtxo_to_user():
                 return jsonify({'error': f'{field} is required'}), 400
 
         vtxo_manager = get_vtxo_manager()
-        vtxo = vtxo_manager.assign_vtxo_to_user(
+        vtxos = vtxo_manager.assign_vtxos_to_user(
             user_pubkey=data['user_pubkey'],
             asset_id=data['asset_id'],
             amount_needed=data['amount_needed']
         )
 
-        if vtxo:
+        if vtxos:
+            total_sats = sum(vtxo.amount_sats for vtxo in vtxos)
             return jsonify({
                 'message': 'VTXO assigned successfully',
-                'vtxo_id': vtxo.vtxo_id,
-                'user_pubkey': vtxo.user_pubkey[:8] + '...',
-                'asset_id': vtxo.asset_id,
-                'amount_sats': vtxo.amount_sats,
+                'vtxo_id': vtxos[0].vtxo_id,
+                'user_pubkey': vtxos[0].user_pubkey[:8] + '...',
+                'asset_id': vtxos[0].asset_id,
+                'amount_sats': total_sats,
+                'change_sats': total_sats - data['amount_needed'],
+                'vtxos': [
+                    {'vtxo_id': vtxo.vtxo_id, 'amount_sats': vtxo.amount_sats}
+                    for vtxo in vtxos
+                ],
                 'timestamp': datetime.now().isoformat()
             })
         else:
@@ -2122,6 +2202,7 @@ def get_vtxo_monitoring_status():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/vtxos/stats')
+@replica_read()
 def get_vtxo_stats():
     """Get comprehensive VTXO statistics"""
     try:
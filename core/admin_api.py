@@ -535,48 +535,26 @@ def cleanup_old_data():
         cleanup_stats = {}
 
         try:
-            # Count records to be cleaned up
-            old_metrics = session.query(SystemMetrics).filter(
-                SystemMetrics.timestamp < cutoff_date
-            ).count()
+            # Partitioned tables drop whole days; others delete rows in bounded batches
+            from core.partitioning import get_partition_manager
+            results = get_partition_manager().apply_retention(session, days, dry_run=dry_run)
 
-            old_heartbeats = session.query(Heartbeat).filter(
-                Heartbeat.timestamp < cutoff_date
-            ).count()
-
-            old_jobs = session.query(JobLog).filter(
-                JobLog.created_at < cutoff_date,
-                JobLog.status.in_(['completed', 'failed'])
-            ).count()
+            old_metrics = results['system_metrics'].rows
+            old_heartbeats = results['heartbeats'].rows
+            old_jobs = results['job_logs'].rows
 
             cleanup_stats = {
                 'old_metrics': old_metrics,
                 'old_heartbeats': old_heartbeats,
                 'old_jobs': old_jobs,
                 'total': old_metrics + old_heartbeats + old_jobs,
-                'cutoff_date': cutoff_date.isoformat()
+                'cutoff_date': cutoff_date.isoformat(),
+                'methods': {name: result.method for name, result in results.items()},
+                'dropped_partitions': {name: result.partitions for name, result in results.items()
+                                       if result.partitions},
+                'complete': all(result.complete for result in results.values())
             }
 
-            if not dry_run:
-                # Perform cleanup
-                if old_metrics > 0:
-                    session.query(SystemMetrics).filter(
-                        SystemMetrics.timestamp < cutoff_date
-                    ).delete()
-
-                if old_heartbeats > 0:
-                    session.query(Heartbeat).filter(
-                        Heartbeat.timestamp < cutoff_date
-                    ).delete()
-
-                if old_jobs > 0:
-                    session.query(JobLog).filter(
-                        JobLog.created_at < cutoff_date,
-                        JobLog.status.in_(['completed', 'failed'])
-                    ).delete()
-
-                session.commit()
-
             session.close()
 
             return jsonify({
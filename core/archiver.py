@@ -0,0 +1,243 @@
+"""
+Cold archive tier for terminal signing sessions, challenges and transactions
+
+signing_sessions, signing_challenges and transactions used to keep every
+completed, failed and expired row forever, so status and per-user queries
+scanned tables that were mostly history. The archiver moves terminal rows
+older than ARCHIVE_AFTER_DAYS into ``archived_records``. Each row there
+is append-only and holds its original columns as zlib-compressed JSON.
+The hot tables stay sized by active traffic.
+
+A session moves together with its challenges and transactions, in the same
+database transaction that deletes them from the hot tables. It stays hot
+while any of its transactions is still pending or broadcast, or while a
+Lightning invoice refers to it. Transactions without a session move on their
+own once confirmed or failed.
+
+Lookups by session_id or txid (``/sessions/<id>``, ``/transactions/<txid>/status``)
+fall back to ``find_session`` / ``find_transaction``. These rebuild detached
+model instances from the archive.
+"""
+
+import json
+import logging
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import DateTime, LargeBinary, delete, exists, func, insert, inspect as sa_inspect
+
+from core.config import Config
+from core.models import (
+    ArchivedRecord, LightningInvoice, SigningChallenge, SigningSession, Transaction, get_session, utc_now
+)
+
+logger = logging.getLogger(__name__)
+
+SESSION_TERMINAL_STATUSES = ('completed', 'failed', 'expired')
+TRANSACTION_TERMINAL_STATUSES = ('confirmed', 'failed')
+
+_RECORD_TYPES = {
+    SigningSession: ('signing_session', 'session_id'),
+    SigningChallenge: ('signing_challenge', 'challenge_id'),
+    Transaction: ('transaction', 'txid'),
+}
+
+
+@dataclass
+class ArchiveResult:
+    """Outcome of one archiver run"""
+    sessions: int = 0
+    challenges: int = 0
+    transactions: int = 0
+    batches: int = 0
+    duration_seconds: float = 0.0
+    complete: bool = True  # False when the time budget ran out with rows left
+
+
+def encode_record(obj) -> bytes:
+    """Compressed JSON of a model instance's columns"""
+    values = {}
+    for attr in sa_inspect(type(obj)).column_attrs:
+        value = getattr(obj, attr.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            value = bytes(value).hex()
+        values[attr.key] = value
+    return zlib.compress(json.dumps(values, separators=(',', ':')).encode())
+
+
+def decode_record(model, payload: bytes):
+    """Detached ``model`` instance rebuilt from ``encode_record`` output"""
+    values = json.loads(zlib.decompress(payload))
+    for attr in sa_inspect(model).column_attrs:
+        value = values.get(attr.key)
+        if value is None:
+            continue
+        column_type = attr.columns[0].type
+        if isinstance(column_type, DateTime):
+            values[attr.key] = datetime.fromisoformat(value)
+        elif isinstance(column_type, LargeBinary):
+            values[attr.key] = bytes.fromhex(value)
+    return model(**values)
+
+
+def _archive_row(obj) -> Dict[str, Any]:
+    record_type, key_column = _RECORD_TYPES[type(obj)]
+    return {
+        'record_type': record_type,
+        'record_key': getattr(obj, key_column),
+        'session_id': getattr(obj, 'session_id', None),
+        'user_pubkey': getattr(obj, 'user_pubkey', None),
+        'status': getattr(obj, 'status', None),
+        'created_at': getattr(obj, 'created_at', None),
+        'archived_at': utc_now(),
+        'payload': encode_record(obj),
+    }
+
+
+class ColdArchiver:
+    """Moves terminal rows into the archive in bounded batches"""
+
+    def __init__(self, archive_after_days: int = 30, batch_size: int = 500, time_budget_seconds: float = 30.0):
+        self.archive_after_days = archive_after_days
+        self.batch_size = batch_size
+        self.time_budget_seconds = time_budget_seconds
+
+    # Archiving
+
+    def archive(self, session, now: Optional[datetime] = None) -> ArchiveResult:
+        """
+        Archive terminal rows older than ``archive_after_days``
+
+        Args:
+            session: Session to run the batches in; committed after every batch
+            now: Reference time (defaults to the current UTC time)
+
+        Returns:
+            ArchiveResult with the number of rows moved per table
+        """
+        cutoff = (now or utc_now()) - timedelta(days=self.archive_after_days)
+        result = ArchiveResult()
+        start = time.monotonic()
+
+        for step in (self._archive_session_batch, self._archive_transaction_batch):
+            while True:
+                moved = step(session, cutoff, result)
+                result.batches += 1
+                if moved < self.batch_size:
+                    break
+                if time.monotonic() - start >= self.time_budget_seconds:
+                    result.complete = False
+                    logger.warning(f"⏱️  Archiver hit its {self.time_budget_seconds}s budget; "
+                                   f"remaining rows are left for the next run")
+                    break
+            if not result.complete:
+                break
+
+        result.duration_seconds = time.monotonic() - start
+        if result.sessions or result.transactions:
+            logger.info(f"🧊 Archived {result.sessions} sessions, {result.challenges} challenges and "
+                        f"{result.transactions} transactions in {result.duration_seconds:.2f}s")
+        return result
+
+    def _archive_session_batch(self, session, cutoff: datetime, result: ArchiveResult) -> int:
+        open_transactions = exists().where(
+            Transaction.session_id == SigningSession.session_id,
+            Transaction.status.notin_(TRANSACTION_TERMINAL_STATUSES)
+        )
+        invoices = exists().where(LightningInvoice.session_id == SigningSession.session_id)
+        sessions = session.query(SigningSession).filter(
+            SigningSession.status.in_(SESSION_TERMINAL_STATUSES),
+            func.coalesce(SigningSession.updated_at, SigningSession.created_at) < cutoff,
+            ~open_transactions,
+            ~invoices
+        ).order_by(SigningSession.id).limit(self.batch_size).all()
+        if not sessions:
+            return 0
+
+        session_ids = [s.session_id for s in sessions]
+        challenges = session.query(SigningChallenge).filter(SigningChallenge.session_id.in_(session_ids)).all()
+        transactions = session.query(Transaction).filter(Transaction.session_id.in_(session_ids)).all()
+
+        self._move(session, [*challenges, *transactions, *sessions])
+        result.sessions += len(sessions)
+        result.challenges += len(challenges)
+        result.transactions += len(transactions)
+        return len(sessions)
+
+    def _archive_transaction_batch(self, session, cutoff: datetime, result: ArchiveResult) -> int:
+        transactions = session.query(Transaction).filter(
+            Transaction.session_id.is_(None),
+            Transaction.status.in_(TRANSACTION_TERMINAL_STATUSES),
+            func.coalesce(Transaction.confirmed_at, Transaction.created_at) < cutoff
+        ).order_by(Transaction.id).limit(self.batch_size).all()
+        if not transactions:
+            return 0
+
+        self._move(session, transactions)
+        result.transactions += len(transactions)
+        return len(transactions)
+
+    @staticmethod
+    def _move(session, rows: List[Any]):
+        """Copy rows into the archive and delete them from the hot tables in one transaction"""
+        try:
+            session.execute(insert(ArchivedRecord), [_archive_row(row) for row in rows])
+            # Children first: challenges and transactions reference their session
+            for model in (SigningChallenge, Transaction, SigningSession):
+                ids = [row.id for row in rows if type(row) is model]
+                if ids:
+                    session.execute(delete(model).where(model.id.in_(ids))
+                                    .execution_options(synchronize_session=False))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        for row in rows:
+            if row in session:
+                session.expunge(row)
+
+    # Lookups
+
+    def find(self, model, key: str, session=None):
+        """Archived ``model`` instance by its external key, or None"""
+        record_type, _ = _RECORD_TYPES[model]
+        db_session = session or get_session()
+        try:
+            record = db_session.query(ArchivedRecord).filter_by(record_type=record_type, record_key=key).first()
+            return decode_record(model, record.payload) if record else None
+        finally:
+            if session is None:
+                db_session.close()
+
+    def find_session(self, session_id: str, session=None) -> Optional[SigningSession]:
+        return self.find(SigningSession, session_id, session)
+
+    def find_transaction(self, txid: str, session=None) -> Optional[Transaction]:
+        return self.find(Transaction, txid, session)
+
+    def get_stats(self, session) -> Dict[str, Any]:
+        """Archived row counts per record type"""
+        counts = session.query(ArchivedRecord.record_type, func.count(ArchivedRecord.id)) \
+            .group_by(ArchivedRecord.record_type).all()
+        return {
+            'records': {record_type: count for record_type, count in counts},
+            'archive_after_days': self.archive_after_days
+        }
+
+
+# Global archiver instance
+_cold_archiver = None
+
+def get_cold_archiver() -> ColdArchiver:
+    """Get the global cold archiver instance"""
+    global _cold_archiver
+    if _cold_archiver is None:
+        config = Config()
+        _cold_archiver = ColdArchiver(archive_after_days=config.ARCHIVE_AFTER_DAYS,
+                                      batch_size=config.ARCHIVE_BATCH_SIZE)
+    return _cold_archiver
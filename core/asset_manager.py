@@ -7,6 +7,11 @@ from typing import Dict, Optional, Any, List, Tuple
 from enum import Enum
 import logging
 from core.models import Asset, AssetBalance, Vtxo, get_session
+from core.balance_cache import balance_row, get_balance_cache
+from core.replica_routing import replica_read
+from core.ledger import (
+    BalanceDelta, InsufficientLedgerBalance, SupplyLimitExceeded, get_balance_ledger, get_ledger_group_committer
+)
 from grpc_clients import get_grpc_manager, ServiceType
 from sqlalchemy import and_, or_, func
 
@@ -145,7 +150,7 @@ class AssetManager:
                 return {'error': 'Asset not found'}
 
             # Get circulation info
-            total_balance = session.query(func.sum(AssetBalance.balance)).filter_by(asset_id=asset_id).scalar() or 0
+            total_balance = get_balance_ledger().circulating_supply(session, [asset_id])[asset_id]
             total_reserved = session.query(func.sum(AssetBalance.reserved_balance)).filter_by(asset_id=asset_id).scalar() or 0
 
             return {
@@ -169,6 +174,7 @@ class AssetManager:
         finally:
             session.close()
 
+    @replica_read()
     def list_assets(self, active_only: bool = True) -> List[Dict[str, Any]]:
         """
         List all assets in the system
@@ -187,10 +193,12 @@ class AssetManager:
 
             assets = query.order_by(Asset.created_at.desc()).all()
 
+            # Circulation info for all assets at once
+            circulating = get_balance_ledger().circulating_supply(session, [asset.asset_id for asset in assets])
+
             result = []
             for asset in assets:
-                # Get circulation info
-                total_balance = session.query(func.sum(AssetBalance.balance)).filter_by(asset_id=asset.asset_id).scalar() or 0
+                total_balance = circulating[asset.asset_id]
 
                 result.append({
                     'asset_id': asset.asset_id,
@@ -229,12 +237,19 @@ class AssetManager:
         if not asset_id or not isinstance(asset_id, str):
             raise AssetError("Invalid asset_id")
 
-        session = get_session()
+        def load():
+            session = get_session()
+            try:
+                return balance_row(session.query(AssetBalance).filter_by(
+                    user_pubkey=user_pubkey,
+                    asset_id=asset_id
+                ).first())
+            finally:
+                session.close()
+
         try:
-            balance = session.query(AssetBalance).filter_by(
-                user_pubkey=user_pubkey,
-                asset_id=asset_id
-            ).first()
+            cache = get_balance_cache()
+            balance = cache.get_balance(user_pubkey, asset_id, load) if cache else load()
 
             if not balance:
                 return {
@@ -245,22 +260,20 @@ class AssetManager:
                     'available_balance': 0
                 }
 
-            available_balance = balance.balance - balance.reserved_balance
+            available_balance = balance['balance'] - balance['reserved_balance']
 
             return {
                 'user_pubkey': user_pubkey,
                 'asset_id': asset_id,
-                'balance': balance.balance,
-                'reserved_balance': balance.reserved_balance,
+                'balance': balance['balance'],
+                'reserved_balance': balance['reserved_balance'],
                 'available_balance': max(0, available_balance),
-                'last_updated': balance.last_updated.isoformat()
+                'last_updated': balance['last_updated']
             }
 
         except Exception as e:
             logger.error(f"Error getting user balance: {e}")
             return {'error': str(e)}
-        finally:
-            session.close()
 
     def get_user_balances(self, user_pubkey: str) -> List[Dict[str, Any]]:
         """
@@ -272,20 +285,27 @@ class AssetManager:
         Returns:
             List of balance information
         """
-        session = get_session()
+        def load():
+            session = get_session()
+            try:
+                return [balance_row(b) for b in session.query(AssetBalance).filter_by(user_pubkey=user_pubkey).all()]
+            finally:
+                session.close()
+
         try:
-            balances = session.query(AssetBalance).filter_by(user_pubkey=user_pubkey).all()
+            cache = get_balance_cache()
+            balances = cache.get_user_balances(user_pubkey, load) if cache else load()
 
             result = []
             for balance in balances:
-                available_balance = balance.balance - balance.reserved_balance
+                available_balance = balance['balance'] - balance['reserved_balance']
 
                 result.append({
-                    'asset_id': balance.asset_id,
-                    'balance': balance.balance,
-                    'reserved_balance': balance.reserved_balance,
+                    'asset_id': balance['asset_id'],
+                    'balance': balance['balance'],
+                    'reserved_balance': balance['reserved_balance'],
                     'available_balance': max(0, available_balance),
-                    'last_updated': balance.last_updated.isoformat()
+                    'last_updated': balance['last_updated']
                 })
 
             return result
@@ -293,8 +313,6 @@ class AssetManager:
         except Exception as e:
             logger.error(f"Error getting user balances: {e}")
             return []
-        finally:
-            session.close()
 
     def mint_assets(self, user_pubkey: str, asset_id: str, amount: int,
                    reserve_amount: int = 0) -> Dict[str, Any]:
@@ -320,30 +338,17 @@ class AssetManager:
             if not asset:
                 raise AssetError(f"Asset {asset_id} not found or inactive")
 
-            # Check supply limit
-            if asset.total_supply > 0 and asset.asset_id != 'BTC':
-                current_supply = session.query(func.sum(AssetBalance.balance)).filter_by(asset_id=asset_id).scalar() or 0
-                if current_supply + amount > asset.total_supply:
-                    raise AssetError(f"Minting would exceed total supply limit")
-
-            # Update or create balance
-            balance = session.query(AssetBalance).filter_by(
-                user_pubkey=user_pubkey,
-                asset_id=asset_id
-            ).first()
-
-            if balance:
-                balance.balance += amount
-                balance.reserved_balance += reserve_amount
-            else:
-                balance = AssetBalance(
-                    user_pubkey=user_pubkey,
-                    asset_id=asset_id,
-                    balance=amount,
-                    reserved_balance=reserve_amount
-                )
-                session.add(balance)
-
+            # Credit the user; the supply limit is checked on the asset's supply counter
+            supply_limits = {asset_id: asset.total_supply} if asset.total_supply > 0 and asset.asset_id != 'BTC' else None
+            ledger = get_balance_ledger()
+            try:
+                ledger.apply(session, [
+                    BalanceDelta(user_pubkey, asset_id, balance=amount, reserved=reserve_amount)
+                ], entry_type='mint', supply_limits=supply_limits)
+            except SupplyLimitExceeded:
+                raise AssetError(f"Minting would exceed total supply limit")
+
+            new_balance = ledger.balances(session, [(asset_id, user_pubkey)])[(asset_id, user_pubkey)][0]
             session.commit()
 
             logger.info(f"Minted {amount} {asset_id} to {user_pubkey[:10]}...")
@@ -353,7 +358,7 @@ class AssetManager:
                 'user_pubkey': user_pubkey[:10] + '...',
                 'amount_minted': amount,
                 'reserve_amount': reserve_amount,
-                'new_balance': balance.balance,
+                'new_balance': new_balance,
                 'timestamp': utc_now().isoformat()
             }
 
@@ -388,38 +393,32 @@ class AssetManager:
             if not asset:
                 raise AssetError(f"Asset {asset_id} not found or inactive")
 
-            # Get sender balance
-            sender_balance = session.query(AssetBalance).filter_by(
-                user_pubkey=sender_pubkey,
-                asset_id=asset_id
-            ).first()
-
-            if not sender_balance or sender_balance.balance < amount:
-                raise InsufficientAssetError(f"Insufficient balance. Required: {amount}, Available: {sender_balance.balance if sender_balance else 0}")
-
-            available_balance = sender_balance.balance - sender_balance.reserved_balance
-            if available_balance < amount:
+            # Debit the sender (guarded on available balance) and credit the recipient
+            ledger = get_balance_ledger()
+            deltas = [
+                BalanceDelta(sender_pubkey, asset_id, balance=-amount, min_available=amount),
+                BalanceDelta(recipient_pubkey, asset_id, balance=amount)
+            ]
+            committer = get_ledger_group_committer()
+            try:
+                if committer is not None:
+                    # End the read transaction; the change commits in the committer's batch
+                    session.commit()
+                    committer.submit(deltas, entry_type='transfer')
+                else:
+                    ledger.apply(session, deltas, entry_type='transfer')
+            except InsufficientLedgerBalance:
+                session.rollback()
+                sender_balance = session.query(AssetBalance).filter_by(
+                    user_pubkey=sender_pubkey,
+                    asset_id=asset_id
+                ).first()
+                if not sender_balance or sender_balance.balance < amount:
+                    raise InsufficientAssetError(f"Insufficient balance. Required: {amount}, Available: {sender_balance.balance if sender_balance else 0}")
+                available_balance = sender_balance.balance - sender_balance.reserved_balance
                 raise InsufficientAssetError(f"Insufficient available balance. Required: {amount}, Available: {available_balance}")
 
-            # Update sender balance
-            sender_balance.balance -= amount
-
-            # Update recipient balance
-            recipient_balance = session.query(AssetBalance).filter_by(
-                user_pubkey=recipient_pubkey,
-                asset_id=asset_id
-            ).first()
-
-            if recipient_balance:
-                recipient_balance.balance += amount
-            else:
-                recipient_balance = AssetBalance(
-                    user_pubkey=recipient_pubkey,
-                    asset_id=asset_id,
-                    balance=amount
-                )
-                session.add(recipient_balance)
-
+            balances = ledger.balances(session, [(asset_id, sender_pubkey), (asset_id, recipient_pubkey)])
             session.commit()
 
             logger.info(f"Transferred {amount} {asset_id} from {sender_pubkey[:10]} to {recipient_pubkey[:10]}")
@@ -429,8 +428,8 @@ class AssetManager:
                 'sender': sender_pubkey[:10] + '...',
                 'recipient': recipient_pubkey[:10] + '...',
                 'amount': amount,
-                'sender_balance': sender_balance.balance,
-                'recipient_balance': recipient_balance.balance,
+                'sender_balance': balances[(asset_id, sender_pubkey)][0],
+                'recipient_balance': balances[(asset_id, recipient_pubkey)][0],
                 'timestamp': utc_now().isoformat()
             }
 
@@ -606,6 +605,7 @@ class AssetManager:
             'timestamp': utc_now().isoformat()
         }
 
+    @replica_read()
     def get_asset_stats(self) -> Dict[str, Any]:
         """Get overall asset statistics"""
         session = get_session()
@@ -684,28 +684,29 @@ class AssetManager:
         except Exception:
             session = get_session()
         try:
-            now = utc_now()
-
-            # Find expired VTXOs
-            expired_vtxos = session.query(Vtxo).filter(
-                Vtxo.expires_at < now,
-                Vtxo.status != VtxoStatus.SPENT.value
-            ).all()
-
-            count = len(expired_vtxos)
-            total_amount = 0
-
-            for vtxo in expired_vtxos:
-                vtxo.status = VtxoStatus.EXPIRED.value
-                total_amount += vtxo.amount_sats
+            from core.expiry_sweeper import get_expiry_sweeper
+
+            # Expire in bounded batches without loading the rows
+            result = get_expiry_sweeper().sweep(
+                session, 'asset_vtxos', Vtxo,
+                [Vtxo.expires_at < utc_now(), Vtxo.status != VtxoStatus.SPENT.value,
+                 Vtxo.status != VtxoStatus.EXPIRED.value],
+                values={'status': VtxoStatus.EXPIRED.value},
+                sum_column=Vtxo.amount_sats
+            )
 
-            session.commit()
+            logger.info(f"Cleaned up {result.rows} expired VTXOs with total amount {result.total}")
 
-            logger.info(f"Cleaned up {count} expired VTXOs with total amount {total_amount}")
+            # Swept rows bypass the ORM change hooks; resync the in-memory VTXO index
+            from core.vtxo_index import get_vtxo_index
+            availability_index = get_vtxo_index()
+            if result.rows and availability_index.ready:
+                availability_index.reconcile()
 
             return {
-                'cleaned_vtxos': count,
-                'total_amount_sats': total_amount,
+                'cleaned_vtxos': result.rows,
+                'total_amount_sats': result.total,
+                'complete': result.complete,
                 'timestamp': utc_now().isoformat()
             }
 
@@ -0,0 +1,235 @@
+"""
+Read-through Redis cache for user balances
+
+Balance reads (balance endpoints, pre-checks before reserving, Lightning
+lifts) are served from Redis, keyed by (user_pubkey, asset_id), with a
+per-user entry for the list of all of a user's balances.
+
+Every entry carries version stamps and is only served while they match the
+current ones:
+- each (user, asset) pair and each user has a version key holding a random
+  token; committed balance writes replace the tokens of the rows they touched
+- a global generation token, replaced when invalidations could not be
+  delivered (Redis unavailable), retires every entry at once
+
+A reader notes the tokens before reading the database and stores them with
+the value, so a value read before a concurrent write commits can be stored
+but never served afterwards. Writes are collected from the ledger's
+statements (``stage_balance_invalidations``) and from ORM flushes of
+AssetBalance rows, and the tokens are replaced in the session's after_commit
+hook, i.e. before the writer's commit() returns.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from redis import Redis
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from core.config import Config
+from core.models import AssetBalance
+
+logger = logging.getLogger(__name__)
+
+# session.info key holding (asset_id, user_pubkey) pairs to invalidate once the transaction commits
+_PENDING_KEY = 'balance_cache_invalidations'
+
+_GENERATION_KEY = 'balance_cache:generation'
+
+
+def balance_row(balance: Optional[AssetBalance]) -> Optional[Dict[str, Any]]:
+    """JSON-serialisable form of a balance row as stored in the cache"""
+    if balance is None:
+        return None
+    return {
+        'asset_id': balance.asset_id,
+        'balance': balance.balance,
+        'reserved_balance': balance.reserved_balance,
+        'last_updated': balance.last_updated.isoformat() if balance.last_updated else None
+    }
+
+
+class BalanceCache:
+    """Versioned read-through cache of balance rows"""
+
+    def __init__(self, redis_client: Redis, ttl: int = 300, retry_after: int = 30):
+        self.redis = redis_client
+        self.ttl = ttl
+        self.version_ttl = ttl * 2  # outlives the entries stamped with it
+        self.retry_after = retry_after  # seconds to bypass the cache after a Redis error
+        self._lock = threading.Lock()
+        self._unavailable_until = 0.0
+        self._needs_reset = False  # invalidations were lost; retire all entries before serving any
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'invalidations': 0,
+            'resets': 0,
+            'errors': 0
+        }
+
+    @staticmethod
+    def _pair_keys(user_pubkey: str, asset_id: str) -> Tuple[str, str]:
+        return f"balance:{user_pubkey}:{asset_id}", f"balance_version:{user_pubkey}:{asset_id}"
+
+    @staticmethod
+    def _user_keys(user_pubkey: str) -> Tuple[str, str]:
+        return f"balances:{user_pubkey}", f"balances_version:{user_pubkey}"
+
+    # Reads
+
+    def get_balance(self, user_pubkey: str, asset_id: str,
+                    load: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Balance row for (user, asset), None if there is none; ``load`` reads it from the database on a miss"""
+        return self._read_through(*self._pair_keys(user_pubkey, asset_id), load)
+
+    def get_user_balances(self, user_pubkey: str,
+                          load: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """All balance rows of a user; ``load`` reads them from the database on a miss"""
+        return self._read_through(*self._user_keys(user_pubkey), load)
+
+    def _read_through(self, entry_key: str, version_key: str, load: Callable[[], Any]) -> Any:
+        if not self._available():
+            return load()
+        try:
+            entry, version, generation = self.redis.mget(entry_key, version_key, _GENERATION_KEY)
+            if entry is not None and version is not None and generation is not None:
+                cached = json.loads(entry)
+                if cached['v'] == version.decode() and cached['g'] == generation.decode():
+                    self.stats['hits'] += 1
+                    return cached['value']
+                self.stats['stale'] += 1
+            self.stats['misses'] += 1
+
+            # Stamp with the tokens seen before the database read
+            version = (version or self._init_token(version_key, self.version_ttl)).decode()
+            generation = (generation or self._init_token(_GENERATION_KEY, None)).decode()
+        except Exception as e:
+            self._failed('read', e)
+            return load()
+
+        value = load()
+        try:
+            self.redis.set(entry_key, json.dumps({'v': version, 'g': generation, 'value': value}), ex=self.ttl)
+        except Exception as e:
+            self._failed('store', e)
+        return value
+
+    def _init_token(self, key: str, ttl: Optional[int]) -> bytes:
+        """Create a missing version token, or return the one a concurrent reader created"""
+        self.redis.set(key, uuid.uuid4().hex, ex=ttl, nx=True)
+        return self.redis.get(key)
+
+    # Invalidation
+
+    def invalidate(self, keys: Iterable[Tuple[str, str]]):
+        """Retire cached entries for the given (asset_id, user_pubkey) pairs and their users"""
+        keys = set(keys)
+        if not keys:
+            return
+        if not self._available():
+            self._needs_reset = True
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for user_pubkey in {user_pubkey for _, user_pubkey in keys}:
+                entry_key, version_key = self._user_keys(user_pubkey)
+                pipe.set(version_key, uuid.uuid4().hex, ex=self.version_ttl)
+                pipe.delete(entry_key)
+            for asset_id, user_pubkey in keys:
+                entry_key, version_key = self._pair_keys(user_pubkey, asset_id)
+                pipe.set(version_key, uuid.uuid4().hex, ex=self.version_ttl)
+                pipe.delete(entry_key)
+            pipe.execute()
+            self.stats['invalidations'] += len(keys)
+        except Exception as e:
+            self._needs_reset = True
+            self._failed('invalidate', e)
+
+    def reset(self) -> bool:
+        """Retire every cached balance by replacing the generation token"""
+        try:
+            self.redis.set(_GENERATION_KEY, uuid.uuid4().hex)
+            self.stats['resets'] += 1
+            return True
+        except Exception as e:
+            self._failed('reset', e)
+            return False
+
+    # Availability
+
+    def _available(self) -> bool:
+        if time.monotonic() < self._unavailable_until:
+            return False
+        if self._needs_reset:
+            with self._lock:
+                if self._needs_reset:
+                    if not self.reset():
+                        return False
+                    self._needs_reset = False
+                    logger.info("✅ Balance cache reset after lost invalidations")
+        return True
+
+    def _failed(self, operation: str, error: Exception):
+        self.stats['errors'] += 1
+        self._unavailable_until = time.monotonic() + self.retry_after
+        logger.warning(f"⚠️  Balance cache {operation} failed, bypassing cache for {self.retry_after}s: {error}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics including hit rate (percent of reads served from Redis)"""
+        reads = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'hit_rate': round(self.stats['hits'] / reads * 100, 2) if reads else 0,
+            'available': time.monotonic() >= self._unavailable_until,
+            'ttl_seconds': self.ttl
+        }
+
+
+def stage_balance_invalidations(session, keys: Iterable[Tuple[str, str]]):
+    """Queue (asset_id, user_pubkey) pairs changed by bulk statements; invalidated when ``session`` commits"""
+    if not Config().BALANCE_CACHE_ENABLED:
+        return
+    session.info.setdefault(_PENDING_KEY, set()).update(keys)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_balance_changes(session, flush_context):
+    """Record AssetBalance rows written through the ORM"""
+    changed = [obj for obj in (*session.new, *session.dirty, *session.deleted) if isinstance(obj, AssetBalance)]
+    if changed:
+        stage_balance_invalidations(session, [(obj.asset_id, obj.user_pubkey) for obj in changed])
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_balances(session):
+    keys = session.info.pop(_PENDING_KEY, None)
+    if keys:
+        cache = get_balance_cache()
+        if cache is not None:
+            cache.invalidate(keys)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_balance_changes(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+# Global balance cache instance
+_balance_cache = None
+
+def get_balance_cache() -> Optional[BalanceCache]:
+    """Get the global balance cache, or None when BALANCE_CACHE_ENABLED is false"""
+    global _balance_cache
+    config = Config()
+    if not config.BALANCE_CACHE_ENABLED:
+        return None
+    if _balance_cache is None:
+        _balance_cache = BalanceCache(Redis.from_url(config.REDIS_URL), ttl=config.BALANCE_CACHE_TTL_SECONDS)
+    return _balance_cache
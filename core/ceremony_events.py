@@ -0,0 +1,105 @@
+"""
+Redis pub/sub notifications for signing ceremony progress
+
+The orchestrator publishes a small message on ``ceremony:<session_id>``
+whenever a ceremony step completes or the ceremony finishes, fails or is
+cancelled. Status long-polls (``?wait=``) and the SSE stream subscribe to
+the channel instead of re-reading the session every second; on a message
+they read the current status once and hand it to the client.
+
+Messages carry no state of their own: subscribers always re-read the status,
+so a missed or duplicated message only costs one read.
+"""
+
+import json
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional
+
+from redis import Redis
+
+from core.config import Config
+
+logger = logging.getLogger(__name__)
+
+def utc_now() -> datetime:
+    """Return current UTC time as a naive datetime (UTC) without deprecation warnings."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class CeremonySubscription:
+    """Subscription to the events of one ceremony"""
+
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    def wait(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next event, or None if none arrives within ``timeout`` seconds"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            message = self.pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+            if message and message['type'] == 'message':
+                return json.loads(message['data'])
+
+
+class CeremonyEvents:
+    """Publishes and subscribes to ceremony progress events"""
+
+    def __init__(self, redis_client: Redis):
+        self.redis = redis_client
+        self.stats = {
+            'published': 0,
+            'subscriptions': 0,
+            'errors': 0
+        }
+
+    @staticmethod
+    def channel(session_id: str) -> str:
+        return f"ceremony:{session_id}"
+
+    def publish(self, session_id: str, event: str, **data):
+        """Notify subscribers of a ceremony transition; failures are logged, never raised"""
+        message = {'session_id': session_id, 'event': event, 'timestamp': utc_now().isoformat(), **data}
+        try:
+            self.redis.publish(self.channel(session_id), json.dumps(message))
+            self.stats['published'] += 1
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning(f"⚠️  Failed to publish ceremony event {event} for session {session_id}: {e}")
+
+    @contextmanager
+    def subscribe(self, session_id: str) -> Iterator[CeremonySubscription]:
+        """Subscribe to a ceremony's events for the duration of the block"""
+        pubsub = self.redis.pubsub()
+        try:
+            pubsub.subscribe(self.channel(session_id))
+            self.stats['subscriptions'] += 1
+            yield CeremonySubscription(pubsub)
+        finally:
+            try:
+                pubsub.close()
+            except Exception:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Event statistics"""
+        return dict(self.stats)
+
+
+# Global ceremony events instance
+_ceremony_events = None
+
+def get_ceremony_events() -> Optional[CeremonyEvents]:
+    """Get the global ceremony events publisher, or None when CEREMONY_EVENTS_ENABLED is false"""
+    global _ceremony_events
+    config = Config()
+    if not config.CEREMONY_EVENTS_ENABLED:
+        return None
+    if _ceremony_events is None:
+        _ceremony_events = CeremonyEvents(Redis.from_url(config.REDIS_URL))
+    return _ceremony_events
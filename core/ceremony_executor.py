@@ -0,0 +1,375 @@
+"""
+Asynchronous signing ceremony executor
+
+Instead of driving the six signing steps inside HTTP requests, the gateway
+can enqueue a ceremony (``CEREMONY_EXECUTOR=true``); an RQ worker then runs
+it to completion as an asyncio state machine:
+
+- steps run in order, except that checkpoint transaction preparation (arkd)
+  and signature collection, which only depend on the ARK transaction, run
+  concurrently
+- each blocking step runs on a thread and is abandoned after the
+  orchestrator's ``step_timeout``, failing the ceremony
+- after every step the ceremony state is checkpointed to the session (step
+  results, transactions, signatures) and subscribers are notified; a worker
+  that resumes a ceremony skips the steps already checkpointed
+- a Redis lease (``ceremony_lock:<session_id>``), renewed at every
+  checkpoint, keeps two workers from running the same ceremony; the
+  ``ceremony-resume`` job re-enqueues ceremonies whose lease has lapsed
+- the session status is re-read before every stage and after every
+  checkpoint; a ceremony whose session was cancelled, failed or expired in
+  the meantime stops without running further steps
+
+The HTTP API only enqueues ceremonies and observes their status.
+"""
+
+import asyncio
+import copy
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from redis import Redis
+
+from core.config import Config
+from core.models import SigningSession, get_session
+from core.session_manager import SessionExpiredError, SessionState, get_session_manager
+from core.signing_orchestrator import (
+    SigningCeremonyError, SigningStep, SigningTimeoutError, get_signing_orchestrator
+)
+
+logger = logging.getLogger(__name__)
+
+def utc_now() -> datetime:
+    """Return current UTC time as a naive datetime (UTC) without deprecation warnings."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+# Steps in each stage run concurrently; stages run in order
+STEP_STAGES: List[Tuple[SigningStep, ...]] = [
+    (SigningStep.INTENT_VERIFICATION,),
+    (SigningStep.ARK_TRANSACTION_PREP,),
+    (SigningStep.CHECKPOINT_TRANSACTION_PREP, SigningStep.SIGNATURE_COLLECTION),
+    (SigningStep.ARK_PROTOCOL_EXECUTION,),
+    (SigningStep.FINALIZATION,),
+]
+
+STEP_ORDER = [step for stage in STEP_STAGES for step in stage]
+
+_FINAL_STATUSES = (SessionState.COMPLETED.value, SessionState.FAILED.value, SessionState.EXPIRED.value)
+
+
+# Lease scripts: the holder check and the extend/delete run as one Redis call,
+# so a lease that lapses in between cannot be extended or deleted for a worker
+# that took it over. A lapsed lease nobody has taken is taken back.
+_RENEW_LEASE = """
+local holder = redis.call('GET', KEYS[1])
+if holder == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+elseif not holder then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+_RELEASE_LEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class _CeremonyStopped(Exception):
+    """The session reached a final status (cancelled, failed, expired) while the ceremony ran"""
+
+    def __init__(self, status: str):
+        super().__init__(status)
+        self.status = status
+
+
+def _merge(target: Dict[str, Any], before: Dict[str, Any], after: Dict[str, Any]):
+    """Apply the changes a step made to its copy of the ceremony state (``before`` -> ``after``) to ``target``"""
+    for key, value in after.items():
+        if key in before and before[key] == value:
+            continue
+        if isinstance(value, dict) and isinstance(before.get(key), dict) and isinstance(target.get(key), dict):
+            _merge(target[key], before[key], value)
+        else:
+            target[key] = value
+
+
+class CeremonyExecutor:
+    """Runs signing ceremonies on RQ workers with concurrent stages, step timeouts and checkpoints"""
+
+    def __init__(self, orchestrator=None, redis_client: Optional[Redis] = None, queue_name: str = 'default'):
+        self.orchestrator = orchestrator or get_signing_orchestrator()
+        self.redis = redis_client or Redis.from_url(Config().REDIS_URL)
+        self.queue_name = queue_name
+        # A lease outlives the longest gap between checkpoints (one stage)
+        self.lease_seconds = int(self.orchestrator.step_timeout * 2)
+        self._renew_lease = self.redis.register_script(_RENEW_LEASE)
+        self._release_lease = self.redis.register_script(_RELEASE_LEASE)
+        self.stats = {
+            'enqueued': 0,
+            'resumed': 0,
+            'completed': 0,
+            'failed': 0,
+            'stopped': 0,
+            'timeouts': 0
+        }
+
+    @property
+    def session_manager(self):
+        return self.orchestrator.session_manager or get_session_manager()
+
+    @staticmethod
+    def _lock_key(session_id: str) -> str:
+        return f"ceremony_lock:{session_id}"
+
+    # Enqueueing
+
+    def enqueue(self, session_id: str, signature_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Checkpoint the initial ceremony state and enqueue the ceremony; returns its status
+
+        Args:
+            session_id: Session to run the ceremony for
+            signature_data: Client signatures (``{'user_signature': ...}``) handed to the
+                signature-collection step; without them the step uses the signature
+                stored on the session's challenge
+        """
+        self.orchestrator.validate_ceremony_start(session_id)
+        session = self.session_manager.get_session(session_id)
+        if (session.result_data or {}).get('ceremony_state'):
+            raise SigningCeremonyError(f"Ceremony for session {session_id} has already started")
+
+        ceremony_state = self.orchestrator.initial_ceremony_state(session_id)
+        ceremony_state['executor'] = {'status': 'queued', 'heartbeat': utc_now().isoformat()}
+        if signature_data:
+            ceremony_state['signature_data'] = signature_data
+        if not self.session_manager._update_session_result(session_id, {
+            'ceremony_state': ceremony_state,
+            'ceremony_status': 'queued'
+        }):
+            raise SigningCeremonyError(f"Failed to store ceremony state for session {session_id}")
+
+        self._enqueue_job(session_id)
+        self.stats['enqueued'] += 1
+        logger.info(f"🔄 Enqueued signing ceremony for session {session_id}")
+        return self.orchestrator.get_ceremony_status(session_id)
+
+    def _enqueue_job(self, session_id: str):
+        from rq import Queue
+
+        Queue(self.queue_name, connection=self.redis).enqueue(
+            'core.tasks.run_signing_ceremony',
+            args=[session_id],
+            job_timeout=self.orchestrator.ceremony_timeout + 60,
+            result_ttl=3600
+        )
+
+    # Execution
+
+    def run(self, session_id: str) -> Dict[str, Any]:
+        """Run (or resume) a ceremony to completion; called from the RQ job"""
+        token = uuid.uuid4().hex
+        if not self.redis.set(self._lock_key(session_id), token, nx=True, ex=self.lease_seconds):
+            logger.info(f"⏭️  Ceremony for session {session_id} is running on another worker")
+            return {'session_id': session_id, 'status': 'locked'}
+
+        pool = ThreadPoolExecutor(max_workers=max(len(stage) for stage in STEP_STAGES),
+                                  thread_name_prefix=f"ceremony-{session_id[:8]}")
+        try:
+            return asyncio.run(self._run(session_id, token, pool))
+        finally:
+            # Do not wait for a step abandoned after its timeout
+            pool.shutdown(wait=False, cancel_futures=True)
+            self._release(session_id, token)
+
+    async def _run(self, session_id: str, token: str, pool: ThreadPoolExecutor) -> Dict[str, Any]:
+        try:
+            session = self.session_manager.get_session(session_id)
+        except SessionExpiredError:
+            self.session_manager.update_session_status(session_id, SessionState.EXPIRED.value)
+            self.orchestrator._publish_ceremony_event(session_id, 'failed')
+            return {'session_id': session_id, 'status': SessionState.EXPIRED.value}
+        if not session or session.status in _FINAL_STATUSES:
+            return {'session_id': session_id, 'status': session.status if session else 'not_found'}
+
+        ceremony_state = (session.result_data or {}).get('ceremony_state') or \
+            self.orchestrator.initial_ceremony_state(session_id)
+        executor_state = ceremony_state.setdefault('executor', {})
+        if executor_state.get('status') == 'running':
+            self.stats['resumed'] += 1
+            logger.info(f"🔄 Resuming ceremony for session {session_id} after {ceremony_state['completed_steps']}")
+        executor_state['status'] = 'running'
+        executor_state['attempts'] = executor_state.get('attempts', 0) + 1
+        status = session.status
+
+        step = None
+        try:
+            for stage in STEP_STAGES:
+                pending = [s for s in stage if s.value not in ceremony_state['completed_steps']]
+                if not pending:
+                    continue
+                step = pending[0]
+                self._ensure_active(session_id)
+                if self.orchestrator._is_ceremony_timed_out(ceremony_state):
+                    raise SigningTimeoutError(f"Signing ceremony for session {session_id} has timed out")
+
+                before = copy.deepcopy(ceremony_state)
+                outcomes = await asyncio.gather(
+                    *(self._run_step(session_id, s, before, pool) for s in pending),
+                    return_exceptions=True
+                )
+                for s, outcome in zip(pending, outcomes):
+                    if isinstance(outcome, BaseException):
+                        step = s
+                        raise outcome
+
+                for s, (result, after) in zip(pending, outcomes):
+                    _merge(ceremony_state, before, after)
+                    ceremony_state.setdefault('step_results', {})[s.value] = result
+                    ceremony_state['completed_steps'].append(s.value)
+                ceremony_state['completed_steps'].sort(key=lambda value: STEP_ORDER.index(SigningStep(value)))
+                ceremony_state['current_step'] = min(len(ceremony_state['completed_steps']) + 1, len(STEP_ORDER))
+                ceremony_state['step_start_time'] = utc_now().isoformat()
+
+                if SigningStep.FINALIZATION in pending:
+                    executor_state['status'] = 'completed'
+                    if not self.session_manager.complete_session(
+                            session_id, ceremony_state['step_results'][SigningStep.FINALIZATION.value]):
+                        self._ensure_active(session_id)
+                        raise SigningCeremonyError(f"Failed to complete session {session_id}")
+                    self.orchestrator._publish_ceremony_event(session_id, 'completed', SigningStep.FINALIZATION.value)
+                    break
+
+                self._checkpoint(session_id, token, ceremony_state, ceremony_state['step_results'][pending[-1].value])
+                self._ensure_active(session_id)
+                if status != SessionState.SIGNING.value:
+                    if not self.session_manager.update_session_status(session_id, SessionState.SIGNING.value,
+                                                                      f"Completed step {pending[-1].value}"):
+                        self._ensure_active(session_id)
+                        raise SigningCeremonyError(f"Failed to move session {session_id} to signing")
+                    status = SessionState.SIGNING.value
+                for s in pending:
+                    self.orchestrator._publish_ceremony_event(session_id, 'step_completed', s.value)
+
+        except _CeremonyStopped as e:
+            self.stats['stopped'] += 1
+            logger.info(f"⏹️  Ceremony for session {session_id} stopped: session is {e.status}")
+            return {'session_id': session_id, 'status': e.status}
+        except Exception as e:
+            if isinstance(e, SigningTimeoutError):
+                self.stats['timeouts'] += 1
+            self.stats['failed'] += 1
+            failed_step = step.value if step else 'unknown'
+            logger.error(f"❌ Ceremony for session {session_id} failed at {failed_step}: {e}")
+            self.session_manager.fail_session(session_id, f"Step {failed_step} failed: {str(e)}")
+            self.orchestrator._publish_ceremony_event(session_id, 'failed', failed_step)
+            return {'session_id': session_id, 'status': 'failed', 'step': failed_step, 'error': str(e)}
+
+        self.stats['completed'] += 1
+        logger.info(f"✅ Ceremony for session {session_id} completed")
+        return {'session_id': session_id, 'status': 'completed'}
+
+    async def _run_step(self, session_id: str, step: SigningStep, ceremony_state: Dict[str, Any],
+                        pool: ThreadPoolExecutor) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Run one blocking step on ``pool`` against a copy of the state; returns (result, changed state)"""
+        working = copy.deepcopy(ceremony_state)
+        loop = asyncio.get_running_loop()
+        try:
+            result = await asyncio.wait_for(
+                loop.run_in_executor(pool, self.orchestrator._execute_signing_step, session_id, step, working,
+                                     working.get('signature_data') if step == SigningStep.SIGNATURE_COLLECTION else None),
+                timeout=self.orchestrator.step_timeout
+            )
+        except asyncio.TimeoutError:
+            raise SigningTimeoutError(f"Step {step.value} timed out after {self.orchestrator.step_timeout}s")
+        return result, working
+
+    def _ensure_active(self, session_id: str):
+        """Stop the ceremony if its session was cancelled, failed or expired since the last check"""
+        try:
+            session = self.session_manager.get_session(session_id)
+        except SessionExpiredError:
+            self.session_manager.update_session_status(session_id, SessionState.EXPIRED.value)
+            self.orchestrator._publish_ceremony_event(session_id, 'failed')
+            raise _CeremonyStopped(SessionState.EXPIRED.value)
+        if not session or session.status in _FINAL_STATUSES:
+            raise _CeremonyStopped(session.status if session else 'not_found')
+
+    def _checkpoint(self, session_id: str, token: str, ceremony_state: Dict[str, Any], last_step_result: Dict[str, Any]):
+        """Persist the ceremony state and renew the lease"""
+        ceremony_state['executor']['heartbeat'] = utc_now().isoformat()
+        if not self.session_manager._update_session_result(session_id, {
+            'ceremony_state': ceremony_state,
+            'ceremony_status': 'in_progress',
+            'last_step_result': last_step_result
+        }):
+            raise SigningCeremonyError(f"Failed to checkpoint ceremony for session {session_id}")
+        if not self._renew(session_id, token):
+            raise SigningCeremonyError(f"Lost the ceremony lease for session {session_id}")
+
+    def _renew(self, session_id: str, token: str) -> bool:
+        return bool(self._renew_lease(keys=[self._lock_key(session_id)], args=[token, self.lease_seconds * 1000]))
+
+    def _release(self, session_id: str, token: str):
+        try:
+            self._release_lease(keys=[self._lock_key(session_id)], args=[token])
+        except Exception as e:
+            logger.warning(f"⚠️  Failed to release ceremony lease for session {session_id}: {e}")
+
+    # Recovery
+
+    def resume_stalled(self) -> int:
+        """Re-enqueue ceremonies whose worker stopped checkpointing; returns how many"""
+        cutoff = utc_now() - timedelta(seconds=self.lease_seconds)
+        db = get_session()
+        try:
+            session_ids = [row.session_id for row in db.query(SigningSession.session_id).filter(
+                SigningSession.status.in_([SessionState.AWAITING_SIGNATURE.value, SessionState.SIGNING.value]),
+                SigningSession.expires_at > utc_now(),
+                SigningSession.updated_at < cutoff
+            ).all()]
+        finally:
+            db.close()
+
+        resumed = 0
+        for session_id in session_ids:
+            try:
+                session = self.session_manager.get_session(session_id)
+            except Exception:
+                continue
+            executor_state = ((session.result_data or {}).get('ceremony_state') or {}).get('executor') if session else None
+            if not executor_state or executor_state.get('status') not in ('queued', 'running'):
+                continue
+            heartbeat = executor_state.get('heartbeat')
+            if heartbeat and datetime.fromisoformat(heartbeat) >= cutoff:
+                continue
+            if self.redis.exists(self._lock_key(session_id)):
+                continue
+            self._enqueue_job(session_id)
+            resumed += 1
+            logger.info(f"🔄 Re-enqueued stalled ceremony for session {session_id}")
+        return resumed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Executor statistics"""
+        return dict(self.stats)
+
+
+# Global ceremony executor instance
+_ceremony_executor = None
+
+def get_ceremony_executor() -> Optional[CeremonyExecutor]:
+    """Get the global ceremony executor, or None when CEREMONY_EXECUTOR is false"""
+    global _ceremony_executor
+    if not Config().CEREMONY_EXECUTOR:
+        return None
+    if _ceremony_executor is None:
+        _ceremony_executor = CeremonyExecutor()
+    return _ceremony_executor
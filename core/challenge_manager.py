@@ -4,12 +4,9 @@ import base64
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional, Any, Tuple
 import logging
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import ec
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.backends import default_backend
 from core.models import SigningChallenge, SigningSession, get_session
 from core.session_manager import SessionState, get_session_manager
+from core.signature_verifier import get_signature_verifier
 
 logger = logging.getLogger(__name__)
 
@@ -219,22 +216,19 @@ class ChallengeManager:
         Returns:
             Number of challenges cleaned up
         """
+        from core.expiry_sweeper import get_expiry_sweeper
+
         session = get_session()
         try:
-            expired_challenges = session.query(SigningChallenge).filter(
-                SigningChallenge.expires_at < utc_now(),
-                SigningChallenge.is_used == False
-            ).all()
-
-            count = len(expired_challenges)
-            if count > 0:
-                for challenge in expired_challenges:
-                    session.delete(challenge)
+            result = get_expiry_sweeper().sweep(
+                session, 'signing_challenges', SigningChallenge,
+                [SigningChallenge.expires_at < utc_now(), SigningChallenge.is_used == False]
+            )
 
-                session.commit()
-                logger.info(f"Cleaned up {count} expired challenges")
+            if result.rows > 0:
+                logger.info(f"Cleaned up {result.rows} expired challenges")
 
-            return count
+            return result.rows
 
         except Exception as e:
             session.rollback()
@@ -342,31 +336,8 @@ class ChallengeManager:
         Returns:
             True if valid, False otherwise
         """
-        try:
-            # Convert hex pubkey to bytes
-            if pubkey_hex.startswith('0x'):
-                pubkey_hex = pubkey_hex[2:]
-
-            pubkey_bytes = bytes.fromhex(pubkey_hex)
-
-            # Load public key
-            public_key = serialization.load_der_public_key(
-                pubkey_bytes,
-                backend=default_backend()
-            )
-
-            # Verify signature
-            public_key.verify(
-                signature,
-                challenge_data,
-                ec.ECDSA(hashes.SHA256())
-            )
-
-            return True
-
-        except Exception as e:
-            logger.error(f"Signature verification failed: {e}")
-            return False
+        # Parsed public keys are cached by the verifier across responses
+        return get_signature_verifier().verify_ecdsa(pubkey_hex, signature, challenge_data)
 
     def get_challenge_info(self, challenge_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import List, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -141,6 +141,104 @@ class Config:
     def VTXO_MIN_AMOUNT_SATS(self) -> int:
         return int(os.getenv('VTXO_MIN_AMOUNT_SATS', 1000))
 
+    @property
+    def VTXO_DENOMINATION_LADDERS(self) -> dict:
+        # "BTC:1-2-5,*:pow2" -> {'BTC': '1-2-5', '*': 'pow2'}; '*' applies to all other assets
+        ladders = {}
+        for entry in os.getenv('VTXO_DENOMINATION_LADDERS', '').split(','):
+            if ':' in entry:
+                asset_id, series = entry.split(':', 1)
+                ladders[asset_id.strip()] = series.strip()
+        return ladders
+
+    @property
+    def VTXO_MAX_DENOMINATION_SATS(self) -> int:
+        return int(os.getenv('VTXO_MAX_DENOMINATION_SATS', 1000000))
+
+    # Nostr Intent Ingestion Configuration
+    @property
+    def NOSTR_INTENT_BATCHING(self) -> bool:
+        return os.getenv('NOSTR_INTENT_BATCHING', 'true').lower() == 'true'
+
+    @property
+    def NOSTR_INTENT_BATCH_MAX_LATENCY_MS(self) -> float:
+        return float(os.getenv('NOSTR_INTENT_BATCH_MAX_LATENCY_MS', 5))
+
+    @property
+    def NOSTR_INTENT_BATCH_MAX_SIZE(self) -> int:
+        return int(os.getenv('NOSTR_INTENT_BATCH_MAX_SIZE', 100))
+
+    @property
+    def NOSTR_INTENT_PUBLISH_WORKERS(self) -> int:
+        return int(os.getenv('NOSTR_INTENT_PUBLISH_WORKERS', 8))
+
+    # VTXO Availability Index Configuration
+    @property
+    def VTXO_INDEX_LAZY_BUILD(self) -> bool:
+        return os.getenv('VTXO_INDEX_LAZY_BUILD', 'true').lower() == 'true'
+
+    # Balance Cache Configuration
+    @property
+    def BALANCE_CACHE_ENABLED(self) -> bool:
+        return os.getenv('BALANCE_CACHE_ENABLED', 'true').lower() == 'true'
+
+    @property
+    def BALANCE_CACHE_TTL_SECONDS(self) -> int:
+        return int(os.getenv('BALANCE_CACHE_TTL_SECONDS', 300))
+
+    # Hot Session State Configuration
+    @property
+    def SESSION_STATE_REDIS(self) -> bool:
+        return os.getenv('SESSION_STATE_REDIS', 'true').lower() == 'true'
+
+    @property
+    def SESSION_STATE_FLUSH_INTERVAL_MS(self) -> int:
+        return int(os.getenv('SESSION_STATE_FLUSH_INTERVAL_MS', 500))
+
+    # Ceremony Executor Configuration
+    @property
+    def CEREMONY_EXECUTOR(self) -> bool:
+        return os.getenv('CEREMONY_EXECUTOR', 'false').lower() == 'true'
+
+    # Ceremony Events Configuration
+    @property
+    def CEREMONY_EVENTS_ENABLED(self) -> bool:
+        return os.getenv('CEREMONY_EVENTS_ENABLED', 'true').lower() == 'true'
+
+    @property
+    def CEREMONY_LONG_POLL_MAX_SECONDS(self) -> float:
+        return float(os.getenv('CEREMONY_LONG_POLL_MAX_SECONDS', 30))
+
+    @property
+    def CEREMONY_SSE_HEARTBEAT_SECONDS(self) -> float:
+        return float(os.getenv('CEREMONY_SSE_HEARTBEAT_SECONDS', 15))
+
+    # Signature Verification Configuration
+    @property
+    def SIGNATURE_VERIFY_PROCESSES(self) -> int:
+        return int(os.getenv('SIGNATURE_VERIFY_PROCESSES', 0))
+
+    @property
+    def SIGNATURE_VERIFY_BATCH_MIN(self) -> int:
+        return int(os.getenv('SIGNATURE_VERIFY_BATCH_MIN', 32))
+
+    @property
+    def SIGNATURE_KEY_CACHE_SIZE(self) -> int:
+        return int(os.getenv('SIGNATURE_KEY_CACHE_SIZE', 4096))
+
+    # Ledger Configuration
+    @property
+    def LEDGER_GROUP_COMMIT(self) -> bool:
+        return os.getenv('LEDGER_GROUP_COMMIT', 'false').lower() == 'true'
+
+    @property
+    def LEDGER_GROUP_COMMIT_MAX_LATENCY_MS(self) -> float:
+        return float(os.getenv('LEDGER_GROUP_COMMIT_MAX_LATENCY_MS', 5))
+
+    @property
+    def LEDGER_GROUP_COMMIT_MAX_BATCH_SIZE(self) -> int:
+        return int(os.getenv('LEDGER_GROUP_COMMIT_MAX_BATCH_SIZE', 100))
+
     # Fee Configuration
     @property
     def FEE_SATS_PER_VBYTE(self) -> int:
@@ -177,6 +275,21 @@ class Config:
     def METRICS_RETENTION_DAYS(self) -> int:
         return int(os.getenv('METRICS_RETENTION_DAYS', 30))
 
+    @property
+    def PARTITION_DAYS_AHEAD(self) -> int:
+        # Day partitions of system_metrics/heartbeats/job_logs kept ready in advance
+        return int(os.getenv('PARTITION_DAYS_AHEAD', 7))
+
+    # Cold Archive Configuration
+    @property
+    def ARCHIVE_AFTER_DAYS(self) -> int:
+        # Terminal sessions/challenges/transactions older than this move to archived_records
+        return int(os.getenv('ARCHIVE_AFTER_DAYS', 30))
+
+    @property
+    def ARCHIVE_BATCH_SIZE(self) -> int:
+        return int(os.getenv('ARCHIVE_BATCH_SIZE', 500))
+
     # Circuit Breaker Configuration
     @property
     def CIRCUIT_BREAKER_THRESHOLD(self) -> int:
@@ -243,6 +356,21 @@ class Config:
     def DB_POOL_TIMEOUT(self) -> int:
         return int(os.getenv('DB_POOL_TIMEOUT', 30))
 
+    @property
+    def DB_SCHEMA_BOOTSTRAP(self) -> str:
+        # auto | check | create | off
+        return os.getenv('DB_SCHEMA_BOOTSTRAP', 'auto')
+
+    @property
+    def DATABASE_REPLICA_URLS(self) -> List[str]:
+        # Comma-separated read replicas; empty sends every query to DATABASE_URL
+        return [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+
+    @property
+    def DB_REPLICA_STICKY_SECONDS(self) -> float:
+        # After a write, reads keyed by the written user stay on the primary this long
+        return float(os.getenv('DB_REPLICA_STICKY_SECONDS', 5))
+
     # Admin Configuration
     @property
     def ADMIN_API_KEY(self) -> Optional[str]:
@@ -0,0 +1,116 @@
+"""
+Set-based expiry sweeps for ArkRelay Gateway
+
+Expires (UPDATE) or removes (DELETE) rows past their expiry in bounded
+batches instead of loading every expired row into the ORM. Each batch is a
+single statement limited to ``batch_size`` rows and committed on its own, so
+a large backlog never holds one long transaction; the loop stops once a batch
+comes back short or the time budget is spent (the next run picks up the rest).
+
+Sweep throughput is exported to Prometheus per target.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, select, update
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SweepResult:
+    """Outcome of one expiry sweep"""
+    target: str
+    rows: int = 0
+    batches: int = 0
+    duration_seconds: float = 0.0
+    total: int = 0  # sum of the requested column over swept rows
+    complete: bool = True  # False when the time budget ran out with rows left
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.duration_seconds if self.duration_seconds > 0 else 0.0
+
+
+class ExpirySweeper:
+    """Chunked UPDATE/DELETE sweeps with a time budget"""
+
+    def __init__(self, batch_size: int = 1000, time_budget_seconds: float = 10.0):
+        self.batch_size = batch_size
+        self.time_budget_seconds = time_budget_seconds
+
+    def sweep(self, session, target: str, model, criteria: List[Any],
+              values: Optional[Dict[str, Any]] = None, sum_column=None) -> SweepResult:
+        """
+        Sweep rows of ``model`` matching ``criteria``
+
+        Args:
+            session: Session to run the batches in; committed after every batch
+            target: Name used in logs and metrics (e.g. 'vtxos')
+            model: Mapped class with an integer ``id`` primary key
+            criteria: SQLAlchemy filter expressions selecting expired rows
+            values: Column values to set; None deletes the rows instead
+            sum_column: Optional column summed over the swept rows into ``total``
+
+        Returns:
+            SweepResult with row counts; no ORM objects are loaded
+        """
+        result = SweepResult(target)
+        start = time.monotonic()
+
+        while True:
+            # LIMIT goes in a derived table: MySQL rejects LIMIT directly inside IN (...)
+            batch_ids = select(model.id).where(*criteria).order_by(model.id).limit(self.batch_size).subquery()
+            in_batch = model.id.in_(select(batch_ids.c.id))
+
+            if sum_column is not None:
+                result.total += session.execute(
+                    select(func.coalesce(func.sum(sum_column), 0)).where(in_batch)
+                ).scalar() or 0
+
+            # criteria are repeated so rows changed since the id selection are left alone
+            if values is None:
+                stmt = delete(model).where(in_batch, *criteria)
+            else:
+                stmt = update(model).where(in_batch, *criteria).values(values)
+            rows = session.execute(stmt.execution_options(synchronize_session=False)).rowcount or 0
+            session.commit()
+
+            result.rows += rows
+            result.batches += 1
+            if rows < self.batch_size:
+                break
+            if time.monotonic() - start >= self.time_budget_seconds:
+                result.complete = False
+                logger.warning(f"⏱️  Expiry sweep of {target} hit its {self.time_budget_seconds}s budget "
+                               f"after {result.rows} rows; remaining rows are left for the next run")
+                break
+
+        result.duration_seconds = time.monotonic() - start
+        self._report(result)
+        return result
+
+    def _report(self, result: SweepResult):
+        """Export sweep throughput to Prometheus"""
+        try:
+            from core.monitoring import get_prometheus_metrics
+            metrics = get_prometheus_metrics()
+            metrics.expiry_sweep_rows.labels(target=result.target).inc(result.rows)
+            metrics.expiry_sweep_duration.labels(target=result.target).observe(result.duration_seconds)
+            metrics.expiry_sweep_rows_per_second.labels(target=result.target).set(result.rows_per_second)
+        except Exception as e:
+            logger.debug(f"Expiry sweep metrics unavailable: {e}")
+
+
+# Global sweeper instance
+_expiry_sweeper = None
+
+def get_expiry_sweeper() -> ExpirySweeper:
+    """Get the global expiry sweeper instance"""
+    global _expiry_sweeper
+    if _expiry_sweeper is None:
+        _expiry_sweeper = ExpirySweeper()
+    return _expiry_sweeper
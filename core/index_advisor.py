@@ -0,0 +1,183 @@
+"""
+Index advisor for ArkRelay Gateway
+
+Runs EXPLAIN against the gateway's canonical hot-path queries and reports any
+that fall back to a full table scan. Supports MariaDB/MySQL, PostgreSQL and SQLite.
+
+Usage:
+    python -m core.index_advisor [--database-url URL] [--json]
+
+Exits with status 1 when at least one query performs a full table scan.
+"""
+
+import argparse
+import json
+import logging
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import create_engine, text
+
+logger = logging.getLogger(__name__)
+
+def utc_now() -> datetime:
+    """Return current UTC time as a naive datetime (UTC) without deprecation warnings."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+# Canonical queries issued by the gateway's hot paths: (name, table, sql, params)
+CANONICAL_QUERIES = [
+    (
+        'vtxo_assignment', 'vtxos',
+        "SELECT id, vtxo_id, amount_sats FROM vtxos "
+        "WHERE asset_id = :asset_id AND status = 'available' "
+        "AND amount_sats >= :amount AND expires_at > :now "
+        "ORDER BY amount_sats ASC LIMIT 1",
+        {'asset_id': 'BTC', 'amount': 1000},
+    ),
+    (
+        'vtxo_inventory_count', 'vtxos',
+        "SELECT COUNT(id) FROM vtxos WHERE asset_id = :asset_id AND status = 'available'",
+        {'asset_id': 'BTC'},
+    ),
+    (
+        'user_asset_balance', 'asset_balances',
+        "SELECT balance, reserved_balance FROM asset_balances "
+        "WHERE user_pubkey = :user_pubkey AND asset_id = :asset_id",
+        {'user_pubkey': '00' * 33, 'asset_id': 'BTC'},
+    ),
+    (
+        'user_sessions_by_status', 'signing_sessions',
+        "SELECT session_id FROM signing_sessions WHERE user_pubkey = :user_pubkey AND status = :status",
+        {'user_pubkey': '00' * 33, 'status': 'initiated'},
+    ),
+    (
+        'transactions_by_session', 'transactions',
+        "SELECT txid, status FROM transactions WHERE session_id = :session_id",
+        {'session_id': 'session'},
+    ),
+    (
+        'pending_lightning_invoices', 'lightning_invoices',
+        "SELECT payment_hash FROM lightning_invoices WHERE status IN ('pending', 'pending_payment')",
+        {},
+    ),
+    (
+        'job_statistics_window', 'job_logs',
+        "SELECT status, COUNT(id) FROM job_logs WHERE created_at >= :since GROUP BY status",
+        {'since': None},
+    ),
+]
+
+
+def _query_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill in time-relative parameters at execution time"""
+    resolved = dict(params)
+    now = utc_now()
+    resolved.setdefault('now', now)
+    if 'since' in resolved and resolved['since'] is None:
+        resolved['since'] = now - timedelta(hours=24)
+    return resolved
+
+
+def _detect_full_scan(dialect: str, table: str, plan_rows: List[Dict[str, Any]]) -> bool:
+    """Return True if the EXPLAIN output shows a full scan of ``table``"""
+    if dialect == 'sqlite':
+        # EXPLAIN QUERY PLAN detail: "SCAN vtxos" vs "SEARCH vtxos USING INDEX ..."
+        for row in plan_rows:
+            detail = str(row.get('detail', ''))
+            if detail.startswith(f'SCAN {table}') and 'USING' not in detail:
+                return True
+        return False
+
+    if dialect in ('mysql', 'mariadb'):
+        # access type ALL means full table scan
+        for row in plan_rows:
+            if row.get('table') == table and str(row.get('type', '')).upper() == 'ALL':
+                return True
+        return False
+
+    if dialect == 'postgresql':
+        for row in plan_rows:
+            line = str(next(iter(row.values()), ''))
+            if f'Seq Scan on {table}' in line:
+                return True
+        return False
+
+    return False
+
+
+def explain_query(connection, dialect: str, sql: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Run EXPLAIN for a query and return the plan as a list of dicts"""
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect == 'sqlite' else 'EXPLAIN '
+    result = connection.execute(text(prefix + sql), _query_params(params))
+    return [dict(row._mapping) for row in result]
+
+
+def run_advisor(engine) -> Dict[str, Any]:
+    """
+    Run EXPLAIN on all canonical queries
+
+    Args:
+        engine: SQLAlchemy engine bound to the gateway database
+
+    Returns:
+        Report with per-query plans and the list of queries doing full scans
+    """
+    dialect = engine.dialect.name
+    report = {
+        'dialect': dialect,
+        'queries': [],
+        'full_scans': [],
+        'timestamp': utc_now().isoformat()
+    }
+
+    with engine.connect() as connection:
+        for name, table, sql, params in CANONICAL_QUERIES:
+            entry = {'name': name, 'table': table}
+            try:
+                plan = explain_query(connection, dialect, sql, params)
+                entry['plan'] = plan
+                entry['full_scan'] = _detect_full_scan(dialect, table, plan)
+                if entry['full_scan']:
+                    report['full_scans'].append(name)
+            except Exception as e:
+                logger.error(f"EXPLAIN failed for {name}: {e}")
+                entry['error'] = str(e)
+            report['queries'].append(entry)
+
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Report full table scans on ArkRelay hot-path queries")
+    parser.add_argument('--database-url', help='Database URL (defaults to DATABASE_URL)')
+    parser.add_argument('--json', action='store_true', help='Print the full report as JSON')
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        engine = create_engine(args.database_url)
+    else:
+        from core.models import _init_engine
+        _init_engine()
+        from core.models import engine
+
+    try:
+        report = run_advisor(engine)
+    finally:
+        engine.dispose()
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        for entry in report['queries']:
+            if 'error' in entry:
+                status = f"ERROR ({entry['error']})"
+            else:
+                status = 'FULL SCAN' if entry['full_scan'] else 'ok'
+            print(f"{entry['name']:<28} {entry['table']:<20} {status}")
+
+    return 1 if report['full_scans'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
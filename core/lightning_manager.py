@@ -12,6 +12,7 @@ from dataclasses import dataclass
 
 from sqlalchemy.orm import Session
 from core.models import LightningInvoice, AssetBalance, SigningSession, Transaction, get_session
+from core.balance_cache import balance_row, get_balance_cache
 from grpc_clients.lnd_client import LndClient, LightningInvoice as LndLightningInvoice, Payment
 from core.lightning_errors import lightning_error_handler, lightning_payment_recovery, lightning_invoice_recovery, LightningError, LightningErrorType
 
@@ -71,12 +72,17 @@ class LightningManager:
             db = next(get_db())
 
             # Check if user has sufficient asset balance for the lift
-            asset_balance = db.query(AssetBalance).filter(
-                AssetBalance.user_pubkey == request.user_pubkey,
-                AssetBalance.asset_id == request.asset_id
-            ).first()
+            def load_balance():
+                return balance_row(db.query(AssetBalance).filter(
+                    AssetBalance.user_pubkey == request.user_pubkey,
+                    AssetBalance.asset_id == request.asset_id
+                ).first())
+
+            cache = get_balance_cache()
+            asset_balance = (cache.get_balance(request.user_pubkey, request.asset_id, load_balance)
+                             if cache else load_balance())
 
-            if not asset_balance or asset_balance.balance < request.amount_sats:
+            if not asset_balance or asset_balance['balance'] < request.amount_sats:
                 error = LightningError(
                     error_type=LightningErrorType.INSUFFICIENT_BALANCE,
                     message=f"Insufficient asset balance for user {request.user_pubkey}",
@@ -168,12 +174,17 @@ class LightningManager:
             db = next(get_db())
 
             # Check if user has sufficient asset balance
-            asset_balance = db.query(AssetBalance).filter(
-                AssetBalance.user_pubkey == request.user_pubkey,
-                AssetBalance.asset_id == request.asset_id
-            ).first()
+            def load_balance():
+                return balance_row(db.query(AssetBalance).filter(
+                    AssetBalance.user_pubkey == request.user_pubkey,
+                    AssetBalance.asset_id == request.asset_id
+                ).first())
+
+            cache = get_balance_cache()
+            asset_balance = (cache.get_balance(request.user_pubkey, request.asset_id, load_balance)
+                             if cache else load_balance())
 
-            if not asset_balance or asset_balance.balance < request.amount_sats:
+            if not asset_balance or asset_balance['balance'] < request.amount_sats:
                 return LightningOperationResult(
                     success=False,
                     operation_id="",
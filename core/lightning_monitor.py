@@ -14,7 +14,8 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 
 from sqlalchemy.orm import Session
-from core.models import LightningInvoice, AssetBalance, SystemMetrics, get_session
+from core.models import LightningInvoice, SystemMetrics, get_session
+from core.ledger import BalanceDelta, get_balance_ledger
 from core.lightning_manager import LightningManager
 
 # Try to import redis_client, fallback to None if not available
@@ -191,21 +192,10 @@ class LightningMonitor:
             asset_id = invoice.asset_id
             amount = invoice.amount_sats
 
-            # Check if user has asset balance, create if not
-            asset_balance = db.query(AssetBalance).filter(
-                AssetBalance.user_pubkey == user_pubkey,
-                AssetBalance.asset_id == asset_id
-            ).first()
-
-            if asset_balance:
-                asset_balance.balance += amount
-            else:
-                asset_balance = AssetBalance(
-                    user_pubkey=user_pubkey,
-                    asset_id=asset_id,
-                    balance=amount
-                )
-                db.add(asset_balance)
+            # Credit the user (balance row created if missing)
+            get_balance_ledger().apply(db, [
+                BalanceDelta(user_pubkey, asset_id, balance=amount)
+            ], entry_type='lightning_lift', reference=invoice.payment_hash)
 
             db.commit()
 
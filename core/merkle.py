@@ -0,0 +1,111 @@
+"""
+Append-only Merkle accumulator for settlement commitments
+
+Leaves are raw 32-byte digests. Hashing follows RFC 6962 (leaf nodes are
+SHA256(0x00 || leaf), interior nodes SHA256(0x01 || left || right)), so the
+root of n leaves is the RFC 6962 tree hash and inclusion proofs verify with
+the standard audit-path algorithm. The accumulator only keeps one peak per
+set bit of the leaf count to compute the root; leaf hashes are kept as well
+when inclusion proofs are needed.
+"""
+
+import hashlib
+from typing import List, Optional, Tuple
+
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+
+def leaf_hash(digest: bytes) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + digest).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+class MerkleAccumulator:
+    """Incremental Merkle tree over 32-byte digests"""
+
+    def __init__(self, keep_leaves: bool = True):
+        self.keep_leaves = keep_leaves
+        self.size = 0
+        self._peaks: List[Tuple[int, bytes]] = []  # (height, hash), strictly decreasing heights
+        self._leaves: Optional[List[bytes]] = [] if keep_leaves else None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, digest: bytes) -> int:
+        """Add a leaf and return its index"""
+        if len(digest) != 32:
+            raise ValueError(f"Merkle leaves must be 32-byte digests, got {len(digest)} bytes")
+
+        node = leaf_hash(digest)
+        if self._leaves is not None:
+            self._leaves.append(node)
+
+        height = 0
+        while self._peaks and self._peaks[-1][0] == height:
+            node = node_hash(self._peaks.pop()[1], node)
+            height += 1
+        self._peaks.append((height, node))
+
+        self.size += 1
+        return self.size - 1
+
+    def root(self) -> bytes:
+        """Current root; peaks are folded right to left, matching the RFC 6962 split"""
+        if not self._peaks:
+            return hashlib.sha256(b'').digest()
+        root = self._peaks[-1][1]
+        for _, peak in reversed(self._peaks[:-1]):
+            root = node_hash(peak, root)
+        return root
+
+    def proofs(self) -> List[List[bytes]]:
+        """Inclusion proof (audit path, leaf to root) for every leaf"""
+        if self._leaves is None:
+            raise ValueError("Accumulator was created without keep_leaves; proofs are unavailable")
+        if not self._leaves:
+            return []
+        return _subtree_proofs(self._leaves, 0, len(self._leaves))[1]
+
+
+def _subtree_proofs(leaves: List[bytes], start: int, end: int) -> Tuple[bytes, List[List[bytes]]]:
+    """Root and audit paths for leaves[start:end], split at the largest power of two below the size"""
+    n = end - start
+    if n == 1:
+        return leaves[start], [[]]
+
+    k = 1 << ((n - 1).bit_length() - 1)
+    left_root, left_proofs = _subtree_proofs(leaves, start, start + k)
+    right_root, right_proofs = _subtree_proofs(leaves, start + k, end)
+    for path in left_proofs:
+        path.append(right_root)
+    for path in right_proofs:
+        path.append(left_root)
+    return node_hash(left_root, right_root), left_proofs + right_proofs
+
+
+def verify_inclusion(digest: bytes, index: int, size: int, proof: List[bytes], root: bytes) -> bool:
+    """Check an audit path for leaf ``index`` of a ``size``-leaf tree against ``root``"""
+    if index >= size:
+        return False
+
+    fn, sn = index, size - 1
+    node = leaf_hash(digest)
+    for sibling in proof:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            node = node_hash(sibling, node)
+            while not fn & 1 and fn != 0:
+                fn >>= 1
+                sn >>= 1
+        else:
+            node = node_hash(node, sibling)
+        fn >>= 1
+        sn >>= 1
+
+    return sn == 0 and node == root
@@ -1,16 +1,31 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, Float, Boolean, ForeignKey, BigInteger, LargeBinary
-from sqlalchemy.orm import declarative_base, sessionmaker, relationship, scoped_session
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, Float, Boolean, ForeignKey, BigInteger, LargeBinary, Index, UniqueConstraint
+from sqlalchemy import event as _sqla_event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import declarative_base, sessionmaker, relationship, Session as _SQLASession
+from sqlalchemy.pool import QueuePool, SingletonThreadPool
 from sqlalchemy.dialects.mysql import JSON
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timezone
+import logging
 import os
+import random
+import threading
+import time
+import weakref
 from core.config import Config
 
+logger = logging.getLogger(__name__)
+
 Base = declarative_base()
 
 def utc_now() -> datetime:
     """Return current UTC time as a naive datetime (UTC) without deprecation warnings."""
     return datetime.now(timezone.utc).replace(tzinfo=None)
 
+# job_logs, system_metrics and heartbeats are range-partitioned by day on MySQL
+# (alembic partition_time_series, core.partitioning); there the primary keys also
+# include the time column and job_id is unique together with created_at.
 class JobLog(Base):
     __tablename__ = 'job_logs'
 
@@ -24,6 +39,11 @@ class JobLog(Base):
     updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
     duration_seconds = Column(Float)
 
+    __table_args__ = (
+        # Time-window scans in admin job statistics
+        Index('ix_job_logs_created_at_status', 'created_at', 'status'),
+    )
+
 class SystemMetrics(Base):
     __tablename__ = 'system_metrics'
 
@@ -61,6 +81,7 @@ class Vtxo(Base):
     created_at = Column(DateTime, default=utc_now)
     expires_at = Column(DateTime, nullable=False)
     spending_txid = Column(String(64), nullable=True)
+    settlement_proof = Column(JSON, nullable=True)  # Merkle inclusion proof in the settlement commitment
 
     # RGB-specific fields
     rgb_asset_type = Column(String(20), nullable=True)  # RGB asset type (CFA, NIA)
@@ -71,6 +92,13 @@ class Vtxo(Base):
 
     asset = relationship("Asset", back_populates="vtxos")
 
+    __table_args__ = (
+        # Covers assignment (asset, status, amount range, expiry) and inventory counts
+        Index('ix_vtxos_asset_status_amount_expires', 'asset_id', 'status', 'amount_sats', 'expires_at'),
+        Index('ix_vtxos_user_status', 'user_pubkey', 'status'),
+        Index('ix_vtxos_status_expires', 'status', 'expires_at'),
+    )
+
 class Asset(Base):
     __tablename__ = 'assets'
 
@@ -109,9 +137,51 @@ class AssetBalance(Base):
     asset = relationship("Asset", back_populates="balances")
 
     __table_args__ = (
+        UniqueConstraint('user_pubkey', 'asset_id', name='uq_asset_balances_user_asset'),
         {'extend_existing': True}
     )
 
+class LedgerEntry(Base):
+    __tablename__ = 'ledger_entries'
+
+    id = Column(Integer, primary_key=True)
+    asset_id = Column(String(64), nullable=False)
+    user_pubkey = Column(String(66), nullable=False)
+    balance_delta = Column(BigInteger, default=0)
+    reserved_delta = Column(BigInteger, default=0)
+    entry_type = Column(String(32), nullable=False)  # opening, mint, transfer, reserve, ...
+    reference = Column(String(128), nullable=True)  # txid / session_id the entry belongs to
+    created_at = Column(DateTime, default=utc_now)
+
+    __table_args__ = (
+        # Replay of one balance from its last snapshot
+        Index('ix_ledger_entries_asset_user_id', 'asset_id', 'user_pubkey', 'id'),
+        # Snapshot runs select entries created before a cutoff
+        Index('ix_ledger_entries_created_at', 'created_at'),
+    )
+
+class AssetSupply(Base):
+    __tablename__ = 'asset_supply'
+
+    asset_id = Column(String(64), primary_key=True)
+    circulating = Column(BigInteger, default=0)  # SUM(asset_balances.balance), maintained by the ledger
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
+
+class LedgerSnapshot(Base):
+    __tablename__ = 'ledger_snapshots'
+
+    id = Column(Integer, primary_key=True)
+    asset_id = Column(String(64), nullable=False)
+    user_pubkey = Column(String(66), nullable=False)
+    balance = Column(BigInteger, default=0)
+    reserved_balance = Column(BigInteger, default=0)
+    last_entry_id = Column(Integer, nullable=False)  # journal entries up to and including this id
+    created_at = Column(DateTime, default=utc_now)
+
+    __table_args__ = (
+        Index('ix_ledger_snapshots_asset_user_entry', 'asset_id', 'user_pubkey', 'last_entry_id'),
+    )
+
 class SigningSession(Base):
     __tablename__ = 'signing_sessions'
 
@@ -131,6 +201,11 @@ class SigningSession(Base):
     # Track associated challenge by ID (no FK to avoid circular dependency issues)
     challenge_id = Column(String(64), nullable=True)
 
+    __table_args__ = (
+        Index('ix_signing_sessions_user_status', 'user_pubkey', 'status'),
+        Index('ix_signing_sessions_status_expires', 'status', 'expires_at'),
+    )
+
     # Compatibility: accept alias kwargs often used in tests
     def __init__(self, **kwargs):
         # Map compatibility aliases to actual column names
@@ -193,6 +268,10 @@ class Transaction(Base):
 
     session = relationship("SigningSession")
 
+    __table_args__ = (
+        Index('ix_transactions_session_id', 'session_id'),
+    )
+
 class LightningInvoice(Base):
     __tablename__ = 'lightning_invoices'
 
@@ -211,6 +290,10 @@ class LightningInvoice(Base):
 
     asset = relationship("Asset")
 
+    __table_args__ = (
+        Index('ix_lightning_invoices_status_expires', 'status', 'expires_at'),
+    )
+
 class RGBContract(Base):
     __tablename__ = 'rgb_contracts'
 
@@ -226,8 +309,8 @@ class RGBContract(Base):
     created_at = Column(DateTime, default=utc_now)
     updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
 
-    # RGB contract metadata
-    metadata = Column(JSON, nullable=True)
+    # RGB contract metadata ('metadata' is reserved on declarative classes)
+    contract_metadata = Column('metadata', JSON, nullable=True)
     creator_pubkey = Column(String(66), nullable=True)
     total_issued = Column(BigInteger, default=0)
 
@@ -257,37 +340,339 @@ class RGBAllocation(Base):
     contract = relationship("RGBContract")
     vtxo = relationship("Vtxo")
 
-# Database setup (lazy initialization so tests can patch create_engine)
+# Append-only cold copies of terminal sessions, challenges and transactions (core.archiver)
+class ArchivedRecord(Base):
+    __tablename__ = 'archived_records'
+
+    id = Column(Integer, primary_key=True)
+    record_type = Column(String(20), nullable=False)  # signing_session, signing_challenge, transaction
+    record_key = Column(String(64), nullable=False)  # session_id, challenge_id or txid
+    session_id = Column(String(64), nullable=True)
+    user_pubkey = Column(String(66), nullable=True)
+    status = Column(String(20), nullable=True)
+    created_at = Column(DateTime, nullable=True)  # of the original row
+    archived_at = Column(DateTime, default=utc_now)
+    payload = Column(LargeBinary(length=16777215), nullable=False)  # zlib-compressed JSON of the original columns (MEDIUMBLOB on MySQL)
+
+    __table_args__ = (
+        UniqueConstraint('record_type', 'record_key', name='uq_archived_records_type_key'),
+        Index('ix_archived_records_session_id', 'session_id'),
+    )
+
+# Database setup: one engine per process, created lazily so tests can patch create_engine
 _config = Config()
 engine = None  # type: ignore[assignment]
 SessionLocal = None  # type: ignore[assignment]
+_engine_pid = None
+_engine_lock = threading.Lock()
+replica_engines = []  # read replicas from DATABASE_REPLICA_URLS, owned by the same process as ``engine``
 
-def _init_engine(force: bool = False) -> None:
-    """Initialize the SQLAlchemy engine and session factory.
+class _TimedQueuePool(QueuePool):
+    """QueuePool that reports how long checkouts wait for a free connection"""
 
-    When force=True, always (re)create the engine/session. This is helpful for tests
-    that patch create_engine and expect failures to propagate from get_session().
-    """
-    global engine, SessionLocal
-    if not force and engine is not None and SessionLocal is not None:
-        return
-    url = _config.DATABASE_URL
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metrics = _pool_metrics()
+            if metrics is not None:
+                metrics.db_pool_timeouts.inc()
+            raise
+        finally:
+            metrics = _pool_metrics()
+            if metrics is not None:
+                metrics.db_pool_wait.observe(time.perf_counter() - started)
+
+# Prometheus metrics, resolved on first use (core.monitoring imports this module)
+_metrics = None
+
+def _pool_metrics():
+    global _metrics
+    if _metrics is None:
+        try:
+            from core.monitoring import get_prometheus_metrics
+            _metrics = get_prometheus_metrics()
+        except Exception:
+            return None
+    return _metrics
+
+def _instrument_pool(new_engine) -> None:
+    """Count checkouts and track checked-out and overflow connections of an engine's pool"""
+    pool = new_engine.pool
+
+    def _observe(metrics):
+        metrics.db_pool_checked_out.set(pool.checkedout())
+        if isinstance(pool, QueuePool):
+            metrics.db_pool_overflow.set(max(pool.overflow(), 0))
+
+    @_sqla_event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics = _pool_metrics()
+        if metrics is not None:
+            metrics.db_pool_checkouts.inc()
+            _observe(metrics)
+
+    @_sqla_event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        metrics = _pool_metrics()
+        if metrics is not None:
+            _observe(metrics)
+
+def _create_engine(url=None):
+    url = url or _config.DATABASE_URL
     # For SQLite (esp. in-memory), avoid pooling args which are invalid for SingletonThreadPool
     if str(url).startswith("sqlite"):
-        engine = create_engine(
+        new_engine = create_engine(
             url,
             connect_args={"check_same_thread": False},
         )
     else:
-        engine = create_engine(
+        new_engine = create_engine(
             url,
+            poolclass=_TimedQueuePool,
             pool_size=_config.DB_POOL_SIZE,
             max_overflow=_config.DB_POOL_MAX_OVERFLOW,
             pool_timeout=_config.DB_POOL_TIMEOUT,
             pool_recycle=1800,
             pool_pre_ping=True,
         )
-    SessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    _instrument_pool(new_engine)
+    metrics = _pool_metrics()
+    if metrics is not None:
+        metrics.db_engines_created.inc()
+    return new_engine
+
+# Read-replica routing: sessions inside replica_reads() send plain SELECTs to a replica
+_replica_reads = ContextVar('db_replica_reads', default=False)
+_WROTE_KEY = 'routing_wrote'
+_REPLICA_KEY = 'routing_replica'
+
+class RoutingSession(_SQLASession):
+    """Session that reads from a replica inside replica_reads() and otherwise uses the primary.
+
+    Flushes, DML statements, SELECT ... FOR UPDATE and textual SQL always go to the
+    primary. Once a session has written, its later reads stay on the primary so it
+    sees its own changes. Each session keeps to one replica.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if replica_engines and _replica_reads.get() and not self.info.get(_WROTE_KEY):
+            if self._flushing or _is_write(clause):
+                self.info[_WROTE_KEY] = True
+            else:
+                replica = self.info.get(_REPLICA_KEY)
+                if replica is None:
+                    replica = self.info[_REPLICA_KEY] = random.choice(replica_engines)
+                return replica
+        return super().get_bind(mapper, clause=clause, **kw)
+
+def _is_write(clause) -> bool:
+    if clause is None:
+        return False
+    if getattr(clause, 'is_dml', False) or getattr(clause, '_for_update_arg', None) is not None:
+        return True
+    # Raw SQL could be anything
+    return getattr(clause, '__visit_name__', None) == 'textclause'
+
+@contextmanager
+def replica_reads(enabled: bool = True):
+    """Let sessions used in this block read from a replica (no-op without DATABASE_REPLICA_URLS)"""
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+def _install_engine(new_engine) -> None:
+    global engine, SessionLocal, _engine_pid
+    engine = new_engine
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=new_engine,
+                                class_=RoutingSession) if new_engine is not None else None
+    _engine_pid = os.getpid() if new_engine is not None else None
+
+def _install_replicas(owned: bool) -> None:
+    """Replace the replica engines with fresh ones built from DATABASE_REPLICA_URLS"""
+    for replica in replica_engines:
+        replica.dispose(close=owned)
+    replica_engines[:] = [_create_engine(url) for url in _config.DATABASE_REPLICA_URLS]
+
+def _init_engine(force: bool = False) -> None:
+    """Create the process's engine and session factory unless they already exist.
+
+    A forked child (gunicorn with --preload, RQ work horses) gets its own engine;
+    the parent's pooled connections are released without being closed, since the
+    parent still uses them. force=True disposes the current engine and builds a
+    new one.
+    """
+    if not force and engine is not None and _engine_pid == os.getpid():
+        return
+    with _engine_lock:
+        if not force and engine is not None and _engine_pid == os.getpid():
+            return
+        owned = _engine_pid == os.getpid()
+        if engine is not None:
+            engine.dispose(close=owned)
+        _install_engine(None)
+        _install_engine(_create_engine())
+        _install_replicas(owned)
+
+def set_engine(new_engine=None):
+    """Replace the process engine (test hook) and return the previous one.
+
+    The previous engine is not disposed; the caller owns both engines. Passing
+    None drops the engine, so the next get_session() builds one from DATABASE_URL.
+    """
+    with _engine_lock:
+        previous = engine if _engine_pid == os.getpid() else None
+        _install_engine(new_engine)
+    return previous
+
+@contextmanager
+def use_engine(new_engine):
+    """Route get_session() through ``new_engine`` for the duration of the block"""
+    previous = set_engine(new_engine)
+    try:
+        yield new_engine
+    finally:
+        set_engine(previous)
+
+def set_replica_engines(engines=()):
+    """Replace the replica engines (test hook) and return the previous ones; the caller owns both"""
+    with _engine_lock:
+        previous = list(replica_engines)
+        replica_engines[:] = list(engines)
+    return previous
+
+def get_pool_stats() -> dict:
+    """Connection pool status of the process engine"""
+    if engine is None or _engine_pid != os.getpid():
+        return {'engine': None}
+    pool = engine.pool
+    stats = {'engine': engine.url.render_as_string(hide_password=True), 'pool': type(pool).__name__,
+             'checked_out': pool.checkedout()}
+    if isinstance(pool, QueuePool):
+        stats.update({'size': pool.size(), 'overflow': max(pool.overflow(), 0)})
+    stats['replicas'] = [{'engine': replica.url.render_as_string(hide_password=True),
+                          'checked_out': replica.pool.checkedout()} for replica in replica_engines]
+    return stats
+
+# Schema bootstrap: runs once per engine instead of on every flush
+_SCHEMA_BOOTSTRAP_MODES = ('check', 'create', 'off')
+_schema_state = weakref.WeakKeyDictionary()  # engine -> {scope: result}
+_schema_lock = threading.Lock()
+_alembic_head_cache = None
+
+def _schema_scope(bind):
+    """Cache scope within an engine: per thread for in-memory SQLite, whose pool gives each thread its own database"""
+    return threading.get_ident() if isinstance(bind.pool, SingletonThreadPool) else None
+
+def _resolve_bootstrap_mode(bind, mode=None) -> str:
+    mode = (mode or _config.DB_SCHEMA_BOOTSTRAP).lower()
+    if mode == 'auto':
+        mode = 'create' if bind.dialect.name == 'sqlite' else 'check'
+    if mode not in _SCHEMA_BOOTSTRAP_MODES:
+        raise ValueError(f"Unknown DB_SCHEMA_BOOTSTRAP mode: {mode}")
+    return mode
+
+def get_alembic_heads() -> set:
+    """Head revisions of the migration scripts shipped with the gateway"""
+    global _alembic_head_cache
+    if _alembic_head_cache is None:
+        from alembic.config import Config as AlembicConfig
+        from alembic.script import ScriptDirectory
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        alembic_cfg = AlembicConfig(os.path.join(root, 'alembic.ini'))
+        alembic_cfg.set_main_option('script_location', os.path.join(root, 'alembic'))
+        _alembic_head_cache = frozenset(ScriptDirectory.from_config(alembic_cfg).get_heads())
+    return set(_alembic_head_cache)
+
+def _check_alembic_head(bind) -> dict:
+    from alembic.runtime.migration import MigrationContext
+    expected = get_alembic_heads()
+    with bind.connect() as connection:
+        current = set(MigrationContext.configure(connection).get_current_heads())
+    if not current:
+        status = 'missing'
+    elif current == expected:
+        status = 'current'
+    else:
+        status = 'behind'
+    if status != 'current':
+        logger.warning(f"Database schema is not at the Alembic head ({status}): "
+                       f"database={sorted(current)} expected={sorted(expected)}; run `alembic upgrade head`")
+    return {'status': status, 'database': sorted(current), 'expected': sorted(expected)}
+
+def bootstrap_schema(bind=None, mode: str = None) -> dict:
+    """Verify or create the schema once per engine and cache the result.
+
+    Modes (DB_SCHEMA_BOOTSTRAP):
+      - check: compare the database's Alembic revision with the script head and log if it differs
+      - create: Base.metadata.create_all, for SQLite development databases and tests
+      - off: do nothing
+      - auto (default): create on SQLite, check elsewhere
+
+    Later calls for the same engine return the cached result without touching the database.
+    Failures are logged and cached too; they never block the caller.
+    """
+    if bind is None:
+        _init_engine()
+        bind = engine
+    bind = getattr(bind, 'engine', bind)
+    scope = _schema_scope(bind)
+    cached = _schema_state.get(bind)
+    if cached is not None and scope in cached:
+        return cached[scope]
+    with _schema_lock:
+        cached = _schema_state.setdefault(bind, {})
+        if scope in cached:
+            return cached[scope]
+        mode = _resolve_bootstrap_mode(bind, mode)
+        result = {'mode': mode}
+        try:
+            if mode == 'check':
+                result.update(_check_alembic_head(bind))
+            elif mode == 'create':
+                Base.metadata.create_all(bind=bind)
+                result['status'] = 'created'
+            else:
+                result['status'] = 'skipped'
+        except Exception as e:
+            logger.error(f"Schema bootstrap ({mode}) failed: {e}")
+            result.update({'status': 'error', 'error': str(e)})
+        cached[scope] = result
+        return result
+
+def reset_schema_bootstrap(bind=None) -> None:
+    """Forget cached bootstrap results for one engine, or for all engines"""
+    with _schema_lock:
+        if bind is None:
+            _schema_state.clear()
+        else:
+            _schema_state.pop(getattr(bind, 'engine', bind), None)
+
+@_sqla_event.listens_for(Base.metadata, "after_drop")
+def _forget_dropped_schema(target, connection, **kw):
+    reset_schema_bootstrap(connection.engine)
+
+def _bootstrap_before_flush(session, flush_context, instances):
+    bind = session.get_bind()
+    if bind is not None:
+        bootstrap_schema(bind, mode='create')
+
+def install_flush_bootstrap() -> None:
+    """Create tables on the first flush against each engine (test convenience).
+
+    Covers tests that build their own engine and Session without create_all.
+    Only the first flush per engine pays for it; production code relies on
+    bootstrap_schema() on the first get_session() instead.
+    """
+    if not _sqla_event.contains(_SQLASession, "before_flush", _bootstrap_before_flush):
+        _sqla_event.listen(_SQLASession, "before_flush", _bootstrap_before_flush)
+
+def remove_flush_bootstrap() -> None:
+    if _sqla_event.contains(_SQLASession, "before_flush", _bootstrap_before_flush):
+        _sqla_event.remove(_SQLASession, "before_flush", _bootstrap_before_flush)
 
 def get_database_url():
     return _config.DATABASE_URL
@@ -298,8 +683,8 @@ def create_tables():
     return engine
 
 def get_session():
-    # Force re-init so that tests patching create_engine see the call on each invocation
-    _init_engine(force=True)
+    _init_engine()
+    bootstrap_schema(engine)
     return SessionLocal()  # type: ignore[operator]
 
 # Expose a safe builtin alias for tests that call `get_session()` directly without import.
@@ -318,20 +703,5 @@ except Exception:
     # If builtins cannot be set, tests will still use proper imports
     pass
 
-# Ensure tables exist when third-party tests create their own Session/Engine
-try:
-    from sqlalchemy.orm import Session as _SQLASession
-    from sqlalchemy import event as _sqla_event
-
-    @_sqla_event.listens_for(_SQLASession, "before_flush")
-    def _ensure_tables_before_flush(session, flush_context, instances):
-        try:
-            bind = session.get_bind()
-            if bind is not None:
-                # No-op if already created
-                Base.metadata.create_all(bind=bind)
-        except Exception:
-            # Never block user flush/commit due to metadata creation attempt
-            pass
-except Exception:
-    pass
\ No newline at end of file
+# Read-your-writes marks must be recorded by every process that commits, not only the API
+import core.replica_routing  # noqa: E402,F401
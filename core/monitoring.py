@@ -167,6 +167,67 @@ class PrometheusMetrics:
             ['job_type']
         )
 
+        # Expiry sweeps
+        self.expiry_sweep_rows = Counter(
+            'arkrelay_expiry_sweep_rows_total',
+            'Total number of rows expired or deleted by expiry sweeps',
+            ['target']
+        )
+
+        self.expiry_sweep_duration = Histogram(
+            'arkrelay_expiry_sweep_duration_seconds',
+            'Expiry sweep duration',
+            ['target']
+        )
+
+        self.expiry_sweep_rows_per_second = Gauge(
+            'arkrelay_expiry_sweep_rows_per_second',
+            'Rows per second achieved by the last expiry sweep',
+            ['target']
+        )
+
+        # Database connection pool
+        self.db_engines_created = Counter(
+            'arkrelay_db_engines_created_total',
+            'Database engines (connection pools) created by this process'
+        )
+
+        self.db_pool_checkouts = Counter(
+            'arkrelay_db_pool_checkouts_total',
+            'Connections checked out of the database pool'
+        )
+
+        self.db_pool_checked_out = Gauge(
+            'arkrelay_db_pool_checked_out',
+            'Connections currently checked out of the database pool'
+        )
+
+        self.db_pool_overflow = Gauge(
+            'arkrelay_db_pool_overflow',
+            'Connections currently open beyond DB_POOL_SIZE'
+        )
+
+        self.db_pool_wait = Histogram(
+            'arkrelay_db_pool_wait_seconds',
+            'Time spent waiting for a pooled database connection',
+            buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+        )
+
+        self.db_pool_timeouts = Counter(
+            'arkrelay_db_pool_timeouts_total',
+            'Checkouts that gave up after DB_POOL_TIMEOUT'
+        )
+
+# Metrics register with the default Prometheus registry, so there is one instance per process
+_prometheus_metrics = None
+
+def get_prometheus_metrics() -> PrometheusMetrics:
+    """Get the global Prometheus metrics instance"""
+    global _prometheus_metrics
+    if _prometheus_metrics is None:
+        _prometheus_metrics = PrometheusMetrics()
+    return _prometheus_metrics
+
 @dataclass
 class AlertRule:
     """Alert rule configuration"""
@@ -489,7 +550,7 @@ class HealthChecker:
     def __init__(self, redis_client: Redis):
         self.redis = redis_client
         self.logger = logging.getLogger('arkrelay.health')
-        self.prometheus_metrics = PrometheusMetrics()
+        self.prometheus_metrics = get_prometheus_metrics()
 
         # Start Prometheus metrics server
         if Config.ENABLE_METRICS:
@@ -687,7 +748,7 @@ class MonitoringSystem:
         self.redis = Redis.from_url(Config.REDIS_URL)
         self.alerting_system = AlertingSystem(self.redis)
         self.health_checker = HealthChecker(self.redis)
-        self.prometheus_metrics = PrometheusMetrics()
+        self.prometheus_metrics = get_prometheus_metrics()
 
         # System monitoring thread
         self.monitoring_thread = None
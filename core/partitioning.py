@@ -0,0 +1,206 @@
+"""
+Day partitions and partition-drop retention for time-series tables
+
+system_metrics, heartbeats and job_logs receive a steady stream of inserts
+and used to be trimmed with large DELETE statements that held locks on the
+shared database. On MySQL/MariaDB the ``partition_time_series`` migration
+range-partitions them by day (``PARTITION BY RANGE (TO_DAYS(column))``):
+
+- ``p_history``: rows older than the day the migration ran
+- ``pYYYYMMDD``: one partition per day
+- ``pmax``: catch-all above the last day partition
+
+The maintenance job keeps day partitions created ``PARTITION_DAYS_AHEAD``
+days in advance (splitting the empty ``pmax``) and drops partitions that lie
+entirely before the retention cutoff; a drop is a metadata operation,
+however many rows the day held.
+
+Other databases (SQLite in development and tests) and tables that have not
+been migrated keep row deletes, run in bounded batches by the expiry sweeper.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from core.config import Config
+from core.models import Heartbeat, JobLog, SystemMetrics, utc_now
+
+logger = logging.getLogger(__name__)
+
+# MySQL's TO_DAYS counts from year 0, Python ordinals from year 1
+_TO_DAYS_OFFSET = 365
+
+
+@dataclass(frozen=True)
+class TimeSeriesTable:
+    """A table partitioned by day on ``column``"""
+    name: str
+    model: Any
+    column: str
+    # Extra row filter for the delete fallback; partition drops remove whole days
+    fallback_criteria: Callable[[Any], List[Any]] = lambda model: []
+
+
+TIME_SERIES_TABLES = (
+    TimeSeriesTable('system_metrics', SystemMetrics, 'timestamp'),
+    TimeSeriesTable('heartbeats', Heartbeat, 'timestamp'),
+    TimeSeriesTable('job_logs', JobLog, 'created_at',
+                    lambda model: [model.status.in_(['completed', 'failed'])]),
+)
+
+
+@dataclass
+class RetentionResult:
+    """Outcome of trimming one table"""
+    table: str
+    method: str  # 'partition_drop' or 'delete'
+    rows: int = 0  # estimated from table statistics for partition drops
+    partitions: List[str] = field(default_factory=list)
+    complete: bool = True
+
+
+def partition_name(day: date) -> str:
+    return f"p{day:%Y%m%d}"
+
+
+def partition_clause(day: date) -> str:
+    """Partition definition holding the rows of ``day``"""
+    return f"PARTITION {partition_name(day)} VALUES LESS THAN (TO_DAYS('{day + timedelta(days=1):%Y-%m-%d}'))"
+
+
+class PartitionManager:
+    """Creates day partitions ahead of time and enforces retention"""
+
+    def __init__(self, retention_days: int = 30, days_ahead: int = 7, sweeper=None):
+        self.retention_days = retention_days
+        self.days_ahead = days_ahead
+        self._sweeper = sweeper
+
+    @property
+    def sweeper(self):
+        if self._sweeper is None:
+            from core.expiry_sweeper import get_expiry_sweeper
+            self._sweeper = get_expiry_sweeper()
+        return self._sweeper
+
+    # Introspection
+
+    @staticmethod
+    def supports_partitions(session) -> bool:
+        return session.get_bind().dialect.name in ('mysql', 'mariadb')
+
+    def partitions(self, session, table: str) -> List[Tuple[str, Optional[date], int]]:
+        """(name, exclusive upper day or None for MAXVALUE, estimated rows) in partition order; empty if unpartitioned"""
+        if not self.supports_partitions(session):
+            return []
+        rows = session.execute(text(
+            "SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+            "ORDER BY PARTITION_ORDINAL_POSITION"
+        ), {'table': table}).all()
+        result = []
+        for name, description, table_rows in rows:
+            upper = None
+            if description and str(description).upper() != 'MAXVALUE':
+                upper = date.fromordinal(int(description) - _TO_DAYS_OFFSET)
+            result.append((name, upper, int(table_rows or 0)))
+        return result
+
+    # Maintenance
+
+    def add_partitions(self, session, table: str, through: date) -> List[str]:
+        """Split ``pmax`` so every day up to ``through`` has its own partition"""
+        parts = self.partitions(session, table)
+        bounded = [upper for _, upper, _ in parts if upper is not None]
+        if not bounded or parts[-1][1] is not None:
+            return []
+        days = []
+        day = max(bounded)
+        while day <= through:
+            days.append(day)
+            day += timedelta(days=1)
+        if not days:
+            return []
+        session.execute(text(
+            f"ALTER TABLE {table} REORGANIZE PARTITION {parts[-1][0]} INTO ("
+            + ", ".join(partition_clause(day) for day in days)
+            + f", PARTITION {parts[-1][0]} VALUES LESS THAN MAXVALUE)"
+        ))
+        created = [partition_name(day) for day in days]
+        logger.info(f"🗂️  Added {len(created)} day partitions to {table} through {through}")
+        return created
+
+    def expired_partitions(self, session, table: str, cutoff: datetime) -> List[Tuple[str, int]]:
+        """Partitions whose every row is older than ``cutoff``"""
+        return [(name, rows) for name, upper, rows in self.partitions(session, table)
+                if upper is not None and upper <= cutoff.date()]
+
+    def purge(self, session, table: TimeSeriesTable, cutoff: datetime,
+              dry_run: bool = False) -> RetentionResult:
+        """Remove rows older than ``cutoff``: drop whole partitions when partitioned, otherwise delete rows"""
+        if self.partitions(session, table.name):
+            expired = self.expired_partitions(session, table.name, cutoff)
+            result = RetentionResult(table.name, 'partition_drop', rows=sum(rows for _, rows in expired),
+                                     partitions=[name for name, _ in expired])
+            if expired and not dry_run:
+                session.execute(text(f"ALTER TABLE {table.name} DROP PARTITION {', '.join(result.partitions)}"))
+                logger.info(f"🗑️  Dropped {len(expired)} partitions of {table.name} older than {cutoff:%Y-%m-%d}")
+            return result
+
+        column = getattr(table.model, table.column)
+        criteria = [column < cutoff, *table.fallback_criteria(table.model)]
+        if dry_run:
+            return RetentionResult(table.name, 'delete', rows=session.query(table.model).filter(*criteria).count())
+        sweep = self.sweeper.sweep(session, table.name, table.model, criteria)
+        return RetentionResult(table.name, 'delete', rows=sweep.rows, complete=sweep.complete)
+
+    def apply_retention(self, session, days: int, dry_run: bool = False,
+                        partitioned_only: bool = False) -> Dict[str, RetentionResult]:
+        """Trim every time-series table to ``days`` of history"""
+        cutoff = utc_now() - timedelta(days=days)
+        results = {}
+        for table in TIME_SERIES_TABLES:
+            if partitioned_only and not self.partitions(session, table.name):
+                continue
+            results[table.name] = self.purge(session, table, cutoff, dry_run=dry_run)
+        session.commit()
+        return results
+
+    def maintain(self, session, today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Partition-maintenance job body
+
+        Creates the next ``days_ahead`` day partitions and drops the ones past
+        ``retention_days``. Unpartitioned tables are left alone; their rows are
+        still removed by the admin cleanup endpoint.
+        """
+        today = today or utc_now().date()
+        through = today + timedelta(days=self.days_ahead)
+        added = {}
+        for table in TIME_SERIES_TABLES:
+            created = self.add_partitions(session, table.name, through)
+            if created:
+                added[table.name] = created
+        dropped = self.apply_retention(session, self.retention_days, partitioned_only=True)
+        return {
+            'added': added,
+            'dropped': {name: result.partitions for name, result in dropped.items() if result.partitions},
+            'partitioned_tables': sorted(dropped),
+        }
+
+
+# Global partition manager instance
+_partition_manager = None
+
+def get_partition_manager() -> PartitionManager:
+    """Get the global partition manager instance"""
+    global _partition_manager
+    if _partition_manager is None:
+        config = Config()
+        _partition_manager = PartitionManager(retention_days=config.METRICS_RETENTION_DAYS,
+                                              days_ahead=config.PARTITION_DAYS_AHEAD)
+    return _partition_manager
@@ -0,0 +1,187 @@
+"""
+Read-replica routing with read-your-writes stickiness
+
+When DATABASE_REPLICA_URLS is set, sessions opened inside ``replica_reads()``
+(core.models) send plain SELECTs to a replica. Endpoints and manager methods
+opt in with the ``replica_read`` decorator, naming the user the read is about:
+
+    @replica_read('user_pubkey')
+    def get_user_balances(user_pubkey): ...
+
+A replica lags the primary, so a user whose rows were just written would not
+see the change there. Every commit records the ``user_pubkey`` of the rows it
+flushed (plus keys staged by bulk statements through ``stage_sticky_writes``)
+and those users' reads stay on the primary for DB_REPLICA_STICKY_SECONDS.
+The marks live in Redis so they hold across gunicorn workers; while Redis is
+unreachable they fall back to the current process.
+"""
+
+import functools
+import inspect
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+from redis import Redis
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from core import models
+from core.config import Config
+
+logger = logging.getLogger(__name__)
+
+# session.info key holding user pubkeys written in the current transaction
+_PENDING_KEY = 'replica_sticky_writes'
+
+
+class StickyWrites:
+    """Users whose recent writes may not have reached the replicas yet"""
+
+    def __init__(self, redis_client: Optional[Redis], window_seconds: float = 5, retry_after: int = 30):
+        self.redis = redis_client
+        self.window_seconds = window_seconds
+        self.retry_after = retry_after  # seconds to use the local marks after a Redis error
+        self._lock = threading.Lock()
+        self._local: Dict[str, float] = {}
+        self._unavailable_until = 0.0
+        self.stats = {
+            'marked': 0,
+            'sticky_reads': 0,
+            'errors': 0
+        }
+
+    @staticmethod
+    def _key(key: str) -> str:
+        return f"db_sticky:{key}"
+
+    def mark(self, keys: Iterable[str]):
+        """Keep reads for ``keys`` on the primary for the sticky window"""
+        keys = set(keys)
+        if not keys:
+            return
+        expires = time.monotonic() + self.window_seconds
+        with self._lock:
+            for key in keys:
+                self._local[key] = expires
+        self.stats['marked'] += len(keys)
+        if not self._available():
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key in keys:
+                pipe.set(self._key(key), 1, px=int(self.window_seconds * 1000))
+            pipe.execute()
+        except Exception as e:
+            self._failed('mark', e)
+
+    def is_sticky(self, key: str) -> bool:
+        sticky = self._local_sticky(key)
+        if not sticky and self._available():
+            try:
+                sticky = bool(self.redis.exists(self._key(key)))
+            except Exception as e:
+                self._failed('lookup', e)
+        if sticky:
+            self.stats['sticky_reads'] += 1
+        return sticky
+
+    def _local_sticky(self, key: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            expires = self._local.get(key)
+            if expires is not None and expires <= now:
+                del self._local[key]
+                expires = None
+            if len(self._local) > 10000:
+                self._local = {k: v for k, v in self._local.items() if v > now}
+        return expires is not None
+
+    def _available(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._unavailable_until
+
+    def _failed(self, operation: str, error: Exception):
+        self.stats['errors'] += 1
+        self._unavailable_until = time.monotonic() + self.retry_after
+        logger.warning(f"⚠️  Replica stickiness {operation} failed, using process-local marks for {self.retry_after}s: {error}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'window_seconds': self.window_seconds, 'local_marks': len(self._local)}
+
+
+def stage_sticky_writes(session, user_pubkeys: Iterable[str]):
+    """Queue users changed by bulk statements; marked sticky when ``session`` commits"""
+    if models.replica_engines:
+        session.info.setdefault(_PENDING_KEY, set()).update(k for k in user_pubkeys if k)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_written_users(session, flush_context):
+    if models.replica_engines:
+        stage_sticky_writes(session, [getattr(obj, 'user_pubkey', None)
+                                      for obj in (*session.new, *session.dirty, *session.deleted)])
+
+
+@event.listens_for(Session, 'after_commit')
+def _mark_committed_users(session):
+    keys = session.info.pop(_PENDING_KEY, None)
+    if keys:
+        get_sticky_writes().mark(keys)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_written_users(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def replica_read(sticky_key: Union[str, Callable[..., Optional[str]], None] = None):
+    """
+    Let the decorated function read from a replica
+
+    Args:
+        sticky_key: Name of the argument holding the user pubkey the read is
+            about, or a callable taking the function's arguments and returning
+            it. Reads for a user with a recent write stay on the primary.
+            None for reads that are not about one user (stats, asset lists).
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not models.replica_engines:
+                return func(*args, **kwargs)
+            key = _resolve_key(sticky_key, signature, args, kwargs)
+            use_replica = not (key and get_sticky_writes().is_sticky(key))
+            with models.replica_reads(use_replica):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _resolve_key(sticky_key, signature, args, kwargs) -> Optional[str]:
+    if sticky_key is None:
+        return None
+    if callable(sticky_key):
+        return sticky_key(*args, **kwargs)
+    try:
+        return signature.bind_partial(*args, **kwargs).arguments.get(sticky_key)
+    except TypeError:
+        return kwargs.get(sticky_key)
+
+
+# Global stickiness tracker
+_sticky_writes = None
+
+def get_sticky_writes() -> StickyWrites:
+    global _sticky_writes
+    if _sticky_writes is None:
+        config = Config()
+        try:
+            redis_client = Redis.from_url(config.REDIS_URL)
+        except Exception as e:
+            logger.warning(f"⚠️  Replica stickiness is process-local, Redis unavailable: {e}")
+            redis_client = None
+        _sticky_writes = StickyWrites(redis_client, window_seconds=config.DB_REPLICA_STICKY_SECONDS)
+    return _sticky_writes
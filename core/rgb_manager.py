@@ -112,7 +112,7 @@ class RGBManager:
                 specification_id=contract_data['specification_id'],
                 genesis_proof=contract_data['genesis_proof'],
                 schema_type=schema_type.value,
-                metadata=contract_data.get('metadata', {}),
+                contract_metadata=contract_data.get('metadata', {}),
                 creator_pubkey=contract_data.get('creator_pubkey')
             )
 
@@ -183,7 +183,7 @@ class RGBManager:
                 'specification_id': contract.specification_id,
                 'schema_type': contract.schema_type,
                 'genesis_proof': contract.genesis_proof,
-                'metadata': contract.metadata,
+                'metadata': contract.contract_metadata,
                 'creator_pubkey': contract.creator_pubkey,
                 'total_issued': contract.total_issued,
                 'current_state_root': contract.current_state_root,
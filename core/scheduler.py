@@ -10,6 +10,10 @@ from core.tasks import (
     cleanup_old_logs,
     cleanup_expired_sessions,
     cleanup_vtxos,
+    snapshot_ledger,
+    maintain_partitions,
+    archive_terminal_records,
+    resume_stalled_ceremonies,
 )
 
 logging.basicConfig(level=logging.INFO)
@@ -33,6 +37,10 @@ def setup_scheduler():
     scheduler.cancel('cleanup')
     scheduler.cancel('session-cleanup')
     scheduler.cancel('vtxo-cleanup')
+    scheduler.cancel('ledger-snapshot')
+    scheduler.cancel('partition-maintenance')
+    scheduler.cancel('cold-archive')
+    scheduler.cancel('ceremony-resume')
 
     logger.info("🗓️  Setting up scheduled jobs...")
 
@@ -91,6 +99,50 @@ def setup_scheduler():
     )
     logger.info("✅ Scheduled VTXO cleanup every 30 minutes")
 
+    # Schedule ledger snapshot every hour
+    scheduler.schedule(
+        utc_now(),
+        func=snapshot_ledger,
+        interval=3600,  # 1 hour
+        timeout=300,
+        id='ledger-snapshot',
+        result_ttl=600  # Store results for 10 minutes
+    )
+    logger.info("✅ Scheduled ledger snapshot every hour")
+
+    # Schedule partition maintenance every hour (idempotent; keeps day partitions ahead and drops expired ones)
+    scheduler.schedule(
+        utc_now(),
+        func=maintain_partitions,
+        interval=3600,  # 1 hour
+        timeout=300,
+        id='partition-maintenance',
+        result_ttl=600  # Store results for 10 minutes
+    )
+    logger.info("✅ Scheduled partition maintenance every hour")
+
+    # Schedule cold archiving every hour (bounded batches; a backlog drains over several runs)
+    scheduler.schedule(
+        utc_now(),
+        func=archive_terminal_records,
+        interval=3600,  # 1 hour
+        timeout=300,
+        id='cold-archive',
+        result_ttl=600  # Store results for 10 minutes
+    )
+    logger.info("✅ Scheduled cold archiving every hour")
+
+    # Schedule stalled ceremony recovery every minute
+    scheduler.schedule(
+        utc_now(),
+        func=resume_stalled_ceremonies,
+        interval=60,  # 1 minute
+        timeout=60,
+        id='ceremony-resume',
+        result_ttl=300  # Store results for 5 minutes
+    )
+    logger.info("✅ Scheduled stalled ceremony recovery every minute")
+
     # List all scheduled jobs
     jobs = list(scheduler.get_jobs())
     logger.info(f"📋 Total scheduled jobs: {len(jobs)}")
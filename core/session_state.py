@@ -0,0 +1,440 @@
+"""
+Redis-resident state for active signing sessions
+
+While a signing session is active (not completed, failed or expired) its
+row lives in a Redis hash, ``signing_session:<session_id>``, holding the
+status, the ceremony state, the rest of ``result_data`` and the expiry along
+with the fields needed to rebuild a SigningSession. Session polls and
+ceremony steps read and write the hash; the database is updated
+write-behind:
+
+- every hash write adds the session to the ``signing_session:dirty`` set
+- a flusher thread (any gateway process) pops dirty sessions and writes
+  their state to ``signing_sessions`` with one executemany UPDATE, guarded
+  so it never overwrites a terminal status
+- terminal transitions first persist pending state, then write the database
+  synchronously and drop the hash
+
+ORM writes to SigningSession rows made elsewhere (Nostr handlers, workers)
+persist the pending hot state in the same transaction before their own
+UPDATE and drop the hash when they commit, so the next read reloads the row.
+Dropping a hash also bumps the session's epoch; a hash is stamped with the
+epoch read before its row was loaded and only used while that epoch is
+current, so a row read before a concurrent write commits is never served
+afterwards. The hash expires shortly after the session itself.
+
+If Redis is unavailable, reads and writes fall back to the database for
+``retry_after`` seconds; hashes of sessions written to the database
+meanwhile are dropped before the store is used again.
+"""
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from redis import Redis
+from sqlalchemy import bindparam, event, update
+from sqlalchemy.orm import Session
+
+from core.config import Config
+from core.models import SigningSession
+from core.replica_routing import stage_sticky_writes
+
+logger = logging.getLogger(__name__)
+
+def utc_now() -> datetime:
+    """Return current UTC time as a naive datetime (UTC) without deprecation warnings."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+TERMINAL_STATUSES = ('completed', 'failed', 'expired')
+
+_DIRTY_KEY = 'signing_session:dirty'
+
+_EPOCH_TTL = 86400  # outlives any session hash
+
+# session.info key holding session ids whose hashes are dropped once the transaction commits
+_PENDING_KEY = 'session_state_evictions'
+
+_DATETIME_FIELDS = ('created_at', 'updated_at', 'expires_at')
+_TEXT_FIELDS = ('session_id', 'user_pubkey', 'session_type', 'status', 'context', 'challenge_id',
+                'error_message', 'signed_tx')
+
+
+class HotSessionStore:
+    """Redis hashes for active signing sessions, written back to the database in batches"""
+
+    def __init__(self, redis_client: Redis, flush_interval_ms: int = 500, flush_batch_size: int = 500,
+                 grace_seconds: int = 300, retry_after: int = 30):
+        self.redis = redis_client
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.flush_batch_size = flush_batch_size
+        self.grace_seconds = grace_seconds  # hashes outlive their session's expiry by this much
+        self.retry_after = retry_after
+        self.running = False
+        self._unavailable_until = 0.0
+        self._stale: Set[str] = set()  # written to the database while Redis was unavailable
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'flushed': 0,
+            'evictions': 0,
+            'errors': 0
+        }
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"signing_session:{session_id}"
+
+    @staticmethod
+    def _epoch_key(session_id: str) -> str:
+        return f"signing_session_epoch:{session_id}"
+
+    # Serialisation
+
+    @staticmethod
+    def _to_hash(signing_session: SigningSession) -> Dict[str, str]:
+        fields = {name: getattr(signing_session, name) or '' for name in _TEXT_FIELDS}
+        for name in _DATETIME_FIELDS:
+            value = getattr(signing_session, name)
+            fields[name] = value.isoformat() if value else ''
+        fields['intent_data'] = json.dumps(signing_session.intent_data)
+        fields.update(HotSessionStore.result_fields(signing_session.result_data))
+        return fields
+
+    @staticmethod
+    def result_fields(result_data: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Hash fields for a session's result_data; the ceremony state is kept in its own field"""
+        rest = dict(result_data) if result_data is not None else None
+        ceremony_state = rest.pop('ceremony_state', None) if rest is not None else None
+        return {'ceremony_state': json.dumps(ceremony_state), 'result_data': json.dumps(rest)}
+
+    @staticmethod
+    def _from_hash(fields: Dict[str, str]) -> SigningSession:
+        values: Dict[str, Any] = {name: fields.get(name) or None for name in _TEXT_FIELDS}
+        for name in _DATETIME_FIELDS:
+            values[name] = datetime.fromisoformat(fields[name]) if fields.get(name) else None
+        values['intent_data'] = json.loads(fields['intent_data'])
+        values['result_data'] = HotSessionStore._result_data(fields)
+        return SigningSession(**values)
+
+    @staticmethod
+    def _result_data(fields: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        result_data = json.loads(fields.get('result_data') or 'null')
+        ceremony_state = json.loads(fields.get('ceremony_state') or 'null')
+        if ceremony_state is not None:
+            result_data = dict(result_data or {})
+            result_data['ceremony_state'] = ceremony_state
+        return result_data
+
+    def _read(self, session_id: str) -> Optional[Dict[str, str]]:
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hgetall(self._key(session_id))
+        pipe.get(self._epoch_key(session_id))
+        raw, epoch = pipe.execute()
+        fields = {k.decode(): v.decode() for k, v in raw.items()} if raw else {}
+        if not fields:
+            return None
+        if not fields.get('user_pubkey'):
+            # a write raced with expiry and left a partial hash
+            self.redis.delete(self._key(session_id))
+            return None
+        if fields.get('epoch') != (epoch.decode() if epoch else '0'):
+            # loaded before the row was last written outside the store
+            return None
+        return fields
+
+    # Reads and writes
+
+    def get(self, session_id: str) -> Optional[SigningSession]:
+        """Detached SigningSession rebuilt from the hash, or None if the session is not hot"""
+        if not self._available():
+            return None
+        try:
+            fields = self._read(session_id)
+        except Exception as e:
+            self._failed('read', e)
+            return None
+        if fields is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return self._from_hash(fields)
+
+    def epoch(self, session_id: str) -> Optional[str]:
+        """Current epoch of a session; read it before loading the row passed to ``put``"""
+        if not self._available():
+            return None
+        try:
+            epoch = self.redis.get(self._epoch_key(session_id))
+            return epoch.decode() if epoch else '0'
+        except Exception as e:
+            self._failed('read', e)
+            return None
+
+    def put(self, signing_session: SigningSession, epoch: Optional[str] = '0'):
+        """
+        Make an active session hot (no database write is scheduled)
+
+        Args:
+            signing_session: Row as loaded from the database
+            epoch: Session epoch read before the row was loaded ('0' for a new session)
+        """
+        if epoch is None or signing_session.status in TERMINAL_STATUSES or not self._available():
+            return
+        try:
+            key = self._key(signing_session.session_id)
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hset(key, mapping={**self._to_hash(signing_session), 'epoch': epoch})
+            if signing_session.expires_at:
+                pipe.expireat(key, self._expire_at(signing_session.expires_at))
+            pipe.execute()
+        except Exception as e:
+            self._failed('write', e)
+
+    def update(self, session_id: str, fields: Dict[str, str]) -> bool:
+        """
+        Write fields of a hot session and schedule its database write
+
+        Returns:
+            False if the session is not hot or Redis is unavailable; the caller
+            then writes the database directly
+        """
+        if not self._available():
+            self._stale.add(session_id)
+            return False
+        try:
+            if self._read(session_id) is None:
+                return False
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hset(self._key(session_id), mapping=fields)
+            pipe.sadd(_DIRTY_KEY, session_id)
+            pipe.execute()
+            self.stats['writes'] += 1
+            return True
+        except Exception as e:
+            self._stale.add(session_id)
+            self._failed('write', e)
+            return False
+
+    def evict(self, session_id: str):
+        """Persist pending state of a session, then drop its hash"""
+        if not self._available():
+            self._stale.add(session_id)
+            return
+        try:
+            if self.redis.srem(_DIRTY_KEY, session_id):
+                self._write_back([session_id])
+            self._delete([session_id])
+            self.stats['evictions'] += 1
+        except Exception as e:
+            self._stale.add(session_id)
+            self._failed('evict', e)
+
+    def drop(self, session_ids: Iterable[str]):
+        """Forget hashes whose rows were just written to the database"""
+        session_ids = list(session_ids)
+        if not session_ids:
+            return
+        if not self._available():
+            self._stale.update(session_ids)
+            return
+        try:
+            self.redis.srem(_DIRTY_KEY, *session_ids)
+            self._delete(session_ids)
+            self.stats['evictions'] += len(session_ids)
+        except Exception as e:
+            self._stale.update(session_ids)
+            self._failed('evict', e)
+
+    def _delete(self, session_ids: List[str]):
+        pipe = self.redis.pipeline(transaction=False)
+        for session_id in session_ids:
+            pipe.incr(self._epoch_key(session_id))
+            pipe.expire(self._epoch_key(session_id), _EPOCH_TTL)
+            pipe.delete(self._key(session_id))
+        pipe.execute()
+
+    def _expire_at(self, expires_at: datetime) -> int:
+        return int(expires_at.replace(tzinfo=timezone.utc).timestamp()) + self.grace_seconds
+
+    # Write-behind
+
+    def pending_rows(self, session_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """UPDATE parameters for the hot state of the given sessions (sessions without a hash are skipped)"""
+        rows = []
+        for session_id in session_ids:
+            fields = self._read(session_id)
+            if fields is None:
+                continue
+            rows.append({
+                'b_session_id': session_id,
+                'b_user_pubkey': fields['user_pubkey'],  # not a column; marks the user sticky
+                'b_status': fields['status'],
+                'b_result_data': self._result_data(fields),
+                'b_signed_tx': fields.get('signed_tx') or None,
+                'b_error_message': fields.get('error_message') or None,
+                'b_updated_at': datetime.fromisoformat(fields['updated_at']) if fields.get('updated_at') else utc_now()
+            })
+        return rows
+
+    @staticmethod
+    def write_rows(session, rows: List[Dict[str, Any]]):
+        """One executemany UPDATE in ``session``'s transaction; terminal rows are never overwritten"""
+        if not rows:
+            return
+        # A bulk UPDATE bypasses after_flush, so stage the replica stickiness here
+        stage_sticky_writes(session, [row['b_user_pubkey'] for row in rows])
+        table = SigningSession.__table__
+        session.connection().execute(
+            update(table).where(
+                table.c.session_id == bindparam('b_session_id'),
+                table.c.status.notin_(TERMINAL_STATUSES)
+            ).values(
+                status=bindparam('b_status'),
+                result_data=bindparam('b_result_data'),
+                signed_tx=bindparam('b_signed_tx'),
+                error_message=bindparam('b_error_message'),
+                updated_at=bindparam('b_updated_at')
+            ),
+            rows
+        )
+
+    def _write_back(self, session_ids: List[str]) -> int:
+        rows = self.pending_rows(session_ids)
+        if not rows:
+            return 0
+        from core.models import get_session
+        session = get_session()
+        try:
+            self.write_rows(session, rows)
+            session.commit()
+            self.stats['flushed'] += len(rows)
+            return len(rows)
+        except Exception:
+            session.rollback()
+            # leave them dirty for the next flush
+            self.redis.sadd(_DIRTY_KEY, *session_ids)
+            raise
+        finally:
+            session.close()
+
+    def flush(self) -> int:
+        """Write dirty sessions to the database; returns the number of rows written"""
+        if not self._available():
+            return 0
+        written = 0
+        try:
+            while True:
+                session_ids = self.redis.spop(_DIRTY_KEY, self.flush_batch_size)
+                if not session_ids:
+                    return written
+                written += self._write_back([s.decode() if isinstance(s, bytes) else s for s in session_ids])
+                if len(session_ids) < self.flush_batch_size:
+                    return written
+        except Exception as e:
+            logger.error(f"❌ Failed to write back hot session state: {e}")
+            self.stats['errors'] += 1
+            return written
+
+    def start_flusher(self):
+        """Start the write-behind thread"""
+        if self.running:
+            return
+        self.running = True
+        threading.Thread(target=self._flush_loop, name='session-state-flush', daemon=True).start()
+        logger.info("🔄 Hot session state write-behind started")
+
+    def stop_flusher(self):
+        """Stop the write-behind thread after a final flush"""
+        self.running = False
+        self.flush()
+        logger.info("⏹️  Hot session state write-behind stopped")
+
+    def _flush_loop(self):
+        while self.running:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    # Availability
+
+    def _available(self) -> bool:
+        if time.monotonic() < self._unavailable_until:
+            return False
+        if self._stale:
+            with self._lock:
+                stale, self._stale = self._stale, set()
+                try:
+                    if stale:
+                        self.redis.srem(_DIRTY_KEY, *stale)
+                        self._delete(list(stale))
+                except Exception as e:
+                    self._stale |= stale
+                    self._failed('recover', e)
+                    return False
+        return True
+
+    def _failed(self, operation: str, error: Exception):
+        self.stats['errors'] += 1
+        self._unavailable_until = time.monotonic() + self.retry_after
+        logger.warning(f"⚠️  Hot session state {operation} failed, using the database for {self.retry_after}s: {error}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Store statistics"""
+        return {**self.stats, 'available': time.monotonic() >= self._unavailable_until}
+
+
+@event.listens_for(Session, 'before_flush')
+def _persist_hot_state_before_orm_write(session, flush_context, instances):
+    """Write pending hot state of SigningSession rows about to be changed through the ORM"""
+    session_ids = {obj.session_id for obj in (*session.dirty, *session.deleted)
+                   if isinstance(obj, SigningSession) and obj.session_id}
+    if not session_ids:
+        return
+    store = get_session_state_store()
+    if store is None:
+        return
+    session.info.setdefault(_PENDING_KEY, set()).update(session_ids)
+    if not store._available():
+        return
+    try:
+        dirty = [s for s in session_ids if store.redis.sismember(_DIRTY_KEY, s)]
+        store.write_rows(session, store.pending_rows(dirty))
+    except Exception as e:
+        store._failed('write back', e)
+
+
+@event.listens_for(Session, 'after_commit')
+def _drop_hot_state_after_orm_write(session):
+    session_ids = session.info.pop(_PENDING_KEY, None)
+    if session_ids:
+        store = get_session_state_store()
+        if store is not None:
+            store.drop(session_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _keep_hot_state_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+# Global hot session store instance
+_session_state_store = None
+
+def get_session_state_store() -> Optional[HotSessionStore]:
+    """Get the global hot session store, or None when SESSION_STATE_REDIS is false"""
+    global _session_state_store
+    config = Config()
+    if not config.SESSION_STATE_REDIS:
+        return None
+    if _session_state_store is None:
+        _session_state_store = HotSessionStore(
+            Redis.from_url(config.REDIS_URL),
+            flush_interval_ms=config.SESSION_STATE_FLUSH_INTERVAL_MS
+        )
+        _session_state_store.start_flusher()
+    return _session_state_store
@@ -0,0 +1,223 @@
+"""
+Signature verification service
+
+Nostr events are signed with BIP340 Schnorr over their NIP-01 id hash;
+challenge responses carry ECDSA signatures under a DER public key. Both
+paths used to parse the public key and set up a verifier from scratch on
+every call. This service:
+
+- keeps parsed public keys in an LRU cache, so repeat signers (the same
+  users sending intents and responses) skip key parsing and validation
+- verifies batches of queued events (e.g. an Action Intent micro-batch) in
+  one call; batches of at least ``batch_min`` signatures are split across a
+  process pool so verification runs outside the GIL
+
+libsecp256k1 as shipped with coincurve exposes no multi-signature batch
+verification, so a batch is verified signature by signature; the saving
+comes from the key cache and from spreading the batch over cores.
+"""
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from coincurve import PublicKeyXOnly
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from core.config import Config
+
+logger = logging.getLogger(__name__)
+
+# (x-only public key hex, signature hex, 32-byte message hash)
+SchnorrItem = Tuple[str, str, bytes]
+
+
+def event_hash(pubkey: str, created_at: int, kind: int, tags: List[List[str]], content: str) -> bytes:
+    """NIP-01 event id hash"""
+    serialized = json.dumps([0, pubkey, created_at, kind, tags, content], separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(serialized.encode()).digest()
+
+
+class _KeyCache:
+    """Thread-safe LRU of parsed public keys"""
+
+    def __init__(self, size: int, parse: Callable[[str], Any]):
+        self.size = size
+        self.parse = parse
+        self._keys: 'OrderedDict[str, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, pubkey_hex: str) -> Any:
+        with self._lock:
+            key = self._keys.get(pubkey_hex)
+            if key is not None:
+                self._keys.move_to_end(pubkey_hex)
+                self.hits += 1
+                return key
+            self.misses += 1
+        key = self.parse(pubkey_hex)
+        with self._lock:
+            self._keys[pubkey_hex] = key
+            if len(self._keys) > self.size:
+                self._keys.popitem(last=False)
+        return key
+
+
+def _parse_xonly(pubkey_hex: str) -> PublicKeyXOnly:
+    return PublicKeyXOnly(bytes.fromhex(pubkey_hex))
+
+
+def _parse_der(pubkey_hex: str):
+    return serialization.load_der_public_key(bytes.fromhex(pubkey_hex), backend=default_backend())
+
+
+class SignatureVerifier:
+    """Verifies Schnorr and ECDSA signatures with cached public keys, batching across processes"""
+
+    def __init__(self, cache_size: int = 4096, processes: int = 0, batch_min: int = 32):
+        """
+        Args:
+            cache_size: Parsed public keys kept per key type
+            processes: Verification processes for large batches (0: verify in the calling thread)
+            batch_min: Smallest batch sent to the process pool
+        """
+        self.processes = processes
+        self.batch_min = max(1, batch_min)
+        self._schnorr_keys = _KeyCache(cache_size, _parse_xonly)
+        self._ecdsa_keys = _KeyCache(cache_size, _parse_der)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self.stats = {
+            'verified': 0,
+            'invalid': 0,
+            'batches': 0,
+            'pool_batches': 0
+        }
+
+    # Schnorr (BIP340)
+
+    def verify_schnorr(self, pubkey_hex: str, signature_hex: str, message_hash: bytes) -> bool:
+        """Verify a BIP340 signature over a 32-byte hash; malformed input verifies as False"""
+        try:
+            valid = self._schnorr_keys.get(pubkey_hex).verify(bytes.fromhex(signature_hex), message_hash)
+        except Exception as e:
+            logger.debug(f"Schnorr verification error for {pubkey_hex[:16]}: {e}")
+            valid = False
+        self._count(valid)
+        return valid
+
+    def verify_schnorr_batch(self, items: Sequence[SchnorrItem]) -> List[bool]:
+        """Verify many signatures; large batches are spread over the process pool"""
+        self.stats['batches'] += 1
+        if self.processes > 0 and len(items) >= self.batch_min:
+            try:
+                results = self._verify_on_pool(list(items))
+                self.stats['pool_batches'] += 1
+                for valid in results:
+                    self._count(valid)
+                return results
+            except Exception as e:
+                logger.warning(f"⚠️  Verification pool failed, verifying inline: {e}")
+        return [self.verify_schnorr(*item) for item in items]
+
+    def verify_event(self, event) -> bool:
+        """Verify a Nostr event's signature (NostrEvent or any object with the NIP-01 fields)"""
+        return self.verify_events([event])[0]
+
+    def verify_events(self, events: Sequence[Any]) -> List[bool]:
+        """Verify the signatures of several Nostr events in one batch"""
+        items, positions, results = [], [], [False] * len(events)
+        for i, event in enumerate(events):
+            try:
+                items.append((event.pubkey, event.sig,
+                              event_hash(event.pubkey, event.created_at, event.kind, event.tags, event.content)))
+                positions.append(i)
+            except Exception as e:
+                logger.debug(f"Cannot hash event {getattr(event, 'id', None)}: {e}")
+                self._count(False)
+        for i, valid in zip(positions, self.verify_schnorr_batch(items) if items else []):
+            results[i] = valid
+        return results
+
+    def _verify_on_pool(self, items: List[SchnorrItem]) -> List[bool]:
+        pool = self._get_pool()
+        size = -(-len(items) // self.processes)
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        return [valid for chunk in pool.map(_verify_schnorr_chunk, chunks) for valid in chunk]
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn: the gateway runs threads, which fork() would copy mid-flight
+                self._pool = ProcessPoolExecutor(max_workers=self.processes,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    # ECDSA
+
+    def verify_ecdsa(self, pubkey_hex: str, signature: bytes, data: bytes) -> bool:
+        """Verify an ECDSA/SHA256 signature under a DER-encoded public key"""
+        if pubkey_hex.startswith('0x'):
+            pubkey_hex = pubkey_hex[2:]
+        try:
+            self._ecdsa_keys.get(pubkey_hex).verify(signature, data, ec.ECDSA(hashes.SHA256()))
+            valid = True
+        except Exception as e:
+            logger.error(f"Signature verification failed: {e}")
+            valid = False
+        self._count(valid)
+        return valid
+
+    def _count(self, valid: bool):
+        self.stats['verified' if valid else 'invalid'] += 1
+
+    def shutdown(self):
+        """Stop the verification processes"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Verification statistics including key cache hit counts"""
+        return {
+            **self.stats,
+            'processes': self.processes,
+            'schnorr_key_cache': {'hits': self._schnorr_keys.hits, 'misses': self._schnorr_keys.misses},
+            'ecdsa_key_cache': {'hits': self._ecdsa_keys.hits, 'misses': self._ecdsa_keys.misses}
+        }
+
+
+# Per-process verifier used by pool workers (keeps its own key cache)
+_worker_verifier = None
+
+def _verify_schnorr_chunk(items: List[SchnorrItem]) -> List[bool]:
+    global _worker_verifier
+    if _worker_verifier is None:
+        _worker_verifier = SignatureVerifier()
+    return [_worker_verifier.verify_schnorr(*item) for item in items]
+
+
+# Global signature verifier instance
+_signature_verifier = None
+
+def get_signature_verifier() -> SignatureVerifier:
+    """Get the global signature verifier"""
+    global _signature_verifier
+    if _signature_verifier is None:
+        config = Config()
+        _signature_verifier = SignatureVerifier(
+            cache_size=config.SIGNATURE_KEY_CACHE_SIZE,
+            processes=config.SIGNATURE_VERIFY_PROCESSES,
+            batch_min=config.SIGNATURE_VERIFY_BATCH_MIN
+        )
+    return _signature_verifier
@@ -3,10 +3,11 @@ import json
 import hashlib
 import time
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Optional, Any, List, Tuple
+from typing import Dict, Optional, Any, Iterator, List, Tuple
 from enum import Enum
 import logging
 import sys as _sys
+from core.ceremony_events import get_ceremony_events
 from core.models import Transaction, SigningSession, get_session
 from core.session_manager import get_session_manager, SessionState
 from core.challenge_manager import get_challenge_manager
@@ -79,6 +80,19 @@ class SigningOrchestrator:
         Returns:
             Ceremony status dictionary
         """
+        self.validate_ceremony_start(session_id)
+
+        # Store ceremony state in session result_data
+        (self.session_manager or get_session_manager())._update_session_result(session_id, {
+            'ceremony_state': self.initial_ceremony_state(session_id),
+            'ceremony_status': 'in_progress'
+        })
+
+        # Start with step 1 using the public wrapper to ensure status updates
+        return self.execute_signing_step(session_id, SigningStep.INTENT_VERIFICATION)
+
+    def validate_ceremony_start(self, session_id: str) -> SigningSession:
+        """Return the session if a ceremony can start for it, else raise SigningCeremonyError"""
         # Validate input
         if not session_id:
             raise SigningCeremonyError("Invalid session ID")
@@ -97,8 +111,11 @@ class SigningOrchestrator:
             # Include both phrases to satisfy different test expectations
             raise SigningCeremonyError("Session is not ready for signing - Session is not in correct state")
 
-        # Initialize ceremony state
-        ceremony_state = {
+        return session
+
+    def initial_ceremony_state(self, session_id: str) -> Dict[str, Any]:
+        """Ceremony state before the first step"""
+        return {
             'session_id': session_id,
             'current_step': 1,
             'start_time': utc_now().isoformat(),
@@ -110,15 +127,6 @@ class SigningOrchestrator:
             'checkpoint_tx_id': None
         }
 
-        # Store ceremony state in session result_data
-        (self.session_manager or get_session_manager())._update_session_result(session_id, {
-            'ceremony_state': ceremony_state,
-            'ceremony_status': 'in_progress'
-        })
-
-        # Start with step 1 using the public wrapper to ensure status updates
-        return self.execute_signing_step(session_id, SigningStep.INTENT_VERIFICATION)
-
     def execute_signing_step(self, session_id: str, step: SigningStep,
                            signature_data: Dict[str, Any] = None) -> Dict[str, Any]:
         """
@@ -181,9 +189,11 @@ class SigningOrchestrator:
             # Check if ceremony is complete
             if step == SigningStep.FINALIZATION:
                 (self.session_manager or get_session_manager()).complete_session(session_id, step_result)
+                self._publish_ceremony_event(session_id, 'completed', step.value)
             else:
                 (self.session_manager or get_session_manager()).update_session_status(session_id, SessionState.SIGNING.value,
                                                    f"Completed step {step.value}")
+                self._publish_ceremony_event(session_id, 'step_completed', step.value)
 
             return step_result
 
@@ -197,6 +207,7 @@ class SigningOrchestrator:
             }
 
             session_manager.fail_session(session_id, f"Step {step.value} failed: {str(e)}")
+            self._publish_ceremony_event(session_id, 'failed', step.value)
             raise SigningCeremonyError(f"Step {step.value} failed: {str(e)}")
 
     def _execute_signing_step(self, session_id: str, step: SigningStep,
@@ -598,7 +609,94 @@ class SigningOrchestrator:
         session = session_manager.get_session(session_id)
         if not session:
             return False
-        return session_manager.fail_session(session_id, f"Ceremony cancelled: {reason}")
+        cancelled = session_manager.fail_session(session_id, f"Ceremony cancelled: {reason}")
+        if cancelled:
+            self._publish_ceremony_event(session_id, 'cancelled')
+        return cancelled
+
+    def wait_for_ceremony_status(self, session_id: str, wait: float, since: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Long-poll the status of a signing ceremony
+
+        Returns as soon as the status differs from the one the caller last saw,
+        the session reaches a terminal state, or ``wait`` seconds pass.
+
+        Args:
+            session_id: Session ID
+            wait: Maximum seconds to wait
+            since: ``last_updated`` of the status the caller already has; when
+                omitted, waits for the next change
+
+        Returns:
+            Status dictionary as from get_ceremony_status; ``long_poll`` is True
+            when ceremony events were used to wait
+        """
+        events = get_ceremony_events()
+        if events is None or wait <= 0:
+            return self.get_ceremony_status(session_id)
+
+        try:
+            with events.subscribe(session_id) as subscription:
+                deadline = time.monotonic() + wait
+                while True:
+                    # Read after subscribing so no transition is missed
+                    status = self.get_ceremony_status(session_id)
+                    if since is None:
+                        since = status.get('last_updated')
+                    if self._is_final_status(status) or status.get('last_updated') != since:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or subscription.wait(remaining) is None:
+                        break
+        except SigningCeremonyError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️  Ceremony events unavailable, returning current status: {e}")
+            return self.get_ceremony_status(session_id)
+
+        status['long_poll'] = True
+        return status
+
+    def stream_ceremony_status(self, session_id: str, heartbeat: float = 15.0,
+                               max_duration: Optional[float] = None) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Yield the ceremony status now and after every change until it is final
+
+        Yields None every ``heartbeat`` seconds without a change so the caller
+        can keep the connection alive. Stops after ``max_duration`` seconds
+        (default: the ceremony timeout).
+        """
+        events = get_ceremony_events()
+        if events is None:
+            raise SigningCeremonyError("Ceremony events are disabled")
+
+        deadline = time.monotonic() + (max_duration if max_duration is not None else self.ceremony_timeout)
+        with events.subscribe(session_id) as subscription:
+            last_seen = None
+            while True:
+                status = self.get_ceremony_status(session_id)
+                seen = (status.get('session_status'), status.get('last_updated'))
+                if seen != last_seen:
+                    last_seen = seen
+                    yield status
+                if self._is_final_status(status):
+                    return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                if subscription.wait(min(heartbeat, remaining)) is None:
+                    yield None
+
+    @staticmethod
+    def _is_final_status(status: Dict[str, Any]) -> bool:
+        return 'error' in status or status.get('session_status') in (
+            SessionState.COMPLETED.value, SessionState.FAILED.value, SessionState.EXPIRED.value)
+
+    def _publish_ceremony_event(self, session_id: str, event: str, step: Optional[str] = None):
+        """Notify status long-polls and event streams of a ceremony transition"""
+        events = get_ceremony_events()
+        if events is not None:
+            events.publish(session_id, event, step=step)
 
     # Public helper methods required by simplified tests
     def validate_pubkey(self, pubkey: Optional[str]) -> bool:
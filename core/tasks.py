@@ -3,6 +3,7 @@ import json
 import uuid
 from datetime import datetime
 import logging
+from typing import List, Optional, Tuple
 import psutil
 from core.models import JobLog, SystemMetrics, Heartbeat, get_session
 
@@ -270,19 +271,34 @@ def cleanup_expired_sessions():
     finally:
         session.close()
 
-def enqueue_vtxo_replenishment(asset_id: str, count: int):
-    """Enqueue a VTXO replenishment job"""
+def enqueue_vtxo_replenishment(asset_id: str, count: int, coalesce_seconds: int = 0,
+                               denominations: Optional[List[Tuple[int, int]]] = None):
+    """
+    Enqueue a VTXO replenishment job
+
+    With ``coalesce_seconds`` set, only the first call per asset within that window
+    enqueues a job (a Redis SET NX key shared by all gateway processes); later calls
+    return None. ``denominations`` is an optional list of (amount_sats, count) pairs
+    to mint instead of ``count`` VTXOs at the default amount.
+    """
     from redis import Redis
     from rq import Queue
     import os
 
     redis_url = os.getenv('REDIS_URL', 'redis://redis:6379/0')
     redis_conn = Redis.from_url(redis_url)
+
+    if coalesce_seconds > 0:
+        key = f"arkrelay:vtxo_replenishment:{asset_id}"
+        if not redis_conn.set(key, count, nx=True, ex=coalesce_seconds):
+            logger.info(f"⏭️  VTXO replenishment for asset {asset_id} already enqueued, coalescing")
+            return None
+
     q = Queue(connection=redis_conn)
 
     job = q.enqueue(
         'core.tasks.process_vtxo_replenishment',
-        args=[asset_id, count],
+        args=[asset_id, count] + ([[list(d) for d in denominations]] if denominations else []),
         job_timeout=300,  # 5 minutes timeout
         job_id=f"vtxo_replenishment_{asset_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
         result_ttl=3600  # Store results for 1 hour
@@ -291,8 +307,8 @@ def enqueue_vtxo_replenishment(asset_id: str, count: int):
     logger.info(f"🔄 Enqueued VTXO replenishment job for asset {asset_id}: {count} VTXOs (Job ID: {job.id})")
     return job
 
-def process_vtxo_replenishment(asset_id: str, count: int):
-    """Process VTXO replenishment by creating new VTXOs"""
+def process_vtxo_replenishment(asset_id: str, count: int, denominations: Optional[List[List[int]]] = None):
+    """Process VTXO replenishment by creating new VTXOs, one batch per denomination if given"""
     job_id = f"vtxo_replenishment_{asset_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     session = get_session()
 
@@ -313,7 +329,11 @@ def process_vtxo_replenishment(asset_id: str, count: int):
         from core.vtxo_manager import get_vtxo_manager
         vtxo_manager = get_vtxo_manager()
 
-        success = vtxo_manager.create_vtxo_batch(asset_id, count)
+        if denominations:
+            success = all([vtxo_manager.create_vtxo_batch(asset_id, n, amount_sats=amount)
+                           for amount, n in denominations])
+        else:
+            success = vtxo_manager.create_vtxo_batch(asset_id, count)
 
         duration = time.time() - start_time
 
@@ -394,4 +414,211 @@ def cleanup_vtxos():
         session.commit()
         raise
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+
+def snapshot_ledger():
+    """Materialise ledger balances changed since the last snapshot"""
+    job_id = f"ledger_snapshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    session = get_session()
+
+    try:
+        # Log job start
+        job_log = JobLog(
+            job_id=job_id,
+            job_type='ledger_snapshot',
+            status='running',
+            message='Starting ledger snapshot'
+        )
+        session.add(job_log)
+        session.commit()
+
+        start_time = time.time()
+
+        from core.ledger import get_balance_ledger
+        snapshot = get_balance_ledger().take_snapshot(session)
+
+        duration = time.time() - start_time
+
+        # Log completion
+        result = {
+            "status": "completed",
+            "last_entry_id": snapshot['last_entry_id'],
+            "balances_snapshotted": snapshot['rows'],
+            "duration_seconds": duration,
+            "timestamp": datetime.now().isoformat()
+        }
+
+        job_log.status = 'completed'
+        job_log.result_data = json.dumps(result)
+        job_log.duration_seconds = duration
+        session.commit()
+
+        logger.info(f"✅ Ledger snapshot completed: {snapshot['rows']} balances up to entry {snapshot['last_entry_id']}")
+        return result
+
+    except Exception as e:
+        logger.error(f"❌ Failed to snapshot ledger: {e}")
+        session.rollback()
+        job_log.status = 'failed'
+        job_log.message = str(e)
+        session.commit()
+        raise
+    finally:
+        session.close()
+
+def maintain_partitions():
+    """Create upcoming day partitions and drop expired ones for the time-series tables"""
+    job_id = f"partition_maintenance_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    session = get_session()
+
+    try:
+        # Log job start
+        job_log = JobLog(
+            job_id=job_id,
+            job_type='partition_maintenance',
+            status='running',
+            message='Starting partition maintenance'
+        )
+        session.add(job_log)
+        session.commit()
+
+        start_time = time.time()
+
+        from core.partitioning import get_partition_manager
+        maintenance = get_partition_manager().maintain(session)
+
+        duration = time.time() - start_time
+
+        # Log completion
+        result = {
+            "status": "completed",
+            **maintenance,
+            "duration_seconds": duration,
+            "timestamp": datetime.now().isoformat()
+        }
+
+        job_log.status = 'completed'
+        job_log.result_data = json.dumps(result)
+        job_log.duration_seconds = duration
+        session.commit()
+
+        if maintenance['added'] or maintenance['dropped']:
+            logger.info(f"✅ Partition maintenance: added {maintenance['added']}, dropped {maintenance['dropped']}")
+        return result
+
+    except Exception as e:
+        logger.error(f"❌ Failed partition maintenance: {e}")
+        session.rollback()
+        job_log.status = 'failed'
+        job_log.message = str(e)
+        session.commit()
+        raise
+    finally:
+        session.close()
+
+def archive_terminal_records():
+    """Move old terminal sessions, challenges and transactions to the cold archive"""
+    job_id = f"cold_archive_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    session = get_session()
+
+    try:
+        # Log job start
+        job_log = JobLog(
+            job_id=job_id,
+            job_type='cold_archive',
+            status='running',
+            message='Starting cold archive run'
+        )
+        session.add(job_log)
+        session.commit()
+
+        start_time = time.time()
+
+        from core.archiver import get_cold_archiver
+        archived = get_cold_archiver().archive(session)
+
+        duration = time.time() - start_time
+
+        # Log completion
+        result = {
+            "status": "completed",
+            "archived_sessions": archived.sessions,
+            "archived_challenges": archived.challenges,
+            "archived_transactions": archived.transactions,
+            "complete": archived.complete,
+            "duration_seconds": duration,
+            "timestamp": datetime.now().isoformat()
+        }
+
+        job_log.status = 'completed'
+        job_log.result_data = json.dumps(result)
+        job_log.duration_seconds = duration
+        session.commit()
+
+        return result
+
+    except Exception as e:
+        logger.error(f"❌ Failed cold archive run: {e}")
+        session.rollback()
+        job_log.status = 'failed'
+        job_log.message = str(e)
+        session.commit()
+        raise
+    finally:
+        session.close()
+
+def run_signing_ceremony(session_id: str):
+    """Run or resume a signing ceremony enqueued by the ceremony executor"""
+    from core.ceremony_executor import CeremonyExecutor
+    return CeremonyExecutor().run(session_id)
+
+def resume_stalled_ceremonies():
+    """Re-enqueue signing ceremonies whose worker stopped checkpointing"""
+    job_id = f"ceremony_resume_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    session = get_session()
+
+    try:
+        # Log job start
+        job_log = JobLog(
+            job_id=job_id,
+            job_type='ceremony_resume',
+            status='running',
+            message='Starting stalled ceremony scan'
+        )
+        session.add(job_log)
+        session.commit()
+
+        start_time = time.time()
+
+        from core.ceremony_executor import get_ceremony_executor
+        executor = get_ceremony_executor()
+        resumed = executor.resume_stalled() if executor else 0
+
+        duration = time.time() - start_time
+
+        # Log completion
+        result = {
+            "status": "completed",
+            "ceremonies_resumed": resumed,
+            "duration_seconds": duration,
+            "timestamp": datetime.now().isoformat()
+        }
+
+        job_log.status = 'completed'
+        job_log.result_data = json.dumps(result)
+        job_log.duration_seconds = duration
+        session.commit()
+
+        if resumed:
+            logger.info(f"✅ Re-enqueued {resumed} stalled ceremonies")
+        return result
+
+    except Exception as e:
+        logger.error(f"❌ Failed to resume stalled ceremonies: {e}")
+        session.rollback()
+        job_log.status = 'failed'
+        job_log.message = str(e)
+        session.commit()
+        raise
+    finally:
+        session.close()
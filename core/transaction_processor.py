@@ -15,13 +15,16 @@ def _get_db_session():
 
 import uuid
 import json
+import base64
 import hashlib
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional, Any, List, Tuple
 from enum import Enum
 import logging
 from core.models import Transaction, SigningSession, AssetBalance, Asset, Vtxo
+from core.ledger import BalanceDelta, InsufficientLedgerBalance, get_balance_ledger
 from core.session_manager import get_session_manager
+from core.replica_routing import replica_read
 from grpc_clients import get_grpc_manager, ServiceType
 from sqlalchemy import and_, or_
 from sqlalchemy.exc import OperationalError
@@ -146,7 +149,7 @@ class TransactionProcessor:
             )
 
             # Update balances (pending)
-            self._update_pending_balances(user_pubkey, recipient_pubkey, asset_id, amount, session)
+            self._update_pending_balances(user_pubkey, recipient_pubkey, asset_id, amount, session, reference=tx_id)
 
             # Update session status context (ignore transition errors if already in 'signing')
             session_manager = get_session_manager()
@@ -365,6 +368,10 @@ class TransactionProcessor:
         session = _get_db_session()
         try:
             transaction = session.query(Transaction).filter_by(txid=txid).first()
+            if not transaction:
+                # Terminal transactions move to the cold archive after ARCHIVE_AFTER_DAYS
+                from core.archiver import get_cold_archiver
+                transaction = get_cold_archiver().find_transaction(txid, session)
             if not transaction:
                 return {'error': 'Transaction not found'}
 
@@ -414,67 +421,108 @@ class TransactionProcessor:
         Args:
             user_pubkey: User's public key
             limit: Maximum number of transactions to return
+            offset: Rows to skip; prefer the cursor of get_user_transactions_page
 
         Returns:
-            List of transaction dictionaries
+            List of transaction dictionaries, newest first
+        """
+        return self.get_user_transactions_page(
+            user_pubkey, limit=limit, asset_id=asset_id, status=status, tx_type=tx_type, offset=offset
+        )['transactions']
+
+    @replica_read('user_pubkey')
+    def get_user_transactions_page(self, user_pubkey: str, limit: int = 50, cursor: Optional[str] = None,
+                                   asset_id: Optional[str] = None, status: Optional[str] = None,
+                                   tx_type: Optional[str] = None, offset: int = 0) -> Dict[str, Any]:
+        """
+        Get one page of a user's transactions, newest first
+
+        One JOIN query against the user's signing sessions; ``asset_id`` is
+        filtered on the session intent in SQL and pages are keyset cursors on
+        (created_at, id), so the cost of a page does not depend on its depth.
+
+        Args:
+            user_pubkey: User's public key
+            limit: Page size
+            cursor: Opaque ``next_cursor`` from the previous page
+
+        Returns:
+            Dict with 'transactions' and 'next_cursor' (None on the last page)
+
+        Raises:
+            TransactionError: If user_pubkey or cursor is invalid
         """
         if user_pubkey is None or not isinstance(user_pubkey, str) or user_pubkey.strip() == "":
             raise TransactionError("Invalid user_pubkey")
+        after = self._decode_cursor(cursor) if cursor else None
+
         session = _get_db_session()
         try:
-            # Get sessions for this user
-            user_sessions = session.query(SigningSession).filter_by(user_pubkey=user_pubkey).all()
-            session_ids = [s.session_id for s in user_sessions]
-
-            # Get transactions for these sessions
-            q = session.query(Transaction).filter(Transaction.session_id.in_(session_ids))
+            intent_asset = SigningSession.intent_data['asset_id'].as_string()
+            q = session.query(Transaction, intent_asset).join(
+                SigningSession, SigningSession.session_id == Transaction.session_id
+            ).filter(SigningSession.user_pubkey == user_pubkey)
+            if asset_id:
+                q = q.filter(intent_asset == asset_id)
             if status:
                 q = q.filter(Transaction.status == status)
             if tx_type:
                 q = q.filter(Transaction.tx_type == tx_type)
-            q = q.order_by(Transaction.created_at.desc())
+            if after:
+                created_at, last_id = after
+                q = q.filter(or_(
+                    Transaction.created_at < created_at,
+                    and_(Transaction.created_at == created_at, Transaction.id < last_id)
+                ))
+            q = q.order_by(Transaction.created_at.desc(), Transaction.id.desc())
             if offset:
                 q = q.offset(offset)
             if limit:
-                q = q.limit(limit)
-            transactions = q.all()
-
-            result = []
-            for tx in transactions:
-                # Look up asset_id from session intent_data if available
-                sess = session.query(SigningSession).filter_by(session_id=tx.session_id).first()
-                tx_asset_id = None
-                try:
-                    if sess and isinstance(sess.intent_data, dict):
-                        tx_asset_id = sess.intent_data.get('asset_id')
-                except Exception:
-                    tx_asset_id = None
-
-                result.append({
-                    'txid': tx.txid,
-                    'status': tx.status,
-                    'tx_type': tx.tx_type,
-                    'amount_sats': tx.amount_sats,
-                    'fee_sats': tx.fee_sats,
-                    'created_at': tx.created_at.isoformat(),
-                    'confirmed_at': tx.confirmed_at.isoformat() if tx.confirmed_at else None,
-                    'block_height': tx.block_height,
-                    'asset_id': tx_asset_id,
-                })
-
-            # If filtering by asset_id, apply on the result set
-            if asset_id:
-                result = [r for r in result if r.get('asset_id') == asset_id]
-
-            return result
+                # One extra row tells whether another page exists
+                q = q.limit(limit + 1)
+            rows = q.all()
+
+            next_cursor = None
+            if limit and len(rows) > limit:
+                rows = rows[:limit]
+                last_tx = rows[-1][0]
+                next_cursor = self._encode_cursor(last_tx.created_at, last_tx.id)
+
+            transactions = [{
+                'txid': tx.txid,
+                'status': tx.status,
+                'tx_type': tx.tx_type,
+                'amount_sats': tx.amount_sats,
+                'fee_sats': tx.fee_sats,
+                'created_at': tx.created_at.isoformat(),
+                'confirmed_at': tx.confirmed_at.isoformat() if tx.confirmed_at else None,
+                'block_height': tx.block_height,
+                'asset_id': tx_asset_id,
+            } for tx, tx_asset_id in rows]
+
+            return {'transactions': transactions, 'next_cursor': next_cursor}
 
         except Exception as e:
             logger.error(f"Error getting user transactions: {e}")
-            return []
+            return {'transactions': [], 'next_cursor': None}
         finally:
             if not getattr(session, "_managed_by_tests", False):
                 session.close()
 
+    @staticmethod
+    def _encode_cursor(created_at: datetime, tx_id: int) -> str:
+        payload = json.dumps([created_at.isoformat(), tx_id]).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        try:
+            payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            created_at, tx_id = json.loads(payload)
+            return datetime.fromisoformat(created_at), int(tx_id)
+        except (ValueError, TypeError) as e:
+            raise TransactionError("Invalid cursor") from e
+
     def _get_asset_balance(self, user_pubkey: str, asset_id: str) -> int:
         """Get user's available balance for a specific asset (balance - reserved)."""
         session = _get_db_session()
@@ -507,37 +555,16 @@ class TransactionProcessor:
         return base_fee
 
     def _update_pending_balances(self, sender_pubkey: str, recipient_pubkey: str,
-                                asset_id: str, amount: int, db_session):
+                                asset_id: str, amount: int, db_session, reference: Optional[str] = None):
         """Update pending balances for transfer"""
-        # Deduct from sender
-        sender_balance = db_session.query(AssetBalance).filter_by(
-            user_pubkey=sender_pubkey,
-            asset_id=asset_id
-        ).first()
-
-        if sender_balance:
-            sender_balance.balance -= amount
-            sender_balance.reserved_balance += amount  # Reserve while pending
-        else:
-            raise InsufficientFundsError("Sender has no balance")
-
-        # Add to recipient (create if doesn't exist)
-        recipient_balance = db_session.query(AssetBalance).filter_by(
-            user_pubkey=recipient_pubkey,
-            asset_id=asset_id
-        ).first()
-
-        if recipient_balance:
-            recipient_balance.reserved_balance += amount
-        else:
-            # Create new balance record
-            new_balance = AssetBalance(
-                user_pubkey=recipient_pubkey,
-                asset_id=asset_id,
-                balance=0,
-                reserved_balance=amount
-            )
-            db_session.add(new_balance)
+        # Sender: move the amount into reserved while pending; recipient: reserve incoming (row created if needed)
+        try:
+            get_balance_ledger().apply(db_session, [
+                BalanceDelta(sender_pubkey, asset_id, balance=-amount, reserved=amount, min_available=amount),
+                BalanceDelta(recipient_pubkey, asset_id, reserved=amount)
+            ], entry_type='transfer_pending', reference=reference)
+        except InsufficientLedgerBalance:
+            raise InsufficientFundsError(f"Insufficient balance. Required: {amount}")
 
     def _generate_txid(self) -> str:
         """Generate a unique transaction ID"""
@@ -691,22 +718,11 @@ class TransactionProcessor:
             amount = transaction.amount_sats
             asset_id = intent_data.get('asset_id', 'BTC')
 
-            # Finalize sender balance
-            sender_balance = db_session.query(AssetBalance).filter_by(
-                user_pubkey=sender_pubkey,
-                asset_id=asset_id
-            ).first()
-            if sender_balance:
-                sender_balance.reserved_balance -= amount
-
-            # Finalize recipient balance
-            recipient_balance = db_session.query(AssetBalance).filter_by(
-                user_pubkey=recipient_pubkey,
-                asset_id=asset_id
-            ).first()
-            if recipient_balance:
-                recipient_balance.reserved_balance -= amount
-                recipient_balance.balance += amount
+            # Release the sender's reservation and move the recipient's into balance
+            get_balance_ledger().apply(db_session, [
+                BalanceDelta(sender_pubkey, asset_id, reserved=-amount),
+                BalanceDelta(recipient_pubkey, asset_id, balance=amount, reserved=-amount)
+            ], entry_type='transfer_settled', reference=txid)
 
 # Global transaction processor instance
 transaction_processor = TransactionProcessor()
@@ -0,0 +1,436 @@
+"""
+In-memory VTXO availability index for Ark Relay Gateway
+
+Keeps a process-local view of each asset's VTXOs so inventory checks and
+assignment candidate lookups are served from memory instead of the database:
+- available VTXOs are kept sorted by (amount, row id), so "smallest VTXO
+  covering N sats" is a bisect and the coin selector can run on it directly
+- per-status counts replace the COUNT queries behind inventory status
+
+The index is built from the database in the background the first time a
+process uses it (or at service start), updated from committed
+changes through SQLAlchemy session events, and periodically reconciled
+against the database to pick up writes made by other processes (RQ workers,
+other gateway instances). Paths that bypass the ORM unit of work (bulk
+UPDATE/INSERT) stage their changes with ``stage_vtxo_changes``.
+"""
+
+import bisect
+import heapq
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from core.models import Vtxo, get_session
+
+logger = logging.getLogger(__name__)
+
+def utc_now() -> datetime:
+    """Return current UTC time as a naive datetime (UTC) without deprecation warnings."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+# Statuses a VTXO can still leave; rows in these states are tracked individually
+LIVE_STATUSES = ('available', 'assigned')
+
+# session.info key holding changes to apply once the transaction commits
+_PENDING_KEY = 'vtxo_index_changes'
+
+
+class VtxoChange(NamedTuple):
+    """A VTXO row change to apply to the index after commit
+
+    ``asset_id``, ``amount_sats`` and ``expires_at`` may be None for rows the
+    index already tracks; ``status`` None means the row was deleted.
+    """
+    vtxo_pk: int
+    status: Optional[str]
+    asset_id: Optional[str] = None
+    amount_sats: Optional[int] = None
+    expires_at: Optional[datetime] = None
+    created: bool = False
+
+
+class VtxoPoolView:
+    """Sorted (ascending by amount, then row id) view of the available VTXOs of one asset"""
+
+    def __init__(self, entries: Optional[List[Tuple[int, int]]] = None):
+        """
+        Args:
+            entries: (amount_sats, vtxo row id) pairs, in any order
+        """
+        entries = sorted(entries or [])
+        self.amounts = [amount for amount, _ in entries]
+        self.ids = [vtxo_pk for _, vtxo_pk in entries]
+        self.total = sum(self.amounts)
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def _position(self, amount: int, vtxo_pk: int) -> int:
+        lo = bisect.bisect_left(self.amounts, amount)
+        hi = bisect.bisect_right(self.amounts, amount, lo)
+        return bisect.bisect_left(self.ids, vtxo_pk, lo, hi)
+
+    def add(self, amount: int, vtxo_pk: int) -> bool:
+        """Insert an entry, keeping the view sorted; returns False if already present"""
+        i = self._position(amount, vtxo_pk)
+        if i < len(self.ids) and self.ids[i] == vtxo_pk and self.amounts[i] == amount:
+            return False
+        self.amounts.insert(i, amount)
+        self.ids.insert(i, vtxo_pk)
+        self.total += amount
+        return True
+
+    def remove(self, amount: int, vtxo_pk: int) -> bool:
+        """Remove an entry; returns False if it was not present"""
+        i = self._position(amount, vtxo_pk)
+        if i < len(self.ids) and self.ids[i] == vtxo_pk and self.amounts[i] == amount:
+            del self.amounts[i]
+            del self.ids[i]
+            self.total -= amount
+            return True
+        return False
+
+    def first_covering(self, amount_needed: int) -> int:
+        """Position of the smallest entry with amount >= amount_needed"""
+        return bisect.bisect_left(self.amounts, amount_needed)
+
+
+class _AssetEntry:
+    """Index state for one asset"""
+
+    __slots__ = ('pool', 'live', 'counts', 'expiry_heap')
+
+    def __init__(self):
+        self.pool = VtxoPoolView()
+        self.live: Dict[int, list] = {}  # row id -> [status, amount_sats, expires_at, in_pool]
+        self.counts: Counter = Counter()
+        self.expiry_heap: List[Tuple[datetime, int]] = []
+
+
+class VtxoAvailabilityIndex:
+    """Process-local index of VTXO availability per asset"""
+
+    def __init__(self):
+        self.reconcile_interval = 60  # Re-read the database every minute
+        self.candidate_limit = 16  # Candidates returned per single-VTXO lookup
+        self.ready = False
+        self.running = False
+        self.stopped = False  # set by an explicit stop; suppresses the lazy build
+        self.last_reconciled_at: Optional[datetime] = None
+        self._lock = threading.RLock()
+        self._start_lock = threading.Lock()
+        self._assets: Dict[str, _AssetEntry] = {}
+        self._asset_by_pk: Dict[int, str] = {}
+        self._reconciling = 0  # database reads in flight
+        self._replay: List[VtxoChange] = []  # changes applied while a read was in flight
+
+    # Building and reconciliation
+
+    def rebuild(self) -> bool:
+        """Load the index from the database; the index serves reads only after this succeeds"""
+        if self.reconcile():
+            self.ready = True
+            logger.info(f"✅ VTXO availability index built for {len(self._assets)} asset(s)")
+        return self.ready
+
+    def reconcile(self, asset_id: Optional[str] = None) -> bool:
+        """
+        Replace the index state (all assets, or one) with the database contents
+
+        The database is read without holding the index lock. Changes committed
+        while the read runs are recorded and re-applied on top of the new state
+        when it is swapped in, so they are not lost.
+        """
+        with self._lock:
+            self._reconciling += 1
+            replay_from = len(self._replay)
+        try:
+            assets = self._read_state(asset_id)
+        except Exception as e:
+            logger.error(f"❌ Failed to reconcile VTXO availability index: {e}")
+            self._end_reconcile()
+            return False
+
+        with self._lock:
+            if asset_id is None:
+                self._assets = assets
+                self._asset_by_pk = {pk: a for a, entry in assets.items() for pk in entry.live}
+            else:
+                previous = self._assets.pop(asset_id, None)
+                if previous:
+                    for pk in previous.live:
+                        self._asset_by_pk.pop(pk, None)
+                if asset_id in assets:
+                    self._assets[asset_id] = assets[asset_id]
+                    self._asset_by_pk.update({pk: asset_id for pk in assets[asset_id].live})
+            for change in self._replay[replay_from:]:
+                self._apply(change)
+            self.last_reconciled_at = utc_now()
+            self._end_reconcile()
+        return True
+
+    def _end_reconcile(self):
+        with self._lock:
+            self._reconciling -= 1
+            if not self._reconciling:
+                self._replay.clear()
+
+    def _read_state(self, asset_id: Optional[str]) -> Dict[str, _AssetEntry]:
+        """Load per-asset index state from the database"""
+        session = get_session()
+        try:
+            count_query = session.query(Vtxo.asset_id, Vtxo.status, func.count(Vtxo.id))
+            live_query = session.query(
+                Vtxo.id, Vtxo.asset_id, Vtxo.amount_sats, Vtxo.expires_at, Vtxo.status
+            ).filter(Vtxo.status.in_(LIVE_STATUSES))
+            if asset_id is not None:
+                count_query = count_query.filter(Vtxo.asset_id == asset_id)
+                live_query = live_query.filter(Vtxo.asset_id == asset_id)
+
+            assets: Dict[str, _AssetEntry] = {}
+            for row_asset, status, count in count_query.group_by(Vtxo.asset_id, Vtxo.status).all():
+                assets.setdefault(row_asset, _AssetEntry()).counts[status] = count
+
+            now = utc_now()
+            pool_entries: Dict[str, List[Tuple[int, int]]] = {}
+            for pk, row_asset, amount, expires_at, status in live_query.all():
+                entry = assets.setdefault(row_asset, _AssetEntry())
+                in_pool = status == 'available' and expires_at is not None and expires_at > now
+                entry.live[pk] = [status, amount, expires_at, in_pool]
+                if in_pool:
+                    pool_entries.setdefault(row_asset, []).append((amount, pk))
+                    entry.expiry_heap.append((expires_at, pk))
+
+            for row_asset, entry in assets.items():
+                entry.pool = VtxoPoolView(pool_entries.get(row_asset))
+                heapq.heapify(entry.expiry_heap)
+            return assets
+        finally:
+            session.close()
+
+    def start_reconciliation(self):
+        """Start the periodic reconciliation thread; it builds the index first if needed"""
+        if self._start(lazy=False):
+            logger.info("🔄 VTXO availability index reconciliation started")
+
+    def ensure_started(self):
+        """Build the index in the background on first use in this process, unless it was stopped"""
+        if not self.running and not self.stopped and self._start(lazy=True):
+            logger.info("🔄 VTXO availability index build started on first use")
+
+    def _start(self, lazy: bool) -> bool:
+        with self._start_lock:
+            if self.running or (lazy and self.stopped):
+                return False
+            self.stopped = False
+            self.running = True
+        reconcile_thread = threading.Thread(target=self._reconcile_loop, daemon=True)
+        reconcile_thread.start()
+        return True
+
+    def stop_reconciliation(self):
+        """Stop the reconciliation thread and stop serving reads from the index"""
+        with self._start_lock:
+            self.stopped = True
+            self.running = False
+            self.ready = False
+        logger.info("⏹️  VTXO availability index reconciliation stopped")
+
+    def _reconcile_loop(self):
+        while self.running:
+            if self.ready:
+                time.sleep(self.reconcile_interval)
+            if not self.running:
+                break
+            if self.ready:
+                self.reconcile()
+            elif not self.rebuild():
+                time.sleep(self.reconcile_interval)
+
+    # Change application
+
+    def apply_changes(self, changes: Iterable[VtxoChange]):
+        """Apply committed row changes; re-applying a change already reflected is a no-op"""
+        with self._lock:
+            for change in changes:
+                self._apply(change)
+                if self._reconciling:
+                    self._replay.append(change)
+
+    @property
+    def tracking(self) -> bool:
+        """Whether committed changes must be collected: the index is built or being read"""
+        return self.ready or self._reconciling > 0
+
+    def _apply(self, change: VtxoChange):
+        pk = change.vtxo_pk
+        asset_id = change.asset_id or self._asset_by_pk.get(pk)
+        if asset_id is None:
+            return  # untracked row with no asset; the next reconcile picks it up
+        entry = self._assets.setdefault(asset_id, _AssetEntry())
+        current = entry.live.get(pk)
+
+        if current is None:
+            # Terminal rows are only counted on insert; anything else is unknown here
+            if not change.created or change.status is None:
+                return
+            entry.counts[change.status] += 1
+            if change.status in LIVE_STATUSES:
+                self._track(entry, asset_id, pk, change.status, change.amount_sats, change.expires_at)
+            return
+
+        status, amount, expires_at, in_pool = current
+        if change.status == status:
+            return
+
+        entry.counts[status] -= 1
+        if in_pool:
+            entry.pool.remove(amount, pk)
+        del entry.live[pk]
+        self._asset_by_pk.pop(pk, None)
+
+        if change.status is None:
+            return
+        entry.counts[change.status] += 1
+        if change.status in LIVE_STATUSES:
+            self._track(entry, asset_id, pk, change.status,
+                        change.amount_sats if change.amount_sats is not None else amount,
+                        change.expires_at or expires_at)
+
+    def _track(self, entry: _AssetEntry, asset_id: str, pk: int, status: str,
+               amount: Optional[int], expires_at: Optional[datetime]):
+        if amount is None:
+            return
+        in_pool = status == 'available' and expires_at is not None and expires_at > utc_now()
+        entry.live[pk] = [status, amount, expires_at, in_pool]
+        self._asset_by_pk[pk] = asset_id
+        if in_pool:
+            entry.pool.add(amount, pk)
+            heapq.heappush(entry.expiry_heap, (expires_at, pk))
+
+    def discard(self, vtxo_pks: Iterable[int]):
+        """
+        Drop rows from the assignable pool after a claim found them taken
+
+        Counts are left alone (the row's new status is unknown); the next
+        reconcile restores exact numbers.
+        """
+        with self._lock:
+            for pk in vtxo_pks:
+                asset_id = self._asset_by_pk.get(pk)
+                entry = self._assets.get(asset_id) if asset_id else None
+                current = entry.live.get(pk) if entry else None
+                if current and current[3]:
+                    entry.pool.remove(current[1], pk)
+                    current[3] = False
+
+    def _prune_expired(self, entry: _AssetEntry):
+        """Remove pool entries whose expiry has passed (their status is updated by the sweeper)"""
+        now = utc_now()
+        heap = entry.expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, pk = heapq.heappop(heap)
+            current = entry.live.get(pk)
+            if current and current[3] and current[2] == expires_at:
+                entry.pool.remove(current[1], pk)
+                current[3] = False
+
+    # Reads
+
+    def candidates(self, asset_id: str, amount_needed: int, limit: Optional[int] = None) -> List[int]:
+        """Row ids of the smallest available, unexpired VTXOs covering ``amount_needed``"""
+        limit = limit or self.candidate_limit
+        with self._lock:
+            entry = self._assets.get(asset_id)
+            if not entry:
+                return []
+            self._prune_expired(entry)
+            start = entry.pool.first_covering(amount_needed)
+            return entry.pool.ids[start:start + limit]
+
+    def select(self, asset_id: str, amount_needed: int, selector):
+        """Run a CoinSelector over the asset's in-memory pool"""
+        with self._lock:
+            entry = self._assets.get(asset_id)
+            if not entry:
+                return None
+            self._prune_expired(entry)
+            return selector.select(entry.pool, amount_needed)
+
+    def available_by_amount(self, asset_id: str, boundaries: List[int]) -> List[int]:
+        """
+        Count assignable VTXOs per amount band
+
+        Band i covers [boundaries[i], boundaries[i + 1]); the last band is open-ended.
+        Amounts below boundaries[0] are not counted.
+        """
+        with self._lock:
+            entry = self._assets.get(asset_id)
+            if not entry:
+                return [0] * len(boundaries)
+            self._prune_expired(entry)
+            positions = [entry.pool.first_covering(b) for b in boundaries] + [len(entry.pool)]
+            return [positions[i + 1] - positions[i] for i in range(len(boundaries))]
+
+    def status_counts(self, asset_id: str) -> Dict[str, int]:
+        """VTXO counts by status for an asset"""
+        with self._lock:
+            entry = self._assets.get(asset_id)
+            return {status: n for status, n in entry.counts.items() if n > 0} if entry else {}
+
+
+def stage_vtxo_changes(session, changes: Iterable[VtxoChange]):
+    """Queue index changes made through bulk statements; applied when ``session`` commits"""
+    if _vtxo_index is None or not _vtxo_index.tracking:
+        return
+    session.info.setdefault(_PENDING_KEY, []).extend(changes)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_vtxo_changes(session, flush_context):
+    """Record Vtxo rows changed by this flush; new/dirty/deleted still hold pre-flush state here"""
+    if _vtxo_index is None or not _vtxo_index.tracking:
+        return
+    changes = []
+    for obj in session.new:
+        if isinstance(obj, Vtxo):
+            changes.append(VtxoChange(obj.id, obj.status, obj.asset_id, obj.amount_sats,
+                                      obj.expires_at, created=True))
+    for obj in session.dirty:
+        if isinstance(obj, Vtxo) and inspect(obj).attrs.status.history.has_changes():
+            changes.append(VtxoChange(obj.id, obj.status, obj.asset_id, obj.amount_sats, obj.expires_at))
+    for obj in session.deleted:
+        if isinstance(obj, Vtxo):
+            changes.append(VtxoChange(obj.id, None, obj.asset_id))
+    if changes:
+        session.info.setdefault(_PENDING_KEY, []).extend(changes)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_vtxo_changes(session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes and _vtxo_index is not None:
+        _vtxo_index.apply_changes(changes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_vtxo_changes(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+# Global index instance
+_vtxo_index = None
+
+def get_vtxo_index() -> VtxoAvailabilityIndex:
+    """Get the global VTXO availability index"""
+    global _vtxo_index
+    if _vtxo_index is None:
+        _vtxo_index = VtxoAvailabilityIndex()
+    return _vtxo_index
@@ -10,16 +10,24 @@ This module implements the complete VTXO lifecycle management including:
 - L1 settlement operations
 """
 
+import bisect
+import hashlib
 import logging
+import math
 import threading
 import time
+from collections import Counter, deque
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Optional, Tuple
-from sqlalchemy import func, and_, or_
-from core.models import Vtxo, Asset, AssetBalance, Transaction, SigningSession, RGBAllocation, get_session
+from typing import Any, List, Dict, Optional, Tuple
+from sqlalchemy import func, and_, or_, insert, update, bindparam
+from core.config import Config
+from core.merkle import MerkleAccumulator
+from core.models import Vtxo, Asset, AssetBalance, Transaction, SigningSession, RGBAllocation, RGBContract, get_session
+from core.replica_routing import replica_read, stage_sticky_writes
+from core.vtxo_index import VtxoChange, VtxoPoolView, get_vtxo_index, stage_vtxo_changes
 from grpc_clients import get_grpc_manager, ServiceType
 from core.asset_manager import get_asset_manager
-from core.rgb_manager import get_rgb_manager
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +35,102 @@ def utc_now() -> datetime:
     """Return current UTC time as a naive datetime (UTC) without deprecation warnings."""
     return datetime.now(timezone.utc).replace(tzinfo=None)
 
+class DenominationLadder:
+    """
+    Fixed VTXO denominations ("rungs") for an asset
+
+    Minting VTXOs on a ladder lets most assignments be served by one VTXO of
+    exactly (or nearly) the requested amount instead of a split or multi-input spend.
+    """
+
+    SERIES = ('pow2', '1-2-5')
+
+    def __init__(self, rungs: List[int]):
+        self.rungs = sorted(set(rungs))
+
+    @classmethod
+    def from_series(cls, series: str, min_sats: int, max_sats: int) -> 'DenominationLadder':
+        """Build a ladder of powers of two ('pow2') or 1/2/5 x 10^n ('1-2-5') within [min_sats, max_sats]"""
+        if series == 'pow2':
+            rungs = [1 << k for k in range(max_sats.bit_length()) if min_sats <= (1 << k) <= max_sats]
+        elif series == '1-2-5':
+            rungs = [d * 10 ** k for k in range(len(str(max_sats))) for d in (1, 2, 5)
+                     if min_sats <= d * 10 ** k <= max_sats]
+        else:
+            raise ValueError(f"Unknown denomination series '{series}' (expected one of {cls.SERIES})")
+        if not rungs:
+            raise ValueError(f"Denomination series '{series}' has no rungs in [{min_sats}, {max_sats}]")
+        return cls(rungs)
+
+    def rung_for(self, amount: int) -> int:
+        """Smallest rung covering ``amount`` (the largest rung for bigger amounts)"""
+        i = bisect.bisect_left(self.rungs, amount)
+        return self.rungs[min(i, len(self.rungs) - 1)]
+
+
+class DemandHistogram:
+    """Requested amounts per asset over a sliding window of recent assignments"""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._amounts: Dict[str, deque] = {}
+
+    def record(self, asset_id: str, amount: int):
+        with self._lock:
+            self._amounts.setdefault(asset_id, deque(maxlen=self.window)).append(amount)
+
+    def shares(self, asset_id: str, ladder: DenominationLadder) -> Dict[int, float]:
+        """Fraction of recent demand per rung; uniform when nothing has been observed"""
+        with self._lock:
+            amounts = list(self._amounts.get(asset_id, ()))
+        if not amounts:
+            return {rung: 1 / len(ladder.rungs) for rung in ladder.rungs}
+        counts = Counter(ladder.rung_for(amount) for amount in amounts)
+        return {rung: counts.get(rung, 0) / len(amounts) for rung in ladder.rungs}
+
+
+class DemandForecaster:
+    """
+    Per-asset EWMA of VTXO assignments per minute
+
+    Assignments are counted in one-minute buckets; each closed bucket is folded
+    into the average, and minutes without assignments decay it.
+    """
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha  # Weight of the most recent minute
+        self._lock = threading.Lock()
+        self._state: Dict[str, List[float]] = {}  # asset_id -> [ewma, bucket_minute, bucket_count]
+
+    def _roll(self, state: List[float], minute: int):
+        elapsed = minute - int(state[1])
+        if elapsed <= 0:
+            return
+        state[0] = self.alpha * state[2] + (1 - self.alpha) * state[0]
+        state[0] *= (1 - self.alpha) ** (elapsed - 1)
+        state[1], state[2] = minute, 0
+
+    def record(self, asset_id: str, count: int = 1, now: Optional[float] = None):
+        """Record ``count`` assignments for an asset"""
+        minute = int((now if now is not None else time.time()) // 60)
+        with self._lock:
+            state = self._state.setdefault(asset_id, [0.0, minute, 0])
+            self._roll(state, minute)
+            state[2] += count
+
+    def rate(self, asset_id: str, now: Optional[float] = None) -> float:
+        """Forecast assignments per minute for an asset"""
+        minute = int((now if now is not None else time.time()) // 60)
+        with self._lock:
+            state = self._state.get(asset_id)
+            if not state:
+                return 0.0
+            self._roll(state, minute)
+            # A busy current minute should count before it closes
+            return max(state[0], float(state[2]))
+
+
 class VtxoInventoryMonitor:
     """Monitors VTXO inventory levels and triggers replenishment"""
 
@@ -34,8 +138,18 @@ class VtxoInventoryMonitor:
         self.min_vtxos_per_asset = 10  # Minimum VTXOs to maintain per asset
         self.max_vtxos_per_asset = 100  # Maximum VTXOs to create in one batch
         self.replenishment_threshold = 0.3  # Trigger replenishment at 30% capacity
-        self.monitoring_interval = 300  # Check every 5 minutes
+        self.monitoring_interval = 900  # Safety-net rescan; assignments trigger replenishment directly
+        self.replenishment_lead_minutes = 5  # Keep at least this many minutes of forecast demand available
+        self.replenishment_horizon_minutes = 30  # Size batches to cover this many minutes of demand
+        self.replenishment_debounce_seconds = 2.0  # Coalesce triggers for an asset within this window
+        self.replenishment_cooldown_seconds = 60  # Ignore triggers while a batch for the asset is in flight
+        self.demand_forecaster = DemandForecaster()
+        self.demand_histogram = DemandHistogram()
+        self.denomination_ladders = self._load_denomination_ladders()
         self.running = False
+        self._trigger_lock = threading.Lock()
+        self._pending_checks: Dict[str, threading.Timer] = {}
+        self._cooldown_until: Dict[str, float] = {}
 
     def start_monitoring(self):
         """Start the inventory monitoring thread"""
@@ -84,38 +198,119 @@ class VtxoInventoryMonitor:
 
     def get_asset_inventory_status(self, session, asset_id: str) -> Dict:
         """Get current inventory status for an asset"""
-        # Count VTXOs by status
-        available_count = session.query(func.count(Vtxo.id)).filter(
-            and_(Vtxo.asset_id == asset_id, Vtxo.status == 'available')
-        ).scalar() or 0
-
-        assigned_count = session.query(func.count(Vtxo.id)).filter(
-            and_(Vtxo.asset_id == asset_id, Vtxo.status == 'assigned')
-        ).scalar() or 0
+        # Count VTXOs by status, from the in-memory index once it is built
+        availability_index = get_vtxo_index()
+        if availability_index.ready:
+            counts = availability_index.status_counts(asset_id)
+        else:
+            counts = dict(session.query(Vtxo.status, func.count(Vtxo.id)).filter(
+                Vtxo.asset_id == asset_id
+            ).group_by(Vtxo.status).all())
 
-        total_count = session.query(func.count(Vtxo.id)).filter(
-            Vtxo.asset_id == asset_id
-        ).scalar() or 0
+        available_count = counts.get('available', 0)
+        assigned_count = counts.get('assigned', 0)
+        total_count = sum(counts.values())
 
         # Calculate utilization
         utilization = assigned_count / total_count if total_count > 0 else 0
 
+        low_watermark = self.low_watermark(asset_id)
+
         # Determine if replenishment is needed
         needs_replenishment = (
-            available_count < self.min_vtxos_per_asset or
+            available_count < low_watermark or
             utilization > self.replenishment_threshold or
             total_count < self.min_vtxos_per_asset
         )
 
-        return {
+        status = {
             'asset_id': asset_id,
             'available_vtxos': available_count,
             'assigned_vtxos': assigned_count,
             'total_vtxos': total_count,
             'utilization': utilization,
+            'demand_per_minute': self.demand_forecaster.rate(asset_id),
+            'low_watermark': low_watermark,
             'needs_replenishment': needs_replenishment
         }
 
+        ladder = self.ladder_for(asset_id)
+        if ladder:
+            status['available_by_denomination'] = self.available_by_rung(session, asset_id, ladder)
+
+        return status
+
+    def _load_denomination_ladders(self) -> Dict[str, DenominationLadder]:
+        """Per-asset ladders from VTXO_DENOMINATION_LADDERS; invalid entries are skipped"""
+        config = Config()
+        ladders = {}
+        for asset_id, series in config.VTXO_DENOMINATION_LADDERS.items():
+            try:
+                ladders[asset_id] = DenominationLadder.from_series(
+                    series, config.VTXO_MIN_AMOUNT_SATS, config.VTXO_MAX_DENOMINATION_SATS
+                )
+            except ValueError as e:
+                logger.error(f"❌ Ignoring denomination ladder for {asset_id}: {e}")
+        return ladders
+
+    def ladder_for(self, asset_id: str) -> Optional[DenominationLadder]:
+        """Denomination ladder for an asset, or None to mint at the default amount"""
+        return self.denomination_ladders.get(asset_id) or self.denomination_ladders.get('*')
+
+    def available_by_rung(self, session, asset_id: str, ladder: DenominationLadder) -> Dict[int, int]:
+        """
+        Available VTXOs per rung; a VTXO counts towards the highest rung not above
+        its amount (off-ladder amounts such as split change still serve that rung)
+        """
+        availability_index = get_vtxo_index()
+        if availability_index.ready:
+            counts = availability_index.available_by_amount(asset_id, ladder.rungs)
+            return dict(zip(ladder.rungs, counts))
+
+        by_rung = {rung: 0 for rung in ladder.rungs}
+        rows = session.query(Vtxo.amount_sats, func.count(Vtxo.id)).filter(
+            and_(Vtxo.asset_id == asset_id, Vtxo.status == 'available', Vtxo.expires_at > utc_now())
+        ).group_by(Vtxo.amount_sats).all()
+        for amount, count in rows:
+            i = bisect.bisect_right(ladder.rungs, amount) - 1
+            if i >= 0:
+                by_rung[ladder.rungs[i]] += count
+        return by_rung
+
+    def plan_denominations(self, asset_id: str, count: int,
+                           available: Dict[int, int]) -> List[Tuple[int, int]]:
+        """
+        Split a replenishment of ``count`` VTXOs across the asset's ladder rungs
+
+        Each rung's target share of the post-replenishment inventory follows the
+        demand histogram; the new VTXOs go to the rungs furthest below target
+        (largest-remainder rounding).
+
+        Returns:
+            (amount_sats, count) pairs with count > 0
+        """
+        ladder = self.ladder_for(asset_id)
+        shares = self.demand_histogram.shares(asset_id, ladder)
+        total_after = sum(available.values()) + count
+
+        deficits = {rung: max(0.0, shares[rung] * total_after - available.get(rung, 0)) for rung in ladder.rungs}
+        weight = sum(deficits.values())
+        if weight <= 0:
+            deficits, weight = shares, 1.0
+
+        exact = {rung: count * deficits[rung] / weight for rung in ladder.rungs}
+        plan = {rung: int(exact[rung]) for rung in ladder.rungs}
+        leftover = count - sum(plan.values())
+        for rung in sorted(ladder.rungs, key=lambda r: exact[r] - plan[r], reverse=True)[:leftover]:
+            plan[rung] += 1
+
+        return [(rung, n) for rung, n in plan.items() if n > 0]
+
+    def low_watermark(self, asset_id: str) -> int:
+        """Available VTXO count below which an asset is replenished"""
+        forecast = self.demand_forecaster.rate(asset_id) * self.replenishment_lead_minutes
+        return max(self.min_vtxos_per_asset, math.ceil(forecast))
+
     def calculate_replenishment_amount(self, inventory_status: Dict) -> int:
         """Calculate how many VTXOs to create"""
         available = inventory_status['available_vtxos']
@@ -130,7 +325,61 @@ class VtxoInventoryMonitor:
         else:
             additional_needed = self.min_vtxos_per_asset
 
-        return min(deficit_to_min + additional_needed, self.max_vtxos_per_asset)
+        # Cover forecast demand over the replenishment horizon
+        demand = inventory_status.get('demand_per_minute', 0) * self.replenishment_horizon_minutes
+        forecast_needed = max(0, math.ceil(demand) - available)
+
+        return min(max(deficit_to_min + additional_needed, forecast_needed), self.max_vtxos_per_asset)
+
+    def on_assignment(self, asset_id: str, count: int = 1, amount_needed: Optional[int] = None):
+        """
+        Assignment event hook: record demand (rate and requested amount) and check
+        the low watermark
+
+        Only active while monitoring runs. The check is cheap when the availability
+        index is built. Triggers for the same asset are debounced into one delayed
+        inventory check, and ignored while a replenishment enqueued for it is still
+        in its cooldown window.
+        """
+        self.demand_forecaster.record(asset_id, count)
+        if amount_needed is not None:
+            self.demand_histogram.record(asset_id, amount_needed)
+        if not self.running:
+            return
+
+        availability_index = get_vtxo_index()
+        if availability_index.ready:
+            available = availability_index.status_counts(asset_id).get('available', 0)
+            if available >= self.low_watermark(asset_id):
+                return
+
+        with self._trigger_lock:
+            if asset_id in self._pending_checks:
+                return
+            if time.monotonic() < self._cooldown_until.get(asset_id, 0):
+                return
+            timer = threading.Timer(self.replenishment_debounce_seconds, self._run_pending_check, args=[asset_id])
+            timer.daemon = True
+            self._pending_checks[asset_id] = timer
+        timer.start()
+
+    def _run_pending_check(self, asset_id: str):
+        """Debounced inventory check for one asset; enqueues at most one replenishment"""
+        session = get_session()
+        try:
+            inventory_status = self.get_asset_inventory_status(session, asset_id)
+            if inventory_status['needs_replenishment']:
+                replenishment_needed = self.calculate_replenishment_amount(inventory_status)
+                if replenishment_needed > 0:
+                    logger.info(f"📉 Asset {asset_id} below low watermark "
+                                f"({inventory_status['available_vtxos']} < {inventory_status['low_watermark']})")
+                    self.trigger_replenishment(asset_id, replenishment_needed)
+        except Exception as e:
+            logger.error(f"❌ Replenishment check failed for asset {asset_id}: {e}")
+        finally:
+            session.close()
+            with self._trigger_lock:
+                self._pending_checks.pop(asset_id, None)
 
     def trigger_replenishment(self, asset_id: str, count: int):
         """Trigger VTXO replenishment process"""
@@ -138,30 +387,202 @@ class VtxoInventoryMonitor:
             logger.info(f"🔄 Triggering VTXO replenishment for asset {asset_id}: {count} VTXOs")
 
             # Enqueue replenishment job
+            # Assets with a denomination ladder get the batch split across its rungs
+            denominations = None
+            ladder = self.ladder_for(asset_id)
+            if ladder:
+                session = get_session()
+                try:
+                    available = self.available_by_rung(session, asset_id, ladder)
+                finally:
+                    session.close()
+                denominations = self.plan_denominations(asset_id, count, available)
+                logger.info(f"🪜 Denominations for {asset_id}: {denominations}")
+
             from core.tasks import enqueue_vtxo_replenishment
-            enqueue_vtxo_replenishment(asset_id, count)
+            enqueue_vtxo_replenishment(asset_id, count, coalesce_seconds=self.replenishment_cooldown_seconds,
+                                       denominations=denominations)
+            with self._trigger_lock:
+                self._cooldown_until[asset_id] = time.monotonic() + self.replenishment_cooldown_seconds
 
         except Exception as e:
             logger.error(f"❌ Failed to trigger VTXO replenishment: {e}")
 
 
+@dataclass
+class CoinSelection:
+    """Result of a coin selection: chosen VTXO row ids and resulting change"""
+    ids: List[int]
+    amounts: List[int]
+    target: int
+    strategy: str
+
+    @property
+    def total(self) -> int:
+        return sum(self.amounts)
+
+    @property
+    def change(self) -> int:
+        return self.total - self.target
+
+
+class CoinSelector:
+    """
+    Chooses VTXOs covering a target amount from a VtxoPoolView.
+
+    Preference order (changeless spends avoid a split round trip to arkd):
+    1. a single VTXO matching the target exactly
+    2. an exact multi-VTXO match found by branch-and-bound (fewest inputs)
+    3. the smallest single VTXO covering the target (least change)
+    4. largest-first accumulation, with the last input swapped for the smallest
+       VTXO that still covers the remainder (knapsack-style change reduction)
+
+    Work is bounded independently of pool size: branch-and-bound only branches
+    over the largest ``bnb_window`` VTXOs below the target (with a binary-search
+    lookup of the exact complement over the whole pool at every node) and stops
+    after ``bnb_max_tries`` nodes.
+    """
+
+    def __init__(self, max_inputs: int = 4, bnb_window: int = 32, bnb_max_tries: int = 500):
+        self.max_inputs = max_inputs
+        self.bnb_window = bnb_window
+        self.bnb_max_tries = bnb_max_tries
+
+    def select(self, pool: VtxoPoolView, target: int) -> Optional[CoinSelection]:
+        """Select VTXOs for ``target`` sats, or None if the pool cannot cover it"""
+        if target <= 0 or not pool.amounts or pool.total < target:
+            return None
+
+        amounts = pool.amounts
+        idx = bisect.bisect_left(amounts, target)
+
+        if idx < len(amounts) and amounts[idx] == target:
+            return self._result(pool, [idx], target, 'exact_single')
+
+        exact = self._branch_and_bound(amounts, idx, target)
+        if exact:
+            return self._result(pool, exact, target, 'branch_and_bound')
+
+        if idx < len(amounts):
+            return self._result(pool, [idx], target, 'single')
+
+        return self._result(pool, self._largest_first(amounts, target), target, 'largest_first')
+
+    def _branch_and_bound(self, amounts: List[int], upper: int, target: int) -> Optional[List[int]]:
+        """Depth-first search for a changeless set of at most ``max_inputs`` VTXOs below ``target``"""
+        if self.max_inputs < 2 or upper == 0:
+            return None
+
+        lo = max(0, upper - self.bnb_window)
+        window = list(range(upper - 1, lo - 1, -1))  # indices, largest amount first
+        # suffix_sum[i]: sum of window[i:]; with the largest possible complement this bounds
+        # what any branch starting at i can still reach
+        largest = amounts[upper - 1]
+        suffix_sum = [0] * (len(window) + 1)
+        for i in range(len(window) - 1, -1, -1):
+            suffix_sum[i] = suffix_sum[i + 1] + amounts[window[i]]
+
+        best: List[Optional[List[int]]] = [None]
+        tries = [0]
+
+        def complement(remaining: int, chosen: List[int]) -> Optional[int]:
+            j = bisect.bisect_left(amounts, remaining, 0, upper)
+            while j < upper and amounts[j] == remaining:
+                if j not in chosen:
+                    return j
+                j += 1
+            return None
+
+        def search(start: int, remaining: int, chosen: List[int]) -> None:
+            tries[0] += 1
+            if tries[0] > self.bnb_max_tries:
+                return
+            if best[0] is not None and len(chosen) + 1 >= len(best[0]):
+                return
+
+            j = complement(remaining, chosen)
+            if j is not None:
+                best[0] = chosen + [j]
+                return
+            if len(chosen) + 2 > self.max_inputs:
+                return
+
+            for pos in range(start, len(window)):
+                amount = amounts[window[pos]]
+                if amount >= remaining:
+                    continue
+                if suffix_sum[pos] + largest < remaining:
+                    return
+                search(pos + 1, remaining - amount, chosen + [window[pos]])
+                if tries[0] > self.bnb_max_tries:
+                    return
+
+        search(0, target, [])
+        return best[0]
+
+    def _largest_first(self, amounts: List[int], target: int) -> List[int]:
+        """Accumulate from the largest VTXO down, then shrink change on the last input"""
+        chosen = []
+        covered = 0
+        pos = len(amounts) - 1
+        while covered < target:
+            chosen.append(pos)
+            covered += amounts[pos]
+            pos -= 1
+
+        # Replace the last input with the smallest unused VTXO that still covers the remainder
+        remaining = target - (covered - amounts[chosen[-1]])
+        j = bisect.bisect_left(amounts, remaining, 0, pos + 1)
+        if j <= pos and amounts[j] < amounts[chosen[-1]]:
+            chosen[-1] = j
+        return chosen
+
+    def _result(self, pool: VtxoPoolView, indices: List[int], target: int, strategy: str) -> CoinSelection:
+        return CoinSelection(
+            ids=[pool.ids[i] for i in indices],
+            amounts=[pool.amounts[i] for i in indices],
+            target=target,
+            strategy=strategy
+        )
+
+
 class VtxoManager:
     """Main VTXO management class"""
 
+    # Backends that support SELECT ... FOR UPDATE SKIP LOCKED
+    SKIP_LOCKED_DIALECTS = ('mysql', 'mariadb', 'postgresql')
+
     def __init__(self):
         self.inventory_monitor = VtxoInventoryMonitor()
         self.default_vtxo_amount = 100000  # 100k sats default VTXO size
         self.vtxo_expiry_hours = 24  # VTXOs expire after 24 hours
         self.dust_limit_sats = 1  # VTXOs are off-chain, so dust limit is 1 satoshi
+        self.assignment_claim_candidates = 16  # Rows tried per compare-and-swap assignment
+        self.assignment_claim_retries = 3  # Re-selections when a multi-VTXO claim loses a race
+        self.coin_selector = CoinSelector()
+        self.vtxo_insert_chunk_size = 500  # Rows per multi-row INSERT
+        self.availability_index = get_vtxo_index()
+        self.lazy_index_build = Config().VTXO_INDEX_LAZY_BUILD
+
+    def _index_ready(self) -> bool:
+        """Whether the availability index can serve reads; starts its lazy build otherwise"""
+        if self.availability_index.ready:
+            return True
+        if self.lazy_index_build:
+            self.availability_index.ensure_started()
+        return False
 
     def start_services(self):
         """Start all VTXO management services"""
+        self.availability_index.rebuild()
+        self.availability_index.start_reconciliation()
         self.inventory_monitor.start_monitoring()
         logger.info("✅ VTXO management services started")
 
     def stop_services(self):
         """Stop all VTXO management services"""
         self.inventory_monitor.stop_monitoring()
+        self.availability_index.stop_reconciliation()
         logger.info("⏹️  VTXO management services stopped")
 
     def create_vtxo_batch(self, asset_id: str, count: int, amount_sats: Optional[int] = None) -> bool:
@@ -202,9 +623,9 @@ class VtxoManager:
                 return False
 
             # Store VTXOs in database
-            self._store_vtxo_batch(session, vtxo_batch, asset_id, amount_sats)
+            inserted = self._store_vtxo_batch(session, vtxo_batch, asset_id, amount_sats)
 
-            logger.info(f"✅ Created {count} VTXOs for asset {asset_id}")
+            logger.info(f"✅ Created {inserted} VTXOs for asset {asset_id}")
             return True
 
         except Exception as e:
@@ -213,26 +634,113 @@ class VtxoManager:
         finally:
             session.close()
 
-    def _store_vtxo_batch(self, session, vtxo_batch: Dict, asset_id: str, amount_sats: int):
-        """Store created VTXOs in database"""
-        expiry_time = utc_now() + timedelta(hours=self.vtxo_expiry_hours)
+    def _store_vtxo_batch(self, session, vtxo_batch: Dict, asset_id: str, amount_sats: int) -> int:
+        """
+        Store created VTXOs in database
 
-        for vtxo_data in vtxo_batch.get('vtxos', []):
-            vtxo = Vtxo(
-                vtxo_id=vtxo_data['vtxo_id'],
-                txid=vtxo_data['txid'],
-                vout=vtxo_data['vout'],
-                amount_sats=amount_sats,
-                script_pubkey=bytes.fromhex(vtxo_data['script_pubkey']),
-                asset_id=asset_id,
-                user_pubkey='',  # Unassigned initially
-                status='available',
-                expires_at=expiry_time
-            )
-            session.add(vtxo)
+        Rows are written with chunked multi-row INSERTs rather than one ORM object
+        each. VTXO ids that already exist (e.g. a replenishment job retried after
+        a partial failure) are skipped.
 
+        Returns:
+            Number of VTXOs inserted
+        """
+        now = utc_now()
+        expiry_time = now + timedelta(hours=self.vtxo_expiry_hours)
+
+        rows = {}
+        for vtxo_data in vtxo_batch.get('vtxos', []):
+            rows.setdefault(vtxo_data['vtxo_id'], {
+                'vtxo_id': vtxo_data['vtxo_id'],
+                'txid': vtxo_data['txid'],
+                'vout': vtxo_data['vout'],
+                'amount_sats': amount_sats,
+                'script_pubkey': bytes.fromhex(vtxo_data['script_pubkey']),
+                'asset_id': asset_id,
+                'user_pubkey': '',  # Unassigned initially
+                'status': 'available',
+                'created_at': now,
+                'expires_at': expiry_time
+            })
+
+        inserted = self._insert_vtxo_rows(session, list(rows.values()))
         session.commit()
 
+        skipped = len(vtxo_batch.get('vtxos', [])) - inserted
+        if skipped:
+            logger.warning(f"⚠️  Skipped {skipped} duplicate VTXO(s) in batch for asset {asset_id}")
+        return inserted
+
+    def _insert_vtxo_rows(self, session, rows: List[Dict]) -> int:
+        """
+        Insert VTXO rows in chunks, ignoring rows whose vtxo_id already exists
+
+        Each chunk is one executemany (batched into multi-row INSERTs by the
+        driver/SQLAlchemy). Duplicates are dropped with ON CONFLICT DO NOTHING
+        (PostgreSQL/SQLite) or a no-op ON DUPLICATE KEY UPDATE (MySQL/MariaDB);
+        other backends filter out existing ids first. Does not commit.
+
+        Returns:
+            Number of rows inserted
+        """
+        dialect = session.get_bind().dialect
+        filter_existing = False
+        if dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            stmt = dialect_insert(Vtxo).on_conflict_do_nothing(index_elements=['vtxo_id'])
+        elif dialect.name == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            stmt = dialect_insert(Vtxo).on_conflict_do_nothing(index_elements=['vtxo_id'])
+        elif dialect.name in ('mysql', 'mariadb'):
+            from sqlalchemy.dialects.mysql import insert as dialect_insert
+            stmt = dialect_insert(Vtxo)
+            stmt = stmt.on_duplicate_key_update(vtxo_id=stmt.inserted.vtxo_id)
+        else:
+            stmt = insert(Vtxo)
+            filter_existing = True
+
+        # RETURNING gives exact counts and row ids for the availability index
+        returning = dialect.insert_executemany_returning and dialect.name != 'mysql'
+        if returning:
+            stmt = stmt.returning(Vtxo.id, Vtxo.vtxo_id)
+
+        inserted = 0
+        for i in range(0, len(rows), self.vtxo_insert_chunk_size):
+            chunk = rows[i:i + self.vtxo_insert_chunk_size]
+
+            if filter_existing:
+                existing = {
+                    row.vtxo_id for row in session.query(Vtxo.vtxo_id).filter(
+                        Vtxo.vtxo_id.in_([r['vtxo_id'] for r in chunk])
+                    ).all()
+                }
+                chunk = [r for r in chunk if r['vtxo_id'] not in existing]
+                if not chunk:
+                    continue
+
+            result = session.execute(stmt, chunk)
+            if returning:
+                inserted_rows = result.all()
+                inserted += len(inserted_rows)
+                if inserted_rows and self.availability_index.ready:
+                    by_vtxo_id = {r['vtxo_id']: r for r in chunk}
+                    changes = []
+                    for pk, vtxo_id in inserted_rows:
+                        row = by_vtxo_id[vtxo_id]
+                        changes.append(VtxoChange(pk, row['status'], row['asset_id'], row['amount_sats'],
+                                                  row['expires_at'], created=True))
+                    stage_vtxo_changes(session, changes)
+            else:
+                inserted += result.rowcount
+                if self.availability_index.ready:
+                    # Without RETURNING, re-read the rows; ones the index already tracks are no-ops
+                    rows_now = session.query(
+                        Vtxo.id, Vtxo.status, Vtxo.asset_id, Vtxo.amount_sats, Vtxo.expires_at
+                    ).filter(Vtxo.vtxo_id.in_([r['vtxo_id'] for r in chunk])).all()
+                    stage_vtxo_changes(session, [VtxoChange(*row, created=True) for row in rows_now])
+
+        return inserted
+
     def estimate_batch_creation_fees(self, count: int, amount_sats: int) -> int:
         """Estimate fees for creating a batch of VTXOs"""
         # Basic fee estimation based on transaction size
@@ -246,26 +754,14 @@ class VtxoManager:
         """Assign an available VTXO to a user"""
         session = get_session()
         try:
-            # Find an available VTXO for the asset
-            vtxo = session.query(Vtxo).filter(
-                and_(
-                    Vtxo.asset_id == asset_id,
-                    Vtxo.status == 'available',
-                    Vtxo.amount_sats >= amount_needed,
-                    Vtxo.expires_at > utc_now()
-                )
-            ).order_by(Vtxo.amount_sats.asc()).first()
+            vtxo = self._claim_vtxo(session, user_pubkey, asset_id, amount_needed)
 
             if not vtxo:
                 logger.warning(f"No available VTXO for user {user_pubkey[:8]}... asset {asset_id}")
                 return None
 
-            # Assign VTXO to user
-            vtxo.user_pubkey = user_pubkey
-            vtxo.status = 'assigned'
-            session.commit()
-
             logger.info(f"✅ Assigned VTXO {vtxo.vtxo_id} to user {user_pubkey[:8]}...")
+            self._notify_assignment(asset_id, 1, amount_needed)
             return vtxo
 
         except Exception as e:
@@ -275,6 +771,206 @@ class VtxoManager:
         finally:
             session.close()
 
+    def _notify_assignment(self, asset_id: str, count: int, amount_needed: int):
+        """Feed the replenishment trigger; never fails the assignment itself"""
+        try:
+            self.inventory_monitor.on_assignment(asset_id, count, amount_needed)
+        except Exception as e:
+            logger.error(f"❌ Failed to record VTXO assignment for replenishment: {e}")
+
+    def _eligible_vtxos_query(self, session, asset_id: str, amount_needed: int):
+        """Available, unexpired VTXOs for an asset that cover the amount, smallest first"""
+        return session.query(Vtxo).filter(
+            and_(
+                Vtxo.asset_id == asset_id,
+                Vtxo.status == 'available',
+                Vtxo.amount_sats >= amount_needed,
+                Vtxo.expires_at > utc_now()
+            )
+        ).order_by(Vtxo.amount_sats.asc(), Vtxo.id.asc())
+
+    def _claim_vtxo(self, session, user_pubkey: str, asset_id: str, amount_needed: int) -> Optional[Vtxo]:
+        """
+        Atomically claim one eligible VTXO for a user and commit
+
+        On MariaDB/MySQL/PostgreSQL the row is locked with FOR UPDATE SKIP LOCKED, so
+        concurrent workers each take a different row instead of queueing on the same one.
+        Other backends (SQLite) use a conditional UPDATE ... WHERE status='available'
+        as a compare-and-swap, moving to the next candidate when another worker wins.
+
+        Returns:
+            The claimed VTXO (loaded, safe to read after the session closes) or None
+        """
+        dialect = session.get_bind().dialect.name
+
+        if dialect in self.SKIP_LOCKED_DIALECTS:
+            query = self._eligible_vtxos_query(session, asset_id, amount_needed)
+            vtxo = None
+            if self._index_ready():
+                candidate_ids = self.availability_index.candidates(
+                    asset_id, amount_needed, self.assignment_claim_candidates
+                )
+                if candidate_ids:
+                    vtxo = query.filter(Vtxo.id.in_(candidate_ids)).with_for_update(skip_locked=True).first()
+            if not vtxo:
+                vtxo = query.with_for_update(skip_locked=True).first()
+            if not vtxo:
+                session.rollback()
+                return None
+            vtxo.user_pubkey = user_pubkey
+            vtxo.status = 'assigned'
+            session.commit()
+            session.refresh(vtxo)
+            return vtxo
+
+        # Every lost race means another worker claimed a row, so this terminates
+        while True:
+            candidate_ids = self._candidate_ids(session, asset_id, amount_needed)
+            if not candidate_ids:
+                session.rollback()
+                return None
+
+            for vtxo_id in candidate_ids:
+                claimed = session.query(Vtxo).filter(
+                    and_(Vtxo.id == vtxo_id, Vtxo.status == 'available', Vtxo.expires_at > utc_now())
+                ).update({'status': 'assigned', 'user_pubkey': user_pubkey}, synchronize_session=False)
+                if claimed:
+                    stage_vtxo_changes(session, [VtxoChange(vtxo_id, 'assigned')])
+                    stage_sticky_writes(session, [user_pubkey])
+                session.commit()
+                if claimed:
+                    return session.query(Vtxo).filter(Vtxo.id == vtxo_id).first()
+                self.availability_index.discard([vtxo_id])
+
+    def _candidate_ids(self, session, asset_id: str, amount_needed: int) -> List[int]:
+        """
+        Row ids to try claiming, smallest first
+
+        Served from the availability index when it is built; falls back to the
+        database when the index has nothing, and reconciles the asset if the
+        database knows rows the index missed (e.g. created by another process).
+        """
+        if self._index_ready():
+            candidate_ids = self.availability_index.candidates(
+                asset_id, amount_needed, self.assignment_claim_candidates
+            )
+            if candidate_ids:
+                return candidate_ids
+
+        candidate_ids = [
+            row.id for row in self._eligible_vtxos_query(session, asset_id, amount_needed)
+            .with_entities(Vtxo.id).limit(self.assignment_claim_candidates).all()
+        ]
+        if candidate_ids and self.availability_index.ready:
+            self.availability_index.reconcile(asset_id)
+        return candidate_ids
+
+    def assign_vtxos_to_user(self, user_pubkey: str, asset_id: str, amount_needed: int) -> List[Vtxo]:
+        """
+        Assign one or more VTXOs covering ``amount_needed`` to a user
+
+        Uses CoinSelector over the asset's available pool and claims the whole
+        selection atomically; if another worker takes one of the chosen VTXOs first,
+        the selection is recomputed.
+
+        Returns:
+            Claimed VTXOs (empty if the pool cannot cover the amount)
+        """
+        session = get_session()
+        try:
+            for _ in range(self.assignment_claim_retries):
+                selection = self._select_vtxos(session, asset_id, amount_needed)
+                if not selection:
+                    break
+
+                vtxos = self._claim_vtxo_set(session, user_pubkey, selection.ids)
+                if vtxos:
+                    logger.info(f"✅ Assigned {len(vtxos)} VTXO(s) ({selection.strategy}, "
+                                f"change {selection.change} sats) to user {user_pubkey[:8]}...")
+                    self._notify_assignment(asset_id, len(vtxos), amount_needed)
+                    return vtxos
+                self._refresh_index_entries(session, selection.ids)
+
+            logger.warning(f"No VTXO selection for user {user_pubkey[:8]}... asset {asset_id} amount {amount_needed}")
+            return []
+
+        except Exception as e:
+            logger.error(f"❌ Failed to assign VTXOs: {e}")
+            session.rollback()
+            return []
+        finally:
+            session.close()
+
+    def _select_vtxos(self, session, asset_id: str, amount_needed: int) -> Optional[CoinSelection]:
+        """Coin selection over the in-memory pool, falling back to a bounded database pool view"""
+        if self._index_ready():
+            selection = self.availability_index.select(asset_id, amount_needed, self.coin_selector)
+            if selection:
+                return selection
+
+        selection = self.coin_selector.select(self.get_pool_view(session, asset_id, amount_needed), amount_needed)
+        if selection and self.availability_index.ready:
+            self.availability_index.reconcile(asset_id)
+        return selection
+
+    def _refresh_index_entries(self, session, vtxo_ids: List[int]):
+        """Re-read rows a claim failed on and apply their current state to the index"""
+        if not self.availability_index.ready:
+            return
+        rows = session.query(
+            Vtxo.id, Vtxo.status, Vtxo.asset_id, Vtxo.amount_sats, Vtxo.expires_at
+        ).filter(Vtxo.id.in_(vtxo_ids)).all()
+        session.rollback()
+        self.availability_index.apply_changes(VtxoChange(*row) for row in rows)
+
+    def get_pool_view(self, session, asset_id: str, amount_needed: int) -> VtxoPoolView:
+        """
+        Build a sorted pool view of the available, unexpired VTXOs selection can use for an amount
+
+        Only two bounded slices are read, whatever the pool size: the smallest VTXO
+        covering the amount (single-VTXO spends) and the largest ``bnb_window`` VTXOs
+        below it (exact matches and largest-first accumulation).
+        """
+        eligible = self._eligible_vtxos_query(session, asset_id, 0).with_entities(Vtxo.amount_sats, Vtxo.id)
+        rows = eligible.filter(Vtxo.amount_sats >= amount_needed).limit(1).all()
+        rows += eligible.filter(Vtxo.amount_sats < amount_needed).order_by(None).order_by(
+            Vtxo.amount_sats.desc(), Vtxo.id.desc()
+        ).limit(max(self.coin_selector.bnb_window, self.coin_selector.max_inputs)).all()
+        session.rollback()  # end the read transaction before claiming
+        return VtxoPoolView([(row.amount_sats, row.id) for row in rows])
+
+    def _claim_vtxo_set(self, session, user_pubkey: str, vtxo_ids: List[int]) -> List[Vtxo]:
+        """
+        Claim all of ``vtxo_ids`` in one transaction, or none of them
+
+        Returns:
+            The claimed VTXOs, or an empty list if any of them was no longer available
+        """
+        if session.get_bind().dialect.name in self.SKIP_LOCKED_DIALECTS:
+            locked = session.query(Vtxo.id).filter(
+                and_(Vtxo.id.in_(vtxo_ids), Vtxo.status == 'available')
+            ).with_for_update(skip_locked=True).all()
+            if len(locked) != len(vtxo_ids):
+                session.rollback()
+                return []
+
+        claimed = session.query(Vtxo).filter(
+            and_(
+                Vtxo.id.in_(vtxo_ids),
+                Vtxo.status == 'available',
+                Vtxo.expires_at > utc_now()
+            )
+        ).update({'status': 'assigned', 'user_pubkey': user_pubkey}, synchronize_session=False)
+
+        if claimed != len(vtxo_ids):
+            session.rollback()
+            return []
+
+        stage_vtxo_changes(session, [VtxoChange(vtxo_id, 'assigned') for vtxo_id in vtxo_ids])
+        stage_sticky_writes(session, [user_pubkey])
+        session.commit()
+        return session.query(Vtxo).filter(Vtxo.id.in_(vtxo_ids)).order_by(Vtxo.amount_sats.desc()).all()
+
     def mark_vtxo_spent(self, vtxo_id: str, spending_txid: str):
         """Mark a VTXO as spent"""
         session = get_session()
@@ -293,6 +989,7 @@ class VtxoManager:
         finally:
             session.close()
 
+    @replica_read('user_pubkey')
     def get_user_vtxos(self, user_pubkey: str, asset_id: Optional[str] = None) -> List[Vtxo]:
         """Get all VTXOs assigned to a user"""
         session = get_session()
@@ -313,25 +1010,23 @@ class VtxoManager:
 
     def cleanup_expired_vtxos(self):
         """Clean up expired VTXOs"""
+        from core.expiry_sweeper import get_expiry_sweeper
+
         session = get_session()
         try:
-            expired_vtxos = session.query(Vtxo).filter(
-                and_(
-                    Vtxo.expires_at <= utc_now(),
-                    Vtxo.status == 'available'
-                )
-            ).all()
-
-            count = len(expired_vtxos)
-            for vtxo in expired_vtxos:
-                vtxo.status = 'expired'
-
-            session.commit()
+            result = get_expiry_sweeper().sweep(
+                session, 'vtxos', Vtxo,
+                [Vtxo.expires_at <= utc_now(), Vtxo.status == 'available'],
+                values={'status': 'expired'}
+            )
 
-            if count > 0:
-                logger.info(f"🧹 Cleaned up {count} expired VTXOs")
+            if result.rows > 0:
+                logger.info(f"🧹 Cleaned up {result.rows} expired VTXOs ({result.rows_per_second:.0f} rows/s)")
+                # Swept rows bypass the ORM change hooks; resync the in-memory counts
+                if self.availability_index.ready:
+                    self.availability_index.reconcile()
 
-            return count
+            return result.rows
 
         except Exception as e:
             logger.error(f"❌ Failed to cleanup expired VTXOs: {e}")
@@ -360,6 +1055,7 @@ class VtxoManager:
         session = get_session()
         try:
             # Validate RGB contract exists
+            from core.rgb_manager import get_rgb_manager
             rgb_manager = get_rgb_manager()
             contract = rgb_manager.get_rgb_contract(rgb_contract_id)
             if not contract:
@@ -429,31 +1125,35 @@ class VtxoManager:
                 logger.error("RGB allocation splits must match split amounts")
                 return False
 
-            # Perform the split using existing VTXO logic
-            split_result = self._perform_vtxo_split(vtxo, split_amounts)
+            # RGB allocations for each new VTXO, written in the same transaction as the split
+            allocations = []
+            child_fields = None
+            if rgb_allocation_splits and vtxo.rgb_allocation_id:
+                allocations, child_fields = self._prepare_split_allocations(
+                    session, vtxo, split_amounts, rgb_allocation_splits
+                )
+                if allocations is None:
+                    session.rollback()
+                    return False
+
+            split_result = self._perform_vtxo_split(session, vtxo, split_amounts, child_fields)
             if not split_result:
                 logger.error(f"Failed to split VTXO {vtxo_id}")
+                session.rollback()
                 return False
 
-            # Create RGB allocations for each new VTXO
-            if rgb_allocation_splits and vtxo.rgb_allocation_id:
-                rgb_manager = get_rgb_manager()
-                for i, (new_vtxo_id, allocation_data) in enumerate(zip(split_result['new_vtxo_ids'], rgb_allocation_splits)):
-                    allocation_data.update({
-                        'vtxo_id': new_vtxo_id,
-                        'contract_id': allocation_data.get('contract_id'),
-                        'owner_pubkey': vtxo.user_pubkey,
-                        'amount': split_amounts[i]
-                    })
-
-                    try:
-                        rgb_manager.create_rgb_allocation(allocation_data)
-                    except Exception as e:
-                        logger.error(f"Failed to create RGB allocation for split VTXO {new_vtxo_id}: {e}")
-                        return False
-
-            # Mark original VTXO as spent
-            vtxo.status = 'spent'
+            if allocations:
+                session.execute(insert(RGBAllocation), allocations)
+
+                # Update contract totals
+                issued = {}
+                for allocation in allocations:
+                    issued[allocation['contract_id']] = issued.get(allocation['contract_id'], 0) + allocation['amount']
+                for contract_id, amount in issued.items():
+                    session.query(RGBContract).filter(RGBContract.contract_id == contract_id).update(
+                        {'total_issued': RGBContract.total_issued + amount}, synchronize_session=False
+                    )
+
             session.commit()
 
             logger.info(f"✅ Split RGB VTXO {vtxo_id} into {len(split_amounts)} VTXOs")
@@ -466,6 +1166,60 @@ class VtxoManager:
         finally:
             session.close()
 
+    def _prepare_split_allocations(self, session, vtxo: Vtxo, split_amounts: List[int],
+                                   rgb_allocation_splits: List[Dict]) -> Tuple[Optional[List[Dict]], Optional[List[Dict]]]:
+        """
+        Build RGB allocation rows and the matching RGB columns of each split output
+
+        Contracts are validated with a single query for all splits.
+
+        Returns:
+            (allocation rows, per-output VTXO column overrides), or (None, None) if a
+            contract is missing or inactive
+        """
+        from core.rgb_manager import RGBSealType
+
+        contract_ids = {split.get('contract_id') for split in rgb_allocation_splits}
+        contracts = {
+            contract.contract_id: contract
+            for contract in session.query(RGBContract).filter(
+                RGBContract.contract_id.in_([c for c in contract_ids if c]),
+                RGBContract.is_active == True
+            ).all()
+        }
+
+        now = utc_now()
+        allocations = []
+        child_fields = []
+        for i, (amount, split) in enumerate(zip(split_amounts, rgb_allocation_splits)):
+            contract = contracts.get(split.get('contract_id'))
+            if not contract:
+                logger.error(f"RGB contract {split.get('contract_id')} not found or inactive")
+                return None, None
+
+            new_vtxo_id = f"{vtxo.vtxo_id}_split_{i}"
+            allocation_id = f"{new_vtxo_id}_{contract.contract_id}"
+            allocations.append({
+                'allocation_id': allocation_id,
+                'contract_id': contract.contract_id,
+                'vtxo_id': new_vtxo_id,
+                'owner_pubkey': vtxo.user_pubkey,
+                'amount': amount,
+                'created_at': now,
+                'state_commitment': split.get('state_commitment'),
+                'proof_data': split.get('proof_data'),
+                'seal_type': split.get('seal_type', RGBSealType.TAPRET_FIRST.value),
+                'is_spent': False
+            })
+            child_fields.append({
+                'rgb_asset_type': contract.schema_type,
+                'rgb_allocation_id': allocation_id,
+                'rgb_state_commitment': split.get('state_commitment'),
+                'rgb_proof_data': split.get('proof_data')
+            })
+
+        return allocations, child_fields
+
     def get_user_rgb_vtxos(self, user_pubkey: str, contract_id: str = None) -> List[Vtxo]:
         """
         Get all RGB VTXOs for a user, optionally filtered by contract
@@ -534,6 +1288,7 @@ class VtxoManager:
             # Validate RGB proof if present
             proof_valid = True
             if vtxo.rgb_proof_data:
+                from core.rgb_manager import get_rgb_manager
                 rgb_manager = get_rgb_manager()
                 proof_valid = rgb_manager.validate_rgb_proof(vtxo.rgb_proof_data, allocation.contract_id)
 
@@ -560,13 +1315,20 @@ class VtxoManager:
         finally:
             session.close()
 
-    def _perform_vtxo_split(self, vtxo: Vtxo, split_amounts: List[int]) -> Optional[Dict]:
+    def _perform_vtxo_split(self, session, vtxo: Vtxo, split_amounts: List[int],
+                            child_fields: Optional[List[Dict]] = None) -> Optional[Dict]:
         """
         Internal method to perform the actual VTXO split
 
+        Marks the parent spent with a guarded UPDATE (so a concurrent split of the
+        same VTXO fails) and bulk-inserts the split outputs plus any change output,
+        all in the caller's transaction. Does not commit.
+
         Args:
+            session: Session whose transaction the split runs in
             vtxo: VTXO to split
             split_amounts: Amounts for each split
+            child_fields: Optional extra VTXO columns for each split output
 
         Returns:
             Split result with new VTXO IDs
@@ -578,44 +1340,48 @@ class VtxoManager:
                 logger.error(f"Split amounts ({total_split}) exceed VTXO amount ({vtxo.amount_sats})")
                 return None
 
-            # Create new VTXOs
-            new_vtxo_ids = []
+            # Spend the parent; zero rows means it was already split or spent
+            spent = session.query(Vtxo).filter(
+                and_(Vtxo.id == vtxo.id, Vtxo.status == 'assigned')
+            ).update({'status': 'spent'}, synchronize_session=False)
+            if not spent:
+                logger.error(f"VTXO {vtxo.vtxo_id} is no longer assigned")
+                return None
+            stage_vtxo_changes(session, [VtxoChange(vtxo.id, 'spent')])
+
+            now = utc_now()
+            base = {
+                'txid': vtxo.txid,
+                'script_pubkey': vtxo.script_pubkey,
+                'asset_id': vtxo.asset_id,
+                'user_pubkey': vtxo.user_pubkey,
+                'status': 'available',
+                'created_at': now,
+                'expires_at': vtxo.expires_at,
+                'rgb_asset_type': vtxo.rgb_asset_type,
+                'rgb_allocation_id': None,
+                'rgb_state_commitment': None,
+                'rgb_proof_data': None
+            }
+
+            # New VTXOs
+            rows = []
             for i, amount in enumerate(split_amounts):
-                new_vtxo = Vtxo(
-                    vtxo_id=f"{vtxo.vtxo_id}_split_{i}",
-                    txid=vtxo.txid,
-                    vout=vtxo.vout + i,  # Simulate new vout
-                    amount_sats=amount,
-                    script_pubkey=vtxo.script_pubkey,
-                    asset_id=vtxo.asset_id,
-                    user_pubkey=vtxo.user_pubkey,
-                    status='available',
-                    expires_at=vtxo.expires_at,
-                    rgb_asset_type=vtxo.rgb_asset_type
-                )
-                session = get_session()
-                session.add(new_vtxo)
-                new_vtxo_ids.append(new_vtxo.vtxo_id)
-                session.commit()
+                row = dict(base, vtxo_id=f"{vtxo.vtxo_id}_split_{i}", vout=vtxo.vout + i, amount_sats=amount)
+                if child_fields:
+                    row.update(child_fields[i])
+                rows.append(row)
+            new_vtxo_ids = [row['vtxo_id'] for row in rows]
 
-            # Create change VTXO if needed
+            # Change VTXO if needed
             change_amount = vtxo.amount_sats - total_split
             if change_amount > 0:
-                change_vtxo = Vtxo(
-                    vtxo_id=f"{vtxo.vtxo_id}_change",
-                    txid=vtxo.txid,
-                    vout=vtxo.vout + len(split_amounts),
-                    amount_sats=change_amount,
-                    script_pubkey=vtxo.script_pubkey,
-                    asset_id=vtxo.asset_id,
-                    user_pubkey=vtxo.user_pubkey,
-                    status='available',
-                    expires_at=vtxo.expires_at,
-                    rgb_asset_type=vtxo.rgb_asset_type
-                )
-                session = get_session()
-                session.add(change_vtxo)
-                session.commit()
+                rows.append(dict(base, vtxo_id=f"{vtxo.vtxo_id}_change",
+                                 vout=vtxo.vout + len(split_amounts), amount_sats=change_amount))
+
+            if self._insert_vtxo_rows(session, rows) != len(rows):
+                logger.error(f"Split outputs of VTXO {vtxo.vtxo_id} already exist")
+                return None
 
             return {
                 'new_vtxo_ids': new_vtxo_ids,
@@ -633,6 +1399,8 @@ class VtxoSettlementManager:
 
     def __init__(self):
         self.settlement_interval = 3600  # 1 hour
+        self.settlement_batch_size = 1000  # max VTXOs per commitment transaction
+        self.settlement_chunk_size = 500  # rows per keyset page
         self.running = False
 
     def start_settlement_service(self):
@@ -657,54 +1425,88 @@ class VtxoSettlementManager:
                 logger.error(f"❌ Settlement loop error: {e}")
                 time.sleep(60)
 
-    def process_hourly_settlement(self):
-        """Process hourly L1 settlement"""
+    def process_hourly_settlement(self) -> Dict[str, int]:
+        """
+        Process hourly L1 settlement
+
+        Spent VTXOs are streamed per asset in keyset-paginated chunks of
+        ``settlement_chunk_size`` and settled in commitments of at most
+        ``settlement_batch_size`` VTXOs, so memory stays bounded by one batch
+        however many VTXOs were spent.
+        """
         logger.info("⚖️  Starting hourly VTXO settlement")
 
+        summary = {'batches': 0, 'settled_vtxos': 0}
         session = get_session()
         try:
-            # Get all spent VTXOs that need settlement
-            spent_vtxos = session.query(Vtxo).filter(
-                and_(
-                    Vtxo.status == 'spent',
-                    Vtxo.spending_txid.isnot(None)
-                )
-            ).all()
+            asset_ids = [row[0] for row in session.query(Vtxo.asset_id).filter(
+                and_(Vtxo.status == 'spent', Vtxo.spending_txid.isnot(None))
+            ).distinct().all()]
 
-            if not spent_vtxos:
+            if not asset_ids:
                 logger.info("ℹ️  No VTXOs to settle")
-                return
+                return summary
 
-            # Group by asset for batch settlement
-            asset_groups = {}
-            for vtxo in spent_vtxos:
-                if vtxo.asset_id not in asset_groups:
-                    asset_groups[vtxo.asset_id] = []
-                asset_groups[vtxo.asset_id].append(vtxo)
+            for asset_id in asset_ids:
+                batch = []
+                for chunk in self._stream_spent_vtxos(session, asset_id):
+                    for vtxo in chunk:
+                        batch.append(vtxo)
+                        if len(batch) == self.settlement_batch_size:
+                            self._settle_batch(session, asset_id, batch, summary)
+                            batch = []
+                if batch:
+                    self._settle_batch(session, asset_id, batch, summary)
 
-            # Process settlement for each asset group
-            for asset_id, vtxos in asset_groups.items():
-                self.process_asset_settlement(session, asset_id, vtxos)
+            logger.info(f"✅ Hourly settlement done: {summary['settled_vtxos']} VTXOs in {summary['batches']} commitments")
 
         except Exception as e:
             logger.error(f"❌ Settlement processing error: {e}")
         finally:
             session.close()
 
-    def process_asset_settlement(self, session, asset_id: str, vtxos: List[Vtxo]):
-        """Process settlement for a group of VTXOs"""
+        return summary
+
+    def _stream_spent_vtxos(self, session, asset_id: str):
+        """Yield chunks of spent VTXO rows (id, vtxo_id, amount_sats) for an asset, keyset-paginated on id"""
+        last_id = 0
+        while True:
+            chunk = session.query(Vtxo.id, Vtxo.vtxo_id, Vtxo.amount_sats).filter(
+                and_(
+                    Vtxo.asset_id == asset_id,
+                    Vtxo.status == 'spent',
+                    Vtxo.spending_txid.isnot(None),
+                    Vtxo.id > last_id
+                )
+            ).order_by(Vtxo.id).limit(self.settlement_chunk_size).all()
+
+            if not chunk:
+                return
+            yield chunk
+            if len(chunk) < self.settlement_chunk_size:
+                return
+            last_id = chunk[-1].id
+
+    def _settle_batch(self, session, asset_id: str, vtxos: List, summary: Dict[str, int]):
+        if self.process_asset_settlement(session, asset_id, vtxos):
+            summary['batches'] += 1
+            summary['settled_vtxos'] += len(vtxos)
+
+    def process_asset_settlement(self, session, asset_id: str, vtxos: List) -> bool:
+        """Settle one batch of VTXOs (ORM objects or rows with id, vtxo_id and amount_sats) in a commitment"""
         try:
             logger.info(f"⚖️  Processing settlement for asset {asset_id} with {len(vtxos)} VTXOs")
 
             # Create Merkle tree for the VTXOs
-            merkle_root = self.create_merkle_tree(vtxos)
+            accumulator = self.build_merkle_accumulator(vtxos)
+            merkle_root = accumulator.root().hex()
 
             # Create commitment transaction
             commitment_tx = self.create_commitment_transaction(session, asset_id, vtxos, merkle_root)
 
             if not commitment_tx:
                 logger.error(f"Failed to create commitment transaction for asset {asset_id}")
-                return
+                return False
 
             # Broadcast the settlement transaction
             broadcast_success = self.broadcast_settlement_transaction(commitment_tx)
@@ -712,38 +1514,41 @@ class VtxoSettlementManager:
             if broadcast_success:
                 logger.info(f"✅ Settlement broadcast for asset {asset_id}: {commitment_tx['txid']}")
 
-                # Update transaction status
-                self.update_settlement_status(session, vtxos, commitment_tx['txid'])
+                # Update VTXO status and store inclusion proofs
+                proofs = [
+                    {
+                        'settlement_txid': commitment_tx['txid'],
+                        'merkle_root': merkle_root,
+                        'leaf_index': i,
+                        'tree_size': len(accumulator),
+                        'path': [sibling.hex() for sibling in path]
+                    }
+                    for i, path in enumerate(accumulator.proofs())
+                ]
+                return self.update_settlement_status(session, vtxos, commitment_tx['txid'], proofs)
             else:
                 logger.error(f"❌ Failed to broadcast settlement for asset {asset_id}")
+                return False
 
         except Exception as e:
             logger.error(f"❌ Asset settlement error: {e}")
+            return False
+
+    @staticmethod
+    def vtxo_leaf(vtxo_id: str) -> bytes:
+        """32-byte Merkle leaf committing to a VTXO"""
+        return hashlib.sha256(vtxo_id.encode()).digest()
+
+    def build_merkle_accumulator(self, vtxos: List) -> MerkleAccumulator:
+        """Append VTXO leaves, in order, to a new accumulator"""
+        accumulator = MerkleAccumulator()
+        for vtxo in vtxos:
+            accumulator.append(self.vtxo_leaf(vtxo.vtxo_id))
+        return accumulator
 
     def create_merkle_tree(self, vtxos: List[Vtxo]) -> str:
-        """Create a Merkle tree from VTXOs"""
-        # Simple Merkle tree implementation
-        # In practice, use a proper cryptographic Merkle tree
-
-        if len(vtxos) == 1:
-            return vtxos[0].vtxo_id
-
-        # Hash VTXO IDs and build tree
-        import hashlib
-        hashes = [hashlib.sha256(v.vtxo_id.encode()).hexdigest() for v in vtxos]
-
-        while len(hashes) > 1:
-            new_hashes = []
-            for i in range(0, len(hashes), 2):
-                if i + 1 < len(hashes):
-                    combined = hashes[i] + hashes[i + 1]
-                    new_hash = hashlib.sha256(combined.encode()).hexdigest()
-                else:
-                    new_hash = hashes[i]  # Odd number, duplicate last
-                new_hashes.append(new_hash)
-            hashes = new_hashes
-
-        return hashes[0]
+        """Hex Merkle root over the VTXOs' leaves"""
+        return self.build_merkle_accumulator(vtxos).root().hex()
 
     def create_commitment_transaction(self, session, asset_id: str, vtxos: List[Vtxo], merkle_root: str) -> Optional[Dict]:
         """Create a commitment transaction for settlement"""
@@ -821,19 +1626,29 @@ class VtxoSettlementManager:
             logger.error(f"❌ Failed to broadcast settlement transaction: {e}")
             return False
 
-    def update_settlement_status(self, session, vtxos: List[Vtxo], settlement_txid: str):
-        """Update VTXO status after settlement"""
+    def update_settlement_status(self, session, vtxos: List, settlement_txid: str,
+                                 proofs: Optional[List[Dict]] = None) -> bool:
+        """Mark spent VTXOs settled (one executemany UPDATE), storing each VTXO's inclusion proof"""
         try:
-            # Update VTXO status to settled
-            for vtxo in vtxos:
-                vtxo.status = 'settled'
-
+            if proofs is None:
+                proofs = [{'settlement_txid': settlement_txid}] * len(vtxos)
+
+            vtxos_table = Vtxo.__table__
+            stmt = update(vtxos_table).where(
+                and_(vtxos_table.c.id == bindparam('b_id'), vtxos_table.c.status == 'spent')
+            ).values(status='settled', settlement_proof=bindparam('b_proof'))
+            session.connection().execute(
+                stmt, [{'b_id': v.id, 'b_proof': proof} for v, proof in zip(vtxos, proofs)]
+            )
+            stage_vtxo_changes(session, [VtxoChange(v.id, 'settled') for v in vtxos])
             session.commit()
             logger.info(f"✅ Updated {len(vtxos)} VTXOs to settled status")
+            return True
 
         except Exception as e:
             logger.error(f"❌ Failed to update settlement status: {e}")
             session.rollback()
+            return False
 
     def monitor_settlement_confirmation(self, settlement_txid: str):
         """Monitor settlement transaction confirmation"""
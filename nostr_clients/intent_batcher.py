@@ -0,0 +1,259 @@
+"""
+Micro-batching stage for Action Intent ingestion
+
+Relay bursts deliver many Action Intents at once. Instead of creating one
+signing session and one challenge per event (each in its own transaction)
+and publishing serially, the handler queues parsed intents here. A flusher
+thread collects them for up to ``max_latency_ms`` (or ``max_batch_size``
+intents) and then:
+
+1. verifies the batch's event signatures in one call (spread over the
+   verification process pool for large batches), then validates the
+   intents, checking balances with one query
+2. inserts all sessions and all challenges in one transaction (two
+   executemany INSERTs); if that fails, each intent is retried in its own
+   transaction so one bad intent does not drop the others
+3. publishes the challenges (Nostr and Redis) in parallel
+
+Each intent succeeds or fails on its own; failures are logged and counted.
+"""
+
+import logging
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from core.config import Config
+from core.ledger import get_balance_ledger
+from core.models import SigningChallenge, SigningSession, get_session
+from .nostr_client import ActionIntent, NostrEvent
+
+logger = logging.getLogger(__name__)
+
+def utc_now() -> datetime:
+    """Return current UTC time as a naive datetime (UTC) without deprecation warnings."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass
+class PendingIntent:
+    """A parsed intent waiting for its batch"""
+    event: NostrEvent
+    action_intent: ActionIntent
+    session_id: Optional[str] = None
+    challenge_id: Optional[str] = None
+    context: Optional[str] = None
+    challenge_data: Optional[bytes] = None
+    error: Optional[str] = None
+
+
+class IntentBatcher:
+    """Collects Action Intents and creates their sessions and challenges in batches"""
+
+    def __init__(self, handler, max_latency_ms: float = 5.0, max_batch_size: int = 100,
+                 publish_workers: int = 8):
+        """
+        Args:
+            handler: NostrEventHandler providing validation, context and publishing helpers
+            max_latency_ms: How long the first queued intent waits for others
+            max_batch_size: Maximum intents per batch
+            publish_workers: Threads publishing challenges concurrently
+        """
+        self.handler = handler
+        self.max_latency = max_latency_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self.stats = {
+            'batches': 0,
+            'intents': 0,
+            'sessions_created': 0,
+            'rejected': 0,
+            'publish_errors': 0
+        }
+        self._queue: 'queue.Queue[PendingIntent]' = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._publisher = ThreadPoolExecutor(max_workers=publish_workers, thread_name_prefix='intent-publish')
+
+    def submit(self, event: NostrEvent, action_intent: ActionIntent):
+        """Queue a parsed intent; returns immediately"""
+        self._ensure_running()
+        self._queue.put(PendingIntent(event, action_intent))
+
+    def _ensure_running(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='intent-batcher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_latency
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self.process_batch(batch)
+            except Exception as e:
+                logger.error(f"Error processing batch of {len(batch)} Action Intent(s): {e}")
+
+    def process_batch(self, batch: List[PendingIntent]) -> List[PendingIntent]:
+        """Validate, persist and publish a batch; returns the intents whose sessions were created"""
+        self.stats['batches'] += 1
+        self.stats['intents'] += len(batch)
+
+        accepted = self._validate(batch)
+        created = self._persist(accepted)
+        futures = [self._publisher.submit(self._publish, pending) for pending in created]
+        for future in futures:
+            future.result()
+
+        self.stats['sessions_created'] += len(created)
+        self.stats['rejected'] += len(batch) - len(created)
+        logger.info(f"Processed {len(batch)} Action Intent(s), created {len(created)} session(s)")
+        return created
+
+    def _validate(self, batch: List[PendingIntent]) -> List[PendingIntent]:
+        """Batched signature check and field validation per intent, then one balance query for the whole batch"""
+        signed = self.handler.client.validate_event_signatures([pending.event for pending in batch])
+        accepted = []
+        for pending, valid in zip(batch, signed):
+            if not valid:
+                pending.error = 'invalid signature'
+                logger.warning(f"Invalid signature for Action Intent event {pending.event.id}")
+            elif self.handler._validate_intent_fields(pending.action_intent):
+                accepted.append(pending)
+            else:
+                pending.error = 'invalid intent'
+                logger.warning(f"Invalid Action Intent from {pending.action_intent.user_pubkey}")
+
+        needs_balance = [p for p in accepted if p.action_intent.session_type in ('p2p_transfer', 'lightning_land')]
+        if not needs_balance:
+            return accepted
+
+        keys = [(p.action_intent.intent_data.get('asset_id'), p.action_intent.user_pubkey) for p in needs_balance]
+        session = get_session()
+        try:
+            balances = get_balance_ledger().balances(session, keys)
+        except Exception as e:
+            logger.error(f"Error checking balances for Action Intent batch: {e}")
+            balances = {}
+        finally:
+            session.close()
+
+        funded = []
+        for pending in accepted:
+            intent = pending.action_intent
+            if intent.session_type in ('p2p_transfer', 'lightning_land'):
+                balance, _ = balances.get((intent.intent_data.get('asset_id'), intent.user_pubkey), (0, 0))
+                try:
+                    sufficient = balance >= intent.intent_data.get('amount')
+                except TypeError:
+                    sufficient = False
+                if not sufficient:
+                    pending.error = 'insufficient balance'
+                    logger.warning(f"Insufficient balance for user {intent.user_pubkey}")
+                    continue
+            funded.append(pending)
+        return funded
+
+    def _persist(self, accepted: List[PendingIntent]) -> List[PendingIntent]:
+        """Insert sessions and challenges for the batch in one transaction, isolating failures"""
+        expires_at = utc_now() + timedelta(minutes=Config().SESSION_TIMEOUT_MINUTES)
+        ready = []
+        for pending in accepted:
+            pending.challenge_data = self.handler._generate_challenge_data(pending.action_intent)
+            if pending.challenge_data is None:
+                pending.error = 'challenge generation failed'
+                continue
+            pending.session_id = str(uuid.uuid4())
+            pending.challenge_id = str(uuid.uuid4())
+            pending.context = self.handler._generate_context(pending.action_intent)
+            ready.append(pending)
+        if not ready:
+            return []
+
+        if self._insert(ready, expires_at):
+            return ready
+
+        logger.warning(f"⚠️  Batch insert of {len(ready)} session(s) failed, retrying individually")
+        return [pending for pending in ready if self._insert([pending], expires_at)]
+
+    def _insert(self, items: List[PendingIntent], expires_at: datetime) -> bool:
+        session = get_session()
+        try:
+            now = utc_now()
+            session.execute(insert(SigningSession), [{
+                'session_id': p.session_id,
+                'user_pubkey': p.action_intent.user_pubkey,
+                'session_type': p.action_intent.session_type,
+                'status': 'challenge_sent',
+                'intent_data': p.action_intent.intent_data,
+                'context': p.context,
+                'challenge_id': p.challenge_id,
+                'created_at': now,
+                'updated_at': now,
+                'expires_at': expires_at
+            } for p in items])
+            session.execute(insert(SigningChallenge), [{
+                'challenge_id': p.challenge_id,
+                'session_id': p.session_id,
+                'challenge_data': p.challenge_data,
+                'context': p.context,
+                'expires_at': expires_at,
+                'created_at': now,
+                'is_used': False
+            } for p in items])
+            session.commit()
+            return True
+
+        except Exception as e:
+            session.rollback()
+            if len(items) == 1:
+                items[0].error = str(e)
+                logger.error(f"Error creating signing session for {items[0].action_intent.user_pubkey}: {e}")
+            return False
+        finally:
+            session.close()
+
+    def _publish(self, pending: PendingIntent):
+        """Publish one challenge; errors only affect this intent"""
+        intent = pending.action_intent
+        try:
+            self.handler.client.publish_signing_challenge(
+                user_pubkey=intent.user_pubkey,
+                challenge_id=pending.challenge_id,
+                context=pending.context
+            )
+            self.handler._publish_to_redis('action_intent', {
+                'event_id': pending.event.id,
+                'session_id': pending.session_id,
+                'user_pubkey': intent.user_pubkey,
+                'session_type': intent.session_type,
+                'intent_data': intent.intent_data,
+                'timestamp': utc_now().isoformat()
+            })
+        except Exception as e:
+            self.stats['publish_errors'] += 1
+            pending.error = f"publish failed: {e}"
+            logger.error(f"Error publishing challenge for session {pending.session_id}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Batching statistics"""
+        return {
+            **self.stats,
+            'queued': self._queue.qsize(),
+            'average_batch_size': round(self.stats['intents'] / self.stats['batches'], 2) if self.stats['batches'] else 0
+        }
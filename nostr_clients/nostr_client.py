@@ -14,10 +14,11 @@ from unittest.mock import MagicMock
 import pynostr
 from pynostr.event import Event
 from pynostr.relay_manager import RelayManager
-from pynostr.key import PrivateKey, PublicKey
+from pynostr.key import PrivateKey
 from pynostr.encrypted_dm import EncryptedDirectMessage
 
 from core.config import Config
+from core.signature_verifier import get_signature_verifier
 from core.models import get_session, SigningSession, SigningChallenge
 from redis import Redis
 
@@ -443,29 +444,21 @@ class NostrClient:
         }
 
     def validate_event_signature(self, event: NostrEvent) -> bool:
-        """Validate Nostr event signature"""
+        """Validate Nostr event signature (BIP340 over the NIP-01 event hash)"""
         try:
-            # Create event hash
-            event_data = [
-                0,
-                event.pubkey,
-                event.created_at,
-                event.kind,
-                event.tags,
-                event.content
-            ]
-
-            event_str = json.dumps(event_data, separators=(',', ':'), ensure_ascii=False)
-            event_hash = hashlib.sha256(event_str.encode()).digest()
-
-            # Verify signature
-            public_key = PublicKey(event.pubkey)
-            return public_key.verify_signed_hash(event.sig, event_hash)
-
+            return get_signature_verifier().verify_event(event)
         except Exception as e:
             logger.error(f"Error validating event signature: {e}")
             return False
 
+    def validate_event_signatures(self, events: List[NostrEvent]) -> List[bool]:
+        """Validate the signatures of several events in one batch"""
+        try:
+            return get_signature_verifier().verify_events(events)
+        except Exception as e:
+            logger.error(f"Error validating event signatures: {e}")
+            return [False] * len(events)
+
     def encrypt_dm(self, recipient_pubkey: str, message: str) -> Optional[str]:
         """Encrypt a direct message for a recipient"""
         try:
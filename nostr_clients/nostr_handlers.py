@@ -5,8 +5,10 @@ from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, Optional
 
 from .nostr_client import NostrClient, NostrEvent, ActionIntent, SigningResponse, get_nostr_client
+from .intent_batcher import IntentBatcher
 from core.models import get_session, SigningSession, SigningChallenge, AssetBalance
 from core.config import Config
+from core.balance_cache import balance_row, get_balance_cache
 from redis import Redis
 
 logger = logging.getLogger(__name__)
@@ -20,6 +22,15 @@ class NostrEventHandler:
         self.client = nostr_client
         self.redis_conn = Redis.from_url(Config.REDIS_URL)
 
+        # Micro-batch intent ingestion (sessions, challenges and publications per batch)
+        config = Config()
+        self.intent_batcher = IntentBatcher(
+            self,
+            max_latency_ms=config.NOSTR_INTENT_BATCH_MAX_LATENCY_MS,
+            max_batch_size=config.NOSTR_INTENT_BATCH_MAX_SIZE,
+            publish_workers=config.NOSTR_INTENT_PUBLISH_WORKERS
+        ) if config.NOSTR_INTENT_BATCHING else None
+
         # Register event handlers
         self.client.add_event_handler(31510, self.handle_action_intent)
         self.client.add_event_handler(31512, self.handle_signing_response)
@@ -31,8 +42,8 @@ class NostrEventHandler:
         try:
             logger.info(f"Processing Action Intent from {event.pubkey}")
 
-            # Validate event signature
-            if not self.client.validate_event_signature(event):
+            # Validate event signature (batched intents are verified together in the batcher)
+            if self.intent_batcher is None and not self.client.validate_event_signature(event):
                 logger.warning(f"Invalid signature for Action Intent event {event.id}")
                 return
 
@@ -42,6 +53,10 @@ class NostrEventHandler:
                 logger.error(f"Failed to parse Action Intent from event {event.id}")
                 return
 
+            if self.intent_batcher is not None:
+                self.intent_batcher.submit(event, action_intent)
+                return
+
             # Validate action intent
             if not self._validate_action_intent(action_intent):
                 logger.warning(f"Invalid Action Intent from {action_intent.user_pubkey}")
@@ -136,6 +151,22 @@ class NostrEventHandler:
 
     def _validate_action_intent(self, action_intent: ActionIntent) -> bool:
         """Validate action intent"""
+        if not self._validate_intent_fields(action_intent):
+            return False
+
+        # Check if user has sufficient balance (for asset transfers)
+        if action_intent.session_type in ['p2p_transfer', 'lightning_land']:
+            asset_id = action_intent.intent_data.get('asset_id')
+            amount = action_intent.intent_data.get('amount')
+
+            if not self._check_user_balance(action_intent.user_pubkey, asset_id, amount):
+                logger.warning(f"Insufficient balance for user {action_intent.user_pubkey}")
+                return False
+
+        return True
+
+    def _validate_intent_fields(self, action_intent: ActionIntent) -> bool:
+        """Validate the intent's session type and required fields"""
         # Check required fields
         if not action_intent.user_pubkey or not action_intent.session_type:
             return False
@@ -157,15 +188,6 @@ class NostrEventHandler:
             if not all(field in action_intent.intent_data for field in required_fields):
                 return False
 
-        # Check if user has sufficient balance (for asset transfers)
-        if action_intent.session_type in ['p2p_transfer', 'lightning_land']:
-            asset_id = action_intent.intent_data.get('asset_id')
-            amount = action_intent.intent_data.get('amount')
-
-            if not self._check_user_balance(action_intent.user_pubkey, asset_id, amount):
-                logger.warning(f"Insufficient balance for user {action_intent.user_pubkey}")
-                return False
-
         return True
 
     def _validate_signing_response(self, signing_response: SigningResponse) -> bool:
@@ -325,23 +347,28 @@ class NostrEventHandler:
 
     def _check_user_balance(self, user_pubkey: str, asset_id: str, amount: int) -> bool:
         """Check if user has sufficient balance"""
-        session = get_session()
+        def load():
+            session = get_session()
+            try:
+                return balance_row(session.query(AssetBalance).filter_by(
+                    user_pubkey=user_pubkey,
+                    asset_id=asset_id
+                ).first())
+            finally:
+                session.close()
+
         try:
-            balance = session.query(AssetBalance).filter_by(
-                user_pubkey=user_pubkey,
-                asset_id=asset_id
-            ).first()
+            cache = get_balance_cache()
+            balance = cache.get_balance(user_pubkey, asset_id, load) if cache else load()
 
             if not balance:
                 return False
 
-            return balance.balance >= amount
+            return balance['balance'] >= amount
 
         except Exception as e:
             logger.error(f"Error checking user balance: {e}")
             return False
-        finally:
-            session.close()
 
     def _process_signing_response(self, signing_response: SigningResponse) -> Optional[SigningSession]:
         """Process a signing response"""
@@ -6,6 +6,8 @@ from typing import Dict, Any, Optional
 
 from core.models import get_session, SigningSession, SigningChallenge, Transaction, AssetBalance, Asset
 from core.config import Config
+from core.balance_cache import balance_row, get_balance_cache
+from core.ledger import BalanceDelta, InsufficientLedgerBalance, get_balance_ledger, get_ledger_group_committer
 from .nostr_redis import get_redis_manager
 from .nostr_client import get_nostr_client
 
@@ -352,138 +354,75 @@ class NostrWorker:
 
     def _check_balance(self, user_pubkey: str, asset_id: str, amount: int) -> bool:
         """Check if user has sufficient balance"""
-        session = get_session()
+        def load():
+            session = get_session()
+            try:
+                return balance_row(session.query(AssetBalance).filter_by(
+                    user_pubkey=user_pubkey,
+                    asset_id=asset_id
+                ).first())
+            finally:
+                session.close()
+
         try:
-            balance = session.query(AssetBalance).filter_by(
-                user_pubkey=user_pubkey,
-                asset_id=asset_id
-            ).first()
+            cache = get_balance_cache()
+            balance = cache.get_balance(user_pubkey, asset_id, load) if cache else load()
 
-            return balance and balance.balance >= amount
+            return balance is not None and balance['balance'] >= amount
 
         except Exception as e:
             logger.error(f"Error checking balance: {e}")
             return False
-        finally:
-            session.close()
 
     def _reserve_balance(self, user_pubkey: str, asset_id: str, amount: int) -> bool:
         """Reserve balance for a transaction"""
-        session = get_session()
-        try:
-            balance = session.query(AssetBalance).filter_by(
-                user_pubkey=user_pubkey,
-                asset_id=asset_id
-            ).first()
-
-            if not balance or balance.balance < amount:
-                return False
-
-            balance.balance -= amount
-            balance.reserved_balance += amount
-            session.commit()
-
-            return True
-
-        except Exception as e:
-            logger.error(f"Error reserving balance: {e}")
-            session.rollback()
-            return False
-        finally:
-            session.close()
+        return self._apply_balance_deltas('reserving', 'reserve', [
+            BalanceDelta(user_pubkey, asset_id, balance=-amount, reserved=amount)
+        ])
 
     def _deduct_balance(self, user_pubkey: str, asset_id: str, amount: int) -> bool:
         """Deduct balance from reserved"""
-        session = get_session()
-        try:
-            balance = session.query(AssetBalance).filter_by(
-                user_pubkey=user_pubkey,
-                asset_id=asset_id
-            ).first()
-
-            if not balance or balance.reserved_balance < amount:
-                return False
-
-            balance.reserved_balance -= amount
-            session.commit()
-
-            return True
-
-        except Exception as e:
-            logger.error(f"Error deducting balance: {e}")
-            session.rollback()
-            return False
-        finally:
-            session.close()
+        return self._apply_balance_deltas('deducting', 'deduct', [
+            BalanceDelta(user_pubkey, asset_id, reserved=-amount)
+        ])
 
     def _add_balance(self, user_pubkey: str, asset_id: str, amount: int) -> bool:
         """Add balance to user"""
-        session = get_session()
-        try:
-            balance = session.query(AssetBalance).filter_by(
-                user_pubkey=user_pubkey,
-                asset_id=asset_id
-            ).first()
-
-            if not balance:
-                # Create new balance record
-                balance = AssetBalance(
-                    user_pubkey=user_pubkey,
-                    asset_id=asset_id,
-                    balance=amount,
-                    reserved_balance=0
-                )
-                session.add(balance)
-            else:
-                balance.balance += amount
-
-            session.commit()
-            return True
-
-        except Exception as e:
-            logger.error(f"Error adding balance: {e}")
-            session.rollback()
-            return False
-        finally:
-            session.close()
+        return self._apply_balance_deltas('adding', 'credit', [
+            BalanceDelta(user_pubkey, asset_id, balance=amount)
+        ])
 
     def _transfer_balance(self, from_pubkey: str, to_pubkey: str, asset_id: str, amount: int) -> bool:
         """Transfer balance between users"""
-        session = get_session()
-        try:
-            # Deduct from sender
-            from_balance = session.query(AssetBalance).filter_by(
-                user_pubkey=from_pubkey,
-                asset_id=asset_id
-            ).first()
-
-            if not from_balance or from_balance.reserved_balance < amount:
+        return self._apply_balance_deltas('transferring', 'transfer', [
+            BalanceDelta(from_pubkey, asset_id, reserved=-amount),
+            BalanceDelta(to_pubkey, asset_id, balance=amount)
+        ])
+
+    def _apply_balance_deltas(self, action: str, entry_type: str, deltas) -> bool:
+        """Apply balance changes atomically in one transaction; False if a guard fails"""
+        committer = get_ledger_group_committer()
+        if committer is not None:
+            try:
+                committer.submit(deltas, entry_type=entry_type)
+                return True
+            except InsufficientLedgerBalance:
+                return False
+            except Exception as e:
+                logger.error(f"Error {action} balance: {e}")
                 return False
 
-            from_balance.reserved_balance -= amount
-
-            # Add to recipient
-            to_balance = session.query(AssetBalance).filter_by(
-                user_pubkey=to_pubkey,
-                asset_id=asset_id
-            ).first()
-
-            if not to_balance:
-                to_balance = AssetBalance(
-                    user_pubkey=to_pubkey,
-                    asset_id=asset_id,
-                    balance=amount,
-                    reserved_balance=0
-                )
-                session.add(to_balance)
-            else:
-                to_balance.balance += amount
-
+        session = get_session()
+        try:
+            get_balance_ledger().apply(session, deltas, entry_type=entry_type)
             session.commit()
             return True
 
+        except InsufficientLedgerBalance:
+            session.rollback()
+            return False
         except Exception as e:
-            logger.error(f"Error transferring balance: {e}")
+            logger.error(f"Error {action} balance: {e}")
             session.rollback()
             return False
         finally:
@@ -1,14 +1,14 @@
 """
 High-level ceremony helpers for ArkRelay Gateway.
 
-- wait_for_ceremony: poll ceremony status until completion or timeout
+- wait_for_ceremony: wait for ceremony completion (long-poll, falling back to polling) or timeout
 """
 from __future__ import annotations
 
 import time
 from typing import Any, Dict, Iterable, Tuple
 
-from .gateway_client import GatewayClient
+from .gateway_client import GatewayClient, GatewayClientError
 
 
 def wait_for_ceremony(
@@ -18,13 +18,20 @@ def wait_for_ceremony(
     failure_states: Iterable[str] = ("failed", "expired", "error"),
     timeout: float = 120.0,
     interval: float = 1.0,
+    long_poll: bool = True,
+    long_poll_wait: float = 25.0,
 ) -> Tuple[bool, Dict[str, Any]]:
     """
-    Poll the gateway for ceremony status until it reaches a terminal state or times out.
+    Wait for the ceremony to reach a terminal state or time out.
+
+    By default each status request is a long-poll (``?wait=``) that the gateway
+    answers as soon as the status changes. Against gateways without long-poll
+    support (responses lack ``"long_poll": true``) or after a long-poll error,
+    falls back to polling every ``interval`` seconds.
 
     Returns (ok, last_status). ok is True when a success state was reached.
 
-    The status object may expose "state" or "status"; both are handled.
+    The status object may expose "state", "status" or "session_status"; all are handled.
     """
     t0 = time.time()
     last: Dict[str, Any] = {}
@@ -32,13 +39,24 @@ def wait_for_ceremony(
     fail = {s.lower() for s in failure_states}
 
     while time.time() - t0 < timeout:
-        last = client.get_ceremony_status(session_id)
-        state = str(last.get("state") or last.get("status") or "").lower()
+        if long_poll:
+            wait = max(0.0, min(long_poll_wait, timeout - (time.time() - t0)))
+            try:
+                last = client.get_ceremony_status(session_id, wait=wait, since=last.get("last_updated"))
+            except GatewayClientError:
+                long_poll = False
+                last = client.get_ceremony_status(session_id)
+            else:
+                long_poll = bool(last.get("long_poll"))
+        else:
+            last = client.get_ceremony_status(session_id)
+        state = str(last.get("state") or last.get("status") or last.get("session_status") or "").lower()
         if state in succ:
             return True, {**last, "elapsed": time.time() - t0}
         if state in fail:
             return False, {**last, "elapsed": time.time() - t0}
-        time.sleep(interval)
+        if not long_poll:
+            time.sleep(interval)
 
     # Timeout
     return False, {**last, "elapsed": time.time() - t0, "timeout": True}
@@ -89,9 +89,21 @@ class GatewayClient:
         payload = {"session_id": session_id}
         return self._post(url, json=payload)
 
-    def get_ceremony_status(self, session_id: str) -> Dict[str, Any]:
+    def get_ceremony_status(
+        self, session_id: str, wait: Optional[float] = None, since: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get ceremony status. With ``wait``, the gateway holds the request until the
+        status differs from ``since`` (its ``last_updated``), the ceremony ends, or
+        ``wait`` seconds pass; long-polled responses carry ``"long_poll": true``.
+        """
         url = f"{self.base_url}/signing/ceremony/{session_id}/status"
-        return self._get(url)
+        if wait is None:
+            return self._get(url)
+        params: Dict[str, Any] = {"wait": wait}
+        if since:
+            params["since"] = since
+        return self._get(url, params=params, timeout=self.timeout + wait)
 
     # ---- Asset Management ----
     def create_asset(self, asset_id: str, name: str, ticker: str, total_supply: int = 0) -> Dict[str, Any]:
@@ -167,10 +179,14 @@ class GatewayClient:
         return self._post(url)
 
     # ---- Internal HTTP helpers ----
-    def _get(self, url: str) -> Dict[str, Any]:
+    def _get(
+        self, url: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
         def _call() -> Dict[str, Any]:
             try:
-                resp = self._session.get(url, headers=self._headers, timeout=self.timeout)
+                resp = self._session.get(
+                    url, headers=self._headers, params=params, timeout=timeout or self.timeout
+                )
                 if not (200 <= resp.status_code < 300):
                     raise GatewayClientError(f"GET {url} -> {resp.status_code}: {resp.text}")
                 return resp.json() if resp.content else {}
@@ -421,4 +421,28 @@ class TestApp:
         # (depends on actual security implementation)
         for header in security_headers:
             if header in headers:
-                assert headers[header] is not None
\ No newline at end of file
+                assert headers[header] is not None
+
+class TestCeremonyExecutorEndpoints:
+    """Ceremony endpoints when ceremonies run on the executor"""
+
+    def test_step_endpoint_conflicts_with_executor(self, test_client):
+        with patch('app.get_ceremony_executor', return_value=Mock()):
+            response = test_client.post('/signing/ceremony/sess-1/step/4', json={})
+
+        assert response.status_code == 409
+
+    def test_start_passes_client_signatures_to_executor(self, test_client):
+        executor = Mock()
+        executor.enqueue.return_value = {'session_id': 'sess-1'}
+        with patch('app.get_ceremony_executor', return_value=executor):
+            response = test_client.post('/signing/ceremony/start', json={
+                'session_id': 'sess-1', 'signature_data': {'user_signature': 'client-sig'}
+            })
+            invalid = test_client.post('/signing/ceremony/start', json={
+                'session_id': 'sess-1', 'signature_data': {'signature': 'client-sig'}
+            })
+
+        assert response.status_code == 202
+        executor.enqueue.assert_called_once_with('sess-1', {'user_signature': 'client-sig'})
+        assert invalid.status_code == 400
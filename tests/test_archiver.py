@@ -0,0 +1,142 @@
+"""
+Test cases for the cold archive tier
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy.orm import sessionmaker
+
+from core.archiver import ColdArchiver, decode_record, encode_record
+from core.models import (
+    ArchivedRecord, LightningInvoice, SigningChallenge, SigningSession, Transaction
+)
+from core.session_manager import SigningSessionManager
+from core.transaction_processor import TransactionProcessor
+from tests.test_database_setup import test_db_session
+
+
+@pytest.fixture
+def SessionLocal(test_db_session):
+    return sessionmaker(bind=test_db_session._engine)
+
+
+def seed_session(SessionLocal, session_id, status='completed', days_old=40, tx_status='confirmed'):
+    session = SessionLocal()
+    stamp = datetime.utcnow() - timedelta(days=days_old)
+    session.add(SigningSession(
+        session_id=session_id, user_pubkey='02' + 'ab' * 32, session_type='p2p_transfer',
+        status=status, intent_data={'amount': 1000}, context='transfer', result_data={'ok': True},
+        created_at=stamp, updated_at=stamp, expires_at=stamp + timedelta(minutes=10)
+    ))
+    session.flush()
+    session.add(SigningChallenge(
+        challenge_id=f'{session_id}_challenge', session_id=session_id, challenge_data=b'\x00\x01challenge',
+        context='sign', expires_at=stamp + timedelta(minutes=5), created_at=stamp, is_used=True
+    ))
+    if tx_status:
+        session.add(Transaction(
+            txid=f'{session_id}_tx', session_id=session_id, tx_type='ark_tx', raw_tx='00',
+            status=tx_status, amount_sats=1000, fee_sats=10, created_at=stamp, confirmed_at=stamp
+        ))
+    session.commit()
+    session.close()
+
+
+class TestColdArchiver:
+    """Test moving terminal rows into the archive"""
+
+    def test_archives_old_terminal_sessions_with_children(self, SessionLocal):
+        seed_session(SessionLocal, 'old_done')
+        seed_session(SessionLocal, 'recent_done', days_old=1)
+        seed_session(SessionLocal, 'old_active', status='signing', tx_status='pending')
+        session = SessionLocal()
+
+        result = ColdArchiver(archive_after_days=30).archive(session)
+
+        assert (result.sessions, result.challenges, result.transactions) == (1, 1, 1)
+        assert session.query(SigningSession).filter_by(session_id='old_done').count() == 0
+        assert session.query(SigningChallenge).filter_by(session_id='old_done').count() == 0
+        assert session.query(Transaction).filter_by(session_id='old_done').count() == 0
+        assert session.query(SigningSession).count() == 2
+        assert session.query(ArchivedRecord).count() == 3
+        session.close()
+
+    def test_keeps_sessions_with_open_transactions_or_invoices(self, SessionLocal):
+        seed_session(SessionLocal, 'broadcasting', tx_status='broadcast')
+        seed_session(SessionLocal, 'with_invoice')
+        session = SessionLocal()
+        session.add(LightningInvoice(payment_hash='ph', bolt11_invoice='lnbc1', session_id='with_invoice',
+                                     amount_sats=1000, invoice_type='lift',
+                                     expires_at=datetime.utcnow() + timedelta(hours=1)))
+        session.commit()
+
+        result = ColdArchiver(archive_after_days=30).archive(session)
+
+        assert result.sessions == 0
+        assert session.query(SigningSession).count() == 2
+        session.close()
+
+    def test_archives_standalone_transactions(self, SessionLocal):
+        session = SessionLocal()
+        stamp = datetime.utcnow() - timedelta(days=40)
+        session.add(Transaction(txid='solo_confirmed', tx_type='settlement_tx', status='confirmed',
+                                amount_sats=5, created_at=stamp, confirmed_at=stamp))
+        session.add(Transaction(txid='solo_pending', tx_type='settlement_tx', status='pending',
+                                amount_sats=5, created_at=stamp))
+        session.commit()
+
+        result = ColdArchiver(archive_after_days=30).archive(session)
+
+        assert result.transactions == 1
+        assert [t.txid for t in session.query(Transaction).all()] == ['solo_pending']
+        session.close()
+
+    def test_batches(self, SessionLocal):
+        for i in range(5):
+            seed_session(SessionLocal, f'batch_{i}')
+        session = SessionLocal()
+
+        result = ColdArchiver(archive_after_days=30, batch_size=2).archive(session)
+
+        assert result.sessions == 5
+        assert result.complete
+        assert session.query(SigningSession).count() == 0
+        session.close()
+
+
+class TestArchiveLookups:
+    """Test lookups falling back to the archive"""
+
+    def test_record_round_trip(self, SessionLocal):
+        seed_session(SessionLocal, 'round_trip')
+        session = SessionLocal()
+        challenge = session.query(SigningChallenge).one()
+
+        restored = decode_record(SigningChallenge, encode_record(challenge))
+
+        assert restored.challenge_data == b'\x00\x01challenge'
+        assert restored.expires_at == challenge.expires_at
+        session.close()
+
+    def test_session_lookup_falls_back_to_archive(self, SessionLocal):
+        seed_session(SessionLocal, 'archived_session')
+        session = SessionLocal()
+        ColdArchiver(archive_after_days=30).archive(session)
+        session.close()
+
+        found = SigningSessionManager().get_session('archived_session')
+
+        assert found.status == 'completed'
+        assert found.intent_data == {'amount': 1000}
+        assert SigningSessionManager().get_session('never_existed') is None
+
+    def test_transaction_status_falls_back_to_archive(self, SessionLocal):
+        seed_session(SessionLocal, 'archived_tx_session')
+        session = SessionLocal()
+        ColdArchiver(archive_after_days=30).archive(session)
+        session.close()
+
+        status = TransactionProcessor().get_transaction_status('archived_tx_session_tx')
+
+        assert status['status'] == 'confirmed'
+        assert status['session_id'] == 'archived_tx_session'
@@ -0,0 +1,174 @@
+"""
+Test cases for the versioned Redis balance cache
+"""
+
+import pytest
+from contextlib import contextmanager
+from unittest.mock import patch
+from sqlalchemy.orm import sessionmaker
+
+from core.asset_manager import AssetManager
+from core.balance_cache import BalanceCache
+from core.ledger import BalanceDelta, BalanceLedger
+from core.models import Asset, AssetBalance
+from nostr_clients.nostr_workers import NostrWorker
+from tests.test_database_setup import test_db_session
+
+
+class FakeRedis:
+    """The subset of redis-py the balance cache uses, backed by a dict"""
+
+    def __init__(self):
+        self.data = {}
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            raise ConnectionError("Redis unavailable")
+
+    def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    def mget(self, *keys):
+        self._check()
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        self._check()
+        if nx and key in self.data:
+            return None
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        return True
+
+    def delete(self, *keys):
+        self._check()
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def set(self, *args, **kwargs):
+        self.calls.append(('set', args, kwargs))
+
+    def delete(self, *args):
+        self.calls.append(('delete', args, {}))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+@pytest.fixture
+def SessionLocal(test_db_session):
+    SessionLocal = sessionmaker(bind=test_db_session._engine)
+    session = SessionLocal()
+    session.add(Asset(asset_id='BTC', name='Bitcoin', ticker='BTC'))
+    session.add(AssetBalance(user_pubkey='alice', asset_id='BTC', balance=5000, reserved_balance=1000))
+    session.add(AssetBalance(user_pubkey='bob', asset_id='BTC', balance=100, reserved_balance=0))
+    session.commit()
+    session.close()
+    return SessionLocal
+
+
+@pytest.fixture
+def cache():
+    cache = BalanceCache(FakeRedis())
+    with patch('core.balance_cache.get_balance_cache', return_value=cache), \
+            patch('core.balance_cache.Config') as config:
+        config.return_value.BALANCE_CACHE_ENABLED = True
+        yield cache
+
+
+@contextmanager
+def cached_reads(SessionLocal, cache):
+    """Route the balance read sites through ``cache`` and ``SessionLocal``"""
+    with patch('core.asset_manager.get_session', side_effect=lambda: SessionLocal()), \
+            patch('core.asset_manager.get_balance_cache', return_value=cache), \
+            patch('nostr_clients.nostr_workers.get_session', side_effect=lambda: SessionLocal()), \
+            patch('nostr_clients.nostr_workers.get_balance_cache', return_value=cache):
+        yield
+
+
+class TestBalanceCache:
+    """Test read-through, invalidation on commit and version stamps"""
+
+    def test_second_read_served_from_cache(self, SessionLocal, cache):
+        manager = AssetManager()
+        with cached_reads(SessionLocal, cache):
+            first = manager.get_user_balance('alice', 'BTC')
+            with patch('core.asset_manager.get_session', side_effect=AssertionError("database read")):
+                second = manager.get_user_balance('alice', 'BTC')
+
+        assert first == second
+        assert second['available_balance'] == 4000
+        assert cache.get_stats()['hits'] == 1
+
+    def test_transfer_invalidates_on_commit(self, SessionLocal, cache):
+        manager = AssetManager()
+        with cached_reads(SessionLocal, cache):
+            assert manager.get_user_balance('bob', 'BTC')['balance'] == 100
+            assert [b['balance'] for b in manager.get_user_balances('bob')] == [100]
+
+            manager.transfer_assets('alice', 'bob', 'BTC', 250)
+
+            assert manager.get_user_balance('bob', 'BTC')['balance'] == 350
+            assert manager.get_user_balance('alice', 'BTC')['balance'] == 4750
+            assert [b['balance'] for b in manager.get_user_balances('bob')] == [350]
+        assert cache.get_stats()['invalidations'] == 2
+
+    def test_value_read_before_commit_never_served(self, SessionLocal, cache):
+        def load_then_write():
+            session = SessionLocal()
+            row = session.query(AssetBalance).filter_by(user_pubkey='bob', asset_id='BTC').first()
+            stale = {'asset_id': 'BTC', 'balance': row.balance, 'reserved_balance': row.reserved_balance,
+                     'last_updated': None}
+            # a transfer commits between this reader's database read and its cache store
+            BalanceLedger().apply(session, [BalanceDelta('bob', 'BTC', balance=900)], entry_type='credit')
+            session.commit()
+            session.close()
+            return stale
+
+        assert cache.get_balance('bob', 'BTC', load_then_write)['balance'] == 100
+
+        session = SessionLocal()
+        load = lambda: {'asset_id': 'BTC', 'balance': session.query(AssetBalance).filter_by(
+            user_pubkey='bob', asset_id='BTC').first().balance, 'reserved_balance': 0, 'last_updated': None}
+        assert cache.get_balance('bob', 'BTC', load)['balance'] == 1000
+        session.close()
+        assert cache.get_stats()['stale'] == 1
+
+    def test_orm_writes_invalidate(self, SessionLocal, cache):
+        worker = NostrWorker.__new__(NostrWorker)
+        with cached_reads(SessionLocal, cache):
+            assert not worker._check_balance('bob', 'BTC', 500)
+
+            session = SessionLocal()
+            session.query(AssetBalance).filter_by(user_pubkey='bob', asset_id='BTC').first().balance = 500
+            session.commit()
+            session.close()
+
+            assert worker._check_balance('bob', 'BTC', 500)
+
+    def test_lost_invalidation_retires_all_entries(self, SessionLocal, cache):
+        manager = AssetManager()
+        with cached_reads(SessionLocal, cache):
+            assert manager.get_user_balance('bob', 'BTC')['balance'] == 100
+
+            cache.redis.down = True
+            manager.transfer_assets('alice', 'bob', 'BTC', 50)
+            # Redis is bypassed while unavailable
+            assert manager.get_user_balance('bob', 'BTC')['balance'] == 150
+
+            cache.redis.down = False
+            cache._unavailable_until = 0
+            assert manager.get_user_balance('bob', 'BTC')['balance'] == 150
+
+        stats = cache.get_stats()
+        assert stats['resets'] == 1
+        assert stats['errors'] == 1
@@ -0,0 +1,182 @@
+"""
+Test cases for ceremony status long-polling and event streams
+"""
+
+import json
+import queue
+import threading
+import time
+import pytest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from core.ceremony_events import CeremonyEvents
+from core.signing_orchestrator import SigningOrchestrator, SigningStep
+
+
+def utc_now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class FakeRedis:
+    """In-process pub/sub with the redis-py subset ceremony events use"""
+
+    def __init__(self):
+        self.subscribers = {}
+        self.lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self.lock:
+            for inbox in self.subscribers.get(channel, []):
+                inbox.put({'type': 'message', 'channel': channel.encode(), 'data': message.encode()})
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.inbox = queue.Queue()
+        self.channels = []
+
+    def subscribe(self, channel):
+        with self.redis.lock:
+            self.redis.subscribers.setdefault(channel, []).append(self.inbox)
+        self.channels.append(channel)
+        self.inbox.put({'type': 'subscribe', 'channel': channel.encode(), 'data': 1})
+
+    def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        try:
+            message = self.inbox.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if ignore_subscribe_messages and message['type'] == 'subscribe':
+            return None
+        return message
+
+    def close(self):
+        with self.redis.lock:
+            for channel in self.channels:
+                self.redis.subscribers[channel].remove(self.inbox)
+
+
+class StubSessionManager:
+    """Session manager holding one in-memory session"""
+
+    def __init__(self, session_id):
+        self.session = SimpleNamespace(
+            session_id=session_id,
+            status='awaiting_signature',
+            expires_at=utc_now() + timedelta(minutes=5),
+            updated_at=utc_now(),
+            result_data=None
+        )
+
+    def get_session(self, session_id):
+        return self.session
+
+    def _touch(self):
+        self.session.updated_at = max(utc_now(), self.session.updated_at + timedelta(microseconds=1))
+
+    def _update_session_result(self, session_id, result_data, signed_tx=None):
+        self.session.result_data = result_data
+        self._touch()
+        return True
+
+    def update_session_status(self, session_id, new_status, message=None):
+        self.session.status = new_status
+        self._touch()
+        return True
+
+    def complete_session(self, session_id, result_data, signed_tx=None):
+        return self.update_session_status(session_id, 'completed')
+
+    def fail_session(self, session_id, error_message):
+        return self.update_session_status(session_id, 'failed')
+
+
+@pytest.fixture
+def events():
+    events = CeremonyEvents(FakeRedis())
+    with patch('core.signing_orchestrator.get_ceremony_events', return_value=events):
+        yield events
+
+
+@pytest.fixture
+def orchestrator():
+    orchestrator = SigningOrchestrator()
+    orchestrator.session_manager = StubSessionManager('sess-1')
+    orchestrator._execute_signing_step = lambda *args: {'status': 'ok'}
+    orchestrator.session_manager._update_session_result('sess-1', {
+        'ceremony_state': {'current_step': 1, 'completed_steps': [], 'start_time': utc_now().isoformat()}
+    })
+    return orchestrator
+
+
+def run_later(delay, func, *args):
+    def target():
+        time.sleep(delay)
+        func(*args)
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread
+
+
+class TestCeremonyEvents:
+    """Test that waiters wake on step transitions instead of polling"""
+
+    def test_long_poll_returns_on_step(self, events, orchestrator):
+        before = orchestrator.get_ceremony_status('sess-1')
+        thread = run_later(0.1, orchestrator.execute_signing_step, 'sess-1', SigningStep.INTENT_VERIFICATION)
+
+        started = time.monotonic()
+        status = orchestrator.wait_for_ceremony_status('sess-1', wait=5, since=before['last_updated'])
+        thread.join()
+
+        assert time.monotonic() - started < 2
+        assert status['long_poll'] is True
+        assert status['session_status'] == 'signing'
+        assert status['completed_steps'] == ['intent_verification']
+        assert events.get_stats()['published'] == 1
+
+    def test_long_poll_returns_immediately_when_behind(self, events, orchestrator):
+        status = orchestrator.wait_for_ceremony_status('sess-1', wait=5, since='2000-01-01T00:00:00')
+
+        assert status['session_status'] == 'awaiting_signature'
+        assert events.get_stats()['published'] == 0
+
+    def test_long_poll_times_out_without_change(self, events, orchestrator):
+        status = orchestrator.wait_for_ceremony_status('sess-1', wait=0.2)
+
+        assert status['long_poll'] is True
+        assert status['session_status'] == 'awaiting_signature'
+
+    def test_stream_ends_with_ceremony(self, events, orchestrator):
+        def finish():
+            orchestrator.execute_signing_step('sess-1', SigningStep.INTENT_VERIFICATION)
+            orchestrator.execute_signing_step('sess-1', SigningStep.FINALIZATION)
+
+        thread = run_later(0.1, finish)
+        statuses = [s for s in orchestrator.stream_ceremony_status('sess-1', heartbeat=0.05, max_duration=5)
+                    if s is not None]
+        thread.join()
+
+        assert statuses[0]['session_status'] == 'awaiting_signature'
+        assert statuses[-1]['session_status'] == 'completed'
+
+    def test_failed_step_notifies_waiters(self, events, orchestrator):
+        def broken(*args):
+            raise RuntimeError("boom")
+        orchestrator._execute_signing_step = broken
+
+        inbox = events.redis.pubsub()
+        inbox.subscribe(events.channel('sess-1'))
+        with pytest.raises(Exception):
+            orchestrator.execute_signing_step('sess-1', SigningStep.INTENT_VERIFICATION)
+
+        inbox.get_message()  # subscribe confirmation
+        event = json.loads(inbox.get_message(timeout=1)['data'])
+        assert event['event'] == 'failed'
+        assert event['step'] == 'intent_verification'
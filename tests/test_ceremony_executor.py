@@ -0,0 +1,236 @@
+"""
+Test cases for the asynchronous ceremony executor
+"""
+
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+from core.ceremony_executor import _RELEASE_LEASE, _RENEW_LEASE, CeremonyExecutor
+from core.signing_orchestrator import SigningOrchestrator, SigningStep
+from tests.test_ceremony_events import StubSessionManager
+
+
+class FakeRedis:
+    """The subset of redis-py the executor's lease uses"""
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value.encode()
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def delete(self, key):
+        return int(self.data.pop(key, None) is not None)
+
+    def register_script(self, script):
+        """The lease scripts, run under a lock as Redis runs them atomically"""
+        def renew(keys, args):
+            with self.lock:
+                holder = self.data.get(keys[0])
+                if holder is None:
+                    self.data[keys[0]] = args[0].encode()
+                return int(holder is None or holder.decode() == args[0])
+
+        def release(keys, args):
+            with self.lock:
+                if self.data.get(keys[0], b'').decode() == args[0]:
+                    return self.delete(keys[0])
+                return 0
+
+        return {_RENEW_LEASE: renew, _RELEASE_LEASE: release}[script]
+
+
+class RecordingSteps:
+    """Stands in for the orchestrator's step implementations"""
+
+    def __init__(self, delay=0.0, hang=None):
+        self.delay = delay
+        self.hang = hang
+        self.calls = []
+        self.spans = {}
+        self.signature_data = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, session_id, step, ceremony_state, signature_data=None):
+        started = time.monotonic()
+        with self.lock:
+            self.calls.append(step)
+            self.signature_data[step] = signature_data
+        time.sleep(5 if step == self.hang else self.delay)
+        if step == SigningStep.ARK_TRANSACTION_PREP:
+            ceremony_state['ark_tx_id'] = 'ark-tx'
+            ceremony_state['transactions']['ark_tx'] = 'ark-tx'
+        elif step == SigningStep.CHECKPOINT_TRANSACTION_PREP:
+            ceremony_state['checkpoint_tx_id'] = 'checkpoint-tx'
+            ceremony_state['transactions']['checkpoint_tx'] = 'checkpoint-tx'
+        elif step == SigningStep.SIGNATURE_COLLECTION:
+            ceremony_state['signatures_collected']['user'] = 'user-sig'
+        self.spans[step] = (started, time.monotonic())
+        return {'step': step.value, 'status': 'completed', 'txid': ceremony_state.get('ark_tx_id')}
+
+
+@pytest.fixture
+def orchestrator():
+    orchestrator = SigningOrchestrator(step_timeout=2)
+    orchestrator.session_manager = StubSessionManager('sess-1')
+    return orchestrator
+
+
+@pytest.fixture
+def executor(orchestrator):
+    executor = CeremonyExecutor(orchestrator, redis_client=FakeRedis())
+    with patch.object(executor, '_enqueue_job') as enqueue_job, \
+            patch('core.signing_orchestrator.get_ceremony_events', return_value=None):
+        executor.enqueue_job = enqueue_job
+        yield executor
+
+
+class TestCeremonyExecutor:
+    """Test staged execution, step timeouts, checkpoints and resumption"""
+
+    def test_enqueue_stores_queued_state(self, executor, orchestrator):
+        status = executor.enqueue('sess-1')
+
+        executor.enqueue_job.assert_called_once_with('sess-1')
+        assert status['session_status'] == 'awaiting_signature'
+        state = orchestrator.session_manager.session.result_data['ceremony_state']
+        assert state['executor']['status'] == 'queued'
+        with pytest.raises(Exception):
+            executor.enqueue('sess-1')
+
+    def test_runs_ceremony_with_concurrent_stage(self, executor, orchestrator):
+        steps = RecordingSteps(delay=0.2)
+        orchestrator._execute_signing_step = steps
+        executor.enqueue('sess-1')
+
+        result = executor.run('sess-1')
+
+        assert result['status'] == 'completed'
+        session = orchestrator.session_manager.session
+        assert session.status == 'completed'
+        assert len(steps.calls) == 6
+        checkpoint = steps.spans[SigningStep.CHECKPOINT_TRANSACTION_PREP]
+        signatures = steps.spans[SigningStep.SIGNATURE_COLLECTION]
+        assert checkpoint[0] < signatures[1] and signatures[0] < checkpoint[1]
+        assert 'ceremony_lock:sess-1' not in executor.redis.data
+
+    def test_client_signatures_reach_signature_collection(self, executor, orchestrator):
+        steps = RecordingSteps()
+        orchestrator._execute_signing_step = steps
+        executor.enqueue('sess-1', {'user_signature': 'client-sig'})
+
+        assert executor.run('sess-1')['status'] == 'completed'
+        assert steps.signature_data[SigningStep.SIGNATURE_COLLECTION] == {'user_signature': 'client-sig'}
+        assert steps.signature_data[SigningStep.ARK_TRANSACTION_PREP] is None
+
+    def test_step_timeout_fails_ceremony(self, executor, orchestrator):
+        steps = RecordingSteps(hang=SigningStep.FINALIZATION)
+        orchestrator._execute_signing_step = steps
+        orchestrator.step_timeout = 0.3
+        executor.enqueue('sess-1')
+
+        started = time.monotonic()
+        result = executor.run('sess-1')
+
+        assert time.monotonic() - started < 2
+        assert result == {'session_id': 'sess-1', 'status': 'failed', 'step': 'finalization',
+                          'error': 'Step finalization timed out after 0.3s'}
+        assert orchestrator.session_manager.session.status == 'failed'
+        assert executor.get_stats()['timeouts'] == 1
+
+    def test_resume_skips_checkpointed_steps(self, executor, orchestrator):
+        steps = RecordingSteps()
+        orchestrator._execute_signing_step = steps
+        executor.enqueue('sess-1')
+        state = orchestrator.session_manager.session.result_data['ceremony_state']
+        state['completed_steps'] = ['intent_verification', 'ark_transaction_prep']
+        state['ark_tx_id'] = 'ark-tx'
+        state['executor']['status'] = 'running'
+        orchestrator.session_manager.session.status = 'signing'
+
+        assert executor.run('sess-1')['status'] == 'completed'
+
+        assert SigningStep.INTENT_VERIFICATION not in steps.calls
+        assert SigningStep.ARK_TRANSACTION_PREP not in steps.calls
+        assert len(steps.calls) == 4
+        assert executor.get_stats()['resumed'] == 1
+
+    def test_concurrent_steps_checkpoint_both_changes(self, executor, orchestrator):
+        steps = RecordingSteps(hang=SigningStep.ARK_PROTOCOL_EXECUTION)
+        orchestrator._execute_signing_step = steps
+        orchestrator.step_timeout = 0.3
+        executor.enqueue('sess-1')
+        checkpoints = []
+        record = orchestrator.session_manager._update_session_result
+        orchestrator.session_manager._update_session_result = lambda sid, data, signed_tx=None: (
+            checkpoints.append(data['ceremony_state'].copy()) or record(sid, data, signed_tx))
+
+        executor.run('sess-1')
+
+        state = checkpoints[-1]
+        assert state['completed_steps'] == ['intent_verification', 'ark_transaction_prep',
+                                            'checkpoint_transaction_prep', 'signature_collection']
+        assert state['transactions'] == {'ark_tx': 'ark-tx', 'checkpoint_tx': 'checkpoint-tx'}
+        assert state['signatures_collected'] == {'user': 'user-sig'}
+
+    def test_cancelled_mid_ceremony_stops_before_next_stage(self, executor, orchestrator):
+        steps = RecordingSteps()
+
+        def cancel_during_ark_prep(session_id, step, ceremony_state, signature_data=None):
+            result = steps(session_id, step, ceremony_state, signature_data)
+            if step == SigningStep.ARK_TRANSACTION_PREP:
+                orchestrator.session_manager.fail_session(session_id, 'Cancelled: User cancelled')
+            return result
+
+        orchestrator._execute_signing_step = cancel_during_ark_prep
+        executor.enqueue('sess-1')
+
+        result = executor.run('sess-1')
+
+        assert result == {'session_id': 'sess-1', 'status': 'failed'}
+        assert steps.calls == [SigningStep.INTENT_VERIFICATION, SigningStep.ARK_TRANSACTION_PREP]
+        assert executor.get_stats()['stopped'] == 1
+
+    def test_rejected_completion_fails_ceremony(self, executor, orchestrator):
+        orchestrator._execute_signing_step = RecordingSteps()
+        executor.enqueue('sess-1')
+
+        with patch.object(orchestrator.session_manager, 'complete_session', return_value=False):
+            result = executor.run('sess-1')
+
+        assert result['status'] == 'failed'
+        assert result['step'] == 'finalization'
+        assert orchestrator.session_manager.session.status == 'failed'
+
+    def test_held_lease_is_respected(self, executor, orchestrator):
+        steps = RecordingSteps()
+        orchestrator._execute_signing_step = steps
+        executor.enqueue('sess-1')
+        executor.redis.set('ceremony_lock:sess-1', 'other-worker')
+
+        assert executor.run('sess-1')['status'] == 'locked'
+        assert steps.calls == []
+
+    def test_lease_renewed_and_released_only_by_holder(self, executor):
+        executor.redis.set('ceremony_lock:sess-1', 'other-worker')
+
+        assert not executor._renew('sess-1', 'mine')
+        executor._release('sess-1', 'mine')
+        assert executor.redis.get('ceremony_lock:sess-1') == b'other-worker'
+
+        executor.redis.delete('ceremony_lock:sess-1')
+        assert executor._renew('sess-1', 'mine')
+        executor._release('sess-1', 'mine')
+        assert 'ceremony_lock:sess-1' not in executor.redis.data
@@ -21,6 +21,10 @@ TEST_CONFIG = {
     # Test database
     'DATABASE_URL': 'sqlite:///:memory:',
     'REDIS_URL': 'redis://localhost:6379/1',
+    'BALANCE_CACHE_ENABLED': 'false',
+    'SESSION_STATE_REDIS': 'false',
+    'CEREMONY_EVENTS_ENABLED': 'false',
+    'VTXO_INDEX_LAZY_BUILD': 'false',
 
     # Test settings
     'FLASK_ENV': 'testing',
@@ -7,10 +7,18 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 import tempfile
 import os as _os
-from core.models import Base
+from core.models import Base, install_flush_bootstrap, remove_flush_bootstrap
 import os
 
 
+@pytest.fixture(scope="session", autouse=True)
+def schema_bootstrap():
+    """Create tables on the first flush against any engine a test builds itself."""
+    install_flush_bootstrap()
+    yield
+    remove_flush_bootstrap()
+
+
 @pytest.fixture(scope="function")
 def test_db_session():
     """Create an isolated in-memory DB session per test, shared across threads."""
@@ -0,0 +1,136 @@
+"""
+Test cases for set-based expiry sweeps
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from prometheus_client import REGISTRY
+from sqlalchemy.orm import sessionmaker
+
+from core.models import Asset, Vtxo, SigningChallenge
+from core.expiry_sweeper import ExpirySweeper
+from core.challenge_manager import ChallengeManager
+from core.vtxo_manager import VtxoManager
+from tests.test_database_setup import test_db_session
+
+
+@pytest.fixture
+def SessionLocal(test_db_session):
+    return sessionmaker(bind=test_db_session._engine)
+
+
+def seed(SessionLocal, expired=0, fresh=0, status='available', amount=100):
+    session = SessionLocal()
+    if not session.query(Asset).filter_by(asset_id='BTC').first():
+        session.add(Asset(asset_id='BTC', name='Bitcoin', ticker='BTC'))
+    offset = session.query(Vtxo).count()
+    now = datetime.utcnow()
+    for i in range(expired + fresh):
+        session.add(Vtxo(
+            vtxo_id=f'vtxo_{offset + i}', txid='tx', vout=i, amount_sats=amount,
+            script_pubkey=b'script', asset_id='BTC', user_pubkey='', status=status,
+            expires_at=now - timedelta(hours=1) if i < expired else now + timedelta(hours=1)
+        ))
+    session.commit()
+    session.close()
+
+
+def expired_available():
+    return [Vtxo.expires_at <= datetime.utcnow(), Vtxo.status == 'available']
+
+
+class TestExpirySweeper:
+    """Test chunked UPDATE/DELETE sweeps"""
+
+    def test_updates_in_batches(self, SessionLocal):
+        seed(SessionLocal, expired=25, fresh=5)
+        seed(SessionLocal, expired=3, status='assigned')
+        session = SessionLocal()
+
+        result = ExpirySweeper(batch_size=10).sweep(
+            session, 'vtxos', Vtxo, expired_available(), values={'status': 'expired'}
+        )
+
+        assert (result.rows, result.batches, result.complete) == (25, 3, True)
+        assert session.query(Vtxo).filter_by(status='expired').count() == 25
+        assert session.query(Vtxo).filter_by(status='available').count() == 5
+        assert session.query(Vtxo).filter_by(status='assigned').count() == 3
+        session.close()
+
+    def test_sums_column_over_swept_rows(self, SessionLocal):
+        seed(SessionLocal, expired=12, fresh=4, amount=250)
+        session = SessionLocal()
+
+        result = ExpirySweeper(batch_size=5).sweep(
+            session, 'vtxos', Vtxo, expired_available(), values={'status': 'expired'},
+            sum_column=Vtxo.amount_sats
+        )
+
+        assert result.rows == 12
+        assert result.total == 3000
+        session.close()
+
+    def test_deletes_when_no_values_given(self, SessionLocal):
+        session = SessionLocal()
+        now = datetime.utcnow()
+        for i in range(7):
+            session.add(SigningChallenge(
+                challenge_id=f'challenge_{i}', challenge_data=b'data', context='ctx',
+                expires_at=now - timedelta(minutes=1) if i < 5 else now + timedelta(minutes=5),
+                is_used=(i == 0)
+            ))
+        session.commit()
+
+        result = ExpirySweeper(batch_size=2).sweep(
+            session, 'signing_challenges', SigningChallenge,
+            [SigningChallenge.expires_at < datetime.utcnow(), SigningChallenge.is_used == False]
+        )
+
+        assert result.rows == 4
+        assert session.query(SigningChallenge).count() == 3
+        session.close()
+
+    def test_stops_at_time_budget(self, SessionLocal):
+        seed(SessionLocal, expired=30)
+        session = SessionLocal()
+
+        result = ExpirySweeper(batch_size=10, time_budget_seconds=0).sweep(
+            session, 'vtxos', Vtxo, expired_available(), values={'status': 'expired'}
+        )
+
+        assert (result.rows, result.batches, result.complete) == (10, 1, False)
+        assert session.query(Vtxo).filter_by(status='available').count() == 20
+        session.close()
+
+    def test_reports_throughput_metrics(self, SessionLocal):
+        seed(SessionLocal, expired=6)
+        before = REGISTRY.get_sample_value('arkrelay_expiry_sweep_rows_total', {'target': 'metrics_test'}) or 0
+        session = SessionLocal()
+
+        ExpirySweeper().sweep(session, 'metrics_test', Vtxo, expired_available(), values={'status': 'expired'})
+        session.close()
+
+        assert REGISTRY.get_sample_value('arkrelay_expiry_sweep_rows_total', {'target': 'metrics_test'}) == before + 6
+        assert REGISTRY.get_sample_value('arkrelay_expiry_sweep_rows_per_second', {'target': 'metrics_test'}) > 0
+
+
+class TestManagerSweeps:
+    """Manager cleanup methods delegate to the sweeper"""
+
+    def test_vtxo_manager_cleanup(self, SessionLocal):
+        seed(SessionLocal, expired=4, fresh=2)
+
+        with patch('core.vtxo_manager.get_session', side_effect=lambda: SessionLocal()):
+            assert VtxoManager().cleanup_expired_vtxos() == 4
+            assert VtxoManager().cleanup_expired_vtxos() == 0
+
+    def test_challenge_manager_cleanup(self, SessionLocal):
+        session = SessionLocal()
+        session.add(SigningChallenge(challenge_id='old', challenge_data=b'd', context='c',
+                                     expires_at=datetime.utcnow() - timedelta(minutes=1)))
+        session.commit()
+        session.close()
+
+        with patch('core.challenge_manager.get_session', side_effect=lambda: SessionLocal()):
+            assert ChallengeManager().cleanup_expired_challenges() == 1
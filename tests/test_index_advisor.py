@@ -0,0 +1,64 @@
+"""
+Test cases for the hot-path index advisor
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from core.models import Base, Asset, AssetBalance
+from core.index_advisor import run_advisor, main, CANONICAL_QUERIES
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+class TestIndexAdvisor:
+    """Test EXPLAIN-based full scan detection"""
+
+    def test_no_full_scans_with_model_indexes(self, engine):
+        report = run_advisor(engine)
+
+        assert report['dialect'] == 'sqlite'
+        assert len(report['queries']) == len(CANONICAL_QUERIES)
+        assert all('error' not in q for q in report['queries'])
+        assert report['full_scans'] == []
+
+    def test_detects_full_scan_when_index_missing(self, engine):
+        with engine.begin() as conn:
+            for name in ('ix_vtxos_asset_status_amount_expires', 'ix_vtxos_user_status', 'ix_vtxos_status_expires'):
+                conn.execute(text(f'DROP INDEX {name}'))
+
+        report = run_advisor(engine)
+
+        assert 'vtxo_assignment' in report['full_scans']
+
+    def test_cli_exit_code(self, tmp_path):
+        db_path = tmp_path / 'advisor.sqlite'
+        url = f'sqlite:///{db_path}'
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        engine.dispose()
+
+        assert main(['--database-url', url]) == 0
+
+
+class TestAssetBalanceUniqueness:
+    """The (user_pubkey, asset_id) pair identifies a single balance row"""
+
+    def test_duplicate_balance_rejected(self, engine):
+        session = sessionmaker(bind=engine)()
+        session.add(Asset(asset_id='BTC', name='Bitcoin', ticker='BTC'))
+        session.add(AssetBalance(user_pubkey='user', asset_id='BTC', balance=1))
+        session.commit()
+
+        session.add(AssetBalance(user_pubkey='user', asset_id='BTC', balance=2))
+        with pytest.raises(IntegrityError):
+            session.commit()
+        session.close()
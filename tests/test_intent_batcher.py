@@ -0,0 +1,146 @@
+"""
+Test cases for batched Action Intent ingestion
+"""
+
+import pytest
+import threading
+import time
+from unittest.mock import Mock, patch
+from sqlalchemy.orm import sessionmaker
+
+from core.models import AssetBalance, SigningChallenge, SigningSession
+from nostr_clients.intent_batcher import IntentBatcher, PendingIntent
+from nostr_clients.nostr_client import ActionIntent, NostrEvent
+from nostr_clients.nostr_handlers import NostrEventHandler
+from tests.test_database_setup import test_db_session
+
+
+@pytest.fixture
+def SessionLocal(test_db_session):
+    SessionLocal = sessionmaker(bind=test_db_session._engine)
+    session = SessionLocal()
+    session.add(AssetBalance(user_pubkey='alice', asset_id='BTC', balance=1000, reserved_balance=0))
+    session.commit()
+    session.close()
+    with patch('nostr_clients.intent_batcher.get_session', side_effect=lambda: SessionLocal()):
+        yield SessionLocal
+
+
+@pytest.fixture
+def handler():
+    handler = NostrEventHandler.__new__(NostrEventHandler)
+    handler.client = Mock()
+    handler.client.public_key = bytes(32)
+    handler.client.validate_event_signatures.side_effect = lambda events: [True] * len(events)
+    handler.redis_conn = Mock()
+    handler.intent_batcher = None
+    return handler
+
+
+def pending(n, user='alice', amount=100, session_type='p2p_transfer', intent_data=None):
+    event = NostrEvent(id=f'event{n}', pubkey=user, created_at=0, kind=31510, tags=[], content='', sig='')
+    data = intent_data if intent_data is not None else {
+        'recipient_pubkey': f'recipient{n}', 'asset_id': 'BTC', 'amount': amount
+    }
+    return PendingIntent(event, ActionIntent(user, session_type, data, int(time.time())))
+
+
+class TestIntentBatcher:
+    """Test batch validation, bulk persistence and publication"""
+
+    def test_batch_creates_sessions_and_challenges(self, SessionLocal, handler):
+        batcher = IntentBatcher(handler)
+        created = batcher.process_batch([pending(i) for i in range(5)])
+
+        assert len(created) == 5
+        session = SessionLocal()
+        sessions = {s.session_id: s for s in session.query(SigningSession).all()}
+        challenges = session.query(SigningChallenge).all()
+        assert len(sessions) == len(challenges) == 5
+        for challenge in challenges:
+            assert sessions[challenge.session_id].challenge_id == challenge.challenge_id
+            assert sessions[challenge.session_id].status == 'challenge_sent'
+        session.close()
+        assert handler.client.publish_signing_challenge.call_count == 5
+        assert handler.redis_conn.publish.call_count == 5
+
+    def test_invalid_intents_rejected_individually(self, SessionLocal, handler):
+        batcher = IntentBatcher(handler)
+        batch = [
+            pending(0),
+            pending(1, amount=5000),  # more than alice holds
+            pending(2, user='nobody'),  # no balance row
+            pending(3, session_type='unknown'),
+            pending(4, intent_data={'asset_id': 'BTC'}),  # missing fields
+            pending(5, amount='lots'),
+            pending(6)
+        ]
+        created = batcher.process_batch(batch)
+
+        assert [p.event.id for p in created] == ['event0', 'event6']
+        assert [p.error for p in batch[1:6]] == [
+            'insufficient balance', 'insufficient balance', 'invalid intent', 'invalid intent',
+            'insufficient balance'
+        ]
+        assert batcher.get_stats()['rejected'] == 5
+
+    def test_signatures_verified_once_per_batch(self, SessionLocal, handler):
+        handler.client.validate_event_signatures.side_effect = lambda events: [e.id != 'event1' for e in events]
+        batcher = IntentBatcher(handler)
+        batch = [pending(i) for i in range(3)]
+        created = batcher.process_batch(batch)
+
+        handler.client.validate_event_signatures.assert_called_once()
+        assert [p.event.id for p in created] == ['event0', 'event2']
+        assert batch[1].error == 'invalid signature'
+
+    def test_failed_insert_isolated_to_its_intent(self, SessionLocal, handler):
+        batcher = IntentBatcher(handler)
+        batch = [pending(i) for i in range(3)]
+        # an intent whose data cannot be stored as JSON fails the shared insert
+        batch[1].action_intent.intent_data['recipient_pubkey'] = object()
+
+        created = batcher.process_batch(batch)
+
+        assert [p.event.id for p in created] == ['event0', 'event2']
+        assert batch[1].error
+        session = SessionLocal()
+        assert session.query(SigningSession).count() == 2
+        assert session.query(SigningChallenge).count() == 2
+        session.close()
+
+    def test_publications_run_in_parallel(self, SessionLocal, handler):
+        running, peak, lock = [0], [0], threading.Lock()
+
+        def slow_publish(**kwargs):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+
+        handler.client.publish_signing_challenge.side_effect = slow_publish
+        handler._publish_to_redis = Mock(side_effect=[None, RuntimeError("redis down"), None, None])
+        batcher = IntentBatcher(handler, publish_workers=4)
+
+        created = batcher.process_batch([pending(i) for i in range(4)])
+
+        assert peak[0] > 1
+        assert len(created) == 4
+        assert batcher.get_stats()['publish_errors'] == 1
+
+    def test_handler_queues_intents_into_batches(self, SessionLocal, handler):
+        handler.client.validate_event_signature.return_value = True
+        handler.client.parse_action_intent.side_effect = lambda event: pending(event.id).action_intent
+        handler.intent_batcher = IntentBatcher(handler, max_latency_ms=100, max_batch_size=10)
+
+        for i in range(10):
+            handler.handle_action_intent(pending(i).event)
+
+        deadline = time.time() + 5
+        while handler.intent_batcher.get_stats()['sessions_created'] < 10 and time.time() < deadline:
+            time.sleep(0.01)
+        stats = handler.intent_batcher.get_stats()
+        assert stats['sessions_created'] == 10
+        assert stats['batches'] < 10
@@ -0,0 +1,411 @@
+"""
+Test cases for the atomic balance ledger
+"""
+
+import pytest
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from core.asset_manager import AssetManager, InsufficientAssetError
+from core.asset_manager import AssetError
+from core.ledger import (
+    BalanceDelta, BalanceLedger, InsufficientLedgerBalance, LedgerError, LedgerGroupCommitter, SupplyLimitExceeded,
+    _PendingChange
+)
+from core.models import Asset, AssetBalance, AssetSupply, LedgerEntry
+from nostr_clients.nostr_workers import NostrWorker
+from tests.test_database_setup import test_db_session
+
+
+@pytest.fixture
+def SessionLocal(test_db_session):
+    SessionLocal = sessionmaker(bind=test_db_session._engine)
+    session = SessionLocal()
+    session.add(Asset(asset_id='BTC', name='Bitcoin', ticker='BTC'))
+    session.add(AssetBalance(user_pubkey='alice', asset_id='BTC', balance=5000, reserved_balance=1000))
+    session.add(AssetBalance(user_pubkey='bob', asset_id='BTC', balance=100, reserved_balance=0))
+    session.commit()
+    session.close()
+    return SessionLocal
+
+
+def balance_of(SessionLocal, user_pubkey):
+    session = SessionLocal()
+    try:
+        row = session.query(AssetBalance).filter_by(user_pubkey=user_pubkey, asset_id='BTC').first()
+        return (row.balance, row.reserved_balance) if row else None
+    finally:
+        session.close()
+
+
+class TestBalanceLedger:
+    """Test guarded debits, upserted credits and lock ordering"""
+
+    def test_debit_guarded_on_available_balance(self, SessionLocal):
+        session = SessionLocal()
+        ledger = BalanceLedger()
+
+        ledger.apply(session, [BalanceDelta('alice', 'BTC', balance=-4000, min_available=4000)])
+        with pytest.raises(InsufficientLedgerBalance):
+            ledger.apply(session, [BalanceDelta('alice', 'BTC', balance=-1, min_available=1)])
+        session.commit()
+        session.close()
+
+        assert balance_of(SessionLocal, 'alice') == (1000, 1000)
+
+    def test_credit_upserts_missing_row(self, SessionLocal):
+        session = SessionLocal()
+        BalanceLedger().apply(session, [
+            BalanceDelta('carol', 'BTC', balance=300),
+            BalanceDelta('bob', 'BTC', reserved=50)
+        ])
+        BalanceLedger().apply(session, [BalanceDelta('carol', 'BTC', balance=200)])
+        session.commit()
+        session.close()
+
+        assert balance_of(SessionLocal, 'carol') == (500, 0)
+        assert balance_of(SessionLocal, 'bob') == (100, 50)
+
+    def test_failed_debit_rolls_back_whole_transfer(self, SessionLocal):
+        session = SessionLocal()
+        with pytest.raises(InsufficientLedgerBalance):
+            # the credit to alice is applied first; the debit of zed (no row) fails
+            BalanceLedger().apply(session, [
+                BalanceDelta('alice', 'BTC', balance=500),
+                BalanceDelta('zed', 'BTC', balance=-500, min_available=500)
+            ])
+        session.rollback()
+        session.close()
+
+        assert balance_of(SessionLocal, 'alice') == (5000, 1000)
+        assert balance_of(SessionLocal, 'zed') is None
+
+    def test_failed_change_removes_rows_it_created(self, SessionLocal):
+        session = SessionLocal()
+        BalanceLedger().apply(session, [BalanceDelta('bob', 'BTC', balance=5)])
+        with pytest.raises(InsufficientLedgerBalance):
+            # 'carol' sorts before 'zed', so her row is created before the debit fails
+            BalanceLedger().apply(session, [
+                BalanceDelta('carol', 'BTC', balance=500),
+                BalanceDelta('zed', 'BTC', balance=-500, min_available=500)
+            ])
+        session.commit()
+        session.close()
+
+        assert balance_of(SessionLocal, 'bob') == (105, 0)
+        assert balance_of(SessionLocal, 'carol') is None
+
+    def test_caller_rollback_discards_change(self, SessionLocal):
+        session = SessionLocal()
+        BalanceLedger().apply(session, [BalanceDelta('bob', 'BTC', balance=5)])
+        session.rollback()
+        session.close()
+
+        assert balance_of(SessionLocal, 'bob') == (100, 0)
+
+    def test_rows_touched_in_key_order(self, SessionLocal):
+        session = SessionLocal()
+        statements = []
+        listener = lambda conn, cursor, statement, params, context, executemany: statements.append(params)
+        event.listen(session.get_bind(), 'before_cursor_execute', listener)
+        try:
+            BalanceLedger().apply(session, [
+                BalanceDelta('bob', 'BTC', balance=-10),
+                BalanceDelta('alice', 'BTC', balance=10)
+            ])
+            session.commit()
+        finally:
+            event.remove(session.get_bind(), 'before_cursor_execute', listener)
+            session.close()
+
+        users = [next(v for v in p if v in ('alice', 'bob')) for p in statements if isinstance(p, tuple) and p]
+        assert users == ['alice', 'bob']
+
+    def test_objects_in_session_see_new_values(self, SessionLocal):
+        session = SessionLocal()
+        alice = session.query(AssetBalance).filter_by(user_pubkey='alice').one()
+
+        BalanceLedger().apply(session, [BalanceDelta('alice', 'BTC', reserved=-1000)])
+
+        assert alice.reserved_balance == 0
+        session.close()
+
+
+class TestLedgerCallSites:
+    """Asset transfers and worker balance helpers go through the ledger"""
+
+    def test_concurrent_transfers_lose_no_updates(self, SessionLocal):
+        manager = AssetManager()
+        with patch('core.asset_manager.get_session', side_effect=lambda: SessionLocal()):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(lambda i: manager.transfer_assets(
+                    *(('alice', 'bob') if i % 2 else ('bob', 'alice')), 'BTC', 10
+                ), range(40)))
+            with pytest.raises(InsufficientAssetError, match="Insufficient available balance"):
+                manager.transfer_assets('alice', 'bob', 'BTC', 4001)
+
+        assert balance_of(SessionLocal, 'alice') == (5000, 1000)
+        assert balance_of(SessionLocal, 'bob') == (100, 0)
+
+    def test_worker_reserve_deduct_and_transfer(self, SessionLocal):
+        worker = NostrWorker.__new__(NostrWorker)
+        with patch('nostr_clients.nostr_workers.get_session', side_effect=lambda: SessionLocal()):
+            assert worker._reserve_balance('bob', 'BTC', 100)
+            assert not worker._reserve_balance('bob', 'BTC', 1)
+            assert worker._transfer_balance('bob', 'dave', 'BTC', 60)
+            assert worker._deduct_balance('bob', 'BTC', 40)
+            assert not worker._deduct_balance('bob', 'BTC', 1)
+            assert worker._add_balance('bob', 'BTC', 5)
+
+        assert balance_of(SessionLocal, 'bob') == (5, 0)
+        assert balance_of(SessionLocal, 'dave') == (60, 0)
+
+
+class TestLedgerJournal:
+    """Test the journal, supply counters, snapshots and replay"""
+
+    def test_journal_written_in_one_batch(self, SessionLocal):
+        session = SessionLocal()
+        statements = []
+        listener = lambda conn, cursor, statement, params, context, executemany: statements.append(statement)
+        event.listen(session.get_bind(), 'before_cursor_execute', listener)
+        try:
+            BalanceLedger().apply(session, [
+                BalanceDelta('alice', 'BTC', balance=-10, min_available=10),
+                BalanceDelta('bob', 'BTC', balance=10)
+            ], entry_type='transfer', reference='tx1')
+            session.commit()
+        finally:
+            event.remove(session.get_bind(), 'before_cursor_execute', listener)
+
+        entries = session.query(LedgerEntry).order_by(LedgerEntry.user_pubkey).all()
+        assert [(e.user_pubkey, e.balance_delta, e.entry_type, e.reference) for e in entries] == [
+            ('alice', -10, 'transfer', 'tx1'), ('bob', 10, 'transfer', 'tx1')
+        ]
+        assert len([s for s in statements if 'ledger_entries' in s]) == 1
+        # a transfer has no net supply change, so the counter is never touched
+        assert not [s for s in statements if 'asset_supply' in s]
+        session.close()
+
+    def test_supply_limit_checked_on_counter(self, SessionLocal):
+        session = SessionLocal()
+        ledger = BalanceLedger()
+
+        ledger.apply(session, [BalanceDelta('carol', 'BTC', balance=900)], supply_limits={'BTC': 6000})
+        with pytest.raises(SupplyLimitExceeded):
+            ledger.apply(session, [BalanceDelta('carol', 'BTC', balance=1)], supply_limits={'BTC': 6000})
+        ledger.apply(session, [BalanceDelta('alice', 'BTC', balance=-1000, reserved=1000)])
+        session.commit()
+
+        # counter started from SUM(balance) = 5100 and follows net balance changes
+        assert session.get(AssetSupply, 'BTC').circulating == 5000
+        assert ledger.circulating_supply(session, ['BTC', 'ETH']) == {'BTC': 5000, 'ETH': 0}
+        session.close()
+
+    def test_mint_respects_total_supply(self, SessionLocal):
+        session = SessionLocal()
+        session.add(Asset(asset_id='GOLD', name='Gold', ticker='GLD', total_supply=1000))
+        session.commit()
+        session.close()
+
+        manager = AssetManager()
+        with patch('core.asset_manager.get_session', side_effect=lambda: SessionLocal()):
+            assert manager.mint_assets('alice', 'GOLD', 600)['new_balance'] == 600
+            assert manager.mint_assets('bob', 'GOLD', 400)['new_balance'] == 400
+            with pytest.raises(AssetError, match="exceed total supply"):
+                manager.mint_assets('alice', 'GOLD', 1)
+            assert manager.get_asset_info('GOLD')['total_circulating'] == 1000
+
+    def test_replay_from_snapshot_matches_balances(self, SessionLocal):
+        session = SessionLocal()
+        ledger = BalanceLedger(snapshot_settle_seconds=0)
+        ledger.apply(session, [BalanceDelta('erin', 'ETH', balance=500), BalanceDelta('finn', 'ETH', balance=300)])
+        session.commit()
+
+        time.sleep(0.01)
+        assert ledger.take_snapshot(session)['rows'] == 2
+        assert ledger.take_snapshot(session)['rows'] == 0
+
+        ledger.apply(session, [
+            BalanceDelta('erin', 'ETH', balance=-200, min_available=200),
+            BalanceDelta('finn', 'ETH', balance=200)
+        ])
+        ledger.apply(session, [BalanceDelta('finn', 'ETH', balance=-100, reserved=100)])
+        session.commit()
+
+        assert ledger.replay_balances(session, 'ETH') == {'erin': (300, 0), 'finn': (400, 100)}
+        assert ledger.reconcile(session, 'ETH')['balance_drift'] == []
+
+        time.sleep(0.01)
+        assert ledger.take_snapshot(session)['rows'] == 2
+        assert ledger.replay_balances(session, 'ETH') == {'erin': (300, 0), 'finn': (400, 100)}
+        session.close()
+
+    def test_reconcile_reports_and_fixes_drift(self, SessionLocal):
+        session = SessionLocal()
+        ledger = BalanceLedger()
+        ledger.apply(session, [BalanceDelta('erin', 'ETH', balance=500)])
+        session.commit()
+        # a write that bypassed the ledger
+        session.query(AssetBalance).filter_by(user_pubkey='erin', asset_id='ETH').update({'balance': 450})
+        session.commit()
+
+        report = ledger.reconcile(session, 'ETH', fix_supply=True)
+
+        assert report['balance_drift'] == [{'user_pubkey': 'erin', 'stored': (450, 0), 'replayed': (500, 0)}]
+        assert (report['supply_counter'], report['supply_actual']) == (500, 450)
+        assert session.get(AssetSupply, 'ETH').circulating == 450
+        session.close()
+
+
+class TestLedgerGroupCommit:
+    """Test batching of concurrent changes into shared commits"""
+
+    def test_concurrent_changes_share_commits(self, SessionLocal):
+        committer = LedgerGroupCommitter(BalanceLedger(), session_factory=SessionLocal,
+                                         max_latency_ms=50, max_batch_size=100)
+        commits = []
+        engine = SessionLocal.kw['bind']
+        listener = lambda conn: commits.append(1)
+        event.listen(engine, 'commit', listener)
+        try:
+            with ThreadPoolExecutor(max_workers=20) as pool:
+                list(pool.map(lambda i: committer.submit([
+                    BalanceDelta('alice', 'BTC', balance=-10, min_available=10),
+                    BalanceDelta(f'user{i}', 'BTC', balance=10)
+                ], entry_type='transfer'), range(20)))
+        finally:
+            event.remove(engine, 'commit', listener)
+
+        # every submit returned after its change was committed
+        assert balance_of(SessionLocal, 'alice') == (4800, 1000)
+        assert all(balance_of(SessionLocal, f'user{i}') == (10, 0) for i in range(20))
+        assert committer.changes == 20
+        assert len(commits) == committer.batches < 20
+
+    def test_failed_change_does_not_affect_batch(self, SessionLocal):
+        committer = LedgerGroupCommitter(BalanceLedger(), session_factory=SessionLocal,
+                                         max_latency_ms=50, max_batch_size=100)
+
+        def submit(deltas):
+            try:
+                committer.submit(deltas)
+                return True
+            except InsufficientLedgerBalance:
+                return False
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            # 'aaa' sorts before 'bob', so its credit runs before the failing debit
+            failing = pool.submit(submit, [BalanceDelta('aaa', 'BTC', balance=50),
+                                           BalanceDelta('bob', 'BTC', balance=-200, min_available=200)])
+            passing = pool.submit(submit, [BalanceDelta('bob', 'BTC', balance=-40, min_available=40),
+                                           BalanceDelta('carol', 'BTC', balance=40)])
+            assert not failing.result()
+            assert passing.result()
+
+        assert committer.batches == 1
+        assert balance_of(SessionLocal, 'aaa') is None
+        assert balance_of(SessionLocal, 'bob') == (60, 0)
+        assert balance_of(SessionLocal, 'carol') == (40, 0)
+        session = SessionLocal()
+        assert not session.query(LedgerEntry).filter_by(user_pubkey='aaa').count()
+        session.close()
+
+    def test_batch_locks_union_of_rows_in_key_order(self, SessionLocal):
+        committer = LedgerGroupCommitter(BalanceLedger(), session_factory=SessionLocal)
+        batch = [
+            _PendingChange([BalanceDelta('bob', 'BTC', balance=-10, min_available=10),
+                            BalanceDelta('carol', 'BTC', balance=10)], 'transfer', None, None),
+            _PendingChange([BalanceDelta('alice', 'BTC', balance=-10, min_available=10),
+                            BalanceDelta('bob', 'BTC', balance=10)], 'transfer', None, None),
+        ]
+        statements = []
+        listener = lambda conn, cursor, statement, params, context, executemany: statements.append((statement, params))
+        engine = SessionLocal.kw['bind']
+        event.listen(engine, 'before_cursor_execute', listener)
+        try:
+            committer._flush(batch)
+        finally:
+            event.remove(engine, 'before_cursor_execute', listener)
+
+        # one locking read over every row of the batch, in key order, before any write
+        statement, params = statements[0]
+        assert statement.startswith('SELECT asset_balances.id') and 'ORDER BY' in statement
+        assert [v for v in params if v != 'BTC'] == ['alice', 'bob', 'carol']
+        assert balance_of(SessionLocal, 'bob') == (100, 0)
+        assert balance_of(SessionLocal, 'carol') == (10, 0)
+
+    def test_lock_statements_use_for_update(self):
+        from sqlalchemy.dialects import mysql
+        session = Mock()
+
+        BalanceLedger().lock(session, [[BalanceDelta('bob', 'BTC', balance=5)]])
+
+        compiled = [str(call.args[0].compile(dialect=mysql.dialect())) for call in session.execute.call_args_list]
+        assert [sql.split()[1] for sql in compiled] == ['asset_supply.asset_id', 'asset_balances.id']
+        assert all(sql.endswith('FOR UPDATE') for sql in compiled)
+
+    def test_timed_out_queued_change_is_dropped(self, SessionLocal):
+        release = threading.Event()
+
+        def blocking_factory():
+            release.wait(5)
+            return SessionLocal()
+
+        committer = LedgerGroupCommitter(BalanceLedger(), session_factory=blocking_factory,
+                                         max_latency_ms=1, max_batch_size=1, submit_timeout=0.2)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            first = pool.submit(committer.submit, [BalanceDelta('bob', 'BTC', balance=1)])
+            time.sleep(0.05)
+            with pytest.raises(LedgerError, match="change not applied"):
+                committer.submit([BalanceDelta('carol', 'BTC', balance=7)])
+            release.set()
+            first.result()  # claimed before its timeout, so it waits for the commit
+        time.sleep(0.1)
+
+        assert balance_of(SessionLocal, 'bob') == (101, 0)
+        assert balance_of(SessionLocal, 'carol') is None
+
+    def test_timed_out_claimed_change_waits_for_its_commit(self, SessionLocal):
+        ledger = BalanceLedger()
+        apply = ledger.apply
+
+        def slow_apply(*args, **kwargs):
+            time.sleep(0.3)
+            return apply(*args, **kwargs)
+
+        committer = LedgerGroupCommitter(ledger, session_factory=SessionLocal, max_latency_ms=1, submit_timeout=0.1)
+        with patch.object(ledger, 'apply', side_effect=slow_apply):
+            committer.submit([BalanceDelta('carol', 'BTC', balance=7)])
+
+        assert balance_of(SessionLocal, 'carol') == (7, 0)
+
+    def test_batch_size_bounds_each_commit(self, SessionLocal):
+        committer = LedgerGroupCommitter(BalanceLedger(), session_factory=SessionLocal,
+                                         max_latency_ms=200, max_batch_size=4)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda i: committer.submit([BalanceDelta('bob', 'BTC', balance=1)]), range(8)))
+
+        assert committer.changes == 8
+        assert committer.batches >= 2
+        assert balance_of(SessionLocal, 'bob') == (108, 0)
+
+    def test_call_sites_use_committer_when_enabled(self, SessionLocal):
+        committer = LedgerGroupCommitter(BalanceLedger(), session_factory=SessionLocal, max_latency_ms=1)
+        worker = NostrWorker.__new__(NostrWorker)
+        with patch('core.asset_manager.get_session', side_effect=lambda: SessionLocal()), \
+                patch('core.asset_manager.get_ledger_group_committer', return_value=committer), \
+                patch('nostr_clients.nostr_workers.get_ledger_group_committer', return_value=committer):
+            result = AssetManager().transfer_assets('alice', 'bob', 'BTC', 500)
+            with pytest.raises(InsufficientAssetError, match="Insufficient available balance"):
+                AssetManager().transfer_assets('alice', 'bob', 'BTC', 4000)
+            assert worker._reserve_balance('bob', 'BTC', 600)
+            assert not worker._reserve_balance('bob', 'BTC', 1)
+
+        assert (result['sender_balance'], result['recipient_balance']) == (4500, 600)
+        assert committer.changes == 4
+        assert balance_of(SessionLocal, 'bob') == (0, 600)
@@ -0,0 +1,77 @@
+"""
+Test cases for the append-only Merkle accumulator
+"""
+
+import hashlib
+import pytest
+
+from core.merkle import MerkleAccumulator, leaf_hash, node_hash, verify_inclusion
+
+
+def digests(n):
+    return [hashlib.sha256(str(i).encode()).digest() for i in range(n)]
+
+
+def reference_root(leaves):
+    """RFC 6962 tree hash, computed recursively"""
+    if len(leaves) == 1:
+        return leaf_hash(leaves[0])
+    k = 1 << ((len(leaves) - 1).bit_length() - 1)
+    return node_hash(reference_root(leaves[:k]), reference_root(leaves[k:]))
+
+
+class TestMerkleAccumulator:
+    """Test incremental roots and inclusion proofs"""
+
+    @pytest.mark.parametrize('n', [1, 2, 3, 5, 8, 13, 64, 100])
+    def test_root_matches_recursive_tree_hash(self, n):
+        accumulator = MerkleAccumulator(keep_leaves=False)
+        for digest in digests(n):
+            accumulator.append(digest)
+
+        assert accumulator.root() == reference_root(digests(n))
+        assert len(accumulator._peaks) == bin(n).count('1')
+
+    def test_root_is_incremental(self):
+        accumulator = MerkleAccumulator()
+        roots = []
+        for digest in digests(7):
+            accumulator.append(digest)
+            roots.append(accumulator.root())
+
+        assert roots == [reference_root(digests(i)) for i in range(1, 8)]
+
+    @pytest.mark.parametrize('n', [1, 2, 3, 6, 7, 16, 37])
+    def test_every_proof_verifies(self, n):
+        accumulator = MerkleAccumulator()
+        for digest in digests(n):
+            accumulator.append(digest)
+        root = accumulator.root()
+
+        proofs = accumulator.proofs()
+
+        assert len(proofs) == n
+        for i, (digest, proof) in enumerate(zip(digests(n), proofs)):
+            assert verify_inclusion(digest, i, n, proof, root)
+            assert len(proof) <= (n - 1).bit_length()
+
+    def test_proof_rejects_wrong_leaf_or_position(self):
+        accumulator = MerkleAccumulator()
+        for digest in digests(5):
+            accumulator.append(digest)
+        root, proofs = accumulator.root(), accumulator.proofs()
+
+        assert not verify_inclusion(digests(5)[1], 2, 5, proofs[2], root)
+        assert not verify_inclusion(digests(5)[2], 3, 5, proofs[2], root)
+        assert not verify_inclusion(digests(5)[2], 5, 5, proofs[2], root)
+
+    def test_rejects_non_digest_leaves(self):
+        with pytest.raises(ValueError):
+            MerkleAccumulator().append(b'vtxo_1')
+
+    def test_proofs_need_leaves(self):
+        accumulator = MerkleAccumulator(keep_leaves=False)
+        accumulator.append(digests(1)[0])
+
+        with pytest.raises(ValueError):
+            accumulator.proofs()
@@ -12,8 +12,9 @@ from unittest.mock import Mock, patch
 from core.models import (
     Base, Asset, AssetBalance, Vtxo, SigningSession,
     SigningChallenge, Transaction, JobLog, SystemMetrics,
-    Heartbeat, get_session
+    Heartbeat, get_session, use_engine
 )
+from core import models
 
 
 @pytest.fixture
@@ -349,11 +350,151 @@ class TestGetSession:
 
     def test_get_session_failure(self):
         """Test session creation failure"""
-        with patch('core.models.create_engine', side_effect=Exception("Connection failed")):
+        with use_engine(None), patch('core.models.create_engine', side_effect=Exception("Connection failed")):
             with pytest.raises(Exception):
                 get_session()
 
 
+class TestEngineRegistry:
+    """Test cases for the process-wide engine"""
+
+    @pytest.fixture
+    def database_url(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'registry.db'}")
+        with use_engine(None):
+            yield
+            models.engine.dispose()
+
+    def test_engine_shared_across_sessions(self, database_url):
+        first, second = get_session(), get_session()
+
+        assert first is not second
+        assert first.get_bind() is second.get_bind() is models.engine
+        first.close()
+        second.close()
+
+    def test_forked_process_gets_new_engine(self, database_url):
+        parent = get_session().get_bind()
+
+        with patch('core.models.os.getpid', return_value=-1):
+            child = get_session().get_bind()
+
+        assert child is not parent
+
+    def test_use_engine_swaps_and_restores(self, database_url):
+        original = get_session().get_bind()
+        other = create_engine('sqlite:///:memory:')
+
+        with use_engine(other):
+            assert get_session().get_bind() is other
+        assert get_session().get_bind() is original
+
+    def test_pool_checkouts_counted(self, database_url):
+        from prometheus_client import REGISTRY
+        from sqlalchemy import text
+        checkouts = lambda: REGISTRY.get_sample_value('arkrelay_db_pool_checkouts_total') or 0
+        # The first get_session() per engine checks out a connection for the schema bootstrap
+        models.bootstrap_schema()
+        before = checkouts()
+
+        session = get_session()
+        session.execute(text('SELECT 1'))
+        assert models.get_pool_stats()['checked_out'] == 1
+        session.close()
+
+        assert checkouts() == before + 1
+        assert models.get_pool_stats()['checked_out'] == 0
+
+
+class TestSchemaBootstrap:
+    """Test cases for the once-per-engine schema bootstrap"""
+
+    @pytest.fixture
+    def engine(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'bootstrap.db'}")
+        yield engine
+        models.reset_schema_bootstrap(engine)
+        engine.dispose()
+
+    def test_create_mode_runs_once_per_engine(self, engine):
+        with patch.object(Base.metadata, 'create_all', wraps=Base.metadata.create_all) as create_all:
+            first = models.bootstrap_schema(engine, mode='create')
+            second = models.bootstrap_schema(engine, mode='create')
+
+        assert first['status'] == 'created'
+        assert second is first
+        assert create_all.call_count == 1
+
+    def test_auto_mode_creates_on_sqlite(self, engine, monkeypatch):
+        monkeypatch.setenv('DB_SCHEMA_BOOTSTRAP', 'auto')
+        assert models.bootstrap_schema(engine)['mode'] == 'create'
+
+    def test_check_mode_reports_missing_revision(self, engine):
+        with patch('core.models.get_alembic_heads', return_value={'head_rev'}):
+            result = models.bootstrap_schema(engine, mode='check')
+
+        assert result['status'] == 'missing'
+        assert result['expected'] == ['head_rev']
+
+    def test_check_mode_current(self, engine):
+        from sqlalchemy import text
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+            connection.execute(text("INSERT INTO alembic_version VALUES ('head_rev')"))
+
+        with patch('core.models.get_alembic_heads', return_value={'head_rev'}):
+            assert models.bootstrap_schema(engine, mode='check')['status'] == 'current'
+
+    def test_drop_all_forgets_engine(self, engine):
+        models.bootstrap_schema(engine, mode='create')
+        Base.metadata.drop_all(engine)
+
+        assert models.bootstrap_schema(engine, mode='create')['status'] == 'created'
+
+    def test_flush_bootstrap_creates_tables_on_first_flush(self, engine):
+        session = sessionmaker(bind=engine)()
+        session.add(Asset(asset_id="gbtc", name="Bitcoin", ticker="BTC"))
+        session.commit()
+
+        assert session.query(Asset).count() == 1
+        session.close()
+
+    @pytest.mark.performance
+    def test_flush_latency_with_and_without_listener(self, engine):
+        """Benchmark: per-flush create_all listener against the cached bootstrap"""
+        import time
+        from sqlalchemy import event
+        from sqlalchemy.orm import Session as SQLASession
+
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        flushes = 200
+
+        def run(prefix):
+            session = Session()
+            started = time.perf_counter()
+            for i in range(flushes):
+                session.add(JobLog(job_id=f"{prefix}-{i}", job_type="bench", status="completed"))
+                session.flush()
+            elapsed = time.perf_counter() - started
+            session.rollback()
+            session.close()
+            return elapsed / flushes
+
+        def create_all_every_flush(session, flush_context, instances):
+            Base.metadata.create_all(bind=session.get_bind())
+
+        cached = run("cached")
+        event.listen(SQLASession, "before_flush", create_all_every_flush)
+        try:
+            legacy = run("legacy")
+        finally:
+            event.remove(SQLASession, "before_flush", create_all_every_flush)
+
+        print(f"flush latency: create_all listener {legacy * 1e6:.0f}us, cached bootstrap {cached * 1e6:.0f}us")
+        assert cached < legacy
+
+
 @pytest.mark.integration
 class TestModelIntegration:
     """Integration tests for models"""
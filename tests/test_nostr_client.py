@@ -11,6 +11,8 @@ from datetime import datetime
 
 from nostr_clients.nostr_client import NostrClient, NostrEvent, ActionIntent, SigningResponse
 from core.config import Config
+from core.signature_verifier import event_hash
+from coincurve import PrivateKey as CoincurvePrivateKey
 
 
 class TestNostrClient:
@@ -368,47 +370,37 @@ class TestNostrClient:
         assert 'subscriptions' in stats
         assert 'handlers' in stats
 
-    def test_validate_event_signature_success(self, nostr_client):
-        """Test successful event signature validation"""
-        event = NostrEvent(
-            id="test_id",
-            pubkey="test_pubkey",
+    def _signed_event(self, content="test_content"):
+        """Event signed with a real BIP340 key"""
+        key = CoincurvePrivateKey()
+        pubkey = key.public_key_xonly.format().hex()
+        message_hash = event_hash(pubkey, 1234567890, 31510, [], content)
+        return NostrEvent(
+            id=message_hash.hex(),
+            pubkey=pubkey,
             created_at=1234567890,
             kind=31510,
             tags=[],
-            content="test_content",
-            sig="test_sig"
+            content=content,
+            sig=key.sign_schnorr(message_hash).hex()
         )
 
-        with patch('nostr_clients.nostr_client.PublicKey') as mock_public_key:
-            mock_pk = Mock()
-            mock_pk.verify_signed_hash.return_value = True
-            mock_public_key.return_value = mock_pk
+    def test_validate_event_signature_success(self, nostr_client):
+        """Test successful event signature validation"""
+        event = self._signed_event()
 
-            result = nostr_client.validate_event_signature(event)
+        result = nostr_client.validate_event_signature(event)
 
-            assert result is True
+        assert result is True
 
     def test_validate_event_signature_failure(self, nostr_client):
         """Test event signature validation failure"""
-        event = NostrEvent(
-            id="test_id",
-            pubkey="test_pubkey",
-            created_at=1234567890,
-            kind=31510,
-            tags=[],
-            content="test_content",
-            sig="test_sig"
-        )
-
-        with patch('nostr_clients.nostr_client.PublicKey') as mock_public_key:
-            mock_pk = Mock()
-            mock_pk.verify_signed_hash.return_value = False
-            mock_public_key.return_value = mock_pk
+        event = self._signed_event()
+        event.content = "tampered_content"
 
-            result = nostr_client.validate_event_signature(event)
+        result = nostr_client.validate_event_signature(event)
 
-            assert result is False
+        assert result is False
 
     def test_validate_event_signature_error(self, nostr_client):
         """Test event signature validation error handling"""
@@ -422,12 +414,18 @@ class TestNostrClient:
             sig="test_sig"
         )
 
-        with patch('nostr_clients.nostr_client.PublicKey') as mock_public_key:
-            mock_public_key.side_effect = Exception("Validation error")
+        result = nostr_client.validate_event_signature(event)
+
+        assert result is False
+
+    def test_validate_event_signatures_batch(self, nostr_client):
+        """Test batch validation keeps results in event order"""
+        events = [self._signed_event(f"content {i}") for i in range(3)]
+        events[1].sig = events[0].sig
 
-            result = nostr_client.validate_event_signature(event)
+        result = nostr_client.validate_event_signatures(events)
 
-            assert result is False
+        assert result == [True, False, True]
 
     def test_encrypt_dm_success(self, nostr_client):
         """Test successful DM encryption"""
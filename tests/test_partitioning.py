@@ -0,0 +1,148 @@
+"""
+Test cases for day partitions and partition-drop retention
+"""
+
+import pytest
+from datetime import date, datetime, timedelta
+from unittest.mock import Mock, patch
+from sqlalchemy.orm import sessionmaker
+
+from core.expiry_sweeper import ExpirySweeper
+from core.models import Heartbeat, JobLog, SystemMetrics
+from core.partitioning import TIME_SERIES_TABLES, PartitionManager, partition_clause
+from tests.test_database_setup import test_db_session
+
+
+@pytest.fixture
+def SessionLocal(test_db_session):
+    return sessionmaker(bind=test_db_session._engine)
+
+
+def seed(SessionLocal, days_old, count=1, status='completed'):
+    session = SessionLocal()
+    stamp = datetime.utcnow() - timedelta(days=days_old)
+    for i in range(count):
+        session.add(SystemMetrics(cpu_percent=1, memory_percent=1, memory_available_mb=1,
+                                  disk_percent=1, disk_free_gb=1, timestamp=stamp))
+        session.add(Heartbeat(service_name='scheduler', timestamp=stamp))
+        session.add(JobLog(job_id=f'job_{days_old}_{status}_{i}', job_type='cleanup',
+                           status=status, created_at=stamp))
+    session.commit()
+    session.close()
+
+
+def mysql_session(partitions):
+    """Session stub reporting ``partitions`` for every table and recording executed SQL"""
+    session = Mock()
+    session.executed = []
+    session.execute.side_effect = lambda stmt, *args: session.executed.append(str(stmt))
+    manager = PartitionManager(retention_days=30, days_ahead=2)
+    manager.partitions = Mock(return_value=partitions)
+    return session, manager
+
+
+class TestDeleteFallback:
+    """Test retention on databases without partitions (SQLite)"""
+
+    def test_deletes_rows_past_cutoff(self, SessionLocal):
+        seed(SessionLocal, days_old=40, count=3)
+        seed(SessionLocal, days_old=40, status='running')
+        seed(SessionLocal, days_old=1, count=2)
+        session = SessionLocal()
+
+        results = PartitionManager(sweeper=ExpirySweeper(batch_size=2)).apply_retention(session, days=30)
+
+        assert {name: (r.method, r.rows) for name, r in results.items()} == {
+            'system_metrics': ('delete', 4),
+            'heartbeats': ('delete', 4),
+            'job_logs': ('delete', 3),
+        }
+        assert session.query(SystemMetrics).count() == 2
+        # Unfinished jobs are kept
+        assert session.query(JobLog).filter_by(status='running').count() == 1
+        session.close()
+
+    def test_dry_run_only_counts(self, SessionLocal):
+        seed(SessionLocal, days_old=40, count=2)
+        session = SessionLocal()
+
+        results = PartitionManager().apply_retention(session, days=30, dry_run=True)
+
+        assert results['heartbeats'].rows == 2
+        assert session.query(Heartbeat).count() == 2
+        session.close()
+
+    def test_maintenance_leaves_unpartitioned_tables_alone(self, SessionLocal):
+        seed(SessionLocal, days_old=40)
+        session = SessionLocal()
+
+        result = PartitionManager().maintain(session)
+
+        assert result == {'added': {}, 'dropped': {}, 'partitioned_tables': []}
+        assert session.query(SystemMetrics).count() == 1
+        session.close()
+
+
+class TestPartitionMaintenance:
+    """Test partition DDL generated for MySQL"""
+
+    def test_partition_clause(self):
+        assert partition_clause(date(2026, 10, 16)) == \
+            "PARTITION p20261016 VALUES LESS THAN (TO_DAYS('2026-10-17'))"
+
+    def test_add_partitions_splits_pmax(self):
+        session, manager = mysql_session([
+            ('p_history', date(2026, 10, 15), 100),
+            ('p20261015', date(2026, 10, 16), 10),
+            ('pmax', None, 0),
+        ])
+
+        created = manager.add_partitions(session, 'heartbeats', date(2026, 10, 17))
+
+        assert created == ['p20261016', 'p20261017']
+        assert session.executed == [
+            "ALTER TABLE heartbeats REORGANIZE PARTITION pmax INTO ("
+            "PARTITION p20261016 VALUES LESS THAN (TO_DAYS('2026-10-17')), "
+            "PARTITION p20261017 VALUES LESS THAN (TO_DAYS('2026-10-18')), "
+            "PARTITION pmax VALUES LESS THAN MAXVALUE)"
+        ]
+
+    def test_add_partitions_noop_when_ahead(self):
+        session, manager = mysql_session([('p20261020', date(2026, 10, 21), 0), ('pmax', None, 0)])
+
+        assert manager.add_partitions(session, 'heartbeats', date(2026, 10, 17)) == []
+        assert session.executed == []
+
+    def test_purge_drops_whole_expired_days(self):
+        session, manager = mysql_session([
+            ('p_history', date(2026, 9, 10), 500),
+            ('p20260910', date(2026, 9, 11), 40),
+            ('p20260911', date(2026, 9, 12), 40),
+            ('pmax', None, 0),
+        ])
+
+        result = manager.purge(session, TIME_SERIES_TABLES[0], datetime(2026, 9, 11, 12, 0))
+
+        assert (result.method, result.rows) == ('partition_drop', 540)
+        assert session.executed == ["ALTER TABLE system_metrics DROP PARTITION p_history, p20260910"]
+
+    def test_purge_dry_run_drops_nothing(self):
+        session, manager = mysql_session([('p_history', date(2026, 9, 10), 500), ('pmax', None, 0)])
+
+        result = manager.purge(session, TIME_SERIES_TABLES[1], datetime(2026, 10, 1), dry_run=True)
+
+        assert result.partitions == ['p_history']
+        assert session.executed == []
+
+    def test_partitions_parses_information_schema(self):
+        session = Mock()
+        session.get_bind.return_value.dialect.name = 'mysql'
+        session.execute.return_value.all.return_value = [
+            ('p20261016', str(date(2026, 10, 17).toordinal() + 365), 12),
+            ('pmax', 'MAXVALUE', None),
+        ]
+
+        assert PartitionManager().partitions(session, 'heartbeats') == [
+            ('p20261016', date(2026, 10, 17), 12),
+            ('pmax', None, 0),
+        ]
@@ -567,4 +567,324 @@ class TestPerformance:
 
         # Log performance metrics for analysis
         for operation, avg_time in avg_times.items():
-            print(f"{operation}: {avg_time:.4f}s average")
\ No newline at end of file
+            print(f"{operation}: {avg_time:.4f}s average")
+
+def benchmark_session_factory(tmp_path):
+    """Session factory for DB benchmarks.
+
+    Uses BENCHMARK_DATABASE_URL when set (e.g. a disposable MariaDB schema) so that
+    lock behaviour can be measured on a real server; otherwise a file-backed SQLite DB.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from core.models import Base
+
+    url = os.getenv('BENCHMARK_DATABASE_URL') or f"sqlite:///{tmp_path / 'benchmark.sqlite'}"
+    if url.startswith('sqlite'):
+        engine = create_engine(url, connect_args={'check_same_thread': False, 'timeout': 30})
+    else:
+        engine = create_engine(url, pool_size=32, max_overflow=0)
+    Base.metadata.create_all(engine)
+    return engine, sessionmaker(bind=engine)
+
+
+class TestVtxoAssignmentContention:
+    """Contention benchmark for concurrent VTXO assignment"""
+
+    @pytest.mark.performance
+    def test_assignment_throughput_by_worker_count(self, tmp_path):
+        """Assignments/sec for 1..8 workers; every worker must claim a distinct VTXO"""
+        import uuid
+        from core.models import Asset, Vtxo
+        from core.vtxo_manager import VtxoManager
+
+        engine, SessionLocal = benchmark_session_factory(tmp_path)
+        manager = VtxoManager()
+        per_worker = 50
+        results = {}
+
+        try:
+            with patch('core.vtxo_manager.get_session', side_effect=lambda: SessionLocal()):
+                for workers in (1, 2, 4, 8):
+                    asset_id = f'BENCH_{workers}_{uuid.uuid4().hex[:8]}'
+                    session = SessionLocal()
+                    session.add(Asset(asset_id=asset_id, name=asset_id, ticker='BENCH'))
+                    expires_at = datetime.utcnow() + timedelta(hours=1)
+                    session.add_all([
+                        Vtxo(vtxo_id=uuid.uuid4().hex, txid=uuid.uuid4().hex, vout=i,
+                             amount_sats=1000 + i, script_pubkey=b'bench', asset_id=asset_id,
+                             user_pubkey='', status='available', expires_at=expires_at)
+                        for i in range(workers * per_worker)
+                    ])
+                    session.commit()
+                    session.close()
+
+                    def worker(n):
+                        claimed = []
+                        for _ in range(per_worker):
+                            vtxo = manager.assign_vtxo_to_user(f'user_{n}', asset_id, 1000)
+                            claimed.append(vtxo.vtxo_id if vtxo else None)
+                        return claimed
+
+                    start = time.perf_counter()
+                    with ThreadPoolExecutor(max_workers=workers) as pool:
+                        claimed = [v for batch in pool.map(worker, range(workers)) for v in batch]
+                    elapsed = time.perf_counter() - start
+
+                    assert None not in claimed
+                    assert len(set(claimed)) == workers * per_worker
+                    results[workers] = len(claimed) / elapsed
+        finally:
+            engine.dispose()
+
+        for workers, rate in results.items():
+            print(f"{engine.dialect.name} workers={workers}: {rate:.0f} assignments/sec")
+
+
+class TestCoinSelectionPerformance:
+    """Coin selection latency over large per-asset pools"""
+
+    @pytest.mark.performance
+    def test_selection_under_one_millisecond_for_100k_pool(self):
+        """Median selection time stays under 1ms for a 100k-VTXO pool"""
+        import random
+        from core.vtxo_manager import VtxoPoolView, CoinSelector
+
+        rng = random.Random(42)
+        pool = VtxoPoolView([(rng.randint(1000, 1_000_000), i) for i in range(100_000)])
+        selector = CoinSelector()
+        targets = [rng.randint(1000, 3_000_000) for _ in range(500)]
+
+        timings = []
+        for target in targets:
+            start = time.perf_counter()
+            selection = selector.select(pool, target)
+            timings.append(time.perf_counter() - start)
+            assert selection is not None and selection.total >= target
+
+        timings.sort()
+        median = timings[len(timings) // 2]
+        p99 = timings[int(len(timings) * 0.99)]
+        print(f"coin selection 100k pool: median {median * 1e6:.0f}us, p99 {p99 * 1e6:.0f}us")
+        assert median < 0.001
+
+
+class TestVtxoIndexPerformance:
+    """In-memory availability index vs database lookups"""
+
+    @pytest.mark.performance
+    def test_index_lookups_vs_database(self, tmp_path):
+        """Candidate lookup and inventory counts from the index, compared with the indexed SQL queries"""
+        import random
+        import uuid
+        from unittest.mock import patch
+        from datetime import datetime, timedelta
+        from core.models import Asset, Vtxo
+        from core.vtxo_index import VtxoAvailabilityIndex
+        from core.vtxo_manager import VtxoManager, VtxoInventoryMonitor
+
+        engine, SessionLocal = benchmark_session_factory(tmp_path)
+        rng = random.Random(7)
+        try:
+            session = SessionLocal()
+            session.add(Asset(asset_id='BTC', name='Bitcoin', ticker='BTC'))
+            expires_at = datetime.utcnow() + timedelta(hours=24)
+            session.bulk_insert_mappings(Vtxo, [
+                {'vtxo_id': uuid.uuid4().hex, 'txid': uuid.uuid4().hex, 'vout': i,
+                 'amount_sats': rng.randint(1000, 1_000_000), 'script_pubkey': b'script',
+                 'asset_id': 'BTC', 'user_pubkey': '', 'status': 'available', 'expires_at': expires_at}
+                for i in range(100_000)
+            ])
+            session.commit()
+
+            index = VtxoAvailabilityIndex()
+            with patch('core.vtxo_index.get_session', side_effect=lambda: SessionLocal()), \
+                    patch('core.vtxo_index._vtxo_index', index):
+                start = time.perf_counter()
+                index.rebuild()
+                print(f"index build, 100k VTXOs: {(time.perf_counter() - start) * 1000:.0f}ms")
+
+                manager = VtxoManager()
+                monitor = VtxoInventoryMonitor()
+                targets = [rng.randint(1000, 1_000_000) for _ in range(200)]
+
+                def timed(fn):
+                    start = time.perf_counter()
+                    for target in targets:
+                        fn(target)
+                    return (time.perf_counter() - start) / len(targets)
+
+                index_lookup = timed(lambda t: index.candidates('BTC', t, 16))
+                index_status = timed(lambda t: monitor.get_asset_inventory_status(session, 'BTC'))
+                index.ready = False
+                db_lookup = timed(lambda t: manager._candidate_ids(session, 'BTC', t))
+                db_status = timed(lambda t: monitor.get_asset_inventory_status(session, 'BTC'))
+            session.close()
+        finally:
+            engine.dispose()
+
+        print(f"candidate lookup: index {index_lookup * 1e6:.1f}us, database {db_lookup * 1e6:.1f}us")
+        print(f"inventory status: index {index_status * 1e6:.1f}us, database {db_status * 1e6:.1f}us")
+        assert index_lookup < db_lookup
+        assert index_status < db_status
+
+
+class TestVtxoBatchInsertPerformance:
+    """Per-object ORM persistence vs chunked multi-row INSERTs for VTXO batches"""
+
+    @pytest.mark.performance
+    def test_bulk_insert_10k_vtxos(self, tmp_path):
+        """Insert 10k VTXOs through the old ORM path and through _store_vtxo_batch"""
+        from datetime import datetime, timedelta
+        from core.models import Asset, Vtxo
+        from core.vtxo_manager import VtxoManager
+
+        engine, SessionLocal = benchmark_session_factory(tmp_path)
+        manager = VtxoManager()
+        count = 10_000
+
+        def batch(prefix):
+            return {'vtxos': [
+                {'vtxo_id': f'{prefix}_{i:06d}', 'txid': 'ab' * 32, 'vout': i, 'script_pubkey': '51'}
+                for i in range(count)
+            ]}
+
+        try:
+            session = SessionLocal()
+            session.add(Asset(asset_id='BTC', name='Bitcoin', ticker='BTC'))
+            session.commit()
+
+            orm_batch = batch('orm')
+            expiry_time = datetime.utcnow() + timedelta(hours=24)
+            start = time.perf_counter()
+            for vtxo_data in orm_batch['vtxos']:
+                session.add(Vtxo(
+                    vtxo_id=vtxo_data['vtxo_id'], txid=vtxo_data['txid'], vout=vtxo_data['vout'],
+                    amount_sats=1000, script_pubkey=bytes.fromhex(vtxo_data['script_pubkey']),
+                    asset_id='BTC', user_pubkey='', status='available', expires_at=expiry_time
+                ))
+            session.commit()
+            orm_elapsed = time.perf_counter() - start
+
+            start = time.perf_counter()
+            inserted = manager._store_vtxo_batch(session, batch('bulk'), 'BTC', 1000)
+            bulk_elapsed = time.perf_counter() - start
+
+            # replaying the batch is idempotent
+            assert manager._store_vtxo_batch(session, batch('bulk'), 'BTC', 1000) == 0
+            assert session.query(Vtxo).count() == 2 * count
+            session.close()
+        finally:
+            engine.dispose()
+
+        assert inserted == count
+        print(f"{engine.dialect.name} 10k VTXOs: ORM {orm_elapsed * 1000:.0f}ms, "
+              f"bulk {bulk_elapsed * 1000:.0f}ms ({orm_elapsed / bulk_elapsed:.1f}x)")
+        assert bulk_elapsed < orm_elapsed
+
+
+class TestLedgerGroupCommitPerformance:
+    """Per-change commits vs group commit for concurrent ledger transfers"""
+
+    @pytest.mark.performance
+    def test_group_commit_throughput(self, tmp_path):
+        """Transfers/sec with 16 threads, committing each change vs batching them"""
+        from core.models import AssetBalance
+        from core.ledger import BalanceDelta, BalanceLedger, LedgerGroupCommitter
+
+        engine, SessionLocal = benchmark_session_factory(tmp_path)
+        ledger = BalanceLedger()
+        threads, per_thread = 16, 50
+        users = [f'bench_user_{i}' for i in range(threads)]
+
+        def deltas(n, i):
+            sender, recipient = users[n], users[(n + 1 + i) % threads]
+            return [BalanceDelta(sender, 'BENCH', balance=-1, min_available=1),
+                    BalanceDelta(recipient, 'BENCH', balance=1)]
+
+        def commit_each(n):
+            for i in range(per_thread):
+                session = SessionLocal()
+                try:
+                    ledger.apply(session, deltas(n, i), entry_type='transfer')
+                    session.commit()
+                finally:
+                    session.close()
+
+        def run(worker):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                list(pool.map(worker, range(threads)))
+            return threads * per_thread / (time.perf_counter() - start)
+
+        results = {}
+        try:
+            session = SessionLocal()
+            session.query(AssetBalance).filter_by(asset_id='BENCH').delete()
+            session.add_all([AssetBalance(user_pubkey=u, asset_id='BENCH', balance=10_000) for u in users])
+            session.commit()
+            session.close()
+
+            results['commit per change'] = run(commit_each)
+            for latency_ms, batch_size in ((2, 100), (5, 100), (5, 16)):
+                committer = LedgerGroupCommitter(ledger, session_factory=SessionLocal,
+                                                 max_latency_ms=latency_ms, max_batch_size=batch_size)
+
+                def grouped(n):
+                    for i in range(per_thread):
+                        committer.submit(deltas(n, i), entry_type='transfer')
+
+                rate = run(grouped)
+                results[f'group commit {latency_ms}ms/{batch_size} '
+                        f'({committer.changes / max(committer.batches, 1):.1f} changes/commit)'] = rate
+
+            session = SessionLocal()
+            total = sum(b.balance for b in session.query(AssetBalance).filter_by(asset_id='BENCH'))
+            session.close()
+        finally:
+            engine.dispose()
+
+        assert total == threads * 10_000
+        for mode, rate in results.items():
+            print(f"{engine.dialect.name} {mode}: {rate:.0f} transfers/sec")
+
+
+class TestSignatureVerificationPerformance:
+    """Uncached vs cached vs process-pool BIP340 verification of Nostr events"""
+
+    @pytest.mark.performance
+    def test_event_verification_throughput(self):
+        """Verifications/sec and per core for 2000 events from 50 signers"""
+        from coincurve import PrivateKey
+        from core.signature_verifier import SignatureVerifier, event_hash
+
+        signers = [PrivateKey() for _ in range(50)]
+        events = []
+        for i in range(2000):
+            key = signers[i % len(signers)]
+            pubkey = key.public_key_xonly.format().hex()
+            message_hash = event_hash(pubkey, 1700000000 + i, 31510, [], f'intent {i}')
+            events.append(Mock(id=message_hash.hex(), pubkey=pubkey, created_at=1700000000 + i, kind=31510,
+                               tags=[], content=f'intent {i}', sig=key.sign_schnorr(message_hash).hex()))
+
+        def measure(verify):
+            start = time.perf_counter()
+            results = verify()
+            assert all(results)
+            return len(events) / (time.perf_counter() - start)
+
+        results = {}
+        results['uncached, one at a time'] = (measure(
+            lambda: [SignatureVerifier(cache_size=1).verify_event(e) for e in events]), 1)
+        cached = SignatureVerifier()
+        results['cached keys, inline batch'] = (measure(lambda: cached.verify_events(events)), 1)
+        processes = max(2, min(4, os.cpu_count() or 1))
+        pooled = SignatureVerifier(processes=processes, batch_min=32)
+        try:
+            pooled.verify_events(events[:processes * 32])  # start the worker processes
+            results[f'process pool x{processes}'] = (measure(lambda: pooled.verify_events(events)), processes)
+        finally:
+            pooled.shutdown()
+
+        for mode, (rate, cores) in results.items():
+            print(f"{mode}: {rate:.0f} verifications/sec ({rate / cores:.0f}/sec per core)")
@@ -0,0 +1,166 @@
+"""
+Test cases for read-replica routing and read-your-writes stickiness
+"""
+
+import pytest
+from unittest.mock import patch
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import sessionmaker
+
+from core import models
+from core.models import Asset, AssetBalance, Base, RoutingSession, replica_reads, set_replica_engines
+from core.replica_routing import StickyWrites, replica_read
+from tests.test_balance_cache import FakeRedis
+
+
+class StickyRedis(FakeRedis):
+    """FakeRedis with the SET PX and EXISTS calls the stickiness tracker uses"""
+
+    def set(self, key, value, px=None, **kwargs):
+        return super().set(key, str(value), **kwargs)
+
+    def exists(self, key):
+        self._check()
+        return int(key in self.data)
+
+
+def _database(path, ticker):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(Asset(asset_id='BTC', name='Bitcoin', ticker=ticker))
+    session.commit()
+    session.close()
+    return engine
+
+
+@pytest.fixture
+def engines(tmp_path):
+    """Primary and replica holding different tickers, so reads show where they went"""
+    primary = _database(tmp_path / 'primary.db', 'PRIMARY')
+    replica = _database(tmp_path / 'replica.db', 'REPLICA')
+    previous = set_replica_engines([replica])
+    yield primary, replica
+    set_replica_engines(previous)
+    primary.dispose()
+    replica.dispose()
+
+
+@pytest.fixture
+def SessionLocal(engines):
+    return sessionmaker(bind=engines[0], class_=RoutingSession)
+
+
+@pytest.fixture
+def sticky():
+    tracker = StickyWrites(None, window_seconds=60)
+    with patch('core.replica_routing._sticky_writes', tracker):
+        yield tracker
+
+
+def _ticker(session):
+    return session.execute(select(Asset.ticker)).scalar_one()
+
+
+class TestRoutingSession:
+    """Test cases for where RoutingSession sends statements"""
+
+    def test_reads_use_primary_outside_scope(self, SessionLocal):
+        assert _ticker(SessionLocal()) == 'PRIMARY'
+
+    def test_reads_use_replica_in_scope(self, SessionLocal):
+        with replica_reads():
+            assert _ticker(SessionLocal()) == 'REPLICA'
+
+    def test_no_replicas_configured(self, SessionLocal):
+        with patch.object(models, 'replica_engines', []), replica_reads():
+            assert _ticker(SessionLocal()) == 'PRIMARY'
+
+    def test_writes_go_to_primary_and_pin_session(self, SessionLocal, engines):
+        session = SessionLocal()
+        with replica_reads():
+            session.execute(update(Asset).values(name='Bitcoin (primary)'))
+            assert _ticker(session) == 'PRIMARY'
+        session.commit()
+
+        assert sessionmaker(bind=engines[0])().query(Asset).filter_by(asset_id='BTC').one().name == 'Bitcoin (primary)'
+        assert sessionmaker(bind=engines[1])().query(Asset).filter_by(asset_id='BTC').one().name == 'Bitcoin'
+
+    def test_flush_goes_to_primary(self, SessionLocal, engines):
+        session = SessionLocal()
+        with replica_reads():
+            session.add(Asset(asset_id='ETH', name='Ether', ticker='ETH'))
+            session.commit()
+
+        assert sessionmaker(bind=engines[0])().query(Asset).filter_by(asset_id='ETH').first() is not None
+        assert sessionmaker(bind=engines[1])().query(Asset).filter_by(asset_id='ETH').first() is None
+
+    def test_select_for_update_goes_to_primary(self, SessionLocal):
+        with replica_reads():
+            session = SessionLocal()
+            assert session.execute(select(Asset.ticker).with_for_update()).scalar_one() == 'PRIMARY'
+
+
+class TestReplicaRead:
+    """Test cases for the replica_read decorator"""
+
+    def test_unkeyed_read_uses_replica(self, SessionLocal, sticky):
+        @replica_read()
+        def read():
+            return _ticker(SessionLocal())
+
+        assert read() == 'REPLICA'
+
+    def test_recent_writer_reads_primary(self, SessionLocal, sticky):
+        @replica_read('user_pubkey')
+        def read(user_pubkey):
+            return _ticker(SessionLocal())
+
+        sticky.mark(['alice'])
+
+        assert read('alice') == 'PRIMARY'
+        assert read(user_pubkey='bob') == 'REPLICA'
+
+    def test_commit_marks_written_users(self, SessionLocal, sticky):
+        session = SessionLocal()
+        session.add(AssetBalance(user_pubkey='carol', asset_id='BTC', balance=1))
+        session.commit()
+
+        assert sticky.is_sticky('carol')
+        assert not sticky.is_sticky('dave')
+
+    def test_rollback_discards_marks(self, SessionLocal, sticky):
+        session = SessionLocal()
+        session.add(AssetBalance(user_pubkey='erin', asset_id='BTC', balance=1))
+        session.flush()
+        session.rollback()
+
+        assert not sticky.is_sticky('erin')
+
+
+class TestStickyWrites:
+    """Test cases for the stickiness tracker"""
+
+    def test_marks_expire(self):
+        tracker = StickyWrites(None, window_seconds=60)
+        tracker.mark(['alice'])
+
+        with patch('core.replica_routing.time.monotonic', return_value=10 ** 9):
+            assert not tracker.is_sticky('alice')
+
+    def test_marks_shared_through_redis(self):
+        redis = StickyRedis()
+
+        StickyWrites(redis).mark(['alice'])
+
+        assert StickyWrites(redis).is_sticky('alice')
+
+    def test_redis_failure_falls_back_to_local_marks(self):
+        redis = StickyRedis()
+        redis.down = True
+        tracker = StickyWrites(redis)
+
+        tracker.mark(['alice'])
+
+        assert tracker.is_sticky('alice')
+        assert tracker.stats['errors'] == 1
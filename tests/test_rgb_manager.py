@@ -103,7 +103,7 @@ class TestRGBManager:
             mock_contract.specification_id = 'RGB20Spec'
             mock_contract.schema_type = 'cfa'
             mock_contract.genesis_proof = 'test_proof'
-            mock_contract.metadata = {}
+            mock_contract.contract_metadata = {}
             mock_contract.creator_pubkey = 'npub1test'
             mock_contract.total_issued = 1000000
             mock_contract.current_state_root = 'root123'
@@ -343,23 +343,20 @@ class TestSessionManagerIntegration:
 
     def test_cleanup_expired_sessions(self, session_manager):
         """Test cleanup of expired sessions"""
-        with patch('core.session_manager.get_session') as mock_get_session:
-            mock_session = Mock()
-            mock_query = Mock()
-            mock_filter = Mock()
-            mock_delete = Mock()
-
-            mock_session.query.return_value = mock_query
-            mock_query.filter.return_value = mock_filter
-            mock_filter.delete.return_value = 5  # 5 sessions deleted
+        from core.expiry_sweeper import SweepResult
 
+        with patch('core.session_manager.get_session') as mock_get_session, \
+                patch('core.expiry_sweeper.ExpirySweeper.sweep') as mock_sweep:
+            mock_session = Mock()
             mock_get_session.return_value = mock_session
+            mock_sweep.return_value = SweepResult('signing_sessions', rows=5, batches=1)
 
             result = session_manager.cleanup_expired_sessions()
 
             assert result == 5
-            mock_filter.delete.assert_called_once()
-            mock_session.commit.assert_called_once()
+            mock_sweep.assert_called_once()
+            assert mock_sweep.call_args[0][0] is mock_session
+            mock_session.close.assert_called_once()
 
     def test_get_user_sessions(self, session_manager, test_user_pubkey):
         """Test getting user sessions"""
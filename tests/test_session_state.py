@@ -0,0 +1,230 @@
+"""
+Test cases for Redis-resident signing session state
+"""
+
+import pytest
+from contextlib import contextmanager
+from unittest.mock import patch
+from sqlalchemy.orm import sessionmaker
+
+from core.models import SigningSession
+from core.session_manager import SigningSessionManager
+from core.session_state import HotSessionStore
+from tests.test_database_setup import test_db_session
+
+
+class FakeRedis:
+    """The subset of redis-py the session store uses, backed by dicts and sets"""
+
+    def __init__(self):
+        self.data = {}
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            raise ConnectionError("Redis unavailable")
+
+    def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    def incr(self, key):
+        self._check()
+        self.data[key] = str(int(self.data.get(key, b'0')) + 1).encode()
+        return int(self.data[key])
+
+    def expire(self, key, seconds):
+        self._check()
+        return key in self.data
+
+    def expireat(self, key, when):
+        self._check()
+        return key in self.data
+
+    def delete(self, *keys):
+        self._check()
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def hset(self, key, mapping):
+        self._check()
+        self.data.setdefault(key, {}).update({k.encode(): v.encode() for k, v in mapping.items()})
+        return len(mapping)
+
+    def hgetall(self, key):
+        self._check()
+        return dict(self.data.get(key, {}))
+
+    def sadd(self, key, *members):
+        self._check()
+        self.data.setdefault(key, set()).update(m.encode() for m in members)
+        return len(members)
+
+    def srem(self, key, *members):
+        self._check()
+        values = self.data.get(key, set())
+        removed = sum(m.encode() in values for m in members)
+        values.difference_update(m.encode() for m in members)
+        return removed
+
+    def sismember(self, key, member):
+        self._check()
+        return member.encode() in self.data.get(key, set())
+
+    def spop(self, key, count):
+        self._check()
+        values = self.data.get(key, set())
+        return [values.pop() for _ in range(min(count, len(values)))]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+@pytest.fixture
+def SessionLocal(test_db_session):
+    return sessionmaker(bind=test_db_session._engine)
+
+
+@pytest.fixture
+def store():
+    return HotSessionStore(FakeRedis())
+
+
+@contextmanager
+def hot_sessions(SessionLocal, store):
+    """Route the session manager and write-behind through ``store`` and ``SessionLocal``"""
+    with patch('core.session_manager.get_session', side_effect=lambda: SessionLocal()), \
+            patch('core.models.get_session', side_effect=lambda: SessionLocal()), \
+            patch('core.session_manager.get_session_state_store', return_value=store), \
+            patch('core.session_state.get_session_state_store', return_value=store):
+        yield
+
+
+def row(SessionLocal, session_id):
+    session = SessionLocal()
+    try:
+        return session.query(SigningSession).filter_by(session_id=session_id).first()
+    finally:
+        session.close()
+
+
+class TestHotSessionState:
+    """Test Redis reads, write-behind and synchronous terminal states"""
+
+    def test_polls_served_from_redis(self, SessionLocal, store):
+        manager = SigningSessionManager()
+        with hot_sessions(SessionLocal, store):
+            created = manager.create_session('alice', 'p2p_transfer', {'amount': 10})
+            with patch('core.session_manager.get_session', side_effect=AssertionError("database read")):
+                hot = manager.get_session(created.session_id)
+
+        assert hot.status == 'initiated'
+        assert hot.intent_data == {'amount': 10}
+        assert hot.expires_at == created.expires_at
+        assert store.get_stats()['hits'] == 1
+
+    def test_steps_written_behind(self, SessionLocal, store):
+        manager = SigningSessionManager()
+        with hot_sessions(SessionLocal, store):
+            session_id = manager.create_session('alice', 'p2p_transfer', {'amount': 10}).session_id
+            assert manager.update_session_status(session_id, 'challenge_sent')
+            assert manager.update_session_status(session_id, 'awaiting_signature')
+            assert manager._update_session_result(session_id, {'ceremony_state': {'current_step': 2}, 'note': 'x'})
+            assert not manager.update_session_status(session_id, 'initiated')
+
+            assert row(SessionLocal, session_id).status == 'initiated'
+            hot = manager.get_session(session_id)
+            assert hot.status == 'awaiting_signature'
+            assert hot.result_data == {'ceremony_state': {'current_step': 2}, 'note': 'x'}
+
+            assert store.flush() == 1
+
+        persisted = row(SessionLocal, session_id)
+        assert persisted.status == 'awaiting_signature'
+        assert persisted.result_data == {'ceremony_state': {'current_step': 2}, 'note': 'x'}
+
+    def test_write_behind_keeps_user_reads_on_primary(self, SessionLocal, store):
+        from core import models
+        from core.replica_routing import StickyWrites
+        manager = SigningSessionManager()
+        sticky = StickyWrites(None, window_seconds=60)
+        with hot_sessions(SessionLocal, store):
+            session_id = manager.create_session('alice', 'p2p_transfer', {'amount': 10}).session_id
+            assert manager.update_session_status(session_id, 'challenge_sent')
+            with patch.object(models, 'replica_engines', [object()]), \
+                    patch('core.replica_routing._sticky_writes', sticky):
+                assert store.flush() == 1
+
+        assert sticky.is_sticky('alice')
+
+    def test_terminal_state_persisted_synchronously(self, SessionLocal, store):
+        manager = SigningSessionManager()
+        with hot_sessions(SessionLocal, store):
+            session_id = manager.create_session('alice', 'p2p_transfer', {'amount': 10}).session_id
+            manager.update_session_status(session_id, 'challenge_sent')
+            manager.update_session_status(session_id, 'awaiting_signature')
+            manager._update_session_result(session_id, {'ceremony_state': {'current_step': 3}})
+
+            assert manager.complete_session(session_id, {'txid': 'abc'}, signed_tx='00ff')
+            assert store.get(session_id) is None
+            assert store.flush() == 0
+
+        persisted = row(SessionLocal, session_id)
+        assert persisted.status == 'completed'
+        assert persisted.result_data == {'txid': 'abc'}
+        assert persisted.signed_tx == '00ff'
+
+    def test_orm_writes_keep_pending_state_and_retire_hash(self, SessionLocal, store):
+        manager = SigningSessionManager()
+        with hot_sessions(SessionLocal, store):
+            session_id = manager.create_session('alice', 'p2p_transfer', {'amount': 10}).session_id
+            manager._update_session_result(session_id, {'ceremony_state': {'current_step': 1}})
+            manager.create_challenge(session_id, b'challenge', 'Send 10')
+
+            persisted = row(SessionLocal, session_id)
+            assert persisted.status == 'challenge_sent'
+            assert persisted.result_data == {'ceremony_state': {'current_step': 1}}
+            assert manager.get_session(session_id).challenge_id == persisted.challenge_id
+
+    def test_row_read_before_concurrent_write_never_served(self, SessionLocal, store):
+        manager = SigningSessionManager()
+        with hot_sessions(SessionLocal, store):
+            session_id = manager.create_session('alice', 'p2p_transfer', {'amount': 10}).session_id
+            store.drop([session_id])
+
+            epoch = store.epoch(session_id)
+            stale = row(SessionLocal, session_id)
+            # a handler writes the row between this reader's database read and its store
+            session = SessionLocal()
+            session.query(SigningSession).filter_by(session_id=session_id).first().status = 'failed'
+            session.commit()
+            session.close()
+            store.put(stale, epoch)
+
+            assert manager.get_session(session_id).status == 'failed'
+
+    def test_redis_outage_falls_back_to_database(self, SessionLocal, store):
+        manager = SigningSessionManager()
+        with hot_sessions(SessionLocal, store):
+            session_id = manager.create_session('alice', 'p2p_transfer', {'amount': 10}).session_id
+
+            store.redis.down = True
+            assert manager.update_session_status(session_id, 'challenge_sent')
+            assert row(SessionLocal, session_id).status == 'challenge_sent'
+
+            store.redis.down = False
+            store._unavailable_until = 0
+            assert manager.get_session(session_id).status == 'challenge_sent'
+
+        assert store.get_stats()['errors'] == 1
@@ -0,0 +1,92 @@
+"""
+Test cases for the signature verification service
+"""
+
+import hashlib
+import pytest
+from types import SimpleNamespace
+
+from coincurve import PrivateKey
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from core.signature_verifier import SignatureVerifier, event_hash
+
+
+def signed_event(key, content):
+    pubkey = key.public_key_xonly.format().hex()
+    message_hash = event_hash(pubkey, 1700000000, 31510, [['t', 'intent']], content)
+    return SimpleNamespace(id=message_hash.hex(), pubkey=pubkey, created_at=1700000000, kind=31510,
+                           tags=[['t', 'intent']], content=content, sig=key.sign_schnorr(message_hash).hex())
+
+
+@pytest.fixture
+def keys():
+    return [PrivateKey() for _ in range(4)]
+
+
+class TestSignatureVerifier:
+    """Test cached and batched verification"""
+
+    def test_schnorr_uses_key_cache(self, keys):
+        verifier = SignatureVerifier(cache_size=2)
+        message = hashlib.sha256(b'challenge').digest()
+        pubkey = keys[0].public_key_xonly.format().hex()
+        signature = keys[0].sign_schnorr(message).hex()
+
+        assert verifier.verify_schnorr(pubkey, signature, message) is True
+        assert verifier.verify_schnorr(pubkey, signature, message) is True
+        assert verifier.verify_schnorr(pubkey, signature, hashlib.sha256(b'other').digest()) is False
+
+        stats = verifier.get_stats()
+        assert stats['schnorr_key_cache'] == {'hits': 2, 'misses': 1}
+        assert stats['verified'] == 2 and stats['invalid'] == 1
+
+    def test_key_cache_evicts_least_recent(self, keys):
+        verifier = SignatureVerifier(cache_size=2)
+        message = hashlib.sha256(b'm').digest()
+        items = [(k.public_key_xonly.format().hex(), k.sign_schnorr(message).hex(), message) for k in keys[:3]]
+
+        for item in items + items[2:]:
+            verifier.verify_schnorr(*item)
+
+        assert verifier.get_stats()['schnorr_key_cache'] == {'hits': 1, 'misses': 3}
+        assert len(verifier._schnorr_keys._keys) == 2
+
+    def test_event_batch_results_in_order(self, keys):
+        verifier = SignatureVerifier()
+        events = [signed_event(key, f'intent {i}') for i, key in enumerate(keys)]
+        events[1].content = 'tampered'
+        events[2].sig = 'not hex'
+        events[3].pubkey = events[0].pubkey
+
+        assert verifier.verify_events(events) == [True, False, False, False]
+        assert verifier.get_stats()['batches'] == 1
+
+    def test_batch_verified_on_process_pool(self, keys):
+        verifier = SignatureVerifier(processes=2, batch_min=4)
+        events = [signed_event(keys[i % len(keys)], f'intent {i}') for i in range(9)]
+        events[5].content = 'tampered'
+        try:
+            results = verifier.verify_events(events)
+        finally:
+            verifier.shutdown()
+
+        assert results == [i != 5 for i in range(9)]
+        stats = verifier.get_stats()
+        assert stats['pool_batches'] == 1
+        assert stats['verified'] == 8 and stats['invalid'] == 1
+
+    def test_ecdsa_der_keys_cached(self):
+        private_key = ec.generate_private_key(ec.SECP256K1())
+        pubkey_hex = private_key.public_key().public_bytes(
+            serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo).hex()
+        data = b'challenge data'
+        signature = private_key.sign(data, ec.ECDSA(hashes.SHA256()))
+        verifier = SignatureVerifier()
+
+        assert verifier.verify_ecdsa(pubkey_hex, signature, data) is True
+        assert verifier.verify_ecdsa('0x' + pubkey_hex, signature, data) is True
+        assert verifier.verify_ecdsa(pubkey_hex, signature, b'other data') is False
+        assert verifier.verify_ecdsa('zz', signature, data) is False
+        assert verifier.get_stats()['ecdsa_key_cache'] == {'hits': 2, 'misses': 2}
@@ -938,4 +938,71 @@ class TestTransactionProcessor:
             assert result['asset_id'] == 'BTC'
 
         finally:
-            db_session.close()
\ No newline at end of file
+            db_session.close()
+
+class TestUserTransactionHistory:
+    """Test JOIN-based, keyset-paginated user transaction history"""
+
+    USER = "history_user_pubkey"
+
+    @pytest.fixture
+    def history(self, test_db_session):
+        """Three sessions per asset for the user, one per other user; one transaction each"""
+        now = datetime.utcnow()
+        n = 0
+        for user, asset_id in [(self.USER, 'BTC')] * 3 + [(self.USER, 'USDT')] * 3 + [("other_user", 'BTC')]:
+            session_id = f"history_session_{n}"
+            test_db_session.add(SigningSession(
+                session_id=session_id, user_pubkey=user, session_type="p2p_transfer", status="completed",
+                intent_data={"asset_id": asset_id, "amount": 1000 + n},
+                expires_at=now + timedelta(hours=1)
+            ))
+            test_db_session.add(Transaction(
+                txid=f"history_tx_{n}", session_id=session_id, tx_type="ark_tx",
+                status="confirmed" if n % 2 else "pending", amount_sats=1000 + n,
+                # ties on created_at are broken by id
+                created_at=now - timedelta(minutes=n // 2)
+            ))
+            n += 1
+        test_db_session.commit()
+
+    def test_cursor_pages_cover_all_rows_once(self, history):
+        processor = TransactionProcessor()
+        seen, cursor = [], None
+        while True:
+            page = processor.get_user_transactions_page(self.USER, limit=4, cursor=cursor)
+            seen.extend(tx['txid'] for tx in page['transactions'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+
+        assert seen == [f"history_tx_{n}" for n in (1, 0, 3, 2, 5, 4)]
+
+    def test_asset_filter_runs_before_paging(self, history):
+        processor = TransactionProcessor()
+
+        page = processor.get_user_transactions_page(self.USER, limit=2, asset_id='USDT')
+
+        rest = processor.get_user_transactions_page(self.USER, limit=2, asset_id='USDT', cursor=page['next_cursor'])
+
+        assert [tx['txid'] for tx in page['transactions']] == ["history_tx_3", "history_tx_5"]
+        assert [tx['txid'] for tx in rest['transactions']] == ["history_tx_4"]
+        assert all(tx['asset_id'] == 'USDT' for tx in page['transactions'] + rest['transactions'])
+        assert rest['next_cursor'] is None
+
+    def test_single_query_per_page(self, history, test_db_session):
+        from sqlalchemy import event
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(test_db_session._engine, 'before_cursor_execute', listener)
+        try:
+            page = TransactionProcessor().get_user_transactions_page(self.USER, limit=10, status='pending')
+        finally:
+            event.remove(test_db_session._engine, 'before_cursor_execute', listener)
+
+        assert [tx['status'] for tx in page['transactions']] == ['pending'] * 3
+        assert len(statements) == 1
+
+    def test_invalid_cursor_rejected(self):
+        with pytest.raises(TransactionError):
+            TransactionProcessor().get_user_transactions_page(self.USER, cursor="not-a-cursor")
@@ -0,0 +1,792 @@
+"""
+Test cases for VtxoManager
+"""
+
+import pytest
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+from sqlalchemy.orm import sessionmaker
+
+import core.vtxo_index
+from core.models import Asset, Vtxo, RGBAllocation, RGBContract
+from core.vtxo_index import VtxoAvailabilityIndex, VtxoChange
+from core.merkle import verify_inclusion
+from core.vtxo_manager import (
+    VtxoManager, VtxoSettlementManager, VtxoInventoryMonitor, VtxoPoolView, CoinSelector, DemandForecaster,
+    DenominationLadder, DemandHistogram
+)
+from tests.test_database_setup import test_db_session
+
+
+@pytest.fixture
+def session_factory(test_db_session):
+    """Session factory bound to the per-test database, patched into core.vtxo_manager"""
+    SessionLocal = sessionmaker(bind=test_db_session._engine)
+    with patch('core.vtxo_manager.get_session', side_effect=lambda: SessionLocal()):
+        yield SessionLocal
+
+
+@pytest.fixture
+def vtxo_manager():
+    return VtxoManager()
+
+
+def seed_vtxos(session_factory, amounts, asset_id='BTC', status='available', expires_in_hours=24):
+    """Insert an asset and one VTXO per amount"""
+    session = session_factory()
+    if not session.query(Asset).filter_by(asset_id=asset_id).first():
+        session.add(Asset(asset_id=asset_id, name=asset_id, ticker=asset_id[:10]))
+    expires_at = datetime.utcnow() + timedelta(hours=expires_in_hours)
+    for i, amount in enumerate(amounts):
+        session.add(Vtxo(
+            vtxo_id=uuid.uuid4().hex,
+            txid=uuid.uuid4().hex,
+            vout=i,
+            amount_sats=amount,
+            script_pubkey=b'script',
+            asset_id=asset_id,
+            user_pubkey='',
+            status=status,
+            expires_at=expires_at
+        ))
+    session.commit()
+    session.close()
+
+
+class TestVtxoAssignment:
+    """Test VTXO claim/assignment"""
+
+    def test_assigns_smallest_eligible_vtxo(self, vtxo_manager, session_factory):
+        seed_vtxos(session_factory, [500, 2000, 1500, 50000])
+
+        vtxo = vtxo_manager.assign_vtxo_to_user('user_a', 'BTC', 1200)
+
+        assert vtxo is not None
+        assert vtxo.amount_sats == 1500
+        assert vtxo.status == 'assigned'
+        assert vtxo.user_pubkey == 'user_a'
+
+    def test_skips_expired_and_assigned(self, vtxo_manager, session_factory):
+        seed_vtxos(session_factory, [1000], expires_in_hours=-1)
+        seed_vtxos(session_factory, [1000], status='assigned')
+
+        assert vtxo_manager.assign_vtxo_to_user('user_a', 'BTC', 1000) is None
+
+    def test_concurrent_assignments_claim_distinct_vtxos(self, vtxo_manager, session_factory):
+        seed_vtxos(session_factory, [1000] * 40)
+
+        def assign(i):
+            vtxo = vtxo_manager.assign_vtxo_to_user(f'user_{i}', 'BTC', 1000)
+            return vtxo.vtxo_id if vtxo else None
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            claimed = list(pool.map(assign, range(40)))
+
+        assert None not in claimed
+        assert len(set(claimed)) == 40
+
+        session = session_factory()
+        assert session.query(Vtxo).filter_by(status='available').count() == 0
+        session.close()
+
+    def test_exhausted_pool_returns_none(self, vtxo_manager, session_factory):
+        seed_vtxos(session_factory, [1000] * 3)
+
+        results = [vtxo_manager.assign_vtxo_to_user(f'user_{i}', 'BTC', 1000) for i in range(4)]
+
+        assert all(results[:3])
+        assert results[3] is None
+
+
+def make_pool(amounts):
+    return VtxoPoolView([(amount, i) for i, amount in enumerate(amounts)])
+
+
+class TestCoinSelector:
+    """Test multi-VTXO coin selection"""
+
+    @pytest.fixture
+    def selector(self):
+        return CoinSelector()
+
+    def test_exact_single_match(self, selector):
+        selection = selector.select(make_pool([500, 1000, 3000]), 1000)
+
+        assert selection.strategy == 'exact_single'
+        assert selection.amounts == [1000]
+        assert selection.change == 0
+
+    def test_exact_combination_preferred_over_change(self, selector):
+        selection = selector.select(make_pool([300, 700, 2500, 5000]), 3200)
+
+        assert selection.strategy == 'branch_and_bound'
+        assert sorted(selection.amounts) == [700, 2500]
+        assert selection.change == 0
+
+    def test_smallest_covering_single_when_no_exact_match(self, selector):
+        selection = selector.select(make_pool([100, 4000, 9000]), 3500)
+
+        assert selection.strategy == 'single'
+        assert selection.amounts == [4000]
+        assert selection.change == 500
+
+    def test_largest_first_when_no_single_vtxo_covers(self, selector):
+        selection = selector.select(make_pool([1000, 2000, 30000, 40000, 50000]), 100500)
+
+        assert selection.strategy == 'largest_first'
+        assert len(selection.ids) == 3
+        assert selection.total >= 100500
+        # no smaller unused VTXO covers the 10500 remainder, so the last input stays
+        assert sorted(selection.amounts) == [30000, 40000, 50000]
+
+    def test_largest_first_reduces_change_on_last_input(self, selector):
+        selection = selector.select(make_pool([600, 5000, 9000, 10000]), 10500)
+
+        assert selection.strategy == 'largest_first'
+        assert sorted(selection.amounts) == [600, 10000]
+        assert selection.change == 100
+
+    def test_insufficient_pool(self, selector):
+        assert selector.select(make_pool([100, 200]), 1000) is None
+        assert selector.select(make_pool([]), 1) is None
+
+    def test_ids_follow_amounts(self, selector):
+        pool = VtxoPoolView([(2500, 42), (700, 7), (300, 3)])
+
+        selection = selector.select(pool, 3200)
+
+        assert sorted(selection.ids) == [7, 42]
+
+
+class TestMultiVtxoAssignment:
+    """Test atomic multi-VTXO claims"""
+
+    def test_combines_vtxos_when_no_single_vtxo_is_large_enough(self, vtxo_manager, session_factory):
+        seed_vtxos(session_factory, [1000, 2000, 4000])
+
+        vtxos = vtxo_manager.assign_vtxos_to_user('user_a', 'BTC', 6000)
+
+        assert sorted(v.amount_sats for v in vtxos) == [2000, 4000]
+        assert all(v.status == 'assigned' and v.user_pubkey == 'user_a' for v in vtxos)
+
+    def test_returns_empty_when_pool_cannot_cover(self, vtxo_manager, session_factory):
+        seed_vtxos(session_factory, [1000, 2000])
+
+        assert vtxo_manager.assign_vtxos_to_user('user_a', 'BTC', 5000) == []
+
+        session = session_factory()
+        assert session.query(Vtxo).filter_by(status='available').count() == 2
+        session.close()
+
+    def test_fallback_pool_view_reads_bounded_rows(self, vtxo_manager, session_factory):
+        seed_vtxos(session_factory, list(range(100, 10100, 100)) + [20000, 30000])
+        vtxo_manager.coin_selector.bnb_window = 8
+        session = session_factory()
+
+        pool = vtxo_manager.get_pool_view(session, 'BTC', 15000)
+        session.close()
+
+        assert pool.amounts == list(range(9300, 10100, 100)) + [20000]
+        vtxos = vtxo_manager.assign_vtxos_to_user('user_a', 'BTC', 19100)
+        assert len(vtxos) == 2 and sum(v.amount_sats for v in vtxos) == 19100
+
+    def test_assignment_keeps_user_reads_on_primary(self, vtxo_manager, session_factory):
+        from core import models
+        from core.replica_routing import StickyWrites
+        seed_vtxos(session_factory, [1000, 2000, 4000])
+        sticky = StickyWrites(None, window_seconds=60)
+
+        with patch.object(models, 'replica_engines', [object()]), \
+                patch('core.replica_routing._sticky_writes', sticky):
+            assert vtxo_manager.assign_vtxos_to_user('user_a', 'BTC', 6000)
+            assert vtxo_manager.assign_vtxo_to_user('user_b', 'BTC', 1000)
+
+        assert sticky.is_sticky('user_a')
+        assert sticky.is_sticky('user_b')
+
+    def test_claim_is_all_or_nothing(self, vtxo_manager, session_factory):
+        seed_vtxos(session_factory, [1000, 2000])
+        session = session_factory()
+        ids = [v.id for v in session.query(Vtxo).all()]
+        session.query(Vtxo).filter(Vtxo.id == ids[0]).update({'status': 'assigned'})
+        session.commit()
+
+        claimed = vtxo_manager._claim_vtxo_set(session, 'user_a', ids)
+
+        assert claimed == []
+        assert session.query(Vtxo).filter(Vtxo.id == ids[1]).one().status == 'available'
+        session.close()
+
+
+@pytest.fixture
+def availability_index(session_factory):
+    """A fresh global availability index, built from the per-test database"""
+    index = VtxoAvailabilityIndex()
+    with patch('core.vtxo_index.get_session', side_effect=lambda: session_factory()), \
+            patch.object(core.vtxo_index, '_vtxo_index', index):
+        yield index
+
+
+class TestVtxoPoolView:
+    """Test in-place updates of the sorted pool"""
+
+    def test_add_and_remove_keep_order(self):
+        pool = make_pool([3000, 1000])
+
+        assert pool.add(2000, 10)
+        assert not pool.add(2000, 10)
+        assert pool.remove(3000, 0)
+        assert not pool.remove(3000, 0)
+
+        assert pool.amounts == [1000, 2000]
+        assert pool.ids == [1, 10]
+        assert pool.total == 3000
+
+    def test_first_covering(self):
+        pool = make_pool([500, 1000, 1000, 4000])
+
+        assert pool.first_covering(1000) == 1
+        assert pool.first_covering(1001) == 3
+        assert pool.first_covering(5000) == 4
+
+
+class TestVtxoAvailabilityIndex:
+    """Test the in-memory availability index and its change hooks"""
+
+    def test_rebuild_matches_database(self, availability_index, session_factory):
+        seed_vtxos(session_factory, [500, 2000, 1500])
+        seed_vtxos(session_factory, [1000], status='assigned')
+        seed_vtxos(session_factory, [1000], status='spent')
+
+        assert availability_index.rebuild()
+
+        assert availability_index.status_counts('BTC') == {'available': 3, 'assigned': 1, 'spent': 1}
+        assert len(availability_index.candidates('BTC', 1200)) == 2
+
+    def test_expired_rows_are_not_candidates(self, availability_index, session_factory):
+        seed_vtxos(session_factory, [1000], expires_in_hours=-1)
+        availability_index.rebuild()
+
+        assert availability_index.candidates('BTC', 1) == []
+        assert availability_index.status_counts('BTC') == {'available': 1}
+
+    def test_commit_hooks_track_inserts_and_status_changes(self, availability_index, session_factory):
+        availability_index.rebuild()
+        seed_vtxos(session_factory, [1000, 2000])
+
+        assert availability_index.status_counts('BTC') == {'available': 2}
+
+        session = session_factory()
+        vtxo = session.query(Vtxo).filter_by(amount_sats=1000).one()
+        vtxo.status = 'spent'
+        session.commit()
+        session.close()
+
+        assert availability_index.status_counts('BTC') == {'available': 1, 'spent': 1}
+        assert len(availability_index.candidates('BTC', 1)) == 1
+
+    def test_rollback_discards_changes(self, availability_index, session_factory):
+        seed_vtxos(session_factory, [1000])
+        availability_index.rebuild()
+
+        session = session_factory()
+        session.query(Vtxo).one().status = 'assigned'
+        session.flush()
+        session.rollback()
+        session.close()
+
+        assert availability_index.status_counts('BTC') == {'available': 1}
+
+    def test_repeated_change_is_noop(self, availability_index, session_factory):
+        seed_vtxos(session_factory, [1000])
+        availability_index.rebuild()
+        pk = availability_index.candidates('BTC', 1)[0]
+
+        availability_index.apply_changes([VtxoChange(pk, 'assigned')] * 2)
+
+        assert availability_index.status_counts('BTC') == {'assigned': 1}
+
+    def test_assignment_updates_index(self, availability_index, session_factory):
+        seed_vtxos(session_factory, [1000, 2000, 4000])
+        availability_index.rebuild()
+        manager = VtxoManager()
+
+        vtxo = manager.assign_vtxo_to_user('user_a', 'BTC', 1500)
+        vtxos = manager.assign_vtxos_to_user('user_b', 'BTC', 5000)
+
+        assert vtxo.amount_sats == 2000
+        assert sorted(v.amount_sats for v in vtxos) == [1000, 4000]
+        assert availability_index.status_counts('BTC') == {'assigned': 3}
+        assert availability_index.candidates('BTC', 1) == []
+
+    def test_reconcile_reads_outside_lock_and_keeps_concurrent_commits(self, availability_index,
+                                                                        session_factory):
+        seed_vtxos(session_factory, [1000, 2000])
+        availability_index.rebuild()
+        read_state = availability_index._read_state
+        lock_free = []
+
+        def read_with_concurrent_commit(asset_id):
+            assets = read_state(asset_id)
+            probe = threading.Thread(target=lambda: lock_free.append(availability_index._lock.acquire(blocking=False)))
+            probe.start()
+            probe.join()
+            # another worker claims a row after the read saw it available
+            session = session_factory()
+            session.query(Vtxo).filter_by(amount_sats=1000).one().status = 'assigned'
+            session.commit()
+            session.close()
+            return assets
+
+        with patch.object(availability_index, '_read_state', side_effect=read_with_concurrent_commit):
+            assert availability_index.reconcile()
+
+        assert lock_free == [True]
+        assert availability_index.status_counts('BTC') == {'available': 1, 'assigned': 1}
+        assert len(availability_index.candidates('BTC', 1)) == 1
+
+    def test_stale_index_falls_back_and_reconciles(self, availability_index, session_factory):
+        seed_vtxos(session_factory, [1000, 2000])
+        availability_index.rebuild()
+
+        # another process claims the 1000 row and creates a new one behind the index's back
+        session = session_factory()
+        pk = session.query(Vtxo).filter_by(amount_sats=1000).one().id
+        session.query(Vtxo).filter(Vtxo.id == pk).update({'status': 'assigned'}, synchronize_session=False)
+        session.commit()
+        session.close()
+        availability_index.ready = False
+        seed_vtxos(session_factory, [8000])
+        availability_index.ready = True
+
+        manager = VtxoManager()
+        assert manager.assign_vtxo_to_user('user_a', 'BTC', 500).amount_sats == 2000
+        assert manager.assign_vtxo_to_user('user_b', 'BTC', 5000).amount_sats == 8000
+        assert availability_index.candidates('BTC', 1) == []
+
+    def test_index_built_lazily_on_first_use(self, availability_index, session_factory):
+        seed_vtxos(session_factory, [1000, 2000])
+        manager = VtxoManager()
+        manager.lazy_index_build = True
+
+        try:
+            assert manager.assign_vtxos_to_user('user_a', 'BTC', 5000) == []
+            deadline = time.monotonic() + 5
+            while not availability_index.ready and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert availability_index.ready
+            assert manager.assign_vtxo_to_user('user_a', 'BTC', 500).amount_sats == 1000
+            assert availability_index.status_counts('BTC') == {'available': 1, 'assigned': 1}
+        finally:
+            availability_index.stop_reconciliation()
+
+        manager.assign_vtxo_to_user('user_b', 'BTC', 500)
+        assert not availability_index.running and not availability_index.ready
+
+    def test_inventory_status_served_from_index(self, availability_index, session_factory):
+        seed_vtxos(session_factory, [1000] * 4)
+        seed_vtxos(session_factory, [1000], status='assigned')
+        monitor = VtxoInventoryMonitor()
+        session = session_factory()
+        from_database = monitor.get_asset_inventory_status(session, 'BTC')
+
+        availability_index.rebuild()
+        with patch.object(session, 'query', side_effect=AssertionError('database queried')):
+            from_index = monitor.get_asset_inventory_status(session, 'BTC')
+        session.close()
+
+        assert from_index == from_database
+        assert from_index['available_vtxos'] == 4
+        assert from_index['total_vtxos'] == 5
+
+
+def make_batch(n, start=0):
+    return {'vtxos': [
+        {'vtxo_id': f'vtxo_{i:06d}', 'txid': 'ab' * 32, 'vout': i, 'script_pubkey': '51'}
+        for i in range(start, start + n)
+    ]}
+
+
+class TestVtxoBatchStorage:
+    """Test chunked bulk persistence of created VTXO batches"""
+
+    def test_stores_all_rows_in_chunks(self, vtxo_manager, session_factory):
+        seed_vtxos(session_factory, [])
+        vtxo_manager.vtxo_insert_chunk_size = 3
+        session = session_factory()
+
+        inserted = vtxo_manager._store_vtxo_batch(session, make_batch(10), 'BTC', 1000)
+
+        assert inserted == 10
+        rows = session.query(Vtxo).all()
+        assert len(rows) == 10
+        assert all(v.status == 'available' and v.amount_sats == 1000 and v.script_pubkey == b'\x51' for v in rows)
+        session.close()
+
+    def test_duplicate_vtxo_ids_are_skipped(self, vtxo_manager, session_factory):
+        seed_vtxos(session_factory, [])
+        session = session_factory()
+        vtxo_manager._store_vtxo_batch(session, make_batch(5), 'BTC', 1000)
+
+        batch = make_batch(5, start=3)
+        batch['vtxos'].append(dict(batch['vtxos'][0]))
+        inserted = vtxo_manager._store_vtxo_batch(session, batch, 'BTC', 1000)
+
+        assert inserted == 3
+        assert session.query(Vtxo).count() == 8
+        session.close()
+
+    def test_bulk_inserts_reach_availability_index(self, availability_index, session_factory, vtxo_manager):
+        seed_vtxos(session_factory, [])
+        availability_index.rebuild()
+        session = session_factory()
+
+        vtxo_manager._store_vtxo_batch(session, make_batch(4), 'BTC', 1000)
+        vtxo_manager._store_vtxo_batch(session, make_batch(4), 'BTC', 1000)
+        session.close()
+
+        assert availability_index.status_counts('BTC') == {'available': 4}
+        assert len(availability_index.candidates('BTC', 1000)) == 4
+
+
+def seed_split_parent(session_factory, amount=10000, rgb=False):
+    """An assigned VTXO to split, optionally carrying an RGB allocation"""
+    seed_vtxos(session_factory, [amount], status='assigned')
+    session = session_factory()
+    parent = session.query(Vtxo).one()
+    parent.user_pubkey = 'owner'
+    if rgb:
+        session.add(RGBContract(contract_id='contract_1', name='Token', interface_id='iface',
+                                specification_id='spec', genesis_proof='proof', schema_type='CFA',
+                                total_issued=amount))
+        parent.rgb_allocation_id = 'parent_allocation'
+    session.commit()
+    vtxo_id = parent.vtxo_id
+    session.close()
+    return vtxo_id
+
+
+class TestVtxoSplit:
+    """Test single-transaction VTXO splits"""
+
+    def test_split_writes_outputs_and_spends_parent(self, vtxo_manager, session_factory):
+        vtxo_id = seed_split_parent(session_factory)
+
+        assert vtxo_manager.split_rgb_vtxo(vtxo_id, [3000, 2000])
+
+        session = session_factory()
+        vtxos = {v.vtxo_id: v for v in session.query(Vtxo).all()}
+        assert vtxos[vtxo_id].status == 'spent'
+        assert vtxos[f'{vtxo_id}_split_0'].amount_sats == 3000
+        assert vtxos[f'{vtxo_id}_split_1'].amount_sats == 2000
+        assert vtxos[f'{vtxo_id}_change'].amount_sats == 5000
+        assert all(v.user_pubkey == 'owner' for k, v in vtxos.items() if k != vtxo_id)
+        session.close()
+
+    def test_second_split_of_same_vtxo_fails(self, vtxo_manager, session_factory):
+        vtxo_id = seed_split_parent(session_factory)
+
+        assert vtxo_manager.split_rgb_vtxo(vtxo_id, [10000])
+        assert not vtxo_manager.split_rgb_vtxo(vtxo_id, [10000])
+
+    def test_failed_split_leaves_no_partial_state(self, vtxo_manager, session_factory):
+        vtxo_id = seed_split_parent(session_factory)
+        session = session_factory()
+        # an output id that is already taken makes the split fail after the parent update
+        blocker = session.query(Vtxo).one()
+        session.add(Vtxo(vtxo_id=f'{vtxo_id}_split_1', txid='tx', vout=9, amount_sats=1,
+                         script_pubkey=b'script', asset_id='BTC', user_pubkey='',
+                         status='spent', expires_at=blocker.expires_at))
+        session.commit()
+        session.close()
+
+        assert not vtxo_manager.split_rgb_vtxo(vtxo_id, [3000, 2000])
+
+        session = session_factory()
+        assert session.query(Vtxo).filter_by(vtxo_id=vtxo_id).one().status == 'assigned'
+        assert session.query(Vtxo).count() == 2
+        session.close()
+
+    def test_rgb_split_creates_allocations_in_same_transaction(self, vtxo_manager, session_factory):
+        vtxo_id = seed_split_parent(session_factory, rgb=True)
+        splits = [{'contract_id': 'contract_1'}, {'contract_id': 'contract_1', 'proof_data': 'p'}]
+
+        assert vtxo_manager.split_rgb_vtxo(vtxo_id, [6000, 4000], splits)
+
+        session = session_factory()
+        allocations = session.query(RGBAllocation).order_by(RGBAllocation.vtxo_id).all()
+        assert [(a.vtxo_id, a.amount, a.owner_pubkey) for a in allocations] == [
+            (f'{vtxo_id}_split_0', 6000, 'owner'), (f'{vtxo_id}_split_1', 4000, 'owner')
+        ]
+        child = session.query(Vtxo).filter_by(vtxo_id=f'{vtxo_id}_split_1').one()
+        assert child.rgb_allocation_id == allocations[1].allocation_id
+        assert child.rgb_asset_type == 'CFA'
+        assert child.rgb_proof_data == 'p'
+        assert session.query(RGBContract).one().total_issued == 20000
+        session.close()
+
+    def test_rgb_split_with_unknown_contract_writes_nothing(self, vtxo_manager, session_factory):
+        vtxo_id = seed_split_parent(session_factory, rgb=True)
+
+        assert not vtxo_manager.split_rgb_vtxo(vtxo_id, [6000], [{'contract_id': 'missing'}])
+
+        session = session_factory()
+        assert session.query(Vtxo).count() == 1
+        assert session.query(Vtxo).one().status == 'assigned'
+        assert session.query(RGBAllocation).count() == 0
+        session.close()
+
+    def test_split_updates_availability_index(self, availability_index, session_factory, vtxo_manager):
+        vtxo_id = seed_split_parent(session_factory)
+        availability_index.rebuild()
+
+        assert vtxo_manager.split_rgb_vtxo(vtxo_id, [3000])
+
+        assert availability_index.status_counts('BTC') == {'spent': 1, 'available': 2}
+        assert len(availability_index.candidates('BTC', 3000)) == 2
+
+
+class TestDemandForecaster:
+    """Test the EWMA assignment-rate forecaster"""
+
+    def test_rate_follows_recent_minutes(self):
+        forecaster = DemandForecaster(alpha=0.5)
+        for minute in range(3):
+            forecaster.record('BTC', 10, now=minute * 60)
+
+        # closed minutes: 0.5*10 -> 5, then 0.5*10 + 0.5*5 -> 7.5; current minute has 10
+        assert forecaster.rate('BTC', now=2 * 60 + 30) == 10
+        assert forecaster.rate('BTC', now=3 * 60) == pytest.approx(8.75)
+
+    def test_idle_minutes_decay_rate(self):
+        forecaster = DemandForecaster(alpha=0.5)
+        forecaster.record('BTC', 40, now=0)
+
+        assert forecaster.rate('BTC', now=60) == 20
+        assert forecaster.rate('BTC', now=4 * 60) == 2.5
+        assert forecaster.rate('ETH') == 0
+
+
+class TestEventDrivenReplenishment:
+    """Test low-watermark triggers, coalescing and forecast-based sizing"""
+
+    @pytest.fixture
+    def monitor(self, session_factory):
+        monitor = VtxoInventoryMonitor()
+        monitor.replenishment_debounce_seconds = 0.05
+        monitor.running = True  # event triggers without the safety-net thread
+        return monitor
+
+    def wait_for_checks(self, monitor):
+        for timer in list(monitor._pending_checks.values()):
+            timer.join()
+
+    def test_low_watermark_scales_with_demand(self, monitor):
+        assert monitor.low_watermark('BTC') == monitor.min_vtxos_per_asset
+
+        monitor.demand_forecaster.record('BTC', 30)
+
+        assert monitor.low_watermark('BTC') == 30 * monitor.replenishment_lead_minutes
+
+    def test_batch_sized_from_forecast(self, monitor):
+        status = {'available_vtxos': 20, 'total_vtxos': 40, 'demand_per_minute': 3}
+
+        assert monitor.calculate_replenishment_amount(status) == 3 * 30 - 20
+
+    def test_concurrent_triggers_enqueue_once(self, monitor, session_factory):
+        seed_vtxos(session_factory, [1000] * 2)
+
+        with patch('core.tasks.enqueue_vtxo_replenishment') as enqueue:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(lambda _: monitor.on_assignment('BTC'), range(50)))
+            self.wait_for_checks(monitor)
+
+            # cooldown suppresses triggers right after the enqueue
+            monitor.on_assignment('BTC')
+            assert not monitor._pending_checks
+
+        enqueue.assert_called_once()
+        asset_id, count = enqueue.call_args[0]
+        assert asset_id == 'BTC' and count > 0
+
+    def test_no_trigger_when_monitoring_stopped(self, monitor):
+        monitor.running = False
+
+        monitor.on_assignment('BTC')
+
+        assert not monitor._pending_checks
+        assert monitor.demand_forecaster.rate('BTC') == 1
+
+    def test_no_check_when_index_above_watermark(self, availability_index, monitor, session_factory):
+        seed_vtxos(session_factory, [1000] * 20)
+        availability_index.rebuild()
+
+        monitor.on_assignment('BTC')
+
+        assert not monitor._pending_checks
+
+    def test_assignment_feeds_monitor(self, vtxo_manager, session_factory):
+        seed_vtxos(session_factory, [1000, 2000])
+
+        with patch.object(vtxo_manager.inventory_monitor, 'on_assignment') as on_assignment:
+            vtxo_manager.assign_vtxo_to_user('user_a', 'BTC', 1000)
+            vtxo_manager.assign_vtxos_to_user('user_b', 'BTC', 2000)
+
+        assert [c[0] for c in on_assignment.call_args_list] == [('BTC', 1, 1000), ('BTC', 1, 2000)]
+
+    def test_enqueue_coalesces_across_processes(self):
+        from core.tasks import enqueue_vtxo_replenishment
+
+        redis_conn = MagicMock()
+        redis_conn.set.side_effect = [True, None]
+        with patch('redis.Redis.from_url', return_value=redis_conn), patch('rq.Queue') as queue:
+            assert enqueue_vtxo_replenishment('BTC', 10, coalesce_seconds=60) is not None
+            assert enqueue_vtxo_replenishment('BTC', 10, coalesce_seconds=60) is None
+
+        queue.return_value.enqueue.assert_called_once()
+        redis_conn.set.assert_called_with('arkrelay:vtxo_replenishment:BTC', 10, nx=True, ex=60)
+
+
+class TestDenominationLadder:
+    """Test denomination ladders and demand-shaped replenishment plans"""
+
+    @pytest.fixture
+    def monitor(self, session_factory):
+        monitor = VtxoInventoryMonitor()
+        monitor.denomination_ladders = {'BTC': DenominationLadder([1000, 2000, 5000])}
+        return monitor
+
+    def test_series(self):
+        assert DenominationLadder.from_series('pow2', 1000, 10000).rungs == [1024, 2048, 4096, 8192]
+        assert DenominationLadder.from_series('1-2-5', 1000, 10000).rungs == [1000, 2000, 5000, 10000]
+        with pytest.raises(ValueError):
+            DenominationLadder.from_series('fibonacci', 1000, 10000)
+
+    def test_rung_for(self):
+        ladder = DenominationLadder([1000, 2000, 5000])
+
+        assert [ladder.rung_for(a) for a in (1, 1000, 1001, 4999, 9000)] == [1000, 1000, 2000, 5000, 5000]
+
+    def test_histogram_shares(self):
+        ladder = DenominationLadder([1000, 2000, 5000])
+        histogram = DemandHistogram(window=4)
+        assert histogram.shares('BTC', ladder) == pytest.approx({1000: 1 / 3, 2000: 1 / 3, 5000: 1 / 3})
+
+        for amount in (5000, 900, 1000, 1500, 1800):  # the first sample falls out of the window
+            histogram.record('BTC', amount)
+
+        assert histogram.shares('BTC', ladder) == {1000: 0.5, 2000: 0.5, 5000: 0.0}
+
+    def test_plan_fills_rungs_below_demand_share(self, monitor):
+        for amount in [1000] * 6 + [2000] * 3 + [5000]:
+            monitor.demand_histogram.record('BTC', amount)
+
+        plan = monitor.plan_denominations('BTC', 10, {1000: 0, 2000: 4, 5000: 6})
+
+        # targets over 20 VTXOs: 12 / 6 / 2 -> deficits 12 / 2 / 0
+        assert plan == [(1000, 9), (2000, 1)]
+        assert sum(n for _, n in plan) == 10
+
+    def test_available_by_rung_from_index_and_database(self, availability_index, monitor, session_factory):
+        seed_vtxos(session_factory, [500, 1000, 1500, 2000, 7000, 7000])
+        session = session_factory()
+        try:
+            from_db = monitor.available_by_rung(session, 'BTC', monitor.ladder_for('BTC'))
+            availability_index.rebuild()
+            from_index = monitor.available_by_rung(session, 'BTC', monitor.ladder_for('BTC'))
+        finally:
+            session.close()
+
+        assert from_db == from_index == {1000: 2, 2000: 1, 5000: 2}
+
+    def test_replenishment_job_mints_each_rung(self):
+        from core.tasks import process_vtxo_replenishment
+
+        manager = MagicMock()
+        manager.create_vtxo_batch.return_value = True
+        with patch('core.vtxo_manager.get_vtxo_manager', return_value=manager), \
+                patch('core.tasks.get_session'):
+            process_vtxo_replenishment('BTC', 5, [[1000, 3], [5000, 2]])
+
+        assert manager.create_vtxo_batch.call_args_list == [
+            (('BTC', 3), {'amount_sats': 1000}), (('BTC', 2), {'amount_sats': 5000})
+        ]
+
+    def test_exact_rung_served_by_single_vtxo(self, vtxo_manager, session_factory):
+        seed_vtxos(session_factory, [1000, 2000, 5000, 5000])
+
+        vtxos = vtxo_manager.assign_vtxos_to_user('user_a', 'BTC', 2000)
+
+        assert [v.amount_sats for v in vtxos] == [2000]
+
+
+class TestVtxoSettlement:
+    """Test streamed settlement in capped commitments with inclusion proofs"""
+
+    @pytest.fixture
+    def ark_client(self):
+        ark_client = MagicMock()
+        ark_client.create_commitment_transaction.side_effect = lambda **kw: {
+            'txid': uuid.uuid4().hex, 'raw_tx': 'raw', 'vtxo_ids': kw['vtxo_ids']
+        }
+        ark_client.broadcast_transaction.return_value = True
+        with patch('core.vtxo_manager.get_grpc_manager') as grpc_manager:
+            grpc_manager.return_value.get_client.return_value = ark_client
+            yield ark_client
+
+    def seed_spent(self, session_factory, count, asset_id='BTC'):
+        seed_vtxos(session_factory, [1000] * count, asset_id=asset_id, status='spent')
+        session = session_factory()
+        session.query(Vtxo).filter_by(status='spent').update({'spending_txid': 'spend_tx'})
+        session.commit()
+        session.close()
+
+    def test_batch_size_limited_per_commitment(self, session_factory, ark_client):
+        self.seed_spent(session_factory, 23)
+        self.seed_spent(session_factory, 4, asset_id='USDT')
+        manager = VtxoSettlementManager()
+        manager.settlement_batch_size = 10
+        manager.settlement_chunk_size = 3
+
+        summary = manager.process_hourly_settlement()
+
+        assert summary == {'batches': 4, 'settled_vtxos': 27}
+        sizes = [len(c.kwargs['vtxo_ids']) for c in ark_client.create_commitment_transaction.call_args_list]
+        assert sorted(sizes) == [3, 4, 10, 10]
+        session = session_factory()
+        assert session.query(Vtxo).filter_by(status='settled').count() == 27
+        session.close()
+
+    def test_stores_verifiable_inclusion_proofs(self, session_factory, ark_client):
+        self.seed_spent(session_factory, 7)
+        manager = VtxoSettlementManager()
+
+        manager.process_hourly_settlement()
+
+        session = session_factory()
+        try:
+            for vtxo in session.query(Vtxo).all():
+                proof = vtxo.settlement_proof
+                assert proof['tree_size'] == 7
+                assert verify_inclusion(
+                    manager.vtxo_leaf(vtxo.vtxo_id), proof['leaf_index'], proof['tree_size'],
+                    [bytes.fromhex(p) for p in proof['path']], bytes.fromhex(proof['merkle_root'])
+                )
+        finally:
+            session.close()
+        assert ark_client.create_commitment_transaction.call_args.kwargs['merkle_root'] == proof['merkle_root']
+
+    def test_failed_broadcast_leaves_vtxos_spent(self, session_factory, ark_client):
+        self.seed_spent(session_factory, 5)
+        ark_client.broadcast_transaction.return_value = False
+
+        summary = VtxoSettlementManager().process_hourly_settlement()
+
+        assert summary == {'batches': 0, 'settled_vtxos': 0}
+        session = session_factory()
+        assert session.query(Vtxo).filter_by(status='spent').count() == 5
+        session.close()